@@ -0,0 +1,96 @@
+"""Run the benchmark scenarios and check them against the stored baselines.
+
+Usage::
+
+    python -m benchmarks [--repeat N] [--only NAME] [--update-baselines]
+
+Exits non-zero when any scenario regresses past its baseline.
+"""
+
+import argparse
+import sys
+
+from benchmarks.harness import (
+    Measurement,
+    compare,
+    load_baselines,
+    measure,
+    save_baselines,
+)
+from benchmarks.scenarios import SCENARIOS, bench_environment
+from benchmarks.startup import load_budgets, measure_import_ms
+
+
+def run_scenarios(names: list[str], repeat: int) -> list[Measurement]:
+    """Measure each scenario in its own fresh environment."""
+    measurements = []
+    for name in names:
+        with bench_environment() as env:
+            operation = SCENARIOS[name](env)
+            measurements.append(measure(name, operation, env.counter, repeat=repeat))
+    return measurements
+
+
+def format_calls(calls: dict[str, int]) -> str:
+    return ", ".join(f"{kind}={count}" for kind, count in calls.items()) or "-"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--only", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--time-tolerance", type=float, default=0.5)
+    parser.add_argument("--alloc-tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--update-baselines",
+        action="store_true",
+        help="store these results as the new baselines",
+    )
+    args = parser.parse_args()
+
+    measurements = run_scenarios(args.only or list(SCENARIOS), args.repeat)
+    baselines = load_baselines()
+
+    print(f"{'scenario':<34} {'wall ms':>9} {'alloc KiB':>10}  calls")
+    failed = False
+    for m in measurements:
+        print(
+            f"{m.name:<34} {m.wall_ms:>9.2f} {m.alloc_kib:>10.1f}  "
+            f"{format_calls(m.calls)}"
+        )
+        if args.update_baselines:
+            continue
+        for regression in compare(
+            m, baselines.get(m.name), args.time_tolerance, args.alloc_tolerance
+        ):
+            print(f"  REGRESSION: {regression}")
+            failed = True
+
+    print(f"\n{'entry point import':<34} {'ms':>9} {'budget':>10}")
+    for module, budget in load_budgets().items():
+        elapsed = measure_import_ms(module)
+        print(f"{module:<34} {elapsed:>9.1f} {budget:>10.0f}")
+        if elapsed > budget:
+            print(f"  OVER BUDGET: {module} imports in {elapsed:.0f}ms")
+            failed = True
+
+    if args.update_baselines:
+        save_baselines([*measurements, *_unmeasured(baselines, measurements)])
+        print("Baselines updated")
+    return 1 if failed else 0
+
+
+def _unmeasured(
+    baselines: dict[str, dict], measurements: list[Measurement]
+) -> list[Measurement]:
+    """Keep baselines of scenarios left out with --only."""
+    measured = {m.name for m in measurements}
+    return [
+        Measurement(name=name, **values)
+        for name, values in baselines.items()
+        if name not in measured
+    ]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
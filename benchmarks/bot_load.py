@@ -0,0 +1,436 @@
+"""Load test for the Discord bot's command handlers.
+
+Synthetic interactions arrive at a steady rate and are handed to the
+callbacks ``create_bot`` registers, all on one event loop as in the bot.
+AWS is served by stubs that block for a configurable latency like botocore
+does, and the session and timeline stores are real SQLite files with a month
+of history, served to the stats and timeline commands by a local health
+server as the tools container does. Response times are measured from when each command was due to
+arrive, so a handler that blocks the loop delays every command queued behind
+it instead of hiding the wait. A timer rescheduled with ``loop.call_later``
+records how late the loop ran it, which is how long the loop was blocked.
+
+Usage::
+
+    python -m benchmarks.bot_load [--rate N] [--duration S] [--aws-latency MS]
+        [--command NAME=WEIGHT ...]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import copy
+import random
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from typing import Any
+from unittest import mock
+
+import discord
+
+from minecraft_tools.config import DiscordBotConfig
+from minecraft_tools.discord_bot.main import create_bot
+from minecraft_tools.health import HealthChecker, HealthServer
+from minecraft_tools.sessions import SessionStore, configure_sessions, player_stats
+from minecraft_tools.timeline import (
+    TimelineStore,
+    configure_timeline,
+    percentile,
+    recent_milestones,
+)
+
+CLUSTER = "minecraft-cluster"
+SERVICE = "minecraft-service"
+TASK_ARN = f"arn:aws:ecs:us-east-1:123456789012:task/{CLUSTER}/0123456789abcdef"
+HEARTBEAT = 0.001
+
+DEFAULT_MIX = {
+    "server-status": 6,
+    "server-start": 2,
+    "server-stats": 1,
+    "server-timeline": 1,
+    "help": 1,
+}
+
+# The command an AWS call is made for, also inside asyncio.to_thread
+_command: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "command", default="(none)"
+)
+
+
+class AWSCalls:
+    """AWS calls per command and how many were in flight at once."""
+
+    def __init__(self) -> None:
+        self.calls: dict[str, Counter[str]] = defaultdict(Counter)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def call(self, operation: str) -> Iterator[None]:
+        with self._lock:
+            self.calls[_command.get()][operation] += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class StubClient:
+    """AWS client answering with canned responses after a blocking delay."""
+
+    def __init__(
+        self,
+        service: str,
+        responses: dict[str, dict[str, Any]],
+        latency: float,
+        aws: AWSCalls,
+    ) -> None:
+        self.service = service
+        self.responses = responses
+        self.latency = latency
+        self.aws = aws
+
+    def __getattr__(self, operation: str) -> Any:
+        if operation not in self.responses:
+            raise AttributeError(operation)
+
+        def call(**kwargs: Any) -> dict[str, Any]:
+            with self.aws.call(f"{self.service}.{operation}"):
+                time.sleep(self.latency)
+                if operation == "update_service":
+                    service = self.responses["describe_services"]["services"][0]
+                    service["desiredCount"] = kwargs["desiredCount"]
+                return copy.deepcopy(self.responses[operation])
+
+        return call
+
+
+def stub_responses(desired: int) -> dict[str, dict[str, dict[str, Any]]]:
+    """Canned responses of a service with one running task."""
+    started = datetime(2026, 10, 12, 18, tzinfo=UTC)
+    return {
+        "ecs": {
+            "describe_services": {
+                "services": [{"desiredCount": desired, "runningCount": 1}]
+            },
+            "update_service": {},
+            "list_tasks": {"taskArns": [TASK_ARN]},
+            "describe_tasks": {
+                "tasks": [
+                    {
+                        "taskArn": TASK_ARN,
+                        "createdAt": started,
+                        "pullStartedAt": started,
+                        "pullStoppedAt": started,
+                        "startedAt": started,
+                        "attachments": [
+                            {
+                                "type": "ElasticNetworkInterface",
+                                "details": [
+                                    {"name": "networkInterfaceId", "value": "eni-1"}
+                                ],
+                            }
+                        ],
+                    }
+                ]
+            },
+        },
+        "ec2": {
+            "describe_network_interfaces": {
+                "NetworkInterfaces": [{"Association": {"PublicIp": "198.51.100.7"}}]
+            }
+        },
+    }
+
+
+def seed_stores(
+    workdir: str, now: float, days: int = 30
+) -> tuple[SessionStore, TimelineStore]:
+    """Configure session and timeline stores with a month of evenings."""
+    sessions = configure_sessions(f"{workdir}/sessions.db").store
+    timeline = configure_timeline(f"{workdir}/timeline.db", "bot-load").store
+    assert sessions is not None and timeline is not None
+    for day in range(days, 0, -1):
+        evening = now - day * 86400
+        arn = f"{TASK_ARN[:-4]}{day:04d}"
+        timeline.record("requested", None, evening - 120)
+        for offset, milestone in [
+            (-110, "task_created"),
+            (-100, "pull_started"),
+            (-80, "pull_stopped"),
+            (-70, "task_started"),
+            (-65, "dns_updated"),
+            (0, "rcon_ready"),
+        ]:
+            timeline.record(milestone, arn, evening + offset)
+        for minute in range(0, 120, 5):
+            players = ["Steve", "Alex"] if minute < 90 else ["Steve"]
+            sessions.observe(players, at=evening + minute * 60)
+        sessions.observe([], at=evening + 2 * 3600)
+    return sessions, timeline
+
+
+class _Response:
+    """``interaction.response``, recording when the command answered."""
+
+    def __init__(self) -> None:
+        self.responded_at: float | None = None
+        self.messages: list[str] = []
+
+    def is_done(self) -> bool:
+        return self.responded_at is not None
+
+    async def send_message(self, content: str = "", **kwargs: Any) -> None:
+        self.responded_at = time.perf_counter()
+        self.messages.append(content)
+
+    async def defer(self, **kwargs: Any) -> None:
+        self.responded_at = time.perf_counter()
+
+
+def synthetic_interaction(user: str) -> Any:
+    """The parts of ``discord.Interaction`` the command handlers use."""
+    return SimpleNamespace(
+        user=SimpleNamespace(name=user, discriminator="0"),
+        created_at=discord.utils.utcnow(),
+        response=_Response(),
+    )
+
+
+@dataclass
+class CommandStats:
+    """Response times of one command, in milliseconds."""
+
+    name: str
+    count: int
+    p50: float
+    p95: float
+    p99: float
+    max: float
+    calls: dict[str, float]  # per command
+    errors: int
+
+
+@dataclass
+class LoadResult:
+    """Outcome of one load test."""
+
+    commands: list[CommandStats]
+    sent: int
+    duration: float  # seconds from the first arrival to the last answer
+    longest_stall: float  # milliseconds a timer ran late
+    p99_stall: float
+    max_aws_in_flight: int
+    errors: list[str] = field(default_factory=list)
+
+
+def arrivals(
+    mix: dict[str, int], rate: float, duration: float, seed: int
+) -> list[tuple[float, str]]:
+    """Poisson arrivals of commands drawn from a weighted mix."""
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    schedule = []
+    at = rng.expovariate(rate)
+    while at < duration:
+        schedule.append((at, rng.choices(names, weights)[0]))
+        at += rng.expovariate(rate)
+    return schedule
+
+
+async def _drive(
+    bot: Any, schedule: list[tuple[float, str]], aws: AWSCalls
+) -> LoadResult:
+    loop = asyncio.get_running_loop()
+    loop_lags: list[float] = []
+    ticker: asyncio.TimerHandle | None = None
+
+    def tick(due: float) -> None:
+        # A timer runs in the loop pass it falls due in, while a task woken
+        # by asyncio.sleep() waits another pass behind every ready task
+        nonlocal ticker
+        now = loop.time()
+        loop_lags.append(max(now - due, 0.0))
+        ticker = loop.call_at(now + HEARTBEAT, tick, now + HEARTBEAT)
+
+    results: dict[str, list[float]] = defaultdict(list)
+    failures: Counter[str] = Counter()
+    errors: list[str] = []
+
+    async def invoke(name: str, due: float, user: str) -> None:
+        _command.set(name)
+        interaction = synthetic_interaction(user)
+        command = bot.tree.get_command(name)
+        try:
+            await command.callback(interaction)
+        except Exception as e:
+            failures[name] += 1
+            errors.append(f"{name}: {e}")
+        answered = interaction.response.responded_at or time.perf_counter()
+        results[name].append((answered - due) * 1000)
+
+    ticker = loop.call_at(loop.time() + HEARTBEAT, tick, loop.time() + HEARTBEAT)
+    start = time.perf_counter()
+    tasks = []
+    for n, (offset, name) in enumerate(schedule):
+        due = start + offset
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(invoke(name, due, f"user{n % 100}")))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    ticker.cancel()
+
+    commands = []
+    for name, times in sorted(results.items()):
+        commands.append(
+            CommandStats(
+                name=name,
+                count=len(times),
+                p50=percentile(times, 50),
+                p95=percentile(times, 95),
+                p99=percentile(times, 99),
+                max=max(times),
+                calls={
+                    op: count / len(times)
+                    for op, count in sorted(aws.calls[name].items())
+                },
+                errors=failures[name],
+            )
+        )
+    return LoadResult(
+        commands=commands,
+        sent=len(schedule),
+        duration=elapsed,
+        longest_stall=max(loop_lags, default=0.0) * 1000,
+        p99_stall=percentile(loop_lags, 99) * 1000 if loop_lags else 0.0,
+        max_aws_in_flight=aws.max_in_flight,
+        errors=errors,
+    )
+
+
+def run_load(
+    mix: dict[str, int] | None = None,
+    rate: float = 50.0,
+    duration: float = 10.0,
+    aws_latency: float = 0.05,
+    desired: int = 1,
+    seed: int = 1,
+) -> LoadResult:
+    """Drive the bot's command handlers with synthetic interactions."""
+    aws = AWSCalls()
+    responses = stub_responses(desired)
+    clients = {
+        service: StubClient(service, canned, aws_latency, aws)
+        for service, canned in responses.items()
+    }
+    schedule = arrivals(mix or DEFAULT_MIX, rate, duration, seed)
+    with (
+        tempfile.TemporaryDirectory() as workdir,
+        mock.patch("boto3.client", lambda service, *a, **kw: clients[service]),
+    ):
+        sessions, timeline = seed_stores(workdir, time.time())
+        tools = HealthServer(
+            HealthChecker({}),
+            port=0,
+            host="127.0.0.1",
+            routes={
+                "/stats": lambda: player_stats(sessions),
+                "/timeline": lambda: recent_milestones(timeline),
+            },
+        ).start()
+        config = DiscordBotConfig(
+            token="load-token",
+            ecs_cluster=CLUSTER,
+            ecs_service=SERVICE,
+            tools_url=f"http://127.0.0.1:{tools.port}",
+        )
+        try:
+            bot = create_bot(config)
+            return asyncio.run(_drive(bot, schedule, aws))
+        finally:
+            tools.stop()
+            configure_sessions(None)
+            configure_timeline(None)
+
+
+def format_result(result: LoadResult) -> str:
+    """Per-command response times and AWS calls, then the loop stalls."""
+    lines = [
+        f"{'command':<16} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'max ms':>8}  AWS calls per command"
+    ]
+    for c in result.commands:
+        calls = ", ".join(f"{op}={n:.2g}" for op, n in c.calls.items()) or "-"
+        lines.append(
+            f"{c.name:<16} {c.count:>6} {c.p50:>8.1f} {c.p95:>8.1f} {c.p99:>8.1f} "
+            f"{c.max:>8.1f}  {calls}"
+        )
+        if c.errors:
+            lines.append(f"  {c.errors} failed")
+    lines += [
+        "",
+        f"{result.sent} commands answered in {result.duration:.1f}s "
+        f"({result.sent / result.duration:.0f}/s)",
+        f"Longest event loop stall (timer drift) {result.longest_stall:.1f}ms "
+        f"(p99 {result.p99_stall:.1f}ms)",
+        f"Most AWS calls in flight at once: {result.max_aws_in_flight}",
+    ]
+    lines += [f"ERROR {error}" for error in result.errors[:10]]
+    return "\n".join(lines)
+
+
+def _weight(value: str) -> tuple[str, int]:
+    name, _, weight = value.partition("=")
+    return name, int(weight or 1)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=50.0, help="commands per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument(
+        "--aws-latency", type=float, default=50.0, help="ms per AWS call"
+    )
+    parser.add_argument(
+        "--desired",
+        type=int,
+        default=1,
+        help="desired count the service starts at (0 makes /server-start scale)",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--command",
+        type=_weight,
+        action="append",
+        metavar="NAME=WEIGHT",
+        help=f"command mix (default: {', '.join(f'{k}={v}' for k, v in DEFAULT_MIX.items())})",
+    )
+    args = parser.parse_args(argv)
+
+    result = run_load(
+        dict(args.command) if args.command else None,
+        rate=args.rate,
+        duration=args.duration,
+        aws_latency=args.aws_latency / 1000,
+        desired=args.desired,
+        seed=args.seed,
+    )
+    print(format_result(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Virtual time for running the blocking tool loops in a simulation.
+
+Simulated threads take turns: exactly one runs at a time, and the clock
+only moves forward when it waits. Waiting hands the turn to whatever is due
+next, so hours of ``stop_event.wait(300)`` pass in microseconds and every
+run with the same inputs takes the same steps.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class SimulationEnded(BaseException):
+    """Raised in simulated threads still waiting when the clock is closed."""
+
+
+@dataclass(eq=False)
+class _SimThread:
+    name: str
+    go: threading.Event = field(default_factory=threading.Event)
+
+
+@dataclass(eq=False)
+class _Wakeup:
+    thread: _SimThread | None = None
+    callback: Callable[[], Any] | None = None
+    cancelled: bool = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class VirtualClock:
+    """Shared clock of the simulated threads and timed callbacks."""
+
+    def __init__(self, start: float) -> None:
+        self.now = start
+        self.errors: list[str] = []
+        self._queue: list[tuple[float, int, _Wakeup]] = []
+        self._order = itertools.count()
+        self._threads = {threading.get_ident(): _SimThread("main")}
+        self._os_threads: list[threading.Thread] = []
+        self._ended = False
+
+    def time(self) -> float:
+        """Stand-in for ``time.time``."""
+        return self.now
+
+    def monotonic(self) -> float:
+        """Stand-in for ``time.monotonic``."""
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Stand-in for ``time.sleep``, letting the other threads run meanwhile."""
+        me = self._current()
+        self._push(self.now + max(seconds, 0.0), _Wakeup(me))
+        self._hand_over(me)
+
+    def call_at(self, at: float, callback: Callable[[], Any]) -> _Wakeup:
+        """Run a callback at a point in virtual time; cancel with ``.cancel()``."""
+        wakeup = _Wakeup(callback=callback)
+        self._push(at, wakeup)
+        return wakeup
+
+    def call_later(self, delay: float, callback: Callable[[], Any]) -> _Wakeup:
+        """Run a callback some virtual seconds from now."""
+        return self.call_at(self.now + delay, callback)
+
+    def event(self) -> "VirtualEvent":
+        """An event whose waits pass in virtual time."""
+        return VirtualEvent(self)
+
+    def spawn(self, name: str, target: Callable[[], Any]) -> None:
+        """Start a simulated thread; it first runs when the caller waits."""
+        thread = _SimThread(name)
+
+        def run() -> None:
+            self._threads[threading.get_ident()] = thread
+            thread.go.wait()
+            thread.go.clear()
+            if self._ended:
+                return
+            try:
+                target()
+            except SimulationEnded:
+                return
+            except Exception as e:
+                logger.exception(f"Simulated thread {name} failed")
+                self.errors.append(f"{name}: {e}")
+            if not self._ended:
+                self._hand_over(None)
+
+        os_thread = threading.Thread(target=run, name=name, daemon=True)
+        self._os_threads.append(os_thread)
+        os_thread.start()
+        self._push(self.now, _Wakeup(thread))
+
+    def run_until(self, at: float) -> None:
+        """Let the simulated threads and callbacks run up to a point in time."""
+        self.sleep(at - self.now)
+
+    def close(self) -> None:
+        """Unwind the simulated threads that are still waiting."""
+        self._ended = True
+        for thread in list(self._threads.values()):
+            thread.go.set()
+        for os_thread in self._os_threads:
+            os_thread.join(timeout=5)
+
+    def _current(self) -> _SimThread:
+        if self._ended:
+            raise SimulationEnded
+        return self._threads[threading.get_ident()]
+
+    def _push(self, at: float, wakeup: _Wakeup) -> None:
+        heapq.heappush(self._queue, (max(at, self.now), next(self._order), wakeup))
+
+    def _hand_over(self, me: _SimThread | None) -> None:
+        """Run what is due next, then block ``me`` until its turn comes again."""
+        while True:
+            if not self._queue:
+                raise RuntimeError("Every simulated thread waits forever")
+            at, _, wakeup = heapq.heappop(self._queue)
+            if wakeup.cancelled:
+                continue
+            self.now = at
+            if wakeup.callback is None:
+                break
+            try:
+                wakeup.callback()
+            except Exception as e:
+                logger.exception("Simulated callback failed")
+                self.errors.append(f"callback: {e}")
+
+        assert wakeup.thread is not None
+        if wakeup.thread is me:
+            return
+        wakeup.thread.go.set()
+        if me is None:
+            return
+        me.go.wait()
+        me.go.clear()
+        if self._ended:
+            raise SimulationEnded
+
+
+class VirtualEvent:
+    """``threading.Event`` whose waits pass in virtual time."""
+
+    def __init__(self, clock: VirtualClock) -> None:
+        self.clock = clock
+        self._flag = False
+        self._waiters: list[_Wakeup] = []
+
+    def is_set(self) -> bool:
+        return self._flag
+
+    def set(self) -> None:
+        self._flag = True
+        for waiter in self._waiters:
+            if not waiter.cancelled:
+                waiter.cancel()
+                self.clock._push(self.clock.now, _Wakeup(waiter.thread))
+        self._waiters.clear()
+
+    def clear(self) -> None:
+        self._flag = False
+
+    def wait(self, timeout: float | None = None) -> bool:
+        if self._flag:
+            return True
+        me = self.clock._current()
+        wakeup = _Wakeup(me)
+        if timeout is not None:
+            self.clock._push(self.clock.now + max(timeout, 0.0), wakeup)
+        self._waiters.append(wakeup)
+        self.clock._hand_over(me)
+        # Woken by the timeout, so a later set() must not wake this thread
+        wakeup.cancel()
+        if wakeup in self._waiters:
+            self._waiters.remove(wakeup)
+        return self._flag
@@ -0,0 +1,103 @@
+"""In-process stand-in for a Minecraft server's RCON listener."""
+
+import socket
+import struct
+import threading
+
+SERVERDATA_AUTH = 3
+SERVERDATA_AUTH_RESPONSE = 2
+SERVERDATA_EXECCOMMAND = 2
+SERVERDATA_RESPONSE_VALUE = 0
+
+
+def _recv_exact(conn: socket.socket, length: int) -> bytes:
+    data = b""
+    while len(data) < length:
+        chunk = conn.recv(length - len(data))
+        if not chunk:
+            raise ConnectionError("Client closed the connection")
+        data += chunk
+    return data
+
+
+def encode_packet(request_id: int, packet_type: int, body: str) -> bytes:
+    """Encode one RCON packet."""
+    payload = struct.pack("<ii", request_id, packet_type) + body.encode() + b"\x00\x00"
+    return struct.pack("<i", len(payload)) + payload
+
+
+class FakeRconServer:
+    """Answer RCON logins and commands on a local port.
+
+    ``list`` reports ``players`` online players; other commands are echoed
+    back. Every connection, login and command is counted.
+    """
+
+    def __init__(self, players: int = 0, password: str = "") -> None:
+        self.players = players
+        self.password = password
+        self.connections = 0
+        self.commands: list[str] = []
+        self._sock = socket.create_server(("127.0.0.1", 0))
+        self._sock.settimeout(0.1)
+        self.port = self._sock.getsockname()[1]
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def reply(self, command: str) -> str:
+        """Build the response to a command."""
+        if command == "list":
+            return f"There are {self.players} of a max of 20 players online: "
+        return command
+
+    def _serve(self) -> None:
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except TimeoutError:
+                continue
+            self.connections += 1
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn: socket.socket) -> None:
+        with conn:
+            try:
+                while True:
+                    (length,) = struct.unpack("<i", _recv_exact(conn, 4))
+                    payload = _recv_exact(conn, length)
+                    request_id, packet_type = struct.unpack("<ii", payload[:8])
+                    body = payload[8:-2].decode()
+                    if packet_type == SERVERDATA_AUTH:
+                        ok = body == self.password
+                        conn.sendall(
+                            encode_packet(
+                                request_id if ok else -1, SERVERDATA_AUTH_RESPONSE, ""
+                            )
+                        )
+                    elif packet_type == SERVERDATA_EXECCOMMAND:
+                        self.commands.append(body)
+                        conn.sendall(
+                            encode_packet(
+                                request_id, SERVERDATA_RESPONSE_VALUE, self.reply(body)
+                            )
+                        )
+                    else:
+                        # Minecraft's answer to request types it does not know
+                        conn.sendall(
+                            encode_packet(
+                                request_id,
+                                SERVERDATA_RESPONSE_VALUE,
+                                f"Unknown request {packet_type:x}",
+                            )
+                        )
+            except (ConnectionError, OSError, struct.error):
+                return
+
+    def __enter__(self) -> "FakeRconServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sock.close()
@@ -0,0 +1,148 @@
+"""Measurement and baseline comparison for benchmark scenarios."""
+
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+
+
+class CallCounter:
+    """Count outbound calls by kind, e.g. ``aws``, ``http`` or ``rcon``."""
+
+    def __init__(self) -> None:
+        self.counts: Counter[str] = Counter()
+        self._probes: dict[str, Callable[[], int]] = {}
+
+    def add(self, kind: str, count: int = 1) -> None:
+        """Record calls that are observed through a hook."""
+        self.counts[kind] += count
+
+    def probe(self, kind: str, read: Callable[[], int]) -> None:
+        """Record calls that are observed by reading a running total."""
+        self._probes[kind] = read
+
+    def snapshot(self) -> dict[str, int]:
+        """Current totals for every kind."""
+        totals = dict(self.counts)
+        for kind, read in self._probes.items():
+            totals[kind] = totals.get(kind, 0) + read()
+        return totals
+
+
+@dataclass
+class Measurement:
+    """Cost of one scenario operation."""
+
+    name: str
+    wall_ms: float
+    alloc_kib: float
+    calls: dict[str, int] = field(default_factory=dict)
+
+
+def measure(
+    name: str,
+    operation: Callable[[], Any],
+    counter: CallCounter,
+    repeat: int = 20,
+    warmup: int = 1,
+) -> Measurement:
+    """Time an operation and record its outbound calls and allocations.
+
+    Warm-up runs absorb one-off costs such as loading botocore service
+    models. Calls and allocations are taken from a single extra run so that
+    tracemalloc overhead does not skew the timings.
+    """
+    for _ in range(warmup):
+        operation()
+
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    before = counter.snapshot()
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    after = counter.snapshot()
+
+    calls = {
+        kind: after.get(kind, 0) - before.get(kind, 0)
+        for kind in sorted(after)
+        if after.get(kind, 0) != before.get(kind, 0)
+    }
+    return Measurement(
+        name=name,
+        wall_ms=round(statistics.median(timings), 3),
+        alloc_kib=round(peak / 1024, 1),
+        calls=calls,
+    )
+
+
+def load_baselines(path: Path = BASELINES_PATH) -> dict[str, dict[str, Any]]:
+    """Load stored baselines, keyed by scenario name."""
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baselines(
+    measurements: list[Measurement], path: Path = BASELINES_PATH
+) -> None:
+    """Store measurements as the new baselines."""
+    data = {
+        m.name: {k: v for k, v in asdict(m).items() if k != "name"}
+        for m in measurements
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(
+    measurement: Measurement,
+    baseline: dict[str, Any] | None,
+    time_tolerance: float = 0.5,
+    alloc_tolerance: float = 0.25,
+) -> list[str]:
+    """Describe every way a measurement is worse than its baseline.
+
+    Outbound call counts are deterministic and must not grow at all; wall
+    time and allocations may drift within the given relative tolerances.
+    """
+    if baseline is None:
+        return []
+
+    regressions = []
+    for kind, count in measurement.calls.items():
+        allowed = baseline.get("calls", {}).get(kind, 0)
+        if count > allowed:
+            regressions.append(f"{kind} calls {allowed} -> {count}")
+
+    wall_limit = baseline["wall_ms"] * (1 + time_tolerance)
+    if measurement.wall_ms > wall_limit:
+        regressions.append(
+            f"wall time {baseline['wall_ms']:.1f}ms -> {measurement.wall_ms:.1f}ms"
+        )
+
+    alloc_limit = baseline["alloc_kib"] * (1 + alloc_tolerance)
+    if measurement.alloc_kib > alloc_limit:
+        regressions.append(
+            f"allocations {baseline['alloc_kib']:.0f}KiB -> "
+            f"{measurement.alloc_kib:.0f}KiB"
+        )
+    return regressions
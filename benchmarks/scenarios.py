@@ -0,0 +1,273 @@
+"""Benchmark scenarios exercising the real tool code paths.
+
+AWS is served by moto, Cloudflare and Discord webhooks by ``responses`` and
+the Minecraft server by :class:`FakeRconServer`, so each scenario runs the
+same functions as production while counting every outbound call.
+"""
+
+import asyncio
+import contextlib
+import os
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any
+
+import boto3
+import responses
+from moto import mock_aws
+
+from benchmarks.fake_rcon import FakeRconServer
+from benchmarks.harness import CallCounter
+from minecraft_tools.config import (
+    DiscordBotConfig,
+    DNSUpdaterConfig,
+    IdleWatcherConfig,
+)
+from minecraft_tools.discord_bot.main import create_bot
+from minecraft_tools.dns_updater.main import CloudflareAPI, update_dns_if_needed
+from minecraft_tools.idle_watcher import main as idle_watcher
+
+CLUSTER = "minecraft-cluster"
+SERVICE = "minecraft-service"
+ZONE_ID = "bench-zone"
+RECORD_NAME = "mc.example.com"
+ZONE_URL = f"https://api.cloudflare.com/client/v4/zones/{ZONE_ID}/dns_records"
+WEBHOOK_URL = "https://discord.com/api/webhooks/bench/token"
+STALE_IP = "203.0.113.10"
+
+FAKE_AWS_ENV = {
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "MOTO_ECS_SERVICE_RUNNING": "1",
+}
+
+
+@dataclass
+class BenchEnvironment:
+    """Fake AWS account, HTTP endpoints and RCON server for one run."""
+
+    counter: CallCounter
+    http: responses.RequestsMock
+    rcon: FakeRconServer
+    public_ip: str
+    stack: contextlib.ExitStack
+
+
+class StopMonitoring(BaseException):
+    """Raised to leave the idle watcher loop; not caught by its handlers."""
+
+
+def _create_service() -> str:
+    """Create the ECS service with a running task and return its public IP."""
+    ec2 = boto3.client("ec2")
+    ecs = boto3.client("ecs")
+
+    vpc_id = ec2.create_vpc(CidrBlock="10.0.0.0/16")["Vpc"]["VpcId"]
+    # moto only fills in task ENI details for VPCs with DNS hostnames
+    ec2.modify_vpc_attribute(VpcId=vpc_id, EnableDnsHostnames={"Value": True})
+    subnet_id = ec2.create_subnet(VpcId=vpc_id, CidrBlock="10.0.0.0/24")["Subnet"][
+        "SubnetId"
+    ]
+    group_id = ec2.create_security_group(
+        GroupName="minecraft", Description="minecraft", VpcId=vpc_id
+    )["GroupId"]
+    network = {
+        "awsvpcConfiguration": {
+            "subnets": [subnet_id],
+            "securityGroups": [group_id],
+            "assignPublicIp": "ENABLED",
+        }
+    }
+
+    ecs.create_cluster(clusterName=CLUSTER)
+    ecs.register_task_definition(
+        family="minecraft",
+        networkMode="awsvpc",
+        containerDefinitions=[{"name": "minecraft", "image": "mc", "memory": 512}],
+    )
+    ecs.create_service(
+        cluster=CLUSTER,
+        serviceName=SERVICE,
+        taskDefinition="minecraft",
+        desiredCount=1,
+        networkConfiguration=network,
+    )
+    task = ecs.run_task(
+        cluster=CLUSTER,
+        taskDefinition="minecraft",
+        group=f"service:{SERVICE}",
+        launchType="FARGATE",
+        networkConfiguration=network,
+    )["tasks"][0]
+
+    eni_id = next(
+        detail["value"]
+        for detail in task["attachments"][0]["details"]
+        if detail["name"] == "networkInterfaceId"
+    )
+    allocation = ec2.allocate_address(Domain="vpc")
+    ec2.associate_address(
+        AllocationId=allocation["AllocationId"], NetworkInterfaceId=eni_id
+    )
+    return allocation["PublicIp"]
+
+
+@contextlib.contextmanager
+def bench_environment(players: int = 2) -> Iterator[BenchEnvironment]:
+    """Set up fake AWS, HTTP and RCON endpoints with call counting."""
+    saved = {key: os.environ.get(key) for key in FAKE_AWS_ENV}
+    os.environ.update(FAKE_AWS_ENV)
+    try:
+        with (
+            mock_aws(),
+            responses.RequestsMock(assert_all_requests_are_fired=False) as http,
+            FakeRconServer(players=players) as rcon,
+            contextlib.ExitStack() as stack,
+        ):
+            boto3.setup_default_session(region_name="us-east-1")
+            public_ip = _create_service()
+
+            counter = CallCounter()
+            # Registered after setup so only calls made by the tools count
+            boto3.DEFAULT_SESSION.events.register(
+                "before-call", lambda **_: counter.add("aws")
+            )
+            counter.probe("http", lambda: len(http.calls))
+            counter.probe("rcon", lambda: len(rcon.commands))
+
+            http.add(responses.POST, WEBHOOK_URL, status=204)
+            yield BenchEnvironment(counter, http, rcon, public_ip, stack)
+    finally:
+        boto3.DEFAULT_SESSION = None
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _cloudflare_listing(http: responses.RequestsMock, ip: str) -> None:
+    http.add(
+        responses.GET,
+        ZONE_URL,
+        json={
+            "success": True,
+            "result": [
+                {
+                    "id": "record-a",
+                    "type": "A",
+                    "name": RECORD_NAME,
+                    "content": ip,
+                    "ttl": 300,
+                    "modified_on": "2024-01-01T00:00:00Z",
+                }
+            ],
+            "result_info": {"page": 1, "total_pages": 1},
+        },
+    )
+
+
+def _dns_config() -> DNSUpdaterConfig:
+    return DNSUpdaterConfig(
+        cloudflare_token="bench-token",
+        zone_id=ZONE_ID,
+        record_name=RECORD_NAME,
+        ecs_cluster=CLUSTER,
+        ecs_service=SERVICE,
+    )
+
+
+def dns_update_changed(env: BenchEnvironment) -> Callable[[], Any]:
+    """One-shot update where the record still points at the old task."""
+    config = _dns_config()
+    _cloudflare_listing(env.http, STALE_IP)
+    env.http.add(
+        responses.POST, f"{ZONE_URL}/batch", json={"success": True, "result": {}}
+    )
+    return lambda: update_dns_if_needed(config)
+
+
+def dns_reconcile_steady(env: BenchEnvironment) -> Callable[[], Any]:
+    """Reconcile pass with long-lived clients and an up-to-date record."""
+    config = _dns_config()
+    _cloudflare_listing(env.http, env.public_ip)
+    cloudflare = CloudflareAPI(config.cloudflare_token)
+    ecs_client = boto3.client("ecs")
+    ec2_client = boto3.client("ec2")
+    return lambda: update_dns_if_needed(config, cloudflare, ecs_client, ec2_client)
+
+
+def idle_watcher_polls(env: BenchEnvironment, polls: int = 5) -> Callable[[], Any]:
+    """Run the idle watcher loop for a fixed number of polls."""
+
+    class BenchConfig(IdleWatcherConfig):
+        def refresh(self) -> None:
+            self.polls += 1
+            if self.polls > polls:
+                raise StopMonitoring
+
+    # Never waits between polls, while idle tracking keeps real time
+    no_wait = SimpleNamespace(is_set=lambda: False, wait=lambda _: False)
+
+    def run() -> None:
+        config = BenchConfig(
+            ecs_cluster=CLUSTER,
+            ecs_service=SERVICE,
+            rcon_host="127.0.0.1",
+            rcon_port=env.rcon.port,
+            discord_webhook=WEBHOOK_URL,
+            dns_name=RECORD_NAME,
+        )
+        config.polls = 0  # type: ignore[attr-defined]
+        with contextlib.suppress(StopMonitoring):
+            idle_watcher.monitor_server(config, stop_event=no_wait)  # type: ignore[arg-type]
+
+    return run
+
+
+class _FakeResponse:
+    def __init__(self) -> None:
+        self.messages: list[str] = []
+
+    async def send_message(self, content: str) -> None:
+        self.messages.append(content)
+
+
+def _bot_command(env: BenchEnvironment, name: str) -> Callable[[], Any]:
+    config = DiscordBotConfig(
+        token="bench-token", ecs_cluster=CLUSTER, ecs_service=SERVICE
+    )
+    bot = create_bot(config)
+    command = bot.tree.get_command(name)
+    loop = asyncio.new_event_loop()
+    env.stack.callback(loop.close)
+
+    def run() -> None:
+        interaction = SimpleNamespace(
+            user=SimpleNamespace(name="bench", discriminator="0"),
+            response=_FakeResponse(),
+        )
+        loop.run_until_complete(command.callback(interaction))  # type: ignore[union-attr]
+
+    return run
+
+
+def bot_server_status(env: BenchEnvironment) -> Callable[[], Any]:
+    """/server-status with one running task."""
+    return _bot_command(env, "server-status")
+
+
+def bot_server_start(env: BenchEnvironment) -> Callable[[], Any]:
+    """/server-start while the service is already scaled up."""
+    return _bot_command(env, "server-start")
+
+
+SCENARIOS: dict[str, Callable[[BenchEnvironment], Callable[[], Any]]] = {
+    "dns_updater.update_changed": dns_update_changed,
+    "dns_updater.reconcile_steady": dns_reconcile_steady,
+    "idle_watcher.monitor_5_polls": idle_watcher_polls,
+    "discord_bot.server_status": bot_server_status,
+    "discord_bot.server_start_noop": bot_server_start,
+}
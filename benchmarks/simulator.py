@@ -0,0 +1,677 @@
+"""Simulate days of server lifecycles in virtual time.
+
+The real idle watcher and DNS reconciler loops run as simulated threads of a
+:class:`VirtualClock`, started and stopped with each task like the
+supervisor does, and the bot's scale logic handles ``/server-start`` for
+simulated players. ECS, EC2, Cloudflare and Discord webhooks are in-process
+fakes and the Minecraft server is a :class:`FakeRconServer` listing the
+players online, so a week of traffic runs in seconds.
+
+Usage::
+
+    python -m benchmarks.simulator [--days N] [--seed N]
+        [--idle-threshold S ...] [--check-interval S ...] [--player-log both]
+
+Each combination of settings is run against the same traffic and reported
+with its shutdown lag, outbound calls and runtime nobody played in.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import logging
+import os
+import random
+import statistics
+import tempfile
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from typing import Any
+from unittest import mock
+
+import requests
+
+from benchmarks.clock import VirtualClock, VirtualEvent
+from benchmarks.fake_rcon import FakeRconServer
+from benchmarks.harness import CallCounter
+from minecraft_tools import http_session
+from minecraft_tools.config import DNSUpdaterConfig, IdleWatcherConfig
+from minecraft_tools.discord_bot.main import update_service
+from minecraft_tools.dns_updater.main import reconcile_dns
+from minecraft_tools.idle_watcher.main import monitor_server
+
+logger = logging.getLogger(__name__)
+
+CLUSTER = "minecraft-cluster"
+SERVICE = "minecraft-service"
+ZONE_ID = "sim-zone"
+RECORD_NAME = "mc.example.com"
+CLOUDFLARE_URL = "https://api.cloudflare.com/client/v4"
+WEBHOOK_URL = "https://discord.com/api/webhooks/sim/token"
+STALE_IP = "203.0.113.10"
+PLAYERS = ("Steve", "Alex", "Notch", "Jeb", "Herobrine", "Kai")
+# Monday 2026-10-12 00:00 UTC
+START = datetime(2026, 10, 12, tzinfo=UTC).timestamp()
+
+
+@dataclass
+class Timings:
+    """How long AWS and the server take, in seconds."""
+
+    task_start: float = 45.0  # update_service until the task is RUNNING
+    server_boot: float = 60.0  # RUNNING until players can join
+    stop_signal: float = 2.0  # scale-down until SIGTERM reaches the task
+    task_stop: float = 30.0  # SIGTERM until the task is STOPPED
+    retry: float = 30.0  # between a waiting player's join attempts
+    patience: float = 1200.0  # waiting players give up after this long
+
+
+@dataclass
+class Visit:
+    """A player playing one or more sessions with breaks in between."""
+
+    player: str
+    arrive: float
+    durations: list[float]
+    breaks: list[float] = field(default_factory=list)
+
+
+@dataclass
+class Settings:
+    """Tool configuration under test."""
+
+    idle_threshold: int = 600
+    check_interval: int = 30
+    player_log: bool = True
+    log_poll_interval: float = 1.0
+    reconcile_interval: int = 60
+
+    def label(self) -> str:
+        log = "log" if self.player_log else "rcon"
+        return (
+            f"idle={self.idle_threshold} check={self.check_interval} "
+            f"dns={self.reconcile_interval} {log}"
+        )
+
+
+@dataclass
+class SimTask:
+    """One ECS task of the service."""
+
+    arn: str
+    ip: str
+    eni: str
+    launched: float
+    status: str = "PROVISIONING"
+    running_at: float | None = None
+    ready_at: float | None = None
+    stopped_at: float | None = None
+    stop_events: list[VirtualEvent] = field(default_factory=list)
+
+
+@dataclass
+class Result:
+    """What one simulated configuration did."""
+
+    settings: Settings
+    starts: int
+    billed: float  # seconds
+    played: float
+    shutdown_lags: list[float]
+    waits: list[float]
+    gave_up: int
+    dns_lags: list[float]
+    calls: dict[str, int]
+    errors: list[str]
+
+    @property
+    def wasted(self) -> float:
+        """Billed seconds nobody was playing."""
+        return self.billed - self.played
+
+
+def generate_visits(days: int, seed: int, start: float = START) -> list[Visit]:
+    """Evening play with more on weekends, some of it with a short break."""
+    rng = random.Random(seed)
+    visits = []
+    for day in range(days):
+        weekend = day % 7 >= 5
+        for player in PLAYERS:
+            if rng.random() > (0.6 if weekend else 0.35):
+                continue
+            hour = min(max(rng.gauss(15 if weekend else 20, 1.5), 8), 22)
+            minutes = rng.uniform(20, 150)
+            visit = Visit(player, start + day * 86400 + hour * 3600, [minutes * 60])
+            if rng.random() < 0.3:
+                first = minutes * rng.uniform(0.3, 0.7)
+                visit.durations = [first * 60, (minutes - first) * 60]
+                visit.breaks = [rng.uniform(5, 25) * 60]
+            visits.append(visit)
+    return sorted(visits, key=lambda v: v.arrive)
+
+
+class _Response:
+    """The parts of ``requests.Response`` the tools use."""
+
+    def __init__(self, data: dict[str, Any], status_code: int = 200) -> None:
+        self._data = data
+        self.status_code = status_code
+
+    def json(self) -> dict[str, Any]:
+        return self._data
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+
+class FakeECS:
+    """The ECS calls of the tools, backed by the simulated world."""
+
+    def __init__(self, world: "World") -> None:
+        self.world = world
+
+    def describe_services(self, cluster: str, services: list[str]) -> dict[str, Any]:
+        self.world.counter.add("ecs")
+        running = sum(t.status == "RUNNING" for t in self.world.tasks)
+        return {
+            "services": [{"desiredCount": self.world.desired, "runningCount": running}]
+        }
+
+    def update_service(self, **kwargs: Any) -> dict[str, Any]:
+        self.world.counter.add("ecs")
+        self.world.scale(kwargs["desiredCount"])
+        return {}
+
+    def list_tasks(self, **kwargs: Any) -> dict[str, Any]:
+        self.world.counter.add("ecs")
+        return {"taskArns": [t.arn for t in self.world.tasks if t.status == "RUNNING"]}
+
+    def describe_tasks(self, cluster: str, tasks: list[str]) -> dict[str, Any]:
+        self.world.counter.add("ecs")
+        return {
+            "tasks": [
+                {
+                    "taskArn": t.arn,
+                    "lastStatus": t.status,
+                    "attachments": [
+                        {
+                            "type": "ElasticNetworkInterface",
+                            "details": [{"name": "networkInterfaceId", "value": t.eni}],
+                        }
+                    ],
+                }
+                for t in self.world.tasks
+                if t.arn in tasks
+            ]
+        }
+
+
+class FakeEC2:
+    """The EC2 calls of the tools, backed by the simulated world."""
+
+    def __init__(self, world: "World") -> None:
+        self.world = world
+
+    def describe_network_interfaces(self, **kwargs: Any) -> dict[str, Any]:
+        self.world.counter.add("ec2")
+        return {
+            "NetworkInterfaces": [
+                {"Association": {"PublicIp": t.ip}}
+                for t in self.world.tasks
+                if t.eni in kwargs["NetworkInterfaceIds"]
+            ]
+        }
+
+
+class FakeHTTP:
+    """HTTP session answering Cloudflare and recording Discord webhooks."""
+
+    def __init__(self, world: "World") -> None:
+        self.world = world
+        self.records: dict[str, dict[str, Any]] = {}
+        self.messages: list[tuple[float, str]] = []
+        self._ids = itertools.count(1)
+
+    def add_record(self, record: dict[str, Any]) -> dict[str, Any]:
+        """Store a record as Cloudflare would, with an id and modification time."""
+        record = {**record, "id": record.get("id") or f"record-{next(self._ids)}"}
+        record["modified_on"] = datetime.fromtimestamp(
+            self.world.clock.now, UTC
+        ).isoformat()
+        previous = self.records.get(record["id"])
+        self.records[record["id"]] = record
+        if record["type"] == "A":
+            self.world.record_published(record["content"], previous)
+        return record
+
+    def get(self, url: str, **kwargs: Any) -> _Response:
+        self.world.counter.add("cloudflare")
+        if url == f"{CLOUDFLARE_URL}/zones/{ZONE_ID}/dns_records":
+            return _Response(
+                {
+                    "success": True,
+                    "result": [dict(r) for r in self.records.values()],
+                    "result_info": {"page": 1, "total_pages": 1},
+                }
+            )
+        if url == f"{CLOUDFLARE_URL}/zones/{ZONE_ID}":
+            return _Response({"success": True, "result": {"name_servers": []}})
+        return _Response({"success": False}, 404)
+
+    def post(self, url: str, json: dict[str, Any], **kwargs: Any) -> _Response:
+        if url == WEBHOOK_URL:
+            self.world.counter.add("discord")
+            self.messages.append((self.world.clock.now, json["content"]))
+            return _Response({}, 204)
+        self.world.counter.add("cloudflare")
+        if url != f"{CLOUDFLARE_URL}/zones/{ZONE_ID}/dns_records/batch":
+            return _Response({"success": False}, 404)
+        result: dict[str, list[dict[str, Any]]] = {
+            "deletes": [],
+            "patches": [],
+            "posts": [],
+        }
+        for record in json.get("deletes", []):
+            result["deletes"].append(self.records.pop(record["id"]))
+        for record in json.get("patches", []):
+            result["patches"].append(
+                self.add_record({**self.records[record["id"]], **record})
+            )
+        for record in json.get("posts", []):
+            result["posts"].append(self.add_record(record))
+        return _Response({"success": True, "result": result})
+
+    def put(self, url: str, json: dict[str, Any], **kwargs: Any) -> _Response:
+        self.world.counter.add("cloudflare")
+        record_id = url.rsplit("/", 1)[1]
+        record = self.add_record({**self.records[record_id], **json})
+        return _Response({"success": True, "result": record})
+
+
+class SimRconServer(FakeRconServer):
+    """RCON of the simulated server, refusing connections until it has booted."""
+
+    def __init__(self, world: "World") -> None:
+        super().__init__()
+        self.world = world
+
+    def reply(self, command: str) -> str:
+        if command == "list":
+            online = sorted(self.world.online)
+            return (
+                f"There are {len(online)} of a max of 20 players online: "
+                + ", ".join(online)
+            )
+        return command
+
+    def _handle(self, conn: Any) -> None:
+        if not any(t.ready_at and t.status == "RUNNING" for t in self.world.tasks):
+            conn.close()
+            return
+        super()._handle(conn)
+
+
+class World:
+    """The service, the server and the players, in virtual time."""
+
+    def __init__(
+        self,
+        settings: Settings,
+        timings: Timings,
+        clock: VirtualClock,
+        workdir: str,
+    ) -> None:
+        self.settings = settings
+        self.timings = timings
+        self.clock = clock
+        self.counter = CallCounter()
+        self.ecs = FakeECS(self)
+        self.ec2 = FakeEC2(self)
+        self.http = FakeHTTP(self)
+        self.rcon = SimRconServer(self)
+        self.counter.probe("rcon", lambda: len(self.rcon.commands))
+        self.log_path = os.path.join(workdir, "latest.log")
+        self.desired = 0
+        self.tasks: list[SimTask] = []
+        self.finished: list[SimTask] = []
+        # When resolvers answer with each address: a change is seen once the
+        # previous answer has expired from their caches
+        self.resolved: list[tuple[float, str]] = []
+        self.online: set[str] = set()
+        self.occupied_since: float | None = None
+        self.played = 0.0
+        # Since when a booted server has had nobody on it
+        self.empty_since: float | None = None
+        self.shutdown_lags: list[float] = []
+        self.waits: list[float] = []
+        self.gave_up = 0
+        self._ips = itertools.count(1)
+        self.http.add_record(
+            {"type": "A", "name": RECORD_NAME, "content": STALE_IP, "ttl": 300}
+        )
+
+    def client(self, service: str, *args: Any, **kwargs: Any) -> Any:
+        """Stand-in for ``boto3.client``."""
+        return {"ecs": self.ecs, "ec2": self.ec2}[service]
+
+    # Service
+
+    def scale(self, desired: int) -> None:
+        """Apply a desired count as the ECS scheduler would."""
+        if desired == 0 and self.desired > 0 and self.empty_since is not None:
+            self.shutdown_lags.append(self.clock.now - self.empty_since)
+        self.desired = desired
+        active = [t for t in self.tasks if t.status in ("PROVISIONING", "RUNNING")]
+        for task in active[desired:]:
+            task.status = "DEACTIVATING"
+            self.clock.call_later(
+                self.timings.stop_signal, lambda t=task: self.sigterm(t)
+            )
+        for _ in range(desired - len(active)):
+            self.launch()
+
+    def launch(self) -> None:
+        n = next(self._ips)
+        task = SimTask(
+            arn=f"arn:aws:ecs:us-east-1:123456789012:task/{CLUSTER}/{n:032x}",
+            ip=f"198.51.100.{n % 250 + 1}",
+            eni=f"eni-{n:08x}",
+            launched=self.clock.now,
+        )
+        self.tasks.append(task)
+        self.clock.call_later(self.timings.task_start, lambda: self.task_running(task))
+
+    def task_running(self, task: SimTask) -> None:
+        if task.status != "PROVISIONING":
+            return
+        task.status = "RUNNING"
+        task.running_at = self.clock.now
+        # A new server run starts a new latest.log
+        with open(self.log_path + ".new", "w"):
+            pass
+        os.replace(self.log_path + ".new", self.log_path)
+        self.start_tools(task)
+        self.clock.call_later(self.timings.server_boot, lambda: self.server_ready(task))
+
+    def server_ready(self, task: SimTask) -> None:
+        if task.status != "RUNNING":
+            return
+        task.ready_at = self.clock.now
+        if not self.online:
+            self.empty_since = self.clock.now
+
+    def sigterm(self, task: SimTask) -> None:
+        for event in task.stop_events:
+            event.set()
+        for player in sorted(self.online):
+            self.leave(player)
+        self.empty_since = None
+        self.clock.call_later(self.timings.task_stop, lambda: self.task_stopped(task))
+
+    def task_stopped(self, task: SimTask) -> None:
+        task.status = "STOPPED"
+        task.stopped_at = self.clock.now
+        self.tasks.remove(task)
+        self.finished.append(task)
+
+    def start_tools(self, task: SimTask) -> None:
+        """Run the idle watcher and DNS reconciler in the task, as the supervisor does."""
+        s = self.settings
+        idle_config = IdleWatcherConfig(
+            ecs_cluster=CLUSTER,
+            ecs_service=SERVICE,
+            rcon_host="127.0.0.1",
+            rcon_port=self.rcon.port,
+            discord_webhook=WEBHOOK_URL,
+            dns_name=RECORD_NAME,
+            check_interval=s.check_interval,
+            idle_threshold=s.idle_threshold,
+            player_log=self.log_path if s.player_log else "",
+            log_poll_interval=s.log_poll_interval,
+        )
+        dns_config = DNSUpdaterConfig(
+            cloudflare_token="sim-token",
+            zone_id=ZONE_ID,
+            record_name=RECORD_NAME,
+            ecs_cluster=CLUSTER,
+            ecs_service=SERVICE,
+            discord_webhook=WEBHOOK_URL,
+            reconcile_interval=s.reconcile_interval,
+            probe_enabled=False,
+        )
+        idle_stop, dns_stop = self.clock.event(), self.clock.event()
+        task.stop_events = [idle_stop, dns_stop]
+        self.clock.spawn(
+            f"idle-watcher-{task.eni}",
+            lambda: monitor_server(idle_config, self.ecs, idle_stop),  # type: ignore[arg-type]
+        )
+        self.clock.spawn(
+            f"dns-updater-{task.eni}",
+            lambda: reconcile_dns(dns_config, dns_stop, self.ecs, self.ec2),  # type: ignore[arg-type]
+        )
+
+    def record_published(self, ip: str, previous: dict[str, Any] | None) -> None:
+        if previous is not None and previous["content"] == ip:
+            return
+        ttl = previous["ttl"] if previous is not None else 0
+        self.resolved.append((self.clock.now + ttl, ip))
+
+    def resolved_ip(self) -> str | None:
+        """The address players' resolvers answer with now."""
+        for at, ip in reversed(self.resolved):
+            if at <= self.clock.now:
+                return ip
+        return None
+
+    def serving(self) -> SimTask | None:
+        """The task players can reach through DNS, if any."""
+        if self.desired == 0:
+            return None
+        for task in self.tasks:
+            if (
+                task.status == "RUNNING"
+                and task.ready_at is not None
+                and task.ip == self.resolved_ip()
+            ):
+                return task
+        return None
+
+    # Players
+
+    def arrive(self, visit: Visit, started: float, asked: bool = False) -> None:
+        """A player trying to join, asking the bot to start the server if needed."""
+        if self.serving() is not None:
+            self.waits.append(self.clock.now - started)
+            self.join(visit.player)
+            self.clock.call_later(visit.durations[0], lambda: self.finish(visit))
+            return
+        if self.clock.now - started >= self.timings.patience:
+            self.gave_up += 1
+            return
+        if not asked:
+            self.server_start(visit.player)
+        self.clock.call_later(
+            self.timings.retry, lambda: self.arrive(visit, started, asked=True)
+        )
+
+    def finish(self, visit: Visit) -> None:
+        """A player ending a session, coming back after a break if there is one."""
+        if visit.player in self.online:
+            self.leave(visit.player)
+        if visit.breaks:
+            again = Visit(visit.player, 0.0, visit.durations[1:], visit.breaks[1:])
+            self.clock.call_later(
+                visit.breaks[0],
+                lambda: self.arrive(again, self.clock.now),
+            )
+
+    def server_start(self, player: str) -> None:
+        """``/server-start`` through the bot's scale logic."""
+        interaction = SimpleNamespace(
+            user=SimpleNamespace(name=player, discriminator="0"),
+            response=SimpleNamespace(send_message=_discard),
+        )
+        asyncio.run(update_service(interaction, self.ecs, CLUSTER, SERVICE, 1))  # type: ignore[arg-type]
+
+    def join(self, player: str) -> None:
+        if not self.online:
+            self.occupied_since = self.clock.now
+        self.online.add(player)
+        self.empty_since = None
+        self._log(f"{player} joined the game")
+
+    def leave(self, player: str) -> None:
+        self.online.discard(player)
+        self._log(f"{player} left the game")
+        if not self.online and self.occupied_since is not None:
+            self.played += self.clock.now - self.occupied_since
+            self.occupied_since = None
+            self.empty_since = self.clock.now
+
+    def _log(self, message: str) -> None:
+        stamp = datetime.fromtimestamp(self.clock.now, UTC).strftime("%H:%M:%S")
+        with open(self.log_path, "a") as f:
+            f.write(f"[{stamp}] [Server thread/INFO]: {message}\n")
+
+    def result(self, end: float) -> Result:
+        played = self.played
+        if self.occupied_since is not None:
+            played += end - self.occupied_since
+        tasks = self.finished + self.tasks
+        return Result(
+            settings=self.settings,
+            starts=len(tasks),
+            billed=sum((t.stopped_at or end) - t.launched for t in tasks),
+            played=played,
+            shutdown_lags=self.shutdown_lags,
+            waits=self.waits,
+            gave_up=self.gave_up,
+            dns_lags=[
+                min(at for at, ip in self.resolved if ip == t.ip) - t.running_at
+                for t in tasks
+                if t.running_at is not None
+                and any(ip == t.ip for _, ip in self.resolved)
+            ],
+            calls=self.counter.snapshot(),
+            errors=self.clock.errors,
+        )
+
+
+async def _discard(content: str) -> None:
+    pass
+
+
+@contextlib.contextmanager
+def patched(world: World) -> Iterator[None]:
+    """Route time, AWS clients and HTTP through the simulation."""
+    clock = world.clock
+    with (
+        mock.patch("time.time", clock.time),
+        mock.patch("time.monotonic", clock.monotonic),
+        mock.patch("time.sleep", clock.sleep),
+        mock.patch("boto3.client", world.client),
+        mock.patch.object(http_session, "_session", world.http),
+    ):
+        yield
+
+
+def simulate(
+    settings: Settings,
+    visits: list[Visit],
+    days: float,
+    timings: Timings | None = None,
+    start: float = START,
+) -> Result:
+    """Run one configuration against a list of visits."""
+    clock = VirtualClock(start)
+    end = start + days * 86400
+    with tempfile.TemporaryDirectory() as workdir:
+        world = World(settings, timings or Timings(), clock, workdir)
+        with world.rcon, patched(world):
+            for visit in visits:
+                clock.call_at(visit.arrive, lambda v=visit: world.arrive(v, clock.now))
+            try:
+                clock.run_until(end)
+            finally:
+                clock.close()
+        return world.result(end)
+
+
+def _summary(values: list[float]) -> str:
+    if not values:
+        return "-"
+    return f"{statistics.median(values):.0f}/{max(values):.0f}"
+
+
+def format_results(results: list[Result]) -> str:
+    """One row per configuration, times in seconds as median/max."""
+    lines = [
+        f"{'settings':<40} {'starts':>6} {'billed h':>8} {'wasted h':>8} "
+        f"{'shutdown lag':>12} {'wait':>9} {'dns lag':>8}  calls"
+    ]
+    for r in results:
+        calls = ", ".join(f"{k}={v}" for k, v in sorted(r.calls.items()) if v)
+        lines.append(
+            f"{r.settings.label():<40} {r.starts:>6} {r.billed / 3600:>8.1f} "
+            f"{r.wasted / 3600:>8.1f} {_summary(r.shutdown_lags):>12} "
+            f"{_summary(r.waits):>9} {_summary(r.dns_lags):>8}  {calls}"
+        )
+        if r.gave_up:
+            lines.append(f"  {r.gave_up} players gave up waiting")
+        for error in r.errors:
+            lines.append(f"  ERROR {error}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--idle-threshold", type=int, nargs="+", default=[600])
+    parser.add_argument("--check-interval", type=int, nargs="+", default=[30])
+    parser.add_argument("--reconcile-interval", type=int, nargs="+", default=[60])
+    parser.add_argument(
+        "--player-log",
+        choices=["yes", "no", "both"],
+        default="yes",
+        help="follow the server log, poll RCON only, or compare both",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="show tool logs")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.CRITICAL,
+        format="%(asctime)s %(threadName)s %(name)s: %(message)s",
+    )
+    player_logs = {"yes": [True], "no": [False], "both": [True, False]}
+    visits = generate_visits(args.days, args.seed)
+    results = [
+        simulate(
+            Settings(
+                idle_threshold=idle_threshold,
+                check_interval=check_interval,
+                reconcile_interval=reconcile_interval,
+                player_log=player_log,
+            ),
+            visits,
+            args.days,
+        )
+        for idle_threshold, check_interval, reconcile_interval, player_log in (
+            itertools.product(
+                args.idle_threshold,
+                args.check_interval,
+                args.reconcile_interval,
+                player_logs[args.player_log],
+            )
+        )
+    ]
+    print(f"{len(visits)} visits over {args.days} days (seed {args.seed})\n")
+    print(format_results(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""Start-up time budgets for short-lived entry points."""
+
+import json
+import statistics
+from pathlib import Path
+
+from minecraft_tools.startup import profile_imports, total_import_ms
+
+BUDGETS_PATH = Path(__file__).with_name("budgets.json")
+
+
+def load_budgets(path: Path = BUDGETS_PATH) -> dict[str, float]:
+    """Load the import-time budget in milliseconds per entry-point module."""
+    with open(path) as f:
+        return json.load(f)["import_ms"]
+
+
+def measure_import_ms(module: str, runs: int = 5) -> float:
+    """Median import time of a module, each run in a fresh interpreter."""
+    return statistics.median(
+        total_import_ms(profile_imports([module]), [module]) for _ in range(runs)
+    )
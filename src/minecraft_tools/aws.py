@@ -0,0 +1,139 @@
+"""AWS client construction.
+
+botocore parses the full JSON service model of every client it creates, and
+the EC2 model alone is several megabytes. ``build_models`` writes compact
+models that keep only the operations the tools call, and
+``use_trimmed_models`` makes the default boto3 session prefer them. A
+service without a trimmed model for the installed API version falls back to
+the full model shipped with botocore.
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = Path(__file__).with_name("aws_models")
+
+# Every AWS operation the tools call, plus the STS calls botocore makes to
+# resolve assume-role profiles; anything else needs the full models
+TRIMMED_OPERATIONS = {
+    "ec2": ["DescribeNetworkInterfaces"],
+    "ecs": ["DescribeServices", "DescribeTasks", "ListTasks", "UpdateService"],
+    "ssm": ["GetParametersByPath"],
+    "sts": ["AssumeRole", "AssumeRoleWithWebIdentity", "GetCallerIdentity"],
+}
+
+
+def create_client(service_name: str) -> Any:
+    """Create an AWS client, importing boto3 only on first use."""
+    import boto3
+
+    return boto3.client(service_name)
+
+
+def trim_service_model(model: dict[str, Any], operations: list[str]) -> dict[str, Any]:
+    """Keep only the given operations and the shapes they reference."""
+    missing = [name for name in operations if name not in model["operations"]]
+    if missing:
+        raise ValueError(f"Unknown operations: {', '.join(missing)}")
+
+    kept = {name: model["operations"][name] for name in operations}
+    pending = []
+    for operation in kept.values():
+        for key in ("input", "output"):
+            if key in operation:
+                pending.append(operation[key]["shape"])
+        pending.extend(error["shape"] for error in operation.get("errors", []))
+
+    shapes: dict[str, Any] = {}
+    while pending:
+        name = pending.pop()
+        if name in shapes:
+            continue
+        shape = shapes[name] = model["shapes"][name]
+        for key in ("member", "key", "value"):
+            if key in shape:
+                pending.append(shape[key]["shape"])
+        pending.extend(member["shape"] for member in shape.get("members", {}).values())
+
+    return _strip_documentation(
+        {"version": model.get("version", "2.0"), "metadata": model["metadata"]}
+        | {"operations": kept, "shapes": shapes}
+    )
+
+
+def _strip_documentation(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            k: _strip_documentation(v)
+            for k, v in value.items()
+            if k not in ("documentation", "documentationUrl")
+        }
+    if isinstance(value, list):
+        return [_strip_documentation(v) for v in value]
+    return value
+
+
+def build_models(output_dir: Path = MODELS_DIR) -> list[Path]:
+    """Write trimmed models for the installed botocore version."""
+    from botocore.loaders import Loader
+
+    loader = Loader()
+    written = []
+    for service, operations in TRIMMED_OPERATIONS.items():
+        api_version = loader.determine_latest_version(service, "service-2")
+        model = loader.load_service_model(service, "service-2", api_version)
+        path = output_dir / service / api_version / "service-2.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(trim_service_model(model, operations), f, separators=(",", ":"))
+        logger.info(f"Wrote {path} ({path.stat().st_size} bytes)")
+        written.append(path)
+    return written
+
+
+def trimmed_model_loader(models_dir: Path = MODELS_DIR) -> Any:
+    """Create a botocore loader that searches the trimmed models first.
+
+    Only ``service-2`` files are trimmed; endpoint rules and paginators are
+    still found in botocore's own data directory. A trimmed model is only
+    picked when its API version is the newest one installed.
+    """
+    from botocore.loaders import Loader
+
+    return Loader(extra_search_paths=[str(models_dir)])
+
+
+def use_trimmed_models(models_dir: Path = MODELS_DIR) -> None:
+    """Make the default boto3 session load the trimmed models.
+
+    Call this before instrumenting the default session, which it replaces.
+    """
+    if not models_dir.is_dir():
+        logger.debug(f"No trimmed AWS models in {models_dir}, using full models")
+        return
+
+    import boto3
+    import botocore.session
+
+    session = botocore.session.get_session()
+    session.register_component("data_loader", trimmed_model_loader(models_dir))
+    boto3.setup_default_session(botocore_session=session)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Build the trimmed AWS service models."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--output", type=Path, default=MODELS_DIR)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    build_models(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""Incremental, deduplicated backups of the server data directory.
+
+Files are split into fixed-size chunks aligned to the 4 KiB sectors of
+Anvil region files, so a Minecraft chunk the server rewrites in place only
+changes the backup chunks it touches. Files whose size and modification time
+match the previous snapshot are not read at all; changed files are hashed
+through memory maps on a thread pool, as hashlib releases the GIL.
+"""
+
+import argparse
+import hashlib
+import logging
+import mmap
+import os
+import stat
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from minecraft_tools.backup.store import BackupRepository
+from minecraft_tools.config import BackupConfig
+from minecraft_tools.logging_config import setup_logging_from_env
+from minecraft_tools.tracing import span
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024  # 16 region file sectors
+
+
+@dataclass
+class BackupStats:
+    """What a snapshot had to read and store."""
+
+    files: int = 0
+    changed_files: int = 0
+    read_bytes: int = 0
+    new_chunks: int = 0
+    new_bytes: int = 0
+    seconds: float = 0.0
+
+
+def iter_files(
+    source_dir: Path, exclude: list[str], skip: Path | None = None
+) -> Iterator[tuple[str, os.stat_result]]:
+    """Regular files below a directory as relative POSIX paths."""
+    excluded = set(exclude)
+    source_dir = source_dir.resolve()
+    skip = skip.resolve() if skip else None
+    for dirpath, dirnames, filenames in os.walk(source_dir):
+        base = Path(dirpath)
+        rel_dir = base.relative_to(source_dir).as_posix()
+        dirnames[:] = sorted(
+            name
+            for name in dirnames
+            if (name if rel_dir == "." else f"{rel_dir}/{name}") not in excluded
+            and base / name != skip
+        )
+        for name in sorted(filenames):
+            rel = name if rel_dir == "." else f"{rel_dir}/{name}"
+            if rel in excluded:
+                continue
+            st = os.lstat(base / name)
+            if stat.S_ISREG(st.st_mode):
+                yield rel, st
+
+
+def store_file(
+    repo: BackupRepository,
+    path: Path,
+    known: set[str],
+    chunk_size: int = CHUNK_SIZE,
+    lock: AbstractContextManager[Any] | None = None,
+) -> tuple[list[str], int, int]:
+    """Hash a file chunk by chunk and store the chunks the repository lacks.
+
+    Digests are added to ``known`` under ``lock``, so files hashed on other
+    threads never store the same new chunk twice. Returns the chunk digests
+    and the number and size of new chunks.
+    """
+    lock = lock or threading.Lock()
+    digests: list[str] = []
+    new_chunks = new_bytes = 0
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return digests, 0, 0
+        with (
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+            memoryview(mapped) as view,
+        ):
+            for offset in range(0, len(view), chunk_size):
+                with view[offset : offset + chunk_size] as chunk:
+                    digest = hashlib.sha256(chunk).hexdigest()
+                    digests.append(digest)
+                    with lock:
+                        if digest in known:
+                            continue
+                        known.add(digest)
+                    if not repo.has_chunk(digest):
+                        repo.put_chunk(digest, chunk)
+                        new_chunks += 1
+                        new_bytes += len(chunk)
+    return digests, new_chunks, new_bytes
+
+
+def create_snapshot(config: BackupConfig) -> tuple[str, BackupStats]:
+    """Back up the source directory and prune old snapshots.
+
+    Only one backup may run against a repository at a time.
+    """
+    started = time.perf_counter()
+    repo = BackupRepository(config.repository)
+    source_dir = Path(config.source_dir)
+    stats = BackupStats()
+
+    snapshot_ids = repo.snapshot_ids()
+    previous = repo.load_manifest(snapshot_ids[-1])["files"] if snapshot_ids else {}
+    known = {digest for entry in previous.values() for digest in entry["chunks"]}
+
+    known_lock = threading.Lock()
+    files: dict[str, dict[str, Any]] = {}
+    pending: dict[str, Future[tuple[list[str], int, int]]] = {}
+    with (
+        span("backup.snapshot", source=config.source_dir),
+        ThreadPoolExecutor(max_workers=config.workers) as pool,
+    ):
+        for rel, st in iter_files(source_dir, config.exclude, skip=repo.root):
+            stats.files += 1
+            entry = {
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "mode": stat.S_IMODE(st.st_mode),
+            }
+            old = previous.get(rel)
+            if old and (old["size"], old["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+                files[rel] = entry | {"chunks": old["chunks"]}
+            else:
+                files[rel] = entry
+                pending[rel] = pool.submit(
+                    store_file, repo, source_dir / rel, known, CHUNK_SIZE, known_lock
+                )
+
+        for rel, future in pending.items():
+            try:
+                digests, new_chunks, new_bytes = future.result()
+            except FileNotFoundError:
+                logger.warning(f"{rel} disappeared during the backup")
+                del files[rel]
+                stats.files -= 1
+                continue
+            files[rel]["chunks"] = digests
+            stats.changed_files += 1
+            stats.read_bytes += files[rel]["size"]
+            stats.new_chunks += new_chunks
+            stats.new_bytes += new_bytes
+
+    created = datetime.now(UTC)
+    snapshot_id = created.strftime("%Y%m%dT%H%M%S.%fZ")
+    repo.save_manifest(
+        snapshot_id,
+        {
+            "created": created.isoformat(),
+            "source": config.source_dir,
+            "chunk_size": CHUNK_SIZE,
+            "files": files,
+        },
+    )
+    prune_snapshots(repo, config.keep)
+
+    stats.seconds = time.perf_counter() - started
+    logger.info(
+        f"Snapshot {snapshot_id}: {stats.changed_files}/{stats.files} files changed, "
+        f"read {stats.read_bytes / 2**20:.1f} MiB, stored {stats.new_chunks} new "
+        f"chunks ({stats.new_bytes / 2**20:.1f} MiB) in {stats.seconds:.1f}s"
+    )
+    return snapshot_id, stats
+
+
+def prune_snapshots(repo: BackupRepository, keep: int) -> int:
+    """Drop all but the newest snapshots and the chunks only they used."""
+    snapshot_ids = repo.snapshot_ids()
+    expired = snapshot_ids[:-keep]
+    if not expired:
+        return 0
+
+    for snapshot_id in expired:
+        repo.remove_manifest(snapshot_id)
+    referenced = {
+        digest
+        for snapshot_id in snapshot_ids[-keep:]
+        for entry in repo.load_manifest(snapshot_id)["files"].values()
+        for digest in entry["chunks"]
+    }
+    unused = repo.chunk_digests() - referenced
+    for digest in unused:
+        repo.remove_chunk(digest)
+    logger.info(f"Pruned {len(expired)} snapshots and {len(unused)} chunks")
+    return len(unused)
+
+
+def restore_snapshot(repo: BackupRepository, snapshot_id: str, target: Path) -> int:
+    """Write the files of a snapshot below a directory."""
+    manifest = repo.load_manifest(snapshot_id)
+    for rel, entry in manifest["files"].items():
+        path = target / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            for digest in entry["chunks"]:
+                data = repo.get_chunk(digest)
+                if hashlib.sha256(data).hexdigest() != digest:
+                    raise ValueError(f"Chunk {digest} of {rel} is corrupt")
+                f.write(data)
+        os.chmod(path, entry["mode"])
+        os.utime(path, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+    logger.info(f"Restored {len(manifest['files'])} files from {snapshot_id}")
+    return len(manifest["files"])
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Create, list and restore world backups."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("create", help="back up BACKUP_SOURCE now")
+    commands.add_parser("list", help="list snapshots")
+    restore = commands.add_parser("restore", help="restore a snapshot")
+    restore.add_argument("snapshot")
+    restore.add_argument("target", type=Path)
+    args = parser.parse_args(argv)
+
+    setup_logging_from_env()
+    config = BackupConfig.from_env()
+    repo = BackupRepository(config.repository)
+
+    if args.command == "create":
+        create_snapshot(config)
+    elif args.command == "list":
+        for snapshot_id in repo.snapshot_ids():
+            files = repo.load_manifest(snapshot_id)["files"]
+            size = sum(entry["size"] for entry in files.values())
+            print(f"{snapshot_id}  {len(files):>6} files  {size / 2**20:>10.1f} MiB")
+    else:
+        restore_snapshot(repo, args.snapshot, args.target)
+
+
+if __name__ == "__main__":
+    main()
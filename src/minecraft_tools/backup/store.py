@@ -0,0 +1,81 @@
+"""Content-addressed chunk store and snapshot manifests."""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write a file so that readers never see it half written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class BackupRepository:
+    """Chunks named by their SHA-256 digest plus one manifest per snapshot.
+
+    Layout::
+
+        chunks/ab/abcdef...   raw chunk bytes
+        snapshots/<id>.json   files of one snapshot and their chunk digests
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self.chunks_dir = self.root / "chunks"
+        self.snapshots_dir = self.root / "snapshots"
+
+    def chunk_path(self, digest: str) -> Path:
+        """Location of a chunk."""
+        return self.chunks_dir / digest[:2] / digest
+
+    def has_chunk(self, digest: str) -> bool:
+        """Whether a chunk is already stored."""
+        return self.chunk_path(digest).exists()
+
+    def put_chunk(self, digest: str, data: bytes | memoryview) -> None:
+        """Store a chunk under its digest."""
+        _write_atomic(self.chunk_path(digest), bytes(data))
+
+    def get_chunk(self, digest: str) -> bytes:
+        """Read a chunk."""
+        return self.chunk_path(digest).read_bytes()
+
+    def chunk_digests(self) -> set[str]:
+        """Digests of every stored chunk."""
+        if not self.chunks_dir.exists():
+            return set()
+        return {
+            path.name
+            for path in self.chunks_dir.glob("??/*")
+            if not path.name.startswith(".")
+        }
+
+    def remove_chunk(self, digest: str) -> None:
+        """Delete a chunk."""
+        self.chunk_path(digest).unlink(missing_ok=True)
+
+    def snapshot_ids(self) -> list[str]:
+        """Snapshot ids, oldest first."""
+        if not self.snapshots_dir.exists():
+            return []
+        return sorted(path.stem for path in self.snapshots_dir.glob("*.json"))
+
+    def load_manifest(self, snapshot_id: str) -> dict[str, Any]:
+        """Read the manifest of a snapshot."""
+        with open(self.snapshots_dir / f"{snapshot_id}.json") as f:
+            return json.load(f)
+
+    def save_manifest(self, snapshot_id: str, manifest: dict[str, Any]) -> None:
+        """Write the manifest of a snapshot, which makes it visible."""
+        data = json.dumps(manifest, separators=(",", ":")).encode()
+        _write_atomic(self.snapshots_dir / f"{snapshot_id}.json", data)
+
+    def remove_manifest(self, snapshot_id: str) -> None:
+        """Delete the manifest of a snapshot."""
+        (self.snapshots_dir / f"{snapshot_id}.json").unlink(missing_ok=True)
@@ -1,7 +1,101 @@
 """Configuration management for minecraft tools."""
 
+import logging
 import os
-from dataclasses import dataclass
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, overload
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_DNS_RECORD_TYPES = ("A", "CNAME", "SRV")
+
+
+class ParameterStoreSource:
+    """Config values under an SSM Parameter Store path, cached with a TTL.
+
+    Parameters are keyed by the upper-cased last segment of their name, so
+    ``/mc/config/idle_threshold`` provides ``IDLE_THRESHOLD``. Values found
+    here take precedence over environment variables.
+    """
+
+    def __init__(self, path: str, ttl: float = 300.0, ssm_client: Any = None) -> None:
+        self.path = "/" + path.strip("/")
+        self.ttl = ttl
+        self._client = ssm_client
+        self._lock = threading.Lock()
+        self._values: dict[str, str] = {}
+        self._loaded_at: float | None = None
+
+    def load(self) -> dict[str, str]:
+        """Fetch every parameter under the path in one paginated listing."""
+        if self._client is None:
+            import boto3
+
+            self._client = boto3.client("ssm")
+
+        values = {}
+        paginator = self._client.get_paginator("get_parameters_by_path")
+        for page in paginator.paginate(
+            Path=self.path, Recursive=True, WithDecryption=True
+        ):
+            for parameter in page["Parameters"]:
+                key = parameter["Name"].rsplit("/", 1)[-1].replace("-", "_").upper()
+                values[key] = parameter["Value"]
+
+        self._values = values
+        self._loaded_at = time.monotonic()
+        logger.debug(f"Loaded {len(values)} parameters from {self.path}")
+        return values
+
+    def values(self) -> dict[str, str]:
+        """Get the cached parameters, reloading them once the TTL expires."""
+        with self._lock:
+            if self._loaded_at is None:
+                return self.load()
+            if time.monotonic() - self._loaded_at >= self.ttl:
+                try:
+                    return self.load()
+                except Exception as e:
+                    # Keep serving the last known values if SSM is unavailable
+                    logger.warning(f"Failed to refresh parameters: {e}")
+            return self._values
+
+    @overload
+    def get(self, name: str) -> str | None: ...
+
+    @overload
+    def get(self, name: str, default: str) -> str: ...
+
+    def get(self, name: str, default: str | None = None) -> str | None:
+        """Get a value from the parameter store, then the environment."""
+        return self.getter()(name, default)
+
+    def getter(self) -> Callable[..., Any]:
+        """Get a ``getenv``-like lookup over one snapshot of the values."""
+        values = self.values()
+
+        def get(name: str, default: str | None = None) -> str | None:
+            value = values.get(name)
+            return value if value is not None else os.getenv(name, default)
+
+        return get
+
+
+_sources: dict[str, ParameterStoreSource] = {}
+
+
+def parameter_source_from_env() -> ParameterStoreSource | None:
+    """Get the shared parameter source named by CONFIG_SSM_PATH, if any."""
+    path = os.getenv("CONFIG_SSM_PATH")
+    if not path:
+        return None
+    if path not in _sources:
+        ttl = float(os.getenv("CONFIG_CACHE_TTL", "300"))
+        _sources[path] = ParameterStoreSource(path, ttl=ttl)
+    return _sources[path]
 
 
 @dataclass
@@ -13,13 +107,24 @@ class DiscordBotConfig:
     ecs_service: str
     aws_role_arn: str | None = None
     aws_region: str | None = None
+    health_port: int = 0  # 0 = no health server
+    health_cache_ttl: float = 10.0
+    # Start the server ahead of likely first joins; 0 = no pre-warming
+    prewarm_probability: float = 0.0
+    prewarm_lead: float = 600.0  # seconds before the expected join
+    prewarm_max_per_week: int = 7
+    idle_threshold: int = 600  # how long a pre-warmed server waits for players
+    # Health server of the tools container serving player statistics
+    tools_url: str | None = None
 
     @classmethod
-    def from_env(cls) -> "DiscordBotConfig":
-        """Create config from environment variables."""
-        token = os.getenv("DISCORD_TOKEN")
-        cluster = os.getenv("ECS_CLUSTER")
-        service = os.getenv("ECS_SERVICE")
+    def from_env(cls, source: ParameterStoreSource | None = None) -> "DiscordBotConfig":
+        """Create config from Parameter Store and environment variables."""
+        source = source or parameter_source_from_env()
+        getenv = source.getter() if source else os.getenv
+        token = getenv("DISCORD_TOKEN")
+        cluster = getenv("ECS_CLUSTER")
+        service = getenv("ECS_SERVICE")
 
         if not token:
             raise ValueError("DISCORD_TOKEN environment variable is required")
@@ -32,11 +137,37 @@ class DiscordBotConfig:
             token=token,
             ecs_cluster=cluster,
             ecs_service=service,
-            aws_role_arn=os.getenv("AWS_ROLE_ARN"),
-            aws_region=os.getenv("AWS_DEFAULT_REGION"),
+            aws_role_arn=getenv("AWS_ROLE_ARN"),
+            aws_region=getenv("AWS_DEFAULT_REGION"),
+            health_port=int(getenv("HEALTH_PORT", "0")),
+            health_cache_ttl=float(getenv("HEALTH_CACHE_TTL", "10")),
+            prewarm_probability=float(getenv("PREWARM_PROBABILITY", "0")),
+            prewarm_lead=float(getenv("PREWARM_LEAD", "600")),
+            prewarm_max_per_week=int(getenv("PREWARM_MAX_PER_WEEK", "7")),
+            idle_threshold=int(getenv("IDLE_THRESHOLD", "600")),
+            tools_url=(getenv("TOOLS_URL") or "").rstrip("/") or None,
         )
 
 
+@dataclass
+class DNSRecordSpec:
+    """A DNS record managed by the DNS updater."""
+
+    name: str
+    type: str = "A"
+
+    @classmethod
+    def parse(cls, value: str) -> "DNSRecordSpec":
+        """Parse a record spec of the form ``name[:type]``."""
+        name, _, record_type = value.strip().partition(":")
+        record_type = (record_type or "A").upper()
+        if not name:
+            raise ValueError(f"Invalid DNS record spec: {value!r}")
+        if record_type not in SUPPORTED_DNS_RECORD_TYPES:
+            raise ValueError(f"Unsupported DNS record type: {record_type}")
+        return cls(name=name.lower(), type=record_type)
+
+
 @dataclass
 class DNSUpdaterConfig:
     """DNS updater configuration."""
@@ -46,15 +177,36 @@ class DNSUpdaterConfig:
     record_name: str
     ecs_cluster: str
     ecs_service: str
+    records: list[DNSRecordSpec] = field(default_factory=list)
+    minecraft_port: int = 25565
+    discord_webhook: str = ""
+    verify_propagation: bool = False
+    verify_nameservers: list[str] = field(default_factory=list)
+    verify_timeout: int = 120
+    ttl_low: int = 60
+    ttl_high: int = 300
+    ttl_stable_after: int = 900  # 15 minutes
+    reconcile_interval: int = 0  # 0 = update once and exit
+    probe_enabled: bool = True
+    probe_timeout: float = 2.0
+    max_addresses: int = 1
+    sleep_address: str = ""  # wake listener published while stopped
+
+    def __post_init__(self) -> None:
+        # Without an explicit record list, manage the single A record
+        if not self.records:
+            self.records = [DNSRecordSpec(name=self.record_name.lower())]
 
     @classmethod
-    def from_env(cls) -> "DNSUpdaterConfig":
-        """Create config from environment variables."""
-        token = os.getenv("CLOUDFLARE_TOKEN")
-        zone_id = os.getenv("CLOUDFLARE_ZONE_ID")
-        record_name = os.getenv("DNS_RECORD_NAME")
-        cluster = os.getenv("ECS_CLUSTER")
-        service = os.getenv("ECS_SERVICE")
+    def from_env(cls, source: ParameterStoreSource | None = None) -> "DNSUpdaterConfig":
+        """Create config from Parameter Store and environment variables."""
+        source = source or parameter_source_from_env()
+        getenv = source.getter() if source else os.getenv
+        token = getenv("CLOUDFLARE_TOKEN")
+        zone_id = getenv("CLOUDFLARE_ZONE_ID")
+        record_name = getenv("DNS_RECORD_NAME")
+        cluster = getenv("ECS_CLUSTER")
+        service = getenv("ECS_SERVICE")
 
         if not token:
             raise ValueError("CLOUDFLARE_TOKEN environment variable is required")
@@ -67,12 +219,77 @@ class DNSUpdaterConfig:
         if not service:
             raise ValueError("ECS_SERVICE environment variable is required")
 
+        records = [
+            DNSRecordSpec.parse(spec)
+            for spec in getenv("DNS_RECORDS", "").split(",")
+            if spec.strip()
+        ]
+
         return cls(
             cloudflare_token=token,
             zone_id=zone_id,
             record_name=record_name,
             ecs_cluster=cluster,
             ecs_service=service,
+            records=records,
+            minecraft_port=int(getenv("MINECRAFT_PORT", "25565")),
+            discord_webhook=getenv("DISCORD_WEBHOOK", ""),
+            verify_propagation=getenv("DNS_VERIFY_PROPAGATION", "false").lower()
+            == "true",
+            verify_nameservers=[
+                ns.strip()
+                for ns in getenv("DNS_VERIFY_NAMESERVERS", "").split(",")
+                if ns.strip()
+            ],
+            verify_timeout=int(getenv("DNS_VERIFY_TIMEOUT", "120")),
+            ttl_low=int(getenv("DNS_TTL_LOW", "60")),
+            ttl_high=int(getenv("DNS_TTL_HIGH", "300")),
+            ttl_stable_after=int(getenv("DNS_TTL_STABLE_AFTER", "900")),
+            reconcile_interval=int(getenv("DNS_RECONCILE_INTERVAL", "0")),
+            probe_enabled=getenv("DNS_PROBE_ENABLED", "true").lower() == "true",
+            probe_timeout=float(getenv("DNS_PROBE_TIMEOUT", "2.0")),
+            max_addresses=int(getenv("DNS_MAX_ADDRESSES", "1")),
+            sleep_address=getenv("DNS_SLEEP_ADDRESS", ""),
+        )
+
+
+@dataclass
+class BackupConfig:
+    """World backup configuration."""
+
+    repository: str
+    source_dir: str = "/data"
+    keep: int = 14
+    workers: int = 4
+    exclude: list[str] = field(default_factory=lambda: ["logs", "cache"])
+
+    @classmethod
+    def from_env(cls, source: ParameterStoreSource | None = None) -> "BackupConfig":
+        """Create config from Parameter Store and environment variables."""
+        source = source or parameter_source_from_env()
+        getenv = source.getter() if source else os.getenv
+        repository = getenv("BACKUP_REPOSITORY")
+
+        if not repository:
+            raise ValueError("BACKUP_REPOSITORY environment variable is required")
+
+        keep = int(getenv("BACKUP_KEEP", "14"))
+        workers = int(getenv("BACKUP_WORKERS", "4"))
+        if keep < 1:
+            raise ValueError("BACKUP_KEEP must be at least 1")
+        if workers < 1:
+            raise ValueError("BACKUP_WORKERS must be at least 1")
+
+        return cls(
+            repository=repository,
+            source_dir=getenv("BACKUP_SOURCE", "/data"),
+            keep=keep,
+            workers=workers,
+            exclude=[
+                path.strip().strip("/")
+                for path in getenv("BACKUP_EXCLUDE", "logs,cache").split(",")
+                if path.strip()
+            ],
         )
 
 
@@ -89,16 +306,45 @@ class IdleWatcherConfig:
     dns_name: str = ""
     check_interval: int = 300  # 5 minutes
     idle_threshold: int = 600  # 10 minutes
+    health_port: int = 0  # 0 = no health server
+    health_cache_ttl: float = 10.0
+    backup: BackupConfig | None = None  # None = no backup before shutdown
+    player_log: str = ""  # server latest.log; "" = RCON polling only
+    log_poll_interval: float = 1.0
+    shutdown_grace: float = 25.0  # below the ECS stop timeout of 30s
+    source: ParameterStoreSource | None = field(default=None, repr=False, compare=False)
+
+    def refresh(self) -> None:
+        """Re-read the live tunables from the parameter source."""
+        if self.source is None:
+            return
+        getenv = self.source.getter()
+        check_interval = int(getenv("CHECK_INTERVAL") or self.check_interval)
+        idle_threshold = int(getenv("IDLE_THRESHOLD") or self.idle_threshold)
+        if (check_interval, idle_threshold) != (
+            self.check_interval,
+            self.idle_threshold,
+        ):
+            logger.info(
+                f"Tunables changed: check every {check_interval}s, "
+                f"idle threshold {idle_threshold}s"
+            )
+        self.check_interval = check_interval
+        self.idle_threshold = idle_threshold
 
     @classmethod
-    def from_env(cls) -> "IdleWatcherConfig":
-        """Create config from environment variables."""
-        cluster = os.getenv("ECS_CLUSTER")
-        service = os.getenv("ECS_SERVICE")
-        rcon_host = os.getenv("RCON_HOST")
-        rcon_password = os.getenv("RCON_PASSWORD", "")
-        discord_webhook = os.getenv("DISCORD_WEBHOOK", "")
-        dns_name = os.getenv("DNS_NAME", "")
+    def from_env(
+        cls, source: ParameterStoreSource | None = None
+    ) -> "IdleWatcherConfig":
+        """Create config from Parameter Store and environment variables."""
+        source = source or parameter_source_from_env()
+        getenv = source.getter() if source else os.getenv
+        cluster = getenv("ECS_CLUSTER")
+        service = getenv("ECS_SERVICE")
+        rcon_host = getenv("RCON_HOST")
+        rcon_password = getenv("RCON_PASSWORD", "")
+        discord_webhook = getenv("DISCORD_WEBHOOK", "")
+        dns_name = getenv("DNS_NAME", "")
 
         if not cluster:
             raise ValueError("ECS_CLUSTER environment variable is required")
@@ -111,10 +357,115 @@ class IdleWatcherConfig:
             ecs_cluster=cluster,
             ecs_service=service,
             rcon_host=rcon_host,
-            rcon_port=int(os.getenv("RCON_PORT", "25575")),
+            rcon_port=int(getenv("RCON_PORT", "25575")),
             rcon_password=rcon_password,
             discord_webhook=discord_webhook,
             dns_name=dns_name,
-            check_interval=int(os.getenv("CHECK_INTERVAL", "300")),
-            idle_threshold=int(os.getenv("IDLE_THRESHOLD", "600")),
+            check_interval=int(getenv("CHECK_INTERVAL", "300")),
+            idle_threshold=int(getenv("IDLE_THRESHOLD", "600")),
+            health_port=int(getenv("HEALTH_PORT", "0")),
+            health_cache_ttl=float(getenv("HEALTH_CACHE_TTL", "10")),
+            backup=(
+                BackupConfig.from_env(source) if getenv("BACKUP_REPOSITORY") else None
+            ),
+            player_log=getenv("PLAYER_LOG", ""),
+            log_poll_interval=float(getenv("PLAYER_LOG_POLL_INTERVAL", "1")),
+            shutdown_grace=float(getenv("SHUTDOWN_GRACE", "25")),
+            source=source,
+        )
+
+
+SUPERVISOR_COMPONENTS = ("idle-watcher", "dns-updater")
+
+
+@dataclass
+class SupervisorConfig:
+    """Supervisor configuration."""
+
+    ecs_cluster: str
+    ecs_service: str
+    components: list[str] = field(default_factory=lambda: [*SUPERVISOR_COMPONENTS])
+    health_port: int = 0  # 0 = no health server
+    health_cache_ttl: float = 10.0
+    restart_delay: float = 1.0
+    max_restart_delay: float = 60.0
+
+    @classmethod
+    def from_env(cls, source: ParameterStoreSource | None = None) -> "SupervisorConfig":
+        """Create config from Parameter Store and environment variables."""
+        source = source or parameter_source_from_env()
+        getenv = source.getter() if source else os.getenv
+        cluster = getenv("ECS_CLUSTER")
+        service = getenv("ECS_SERVICE")
+
+        if not cluster:
+            raise ValueError("ECS_CLUSTER environment variable is required")
+        if not service:
+            raise ValueError("ECS_SERVICE environment variable is required")
+
+        components = [
+            name.strip()
+            for name in getenv(
+                "SUPERVISOR_COMPONENTS", ",".join(SUPERVISOR_COMPONENTS)
+            ).split(",")
+            if name.strip()
+        ]
+        for name in components:
+            if name not in SUPERVISOR_COMPONENTS:
+                raise ValueError(f"Unknown supervisor component: {name}")
+
+        return cls(
+            ecs_cluster=cluster,
+            ecs_service=service,
+            components=components,
+            health_port=int(getenv("HEALTH_PORT", "0")),
+            health_cache_ttl=float(getenv("HEALTH_CACHE_TTL", "10")),
+            restart_delay=float(getenv("SUPERVISOR_RESTART_DELAY", "1")),
+            max_restart_delay=float(getenv("SUPERVISOR_MAX_RESTART_DELAY", "60")),
+        )
+
+
+@dataclass
+class WakeListenerConfig:
+    """Wake-on-connect listener configuration."""
+
+    ecs_cluster: str
+    ecs_service: str
+    host: str = "0.0.0.0"
+    port: int = 25565
+    start_estimate: float = 90.0  # seconds from scale-up to joinable
+    status_cache_ttl: float = 10.0
+    client_timeout: float = 5.0
+    allowed_players: list[str] = field(default_factory=list)  # [] = anyone
+    discord_webhook: str = ""
+
+    @classmethod
+    def from_env(
+        cls, source: ParameterStoreSource | None = None
+    ) -> "WakeListenerConfig":
+        """Create config from Parameter Store and environment variables."""
+        source = source or parameter_source_from_env()
+        getenv = source.getter() if source else os.getenv
+        cluster = getenv("ECS_CLUSTER")
+        service = getenv("ECS_SERVICE")
+
+        if not cluster:
+            raise ValueError("ECS_CLUSTER environment variable is required")
+        if not service:
+            raise ValueError("ECS_SERVICE environment variable is required")
+
+        return cls(
+            ecs_cluster=cluster,
+            ecs_service=service,
+            host=getenv("WAKE_HOST", "0.0.0.0"),
+            port=int(getenv("WAKE_PORT", "25565")),
+            start_estimate=float(getenv("WAKE_START_ESTIMATE", "90")),
+            status_cache_ttl=float(getenv("WAKE_STATUS_CACHE_TTL", "10")),
+            client_timeout=float(getenv("WAKE_CLIENT_TIMEOUT", "5")),
+            allowed_players=[
+                name.strip()
+                for name in getenv("WAKE_ALLOWED_PLAYERS", "").split(",")
+                if name.strip()
+            ],
+            discord_webhook=getenv("DISCORD_WEBHOOK", ""),
         )
@@ -1,16 +1,37 @@
 """Discord bot for managing Minecraft ECS service."""
 
+import asyncio
 import logging
 import os
+import time
 from typing import Any
 
 import boto3
 import discord
 from botocore.exceptions import ClientError
-from discord.ext import commands
+from discord.ext import commands, tasks
 
+from minecraft_tools.aws import use_trimmed_models
 from minecraft_tools.config import DiscordBotConfig
-from minecraft_tools.logging_config import setup_logging
+from minecraft_tools.discord_bot.prewarm import PrewarmScheduler
+from minecraft_tools.health import aws_service_checks, start_health_server
+from minecraft_tools.http_session import get_http_session
+from minecraft_tools.logging_config import log_context, setup_logging_from_env
+from minecraft_tools.sessions import (
+    configure_sessions_from_env,
+    format_busiest_hours,
+    format_playtime,
+    get_sessions,
+)
+from minecraft_tools.timeline import (
+    StageStats,
+    configure_timeline_from_env,
+    format_report,
+    get_timeline,
+    lifecycles,
+    stage_stats,
+)
+from minecraft_tools.tracing import configure_tracing_from_env, span
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +59,35 @@ source_profile = default
     os.environ["AWS_PROFILE"] = "botrole"
 
 
+def fetch_tools_json(url: str, timeout: float = 2.0) -> dict[str, Any]:
+    """Get a JSON document from the tools container's health server."""
+    response = get_http_session().get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def load_timeline(
+    config: DiscordBotConfig, days: float = 30.0
+) -> tuple[list[StageStats], bool]:
+    """Stage percentiles from the bot's start requests and the tools' milestones.
+
+    The second value is False when the tools container could not be reached.
+    """
+    rows = []
+    store = get_timeline().store
+    if store is not None:
+        rows.extend(store.milestones(time.time() - days * 86400))
+    complete = True
+    if config.tools_url:
+        try:
+            remote = fetch_tools_json(f"{config.tools_url}/timeline")
+            rows.extend(tuple(row) for row in remote["milestones"])
+        except Exception as e:
+            logger.warning(f"Failed to fetch the tools container's milestones: {e}")
+            complete = False
+    return stage_stats(lifecycles(rows)), complete
+
+
 async def get_service_status(
     ecs_client: Any, ec2_client: Any, cluster: str, service: str
 ) -> dict[str, Any]:
@@ -61,6 +111,8 @@ async def get_service_status(
                 )
 
                 for task in task_details["tasks"]:
+                    # SQLite write, kept off the event loop
+                    await asyncio.to_thread(get_timeline().record_task, task)
                     for attachment in task.get("attachments", []):
                         if attachment["type"] == "ElasticNetworkInterface":
                             for detail in attachment["details"]:
@@ -133,6 +185,8 @@ async def update_service(
             forceNewDeployment=True,
         )
         logger.info(f"Successfully updated service to desired count {desired_count}")
+        if desired_count > 0:
+            await asyncio.to_thread(get_timeline().record, "requested")
         await interaction.response.send_message(
             f"✅ Service `{service}` updated to desired count = {desired_count}"
         )
@@ -159,41 +213,109 @@ def create_bot(config: DiscordBotConfig) -> commands.Bot:
 
     @bot.tree.command(name="server-start", description="Scale ECS service to 1 task")
     async def server_start(interaction: discord.Interaction) -> None:
-        logger.info(f"Server start command invoked by {interaction.user.name}")
-        await update_service(
-            interaction, ecs_client, config.ecs_cluster, config.ecs_service, 1
-        )
+        with (
+            log_context(command="server-start"),
+            span("discord.command", command="server-start"),
+        ):
+            logger.info(f"Server start command invoked by {interaction.user.name}")
+            await update_service(
+                interaction, ecs_client, config.ecs_cluster, config.ecs_service, 1
+            )
 
     @bot.tree.command(name="server-stop", description="Scale ECS service to 0 tasks")
     async def server_stop(interaction: discord.Interaction) -> None:
-        logger.info(f"Server stop command invoked by {interaction.user.name}")
-        await update_service(
-            interaction, ecs_client, config.ecs_cluster, config.ecs_service, 0
-        )
+        with (
+            log_context(command="server-stop"),
+            span("discord.command", command="server-stop"),
+        ):
+            logger.info(f"Server stop command invoked by {interaction.user.name}")
+            await update_service(
+                interaction, ecs_client, config.ecs_cluster, config.ecs_service, 0
+            )
 
     @bot.tree.command(name="server-status", description="Check ECS service status")
     async def server_status(interaction: discord.Interaction) -> None:
-        logger.info(f"Server status command invoked by {interaction.user.name}")
-        try:
-            status = await get_service_status(
-                ecs_client, ec2_client, config.ecs_cluster, config.ecs_service
-            )
+        with (
+            log_context(command="server-status"),
+            span("discord.command", command="server-status"),
+        ):
+            logger.info(f"Server status command invoked by {interaction.user.name}")
+            try:
+                status = await get_service_status(
+                    ecs_client, ec2_client, config.ecs_cluster, config.ecs_service
+                )
 
-            message = (
-                f"📊 **Service Status**\n"
-                f"Service: `{config.ecs_service}`\n"
-                f"Desired: {status['desired']}\n"
-                f"Running: {status['running']}"
-            )
+                message = (
+                    f"📊 **Service Status**\n"
+                    f"Service: `{config.ecs_service}`\n"
+                    f"Desired: {status['desired']}\n"
+                    f"Running: {status['running']}"
+                )
+
+                if status["ips"]:
+                    ips_str = ", ".join(status["ips"])
+                    message += f"\nPublic IPs: {ips_str}"
 
-            if status["ips"]:
-                ips_str = ", ".join(status["ips"])
-                message += f"\nPublic IPs: {ips_str}"
+                await interaction.response.send_message(message)
+            except Exception as e:
+                logger.error(f"Error getting service status: {e}")
+                await interaction.response.send_message(f"❌ Error getting status: {e}")
 
+    @bot.tree.command(
+        name="server-timeline", description="Show how long server starts take"
+    )
+    async def server_timeline(interaction: discord.Interaction) -> None:
+        with (
+            log_context(command="server-timeline"),
+            span("discord.command", command="server-timeline"),
+        ):
+            if get_timeline().store is None and not config.tools_url:
+                await interaction.response.send_message(
+                    "ℹ️ Lifecycle timeline recording is not enabled"
+                )
+                return
+            stats, complete = await asyncio.to_thread(load_timeline, config)
+            message = (
+                f"⏱️ **Server start timeline (last 30 days)**\n"
+                f"```\n{format_report(stats)}\n```"
+            )
+            if not complete:
+                message += (
+                    "\nℹ️ Server boot and DNS stages are available while the "
+                    "server is running"
+                )
             await interaction.response.send_message(message)
-        except Exception as e:
-            logger.error(f"Error getting service status: {e}")
-            await interaction.response.send_message(f"❌ Error getting status: {e}")
+
+    @bot.tree.command(
+        name="server-stats", description="Show playtime and the busiest hours"
+    )
+    async def server_stats(interaction: discord.Interaction) -> None:
+        with (
+            log_context(command="server-stats"),
+            span("discord.command", command="server-stats"),
+        ):
+            if not config.tools_url:
+                await interaction.response.send_message(
+                    "ℹ️ Player statistics are not enabled"
+                )
+                return
+            try:
+                # The statistics live on EFS, read by the tools container
+                stats = await asyncio.to_thread(
+                    fetch_tools_json, f"{config.tools_url}/stats"
+                )
+            except Exception as e:
+                logger.warning(f"Failed to fetch player statistics: {e}")
+                await interaction.response.send_message(
+                    "ℹ️ Player statistics are available while the server is running"
+                )
+                return
+            await interaction.response.send_message(
+                f"🏆 **Playtime this week**\n"
+                f"```\n{format_playtime(stats['playtime'])}\n```\n"
+                f"🕒 **Busiest hours (last 30 days)**\n"
+                f"```\n{format_busiest_hours(stats['busiest_hours'])}\n```"
+            )
 
     @bot.tree.command(name="help", description="Show available commands")
     async def help_command(interaction: discord.Interaction) -> None:
@@ -203,15 +325,51 @@ def create_bot(config: DiscordBotConfig) -> commands.Bot:
 `/server-start` - Start the Minecraft server (scale to 1 task)
 `/server-stop` - Stop the Minecraft server (scale to 0 tasks)
 `/server-status` - Check current server status and IP addresses
+`/server-timeline` - Show p50/p95 durations of each server start stage
+`/server-stats` - Show playtime this week and the busiest hours
 `/help` - Show this help message
 
 The server runs on AWS ECS Fargate and may take a few minutes to start up.
         """
         await interaction.response.send_message(help_text)
 
+    @bot.event
+    async def on_app_command_completion(
+        interaction: discord.Interaction, command: Any
+    ) -> None:
+        elapsed = discord.utils.utcnow() - interaction.created_at
+        logger.info(
+            f"Command {command.name} completed",
+            extra={
+                "command": command.name,
+                "latency_ms": round(elapsed.total_seconds() * 1000, 1),
+            },
+        )
+
+    prewarm: tasks.Loop[Any] | None = None
+    if config.prewarm_probability > 0:
+        if get_timeline().store is None:
+            logger.warning(
+                "Pre-warming without TIMELINE_DB has no start requests to learn "
+                "from and forgets its weekly cap on restart"
+            )
+        scheduler = PrewarmScheduler(
+            config, ecs_client, get_sessions().store, get_timeline().store
+        )
+
+        async def check_prewarm() -> None:
+            try:
+                await asyncio.to_thread(scheduler.tick)
+            except Exception as e:
+                logger.error(f"Pre-warm check failed: {e}")
+
+        prewarm = tasks.loop(minutes=1)(check_prewarm)
+
     @bot.event
     async def on_ready() -> None:
         logger.info(f"Bot logged in as {bot.user}")
+        if prewarm is not None and not prewarm.is_running():
+            prewarm.start()
         try:
             synced = await bot.tree.sync()
             logger.info(f"Synced {len(synced)} command(s)")
@@ -224,10 +382,7 @@ The server runs on AWS ECS Fargate and may take a few minutes to start up.
 def main() -> None:
     """Main entry point."""
     try:
-        # Setup logging
-        structured = os.getenv("STRUCTURED_LOGGING", "false").lower() == "true"
-        log_level = os.getenv("LOG_LEVEL", "INFO")
-        setup_logging(log_level, structured)
+        setup_logging_from_env()
 
         config = DiscordBotConfig.from_env()
         logger.info(
@@ -235,8 +390,21 @@ def main() -> None:
         )
 
         setup_aws_profile(config)
+        use_trimmed_models()
+        configure_tracing_from_env()
+        configure_timeline_from_env("discord-bot")
+        configure_sessions_from_env()
+        if config.health_port:
+            start_health_server(
+                config.health_port,
+                aws_service_checks(config.ecs_cluster, config.ecs_service),
+                cache_ttl=config.health_cache_ttl,
+            )
+
         bot = create_bot(config)
-        bot.run(config.token)
+        with log_context(cluster=config.ecs_cluster, service=config.ecs_service):
+            # log_handler=None keeps discord.py from adding its own root handler
+            bot.run(config.token, log_handler=None)
     except ValueError as e:
         logger.error(f"Configuration error: {e}")
         raise
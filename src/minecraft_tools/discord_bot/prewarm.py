@@ -0,0 +1,260 @@
+"""Start the server shortly before players usually turn up.
+
+A weekly profile of arrivals is learned from the recorded history: the
+first player joining an empty server and every start request. Each slot of
+the week gets the chance that somebody arrives within an idle threshold of
+it, which is how long a pre-warmed server waits for them, weighting recent
+weeks more. The service is scaled up one lead time before the most likely
+slot of each likely enough stretch; if nobody joins, the idle watcher scales
+it back down after its idle threshold as usual.
+
+The bot runs away from the EFS volume, so it usually learns from the start
+requests in its own timeline store only; a session store adds the first
+joins when the bot can read one. Pre-warms go into the timeline store too,
+so the weekly cap holds across restarts. A pre-warm players used saves them
+the start request, so once an unused one would have been scaled down the
+service is checked again: if it is still up, the pre-warm is recorded as
+used and counts as an arrival when the server was ready.
+"""
+
+import logging
+import sqlite3
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from minecraft_tools.config import DiscordBotConfig
+from minecraft_tools.sessions import SessionStore, week_start
+from minecraft_tools.timeline import TimelineStore
+
+logger = logging.getLogger(__name__)
+
+SLOT_SECONDS = 300
+WEEK_SECONDS = 7 * 86400
+WEEK_SLOTS = WEEK_SECONDS // SLOT_SECONDS
+HISTORY_WEEKS = 8
+HALF_LIFE_WEEKS = 2.0
+# One pre-warm per expected session, so a start nobody used is not repeated
+# for the later slots of the same evening
+COOLDOWN = 4 * 3600
+# How often the profile is learned again
+REFIT_INTERVAL = 3600
+# How late the check whether a pre-warm was used may still be made
+USED_CHECK_WINDOW = 900
+
+
+def arrivals(
+    sessions: Iterable[tuple[str, float, float]], requests: Iterable[float] = ()
+) -> list[float]:
+    """Times a player joined an empty server, and the start requests."""
+    times = list(requests)
+    busy_until = 0.0
+    for _, started, last_seen in sorted(sessions, key=lambda s: s[1]):
+        if started > busy_until:
+            times.append(started)
+        busy_until = max(busy_until, last_seen)
+    return sorted(times)
+
+
+@dataclass
+class WeeklyProfile:
+    """Chance of an arrival in each slot of the week."""
+
+    probabilities: list[float]
+    weeks: int
+
+    @classmethod
+    def fit(
+        cls,
+        times: list[float],
+        now: float,
+        window: float = 600.0,
+        history_weeks: int = HISTORY_WEEKS,
+        half_life_weeks: float = HALF_LIFE_WEEKS,
+    ) -> "WeeklyProfile":
+        """Learn from the completed weeks since the first arrival.
+
+        An arrival counts for every slot starting less than ``window`` seconds
+        before it.
+        """
+        window_slots = max(int(window // SLOT_SECONDS), 1)
+        current = week_start(now)
+        weeks = 0
+        if times:
+            weeks = int((current - week_start(times[0])) // WEEK_SECONDS)
+            weeks = min(weeks, history_weeks)
+        first = current - weeks * WEEK_SECONDS
+
+        hits = [bytearray(WEEK_SLOTS) for _ in range(weeks)]
+        for at in times:
+            week, offset = divmod(at - first, WEEK_SECONDS)
+            if 0 <= week < weeks:
+                slot = int(offset // SLOT_SECONDS)
+                low = max(slot - window_slots + 1, 0)
+                hits[int(week)][low : slot + 1] = b"\x01" * (slot + 1 - low)
+
+        totals = [0.0] * WEEK_SLOTS
+        weights = 0.0
+        for week, week_hits in enumerate(hits):
+            weight = 0.5 ** ((weeks - 1 - week) / half_life_weeks)
+            weights += weight
+            for slot, hit in enumerate(week_hits):
+                if hit:
+                    totals[slot] += weight
+        probabilities = [t / weights for t in totals] if weights else totals
+        return cls(probabilities, weeks)
+
+    def probability(self, at: float) -> float:
+        """Chance of an arrival in the window of the slot containing a timestamp."""
+        slot = int((at - week_start(at)) // SLOT_SECONDS)
+        return self.probabilities[slot]
+
+
+class PrewarmScheduler:
+    """Scales the service up ahead of likely arrivals."""
+
+    def __init__(
+        self,
+        config: DiscordBotConfig,
+        ecs_client: Any,
+        sessions: SessionStore | None,
+        timeline: TimelineStore | None = None,
+    ) -> None:
+        self.config = config
+        self.ecs_client = ecs_client
+        self.sessions = sessions
+        self.timeline = timeline
+        self.profile: WeeklyProfile | None = None
+        self.fitted_at = 0.0
+        self.prewarms: list[float] = []
+        # Pre-warm still waiting for the check whether players used it
+        self.unchecked: float | None = None
+
+    def used_check_at(self, prewarmed: float) -> float:
+        """When a pre-warm nobody used has surely been scaled down again.
+
+        The start is allowed to take up to twice the lead time.
+        """
+        return prewarmed + 2 * self.config.prewarm_lead + self.config.idle_threshold
+
+    def refit(self, now: float) -> WeeklyProfile:
+        """Learn the weekly profile again from the stores."""
+        since = week_start(now) - HISTORY_WEEKS * WEEK_SECONDS
+        sessions = self.sessions.sessions(since) if self.sessions else []
+        requests = []
+        if self.timeline is not None:
+            rows = self.timeline.milestones(since)
+            requests = [
+                at
+                for task_arn, milestone, at in rows
+                if task_arn is None and milestone == "requested"
+            ]
+            prewarms = [
+                at
+                for task_arn, milestone, at in rows
+                if task_arn is None and milestone == "prewarmed"
+            ]
+            # Recorded at the time of the pre-warm players used
+            used = {
+                at
+                for task_arn, milestone, at in rows
+                if task_arn is None and milestone == "prewarm_used"
+            }
+            requests.extend(at + self.config.prewarm_lead for at in sorted(used))
+            self.prewarms = [at for at in prewarms if now - at < WEEK_SECONDS]
+            last = prewarms[-1] if prewarms else None
+            self.unchecked = (
+                last
+                if last is not None
+                and last not in used
+                and now < self.used_check_at(last) + USED_CHECK_WINDOW
+                else None
+            )
+        times = arrivals(sessions, sorted(requests))
+        self.profile = WeeklyProfile.fit(times, now, self.config.idle_threshold)
+        self.fitted_at = now
+        logger.info(
+            f"Learned arrival times from {len(times)} arrivals "
+            f"over {self.profile.weeks} weeks"
+        )
+        return self.profile
+
+    def check_used(self, now: float) -> bool:
+        """Record the last pre-warm as used if the service is still up; True if so."""
+        prewarmed = self.unchecked
+        if prewarmed is None or now < self.used_check_at(prewarmed):
+            return False
+        self.unchecked = None
+        late = now - self.used_check_at(prewarmed) > USED_CHECK_WINDOW
+        if late or self.timeline is None:
+            return False
+        response = self.ecs_client.describe_services(
+            cluster=self.config.ecs_cluster, services=[self.config.ecs_service]
+        )
+        if not response["services"] or response["services"][0]["desiredCount"] == 0:
+            return False
+
+        logger.info("Players used the pre-warmed server, keeping it in the profile")
+        try:
+            self.timeline.record("prewarm_used", at=prewarmed, source="discord-bot")
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to record pre-warm use: {e}")
+        return True
+
+    def due(self, now: float) -> float | None:
+        """Chance of an arrival one lead time from now, if worth a pre-warm."""
+        profile = self.profile
+        if profile is None or now - self.fitted_at >= REFIT_INTERVAL:
+            profile = self.refit(now)
+        if self.prewarms and now - self.prewarms[-1] < COOLDOWN:
+            return None
+        recent = [at for at in self.prewarms if now - at < WEEK_SECONDS]
+        if len(recent) >= self.config.prewarm_max_per_week:
+            return None
+        ready = now + self.config.prewarm_lead
+        chance = profile.probability(ready)
+        if chance < self.config.prewarm_probability:
+            return None
+        # Wait for the most likely slot, or the server gives up on players
+        # before they usually arrive
+        window = max(int(self.config.idle_threshold // SLOT_SECONDS), 1)
+        for slot in range(1, window + 1):
+            if profile.probability(ready + slot * SLOT_SECONDS) > chance:
+                return None
+        return chance
+
+    def tick(self, now: float | None = None) -> bool:
+        """Pre-warm the server if players are expected soon; True if started."""
+        now = time.time() if now is None else now
+        self.check_used(now)
+        chance = self.due(now)
+        if chance is None:
+            return False
+        response = self.ecs_client.describe_services(
+            cluster=self.config.ecs_cluster, services=[self.config.ecs_service]
+        )
+        if not response["services"] or response["services"][0]["desiredCount"] > 0:
+            return False
+
+        logger.info(
+            f"Pre-warming {self.config.ecs_service}, players arrived within "
+            f"{self.config.idle_threshold / 60:.0f} minutes of it being ready "
+            f"{chance:.0%} of the time"
+        )
+        self.ecs_client.update_service(
+            cluster=self.config.ecs_cluster,
+            service=self.config.ecs_service,
+            desiredCount=1,
+            forceNewDeployment=True,
+        )
+        # Not recorded as a start request, which would teach the profile that
+        # players arrive when the server was pre-warmed
+        self.prewarms.append(now)
+        if self.timeline is not None:
+            self.unchecked = now
+            try:
+                self.timeline.record("prewarmed", at=now, source="discord-bot")
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to record pre-warm: {e}")
+        return True
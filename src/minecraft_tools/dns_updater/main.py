@@ -1,77 +1,221 @@
 """DNS updater for Minecraft server IP addresses."""
 
+import argparse
 import logging
+import signal
 import sys
+import threading
 import time
-from typing import Any
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
 
-import boto3
-import requests
-from botocore.exceptions import ClientError
+from minecraft_tools.aws import create_client, use_trimmed_models
+from minecraft_tools.config import DNSRecordSpec, DNSUpdaterConfig
+from minecraft_tools.dns_updater.probe import probe_candidates, rank_healthy
+from minecraft_tools.dns_updater.propagation import wait_for_propagation
+from minecraft_tools.http_session import get_http_session
+from minecraft_tools.logging_config import log_context, setup_logging_from_env
+from minecraft_tools.notifications import send_discord_message
+from minecraft_tools.timeline import configure_timeline_from_env, get_timeline
+from minecraft_tools.tracing import configure_tracing_from_env, span, traced
 
-from minecraft_tools.config import DNSUpdaterConfig
+if TYPE_CHECKING:
+    import requests
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
 logger = logging.getLogger(__name__)
 
 
+DNSRecordIndex = dict[tuple[str, str], list[dict[str, Any]]]
+
+
+def index_dns_records(records: list[dict[str, Any]]) -> DNSRecordIndex:
+    """Index DNS records by lowercased name and type."""
+    index: DNSRecordIndex = {}
+    for record in records:
+        index.setdefault((record["name"].lower(), record["type"]), []).append(record)
+    return index
+
+
 class CloudflareAPI:
     """Cloudflare API client."""
 
-    def __init__(self, token: str) -> None:
+    page_size = 5000
+
+    def __init__(
+        self,
+        token: str,
+        index_ttl: float = 60.0,
+        session: "requests.Session | None" = None,
+    ) -> None:
         self.token = token
+        self.session = session or get_http_session()
         self.base_url = "https://api.cloudflare.com/client/v4"
         self.headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
+        self.index_ttl = index_ttl
+        self._index: DNSRecordIndex = {}
+        self._index_zone: str | None = None
+        self._index_loaded_at = 0.0
+
+    @traced("cloudflare.list_dns_records")
+    def list_dns_records(self, zone_id: str) -> list[dict[str, Any]]:
+        """List all DNS records in a zone, following pagination."""
+        import requests
+
+        records: list[dict[str, Any]] = []
+        page = 1
+        try:
+            while True:
+                response = self.session.get(
+                    f"{self.base_url}/zones/{zone_id}/dns_records",
+                    headers=self.headers,
+                    params={"per_page": self.page_size, "page": page},
+                    timeout=30,
+                )
+                response.raise_for_status()
+
+                data = response.json()
+                if not data["success"]:
+                    break
+                records.extend(data["result"])
+
+                total_pages = (data.get("result_info") or {}).get("total_pages", 1)
+                if page >= total_pages:
+                    break
+                page += 1
+            return records
+        except requests.RequestException as e:
+            logger.error(f"Failed to list DNS records: {e}")
+            raise
+
+    @traced("cloudflare.get_zone_nameservers")
+    def get_zone_nameservers(self, zone_id: str) -> list[str]:
+        """Get the authoritative nameservers assigned to a zone."""
+        import requests
+
+        try:
+            response = self.session.get(
+                f"{self.base_url}/zones/{zone_id}",
+                headers=self.headers,
+                timeout=30,
+            )
+            response.raise_for_status()
+
+            data = response.json()
+            if data["success"]:
+                return data["result"].get("name_servers", [])
+            return []
+        except requests.RequestException as e:
+            logger.error(f"Failed to get zone nameservers: {e}")
+            raise
+
+    def dns_record_index(self, zone_id: str, refresh: bool = False) -> DNSRecordIndex:
+        """Get the zone's record index, reloading it when stale."""
+        stale = time.monotonic() - self._index_loaded_at >= self.index_ttl
+        if refresh or stale or self._index_zone != zone_id:
+            self._index = index_dns_records(self.list_dns_records(zone_id))
+            self._index_zone = zone_id
+            self._index_loaded_at = time.monotonic()
+            logger.debug(f"Indexed {len(self._index)} DNS record sets in {zone_id}")
+        return self._index
+
+    def invalidate_index(self) -> None:
+        """Force the next lookup to reload the zone listing."""
+        self._index_loaded_at = 0.0
+
+    def get_dns_records(
+        self, zone_id: str, record_name: str, record_type: str = "A"
+    ) -> list[dict[str, Any]]:
+        """Get all DNS records with a name and type."""
+        index = self.dns_record_index(zone_id)
+        return index.get((record_name.lower(), record_type), [])
 
     def get_dns_record(
-        self, zone_id: str, record_name: str
+        self, zone_id: str, record_name: str, record_type: str = "A"
     ) -> dict[str, Any] | None:
         """Get DNS record by name."""
+        records = self.get_dns_records(zone_id, record_name, record_type)
+        if len(records) > 1:
+            logger.warning(
+                f"Found {len(records)} {record_type} records for {record_name}, "
+                f"using {records[0]['id']}"
+            )
+        return records[0] if records else None
+
+    def _apply_to_index(self, zone_id: str, results: dict[str, Any]) -> None:
+        """Fold the records returned by a write into the index."""
+        if self._index_zone != zone_id:
+            return
+        for record in results.get("deletes") or []:
+            for records in self._index.values():
+                records[:] = [r for r in records if r["id"] != record["id"]]
+        for record in (results.get("patches") or []) + (results.get("posts") or []):
+            for records in self._index.values():
+                records[:] = [r for r in records if r["id"] != record["id"]]
+            key = (record["name"].lower(), record["type"])
+            self._index.setdefault(key, []).append(record)
+
+    @traced("cloudflare.batch_dns_records")
+    def batch_dns_records(self, zone_id: str, changes: dict[str, list[Any]]) -> bool:
+        """Apply DNS record changes (posts, patches, ...) in one request."""
+        import requests
+
         try:
-            response = requests.get(
-                f"{self.base_url}/zones/{zone_id}/dns_records",
+            response = self.session.post(
+                f"{self.base_url}/zones/{zone_id}/dns_records/batch",
                 headers=self.headers,
-                params={"name": record_name, "type": "A"},
+                json=changes,
                 timeout=30,
             )
             response.raise_for_status()
 
             data = response.json()
-            if data["success"] and data["result"]:
-                return data["result"][0]
-            return None
+            if data["success"] and isinstance(data.get("result"), dict):
+                self._apply_to_index(zone_id, data["result"])
+            else:
+                self.invalidate_index()
+            return data["success"]
         except requests.RequestException as e:
-            logger.error(f"Failed to get DNS record: {e}")
+            self.invalidate_index()
+            logger.error(f"Failed to apply DNS record batch: {e}")
             raise
 
+    @traced("cloudflare.update_dns_record")
     def update_dns_record(
-        self, zone_id: str, record_id: str, record_name: str, ip_address: str
+        self,
+        zone_id: str,
+        record_id: str,
+        record_name: str,
+        ip_address: str,
+        ttl: int,
     ) -> bool:
-        """Update DNS record with new IP address."""
+        """Update DNS record with new IP address and TTL."""
+        import requests
+
         try:
-            response = requests.put(
+            response = self.session.put(
                 f"{self.base_url}/zones/{zone_id}/dns_records/{record_id}",
                 headers=self.headers,
                 json={
                     "type": "A",
                     "name": record_name,
                     "content": ip_address,
-                    "ttl": 300,
+                    "ttl": ttl,
                 },
                 timeout=30,
             )
             response.raise_for_status()
 
             data = response.json()
+            if data["success"] and isinstance(data.get("result"), dict):
+                self._apply_to_index(zone_id, {"patches": [data["result"]]})
+            else:
+                self.invalidate_index()
             return data["success"]
         except requests.RequestException as e:
+            self.invalidate_index()
             logger.error(f"Failed to update DNS record: {e}")
             raise
 
@@ -79,7 +223,12 @@ class CloudflareAPI:
 def get_service_public_ips(
     ecs_client: Any, ec2_client: Any, cluster: str, service: str
 ) -> list[str]:
-    """Get public IP addresses for ECS service tasks."""
+    """Get public IP addresses for ECS service tasks.
+
+    Without an EC2 client, one is created once a task ENI needs resolving.
+    """
+    from botocore.exceptions import ClientError
+
     try:
         # Get running tasks
         tasks_response = ecs_client.list_tasks(cluster=cluster, serviceName=service)
@@ -94,11 +243,13 @@ def get_service_public_ips(
 
         ips = []
         for task in task_details["tasks"]:
+            get_timeline().record_task(task)
             for attachment in task.get("attachments", []):
                 if attachment["type"] == "ElasticNetworkInterface":
                     for detail in attachment["details"]:
                         if detail["name"] == "networkInterfaceId":
                             eni_id = detail["value"]
+                            ec2_client = ec2_client or create_client("ec2")
                             try:
                                 eni_response = ec2_client.describe_network_interfaces(
                                     NetworkInterfaceIds=[eni_id]
@@ -125,13 +276,235 @@ def get_service_public_ips(
         raise
 
 
-def update_dns_if_needed(config: DNSUpdaterConfig) -> None:
-    """Update DNS record if IP address has changed."""
+def choose_ttl(
+    config: DNSUpdaterConfig,
+    current: dict[str, Any] | None,
+    ip_address: str,
+    now: float,
+) -> int:
+    """Pick the TTL for an A record based on the server lifecycle phase."""
+    # Starting: a new IP is published with a low TTL so a restart is seen fast
+    if current is None or current.get("content") != ip_address:
+        return config.ttl_low
+    # Stable: once raised, the TTL stays high while the IP does not change
+    if current.get("ttl") == config.ttl_high:
+        return config.ttl_high
+    modified_on = current.get("modified_on")
+    if modified_on:
+        age = now - datetime.fromisoformat(modified_on).timestamp()
+        if age >= config.ttl_stable_after:
+            return config.ttl_high
+    return config.ttl_low
+
+
+def build_desired_record(
+    spec: DNSRecordSpec, config: DNSUpdaterConfig, ip_address: str, ttl: int
+) -> dict[str, Any]:
+    """Build the Cloudflare record body a spec should have for an IP address."""
+    record: dict[str, Any] = {"type": spec.type, "name": spec.name, "ttl": ttl}
+    if spec.type == "A":
+        record["content"] = ip_address
+    elif spec.type == "CNAME":
+        record["content"] = config.record_name
+    elif spec.type == "SRV":
+        record["data"] = {
+            "priority": 0,
+            "weight": 5,
+            "port": config.minecraft_port,
+            "target": config.record_name,
+        }
+    return record
+
+
+def same_value(existing: dict[str, Any], desired: dict[str, Any]) -> bool:
+    """Check whether an existing record already points where desired."""
+    if "data" in desired:
+        existing_data = existing.get("data") or {}
+        return all(existing_data.get(k) == v for k, v in desired["data"].items())
+    return existing.get("content") == desired["content"]
+
+
+def record_matches(existing: dict[str, Any], desired: dict[str, Any]) -> bool:
+    """Check whether an existing record already has the desired value."""
+    return same_value(existing, desired) and existing.get("ttl") == desired["ttl"]
+
+
+def diff_dns_records(
+    desired: list[dict[str, Any]], index: DNSRecordIndex
+) -> dict[str, list[dict[str, Any]]]:
+    """Compute the batch of changes needed to reach the desired records."""
+    grouped: dict[tuple[str, str], list[dict[str, Any]]] = {}
+    for record in desired:
+        grouped.setdefault((record["name"], record["type"]), []).append(record)
+
+    changes: dict[str, list[dict[str, Any]]] = {
+        "posts": [],
+        "patches": [],
+        "deletes": [],
+    }
+    for key, records in grouped.items():
+        existing = list(index.get(key, []))
+        pending = []
+        for record in records:
+            current = next((e for e in existing if same_value(e, record)), None)
+            if current is None:
+                pending.append(record)
+                continue
+            existing.remove(current)
+            if not record_matches(current, record):
+                changes["patches"].append({"id": current["id"], **record})
+
+        # Repoint leftover records before creating new ones, drop the surplus
+        for record in pending:
+            if existing:
+                changes["patches"].append({"id": existing.pop(0)["id"], **record})
+            else:
+                changes["posts"].append(record)
+        changes["deletes"].extend({"id": e["id"]} for e in existing)
+
+    return {k: v for k, v in changes.items() if v}
+
+
+def verify_propagation(
+    config: DNSUpdaterConfig,
+    cloudflare: CloudflareAPI,
+    record_names: list[str],
+    ip_address: str,
+) -> None:
+    """Wait for updated records to be served and report the latency."""
+    started_at = time.monotonic()
+    nameservers = config.verify_nameservers or cloudflare.get_zone_nameservers(
+        config.zone_id
+    )
+    if not nameservers:
+        logger.warning("No nameservers to verify DNS propagation against")
+        return
+
+    for record_name in record_names:
+        result = wait_for_propagation(
+            record_name,
+            ip_address,
+            nameservers,
+            timeout=config.verify_timeout,
+            started_at=started_at,
+        )
+        per_server = ", ".join(
+            f"{ns}: {'-' if latency is None else f'{latency:.1f}s'}"
+            for ns, latency in result.nameservers.items()
+        )
+        if result.propagated:
+            logger.info(
+                f"DNS record {record_name} propagated in {result.latency:.1f}s "
+                f"({per_server})"
+            )
+            send_discord_message(
+                config.discord_webhook,
+                f"🌐 **{record_name}** now resolves to {ip_address} "
+                f"(propagated in {result.latency:.1f}s)",
+            )
+        else:
+            logger.warning(
+                f"DNS record {record_name} not propagated after "
+                f"{result.latency:.1f}s ({per_server})"
+            )
+            send_discord_message(
+                config.discord_webhook,
+                f"⚠️ **{record_name}** still not resolving to {ip_address} "
+                f"after {result.latency:.0f}s",
+            )
+
+
+def build_desired_records(
+    config: DNSUpdaterConfig, index: DNSRecordIndex, addresses: list[str]
+) -> list[dict[str, Any]]:
+    """Build the desired state of every managed record."""
+    now = time.time()
+    desired = []
+    for spec in config.records:
+        if spec.type == "A":
+            # One A record per published address (multi-value when > 1)
+            existing = index.get((spec.name, spec.type), [])
+            for ip_address in addresses:
+                current = next(
+                    (r for r in existing if r.get("content") == ip_address), None
+                )
+                ttl = choose_ttl(config, current, ip_address, now)
+                desired.append(build_desired_record(spec, config, ip_address, ttl))
+        else:
+            # CNAME and SRV targets never move, so they always get the high TTL
+            desired.append(
+                build_desired_record(spec, config, addresses[0], config.ttl_high)
+            )
+    return desired
+
+
+def select_addresses(config: DNSUpdaterConfig, candidates: list[str]) -> list[str]:
+    """Pick the healthy, lowest-latency task addresses to publish."""
+    if not config.probe_enabled or len(candidates) == 1:
+        return candidates[: config.max_addresses]
+
+    results = probe_candidates(candidates, config.minecraft_port, config.probe_timeout)
+    for result in results:
+        if result.healthy:
+            logger.info(f"Probe {result.ip}: {(result.latency or 0) * 1000:.1f}ms")
+        else:
+            logger.info(f"Probe {result.ip}: unreachable ({result.error})")
+
+    healthy = rank_healthy(results)
+    if not healthy:
+        # Tasks that are still booting do not accept connections yet
+        logger.warning(
+            f"No task answered on port {config.minecraft_port}, "
+            "publishing unprobed addresses"
+        )
+        return candidates[: config.max_addresses]
+    return healthy[: config.max_addresses]
+
+
+def apply_dns_changes(
+    cloudflare: CloudflareAPI,
+    config: DNSUpdaterConfig,
+    changes: dict[str, list[dict[str, Any]]],
+) -> bool:
+    """Log and apply a batch of DNS changes."""
+    for action, records in changes.items():
+        for record in records:
+            if action == "deletes":
+                logger.info(f"DNS delete: {record['id']}")
+                continue
+            logger.info(
+                f"DNS {action[:-1]}: {record['type']} {record['name']} "
+                f"{record.get('content', '')} (ttl {record['ttl']})"
+            )
+
+    if cloudflare.batch_dns_records(config.zone_id, changes):
+        logger.info("DNS records updated successfully")
+        return True
+    logger.error("Failed to update DNS records")
+    return False
+
+
+def update_dns_if_needed(
+    config: DNSUpdaterConfig,
+    cloudflare: CloudflareAPI | None = None,
+    ecs_client: Any = None,
+    ec2_client: Any = None,
+) -> None:
+    """Update DNS records if IP address has changed."""
+    with span("dns.update"):
+        _update_dns_if_needed(config, cloudflare, ecs_client, ec2_client)
+
+
+def _update_dns_if_needed(
+    config: DNSUpdaterConfig,
+    cloudflare: CloudflareAPI | None,
+    ecs_client: Any,
+    ec2_client: Any,
+) -> None:
     try:
-        # Initialize clients
-        ecs_client = boto3.client("ecs")
-        ec2_client = boto3.client("ec2")
-        cloudflare = CloudflareAPI(config.cloudflare_token)
+        # Clients are created on the path that needs them, keeping the
+        # no-tasks path free of the EC2 model and the HTTP stack
+        ecs_client = ecs_client or create_client("ecs")
 
         # Get current service IPs
         current_ips = get_service_public_ips(
@@ -142,44 +515,161 @@ def update_dns_if_needed(config: DNSUpdaterConfig) -> None:
             logger.info("No public IPs found for service, skipping DNS update")
             return
 
-        # Use first IP (assuming single task)
-        current_ip = current_ips[0]
-        logger.info(f"Current service IP: {current_ip}")
+        logger.info(f"Current service IPs: {', '.join(current_ips)}")
+        addresses = select_addresses(config, current_ips)
+        current_ip = addresses[0]
+        logger.info(f"Publishing: {', '.join(addresses)}")
+
+        # Diff every managed record against a single zone listing
+        cloudflare = cloudflare or CloudflareAPI(config.cloudflare_token)
+        index = cloudflare.dns_record_index(config.zone_id)
+        desired = build_desired_records(config, index, addresses)
+        changes = diff_dns_records(desired, index)
 
-        # Get current DNS record
-        dns_record = cloudflare.get_dns_record(config.zone_id, config.record_name)
-        if not dns_record:
-            logger.error(f"DNS record {config.record_name} not found")
+        if not changes:
+            logger.info("DNS records are already up to date")
+            get_timeline().mark("dns_updated")
             return
 
-        current_dns_ip = dns_record["content"]
-        logger.info(f"Current DNS IP: {current_dns_ip}")
+        # Records whose address changes, as opposed to only their TTL
+        moved = []
+        for record in desired:
+            existing = index.get((record["name"], record["type"]), [])
+            if (
+                record["type"] == "A"
+                and record["content"] == current_ip
+                and all(r.get("content") != current_ip for r in existing)
+            ):
+                moved.append(record["name"])
 
-        # Update if different
-        if current_ip != current_dns_ip:
-            logger.info(f"Updating DNS record from {current_dns_ip} to {current_ip}")
-            success = cloudflare.update_dns_record(
-                config.zone_id, dns_record["id"], config.record_name, current_ip
-            )
-            if success:
-                logger.info("DNS record updated successfully")
-            else:
-                logger.error("Failed to update DNS record")
-        else:
-            logger.info("DNS record is already up to date")
+        success = apply_dns_changes(cloudflare, config, changes)
+        if success:
+            get_timeline().mark("dns_updated")
+        if success and moved and config.verify_propagation:
+            verify_propagation(config, cloudflare, moved, current_ip)
 
     except Exception as e:
         logger.error(f"Error updating DNS: {e}")
         raise
 
 
-def main() -> None:
+def lower_dns_ttl(config: DNSUpdaterConfig, cloudflare: CloudflareAPI) -> None:
+    """Drop A records to the low TTL ahead of the server stopping.
+
+    Only the TTL changes: every record in a multi-address set is kept as is.
+    """
+    index = cloudflare.dns_record_index(config.zone_id, refresh=True)
+    patches = [
+        {
+            "id": record["id"],
+            "type": "A",
+            "name": record["name"],
+            "content": record["content"],
+            "ttl": config.ttl_low,
+        }
+        for spec in config.records
+        if spec.type == "A"
+        for record in index.get((spec.name, "A"), [])
+        if record.get("ttl") != config.ttl_low
+    ]
+    if patches:
+        logger.info(f"Server stopping, lowering DNS TTL to {config.ttl_low}s")
+        apply_dns_changes(cloudflare, config, {"patches": patches})
+
+
+def publish_sleep_address(config: DNSUpdaterConfig, cloudflare: CloudflareAPI) -> None:
+    """Point A records at the wake listener while the server is stopped.
+
+    The low TTL lets clients pick up the task's address soon after a start.
+    """
+    index = cloudflare.dns_record_index(config.zone_id, refresh=True)
+    desired = [
+        build_desired_record(spec, config, config.sleep_address, config.ttl_low)
+        for spec in config.records
+        if spec.type == "A"
+    ]
+    changes = diff_dns_records(desired, index)
+    if changes:
+        logger.info(f"Server stopping, pointing DNS at {config.sleep_address}")
+        apply_dns_changes(cloudflare, config, changes)
+
+
+def reconcile_dns(
+    config: DNSUpdaterConfig,
+    stop_event: threading.Event,
+    ecs_client: Any = None,
+    ec2_client: Any = None,
+) -> None:
+    """Keep DNS in sync until stopped, then prepare it for the next start."""
+    ecs_client = ecs_client or create_client("ecs")
+    ec2_client = ec2_client or create_client("ec2")
+    cloudflare = CloudflareAPI(config.cloudflare_token)
+
+    while not stop_event.is_set():
+        try:
+            update_dns_if_needed(config, cloudflare, ecs_client, ec2_client)
+        except Exception as e:
+            logger.error(f"DNS reconciliation failed: {e}")
+        stop_event.wait(config.reconcile_interval)
+
+    if config.sleep_address:
+        publish_sleep_address(config, cloudflare)
+    else:
+        lower_dns_ttl(config, cloudflare)
+
+
+# Heavy dependencies imported on first use rather than at start-up
+DEFERRED_IMPORTS = ["boto3", "requests"]
+
+
+def print_startup_profile() -> None:
+    """Print what importing the entry point and its deferred dependencies costs."""
+    from minecraft_tools.startup import format_report, profile_imports, total_import_ms
+
+    entry_point = __spec__.name if __spec__ else __name__
+    costs = profile_imports([entry_point])
+    print(f"Entry point imports: {total_import_ms(costs, [entry_point]):.1f}ms")
+    print(format_report(costs))
+
+    deferred = profile_imports(DEFERRED_IMPORTS)
+    print(
+        f"\nDeferred until first use: {total_import_ms(deferred, DEFERRED_IMPORTS):.1f}ms"
+    )
+    print(format_report(deferred, limit=10))
+
+
+def main(argv: list[str] | None = None) -> None:
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Update DNS for the ECS service")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print the import cost of each module and exit",
+    )
+    args = parser.parse_args(argv)
+    if args.profile_startup:
+        print_startup_profile()
+        return
+
     try:
+        setup_logging_from_env()
+        use_trimmed_models()
+        configure_tracing_from_env()
+        configure_timeline_from_env("dns-updater")
         config = DNSUpdaterConfig.from_env()
-        logger.info(f"Starting DNS updater for {config.record_name}")
+        names = ", ".join(f"{r.name} ({r.type})" for r in config.records)
+        logger.info(f"Starting DNS updater for {names}")
 
-        update_dns_if_needed(config)
+        with log_context(cluster=config.ecs_cluster, service=config.ecs_service):
+            if config.reconcile_interval > 0:
+                stop_event = threading.Event()
+                signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+                logger.info(
+                    f"Reconciling DNS every {config.reconcile_interval}s until stopped"
+                )
+                reconcile_dns(config, stop_event)
+            else:
+                update_dns_if_needed(config)
         logger.info("DNS update complete, exiting successfully")
         sys.exit(0)
 
@@ -0,0 +1,47 @@
+"""Reachability probes for candidate server addresses."""
+
+import logging
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of probing one address."""
+
+    ip: str
+    healthy: bool
+    latency: float | None = None
+    error: str | None = None
+
+
+def probe_tcp(ip: str, port: int, timeout: float = 2.0) -> ProbeResult:
+    """Measure how long a TCP connect to an address takes."""
+    started = time.perf_counter()
+    try:
+        with socket.create_connection((ip, port), timeout=timeout):
+            return ProbeResult(
+                ip=ip, healthy=True, latency=time.perf_counter() - started
+            )
+    except OSError as e:
+        return ProbeResult(ip=ip, healthy=False, error=str(e))
+
+
+def probe_candidates(
+    ips: list[str], port: int, timeout: float = 2.0
+) -> list[ProbeResult]:
+    """Probe all addresses concurrently, in the order given."""
+    if not ips:
+        return []
+    with ThreadPoolExecutor(max_workers=len(ips)) as executor:
+        return list(executor.map(lambda ip: probe_tcp(ip, port, timeout), ips))
+
+
+def rank_healthy(results: list[ProbeResult]) -> list[str]:
+    """Return healthy addresses, fastest first."""
+    healthy = [r for r in results if r.healthy and r.latency is not None]
+    return [r.ip for r in sorted(healthy, key=lambda r: r.latency or 0.0)]
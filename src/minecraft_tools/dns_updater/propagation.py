@@ -0,0 +1,131 @@
+"""DNS propagation verification against authoritative nameservers."""
+
+import logging
+import random
+import socket
+import struct
+import time
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+DNS_PORT = 53
+TYPE_A = 1
+CLASS_IN = 1
+
+
+@dataclass
+class PropagationResult:
+    """Outcome of waiting for a record to propagate."""
+
+    record_name: str
+    expected: str
+    propagated: bool
+    latency: float
+    nameservers: dict[str, float | None] = field(default_factory=dict)
+
+
+def parse_nameserver(nameserver: str) -> tuple[str, int]:
+    """Split a ``host[:port]`` nameserver into host and port."""
+    host, _, port = nameserver.rpartition(":")
+    if host and port.isdigit():
+        return host, int(port)
+    return nameserver, DNS_PORT
+
+
+def build_query(name: str, query_id: int, qtype: int = TYPE_A) -> bytes:
+    """Build a non-recursive DNS query packet."""
+    header = struct.pack(">HHHHHH", query_id, 0, 1, 0, 0, 0)
+    qname = b"".join(
+        bytes([len(label)]) + label.encode("ascii")
+        for label in name.rstrip(".").split(".")
+    )
+    return header + qname + b"\x00" + struct.pack(">HH", qtype, CLASS_IN)
+
+
+def _skip_name(data: bytes, offset: int) -> int:
+    """Return the offset just past a (possibly compressed) domain name."""
+    while True:
+        length = data[offset]
+        if length == 0:
+            return offset + 1
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        offset += length + 1
+
+
+def parse_a_answers(data: bytes, query_id: int) -> list[str]:
+    """Extract the A record addresses from a DNS response."""
+    response_id, flags, qdcount, ancount = struct.unpack(">HHHH", data[:8])
+    if response_id != query_id:
+        raise ValueError("DNS response ID does not match query")
+    if flags & 0x000F:
+        raise ValueError(f"DNS server returned rcode {flags & 0x000F}")
+
+    offset = 12
+    for _ in range(qdcount):
+        offset = _skip_name(data, offset) + 4
+
+    addresses = []
+    for _ in range(ancount):
+        offset = _skip_name(data, offset)
+        rtype, _, _, rdlength = struct.unpack(">HHIH", data[offset : offset + 10])
+        offset += 10
+        if rtype == TYPE_A and rdlength == 4:
+            addresses.append(socket.inet_ntoa(data[offset : offset + 4]))
+        offset += rdlength
+    return addresses
+
+
+def query_a_records(nameserver: str, name: str, timeout: float = 2.0) -> list[str]:
+    """Ask a nameserver directly for the A records of a name."""
+    host, port = parse_nameserver(nameserver)
+    query_id = random.randint(0, 0xFFFF)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(timeout)
+        sock.sendto(build_query(name, query_id), (host, port))
+        data, _ = sock.recvfrom(4096)
+    return parse_a_answers(data, query_id)
+
+
+def wait_for_propagation(
+    record_name: str,
+    expected_ip: str,
+    nameservers: list[str],
+    timeout: float = 120.0,
+    interval: float = 2.0,
+    started_at: float | None = None,
+) -> PropagationResult:
+    """Poll nameservers until all of them answer with the expected IP."""
+    started_at = time.monotonic() if started_at is None else started_at
+    deadline = started_at + timeout
+    seen: dict[str, float | None] = dict.fromkeys(nameservers)
+
+    while True:
+        for nameserver in [ns for ns, latency in seen.items() if latency is None]:
+            try:
+                answers = query_a_records(nameserver, record_name)
+            except (OSError, ValueError) as e:
+                logger.debug(f"Query to {nameserver} for {record_name} failed: {e}")
+                continue
+            if expected_ip in answers:
+                seen[nameserver] = time.monotonic() - started_at
+
+        now = time.monotonic()
+        if all(latency is not None for latency in seen.values()) or now >= deadline:
+            break
+        time.sleep(min(interval, deadline - now))
+
+    propagated = all(latency is not None for latency in seen.values())
+    latency = (
+        max(lat for lat in seen.values() if lat is not None)
+        if propagated and seen
+        else time.monotonic() - started_at
+    )
+    return PropagationResult(
+        record_name=record_name,
+        expected=expected_ip,
+        propagated=propagated,
+        latency=latency,
+        nameservers=seen,
+    )
@@ -0,0 +1,359 @@
+"""Report how much of the billed server time was actually played.
+
+Billed time comes from the server runs the idle watcher records and from the
+start and stop events ECS keeps for the service; played time from the player
+sessions. Both are laid out as one byte per minute of the report period, so a
+day's totals are a count over a slice and the empty stretches are a regex
+search, which keeps months of history fast. The empty stretches also give the
+idle threshold that keeps the server up through most breaks players come
+back from, and what it would have cost.
+"""
+
+import argparse
+import logging
+import math
+import os
+import re
+import time
+from bisect import bisect_right
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+from itertools import accumulate
+from typing import Any
+
+from minecraft_tools.logging_config import setup_logging_from_env
+from minecraft_tools.sessions import SessionStore
+from minecraft_tools.timeline import TimelineStore, percentile
+from minecraft_tools.timeline import report as timeline_report
+
+logger = logging.getLogger(__name__)
+
+DAY_MINUTES = 1440
+
+# Flags of each minute in the state map
+BILLED = 1
+PLAYED = 2
+BUSY = BILLED | PLAYED
+
+# A stretch of billed minutes nobody played
+EMPTY_STRETCH = re.compile(bytes([BILLED]) + b"+")
+FOLLOWED_BY_PLAY = bytes([BUSY])
+
+SERVICE_EVENT = re.compile(
+    r"has (?P<action>started|stopped) \d+ (?:running )?tasks?: (?P<tasks>.*)$"
+)
+TASK_ID = re.compile(r"\(task (\w+)\)")
+
+# Minutes a server start is billed before anyone can play, if not measured
+DEFAULT_RESTART_COST = 3.0
+
+
+def service_event_intervals(
+    events: Iterable[dict[str, Any]], now: float | None = None
+) -> list[tuple[float, float]]:
+    """Task start and stop times from the events of ``describe_services``.
+
+    Tasks still running when the events were fetched run until ``now``; stops
+    of tasks started before the oldest event are left out.
+    """
+    started: dict[str, float] = {}
+    intervals = []
+    for event in sorted(events, key=lambda e: e["createdAt"]):
+        match = SERVICE_EVENT.search(event["message"])
+        if not match:
+            continue
+        at = event["createdAt"].timestamp()
+        for task in TASK_ID.findall(match["tasks"]):
+            if match["action"] == "started":
+                started[task] = at
+            elif task in started:
+                intervals.append((started.pop(task), at))
+    end = time.time() if now is None else now
+    intervals.extend((start, end) for start in started.values())
+    return intervals
+
+
+class MinuteMap:
+    """One byte per minute of a period, set for the minutes in intervals."""
+
+    def __init__(self, start: float, end: float) -> None:
+        self.origin = int(start // 60)
+        self.minutes = max(int(end // 60) - self.origin, 0)
+        self.flags = bytearray(self.minutes)
+
+    def mark(self, intervals: Iterable[tuple[float, float]], flag: int) -> None:
+        """Set ``flag`` for every minute overlapping an interval."""
+        fill = bytes([flag])
+        for start, end in intervals:
+            first = max(int(start // 60) - self.origin, 0)
+            last = min(-int(-end // 60) - self.origin, self.minutes)
+            if first < last:
+                self.flags[first:last] = fill * (last - first)
+
+
+@dataclass
+class DayStats:
+    """Billed and played minutes of one day."""
+
+    day: date
+    billed: int
+    played: int
+    starts: int
+    idle_shutdowns: int
+
+    @property
+    def efficiency(self) -> float:
+        """Share of the billed minutes somebody was playing."""
+        return self.played / self.billed if self.billed else 0.0
+
+
+@dataclass
+class Recommendation:
+    """Recommended idle threshold and what it would have cost."""
+
+    threshold: int  # minutes
+    idle_minutes: float
+    restarts: int
+    current_threshold: int
+    current_idle_minutes: float
+    current_restarts: int
+
+
+def daily_stats(
+    state: bytes, origin: int, runs: list[tuple[float, float, float | None]]
+) -> list[DayStats]:
+    """Billed and played minutes per UTC day of a state map."""
+    starts = Counter(int(started // 86400) for started, _, _ in runs)
+    idle_shutdowns = Counter(int(idle // 86400) for _, _, idle in runs if idle)
+    days = []
+    day = origin // DAY_MINUTES
+    while day * DAY_MINUTES < origin + len(state):
+        start = max(day * DAY_MINUTES - origin, 0)
+        end = min((day + 1) * DAY_MINUTES - origin, len(state))
+        played = state.count(BUSY, start, end)
+        days.append(
+            DayStats(
+                day=datetime.fromtimestamp(day * 86400, UTC).date(),
+                billed=state.count(BILLED, start, end) + played,
+                played=played,
+                starts=starts[day],
+                idle_shutdowns=idle_shutdowns[day],
+            )
+        )
+        day += 1
+    return days
+
+
+def empty_stretches(state: bytes) -> list[tuple[int, bool]]:
+    """Length of each billed stretch without players and whether play followed."""
+    return [
+        (
+            match.end() - match.start(),
+            state[match.end() : match.end() + 1] == FOLLOWED_BY_PLAY,
+        )
+        for match in EMPTY_STRETCH.finditer(state)
+    ]
+
+
+class IdleStretches:
+    """Lengths of the empty stretches, sorted for costing many thresholds."""
+
+    def __init__(self, stretches: Iterable[tuple[int, bool]]) -> None:
+        self.returned = sorted(length for length, came_back in stretches if came_back)
+        self.final = sorted(length for length, came_back in stretches if not came_back)
+        self._returned_sums = [0, *accumulate(self.returned)]
+        self._final_sums = [0, *accumulate(self.final)]
+
+    def cost(self, threshold: int, restart_cost: float) -> tuple[float, int]:
+        """Idle minutes billed and restarts needed with an idle threshold.
+
+        A stretch longer than the threshold shuts the server down after the
+        threshold; if somebody came back afterwards, the server had to start
+        again, billing ``restart_cost`` before they could play.
+        """
+        returned = bisect_right(self.returned, threshold)
+        final = bisect_right(self.final, threshold)
+        restarts = len(self.returned) - returned
+        minutes = (
+            self._returned_sums[returned]
+            + self._final_sums[final]
+            + restarts * (threshold + restart_cost)
+            + (len(self.final) - final) * threshold
+        )
+        return minutes, restarts
+
+
+def recommend_threshold(
+    stretches: IdleStretches,
+    current: int,
+    restart_cost: float,
+    coverage: float = 0.9,
+) -> Recommendation:
+    """Shortest idle threshold in minutes outlasting most breaks players return from.
+
+    A shorter threshold usually bills less even counting the restarts, but a
+    player coming back to a stopped server has to wait for a cold start, so
+    the threshold keeps the server up through ``coverage`` of the breaks. Without any
+    breaks to go by the current threshold is kept.
+    """
+    threshold = current
+    if stretches.returned:
+        threshold = max(math.ceil(percentile(stretches.returned, coverage * 100)), 1)
+    idle_minutes, restarts = stretches.cost(threshold, restart_cost)
+    current_minutes, current_restarts = stretches.cost(current, restart_cost)
+    return Recommendation(
+        threshold, idle_minutes, restarts, current, current_minutes, current_restarts
+    )
+
+
+def build_state(
+    start: float,
+    end: float,
+    billed: Iterable[tuple[float, float]],
+    played: Iterable[tuple[float, float]],
+) -> tuple[bytes, int]:
+    """State map of a period, with the minute it starts at."""
+    billed_map = MinuteMap(start, end)
+    billed_map.mark(billed, BILLED)
+    played_map = MinuteMap(start, end)
+    played_map.mark(played, PLAYED)
+    # OR the maps as two big integers instead of minute by minute
+    state = int.from_bytes(billed_map.flags, "little") | int.from_bytes(
+        played_map.flags, "little"
+    )
+    return state.to_bytes(billed_map.minutes, "little"), billed_map.origin
+
+
+def format_report(days: list[DayStats], recommendation: Recommendation) -> str:
+    """Render the daily metrics and the recommended threshold."""
+    lines = [
+        f"{'day':<10} {'billed':>7} {'played':>7} {'eff':>5} {'starts':>6} {'idle':>4}"
+    ]
+    for d in days:
+        if d.billed or d.starts:
+            lines.append(
+                f"{d.day.isoformat():<10} {d.billed:>7} {d.played:>7} "
+                f"{d.efficiency:>5.0%} {d.starts:>6} {d.idle_shutdowns:>4}"
+            )
+    billed = sum(d.billed for d in days)
+    played = sum(d.played for d in days)
+    lines.append(
+        f"{'total':<10} {billed:>7} {played:>7} "
+        f"{played / billed if billed else 0.0:>5.0%}"
+    )
+    r = recommendation
+    lines += [
+        "",
+        f"IDLE_THRESHOLD {r.current_threshold * 60}: {r.current_idle_minutes:.0f} "
+        f"idle minutes, {r.current_restarts} restarts after a break",
+        f"IDLE_THRESHOLD {r.threshold * 60}: {r.idle_minutes:.0f} "
+        f"idle minutes, {r.restarts} restarts after a break (recommended)",
+    ]
+    return "\n".join(lines)
+
+
+def report(
+    store: SessionStore,
+    days: float,
+    current_threshold: int,
+    restart_cost: float,
+    events: Iterable[dict[str, Any]] = (),
+    now: float | None = None,
+    coverage: float = 0.9,
+) -> tuple[list[DayStats], Recommendation]:
+    """Daily metrics and threshold recommendation for the last days."""
+    end = time.time() if now is None else now
+    start = end - days * 86400
+    runs = store.runs(start)
+    billed = [(started, last_seen) for started, last_seen, _ in runs]
+    billed += service_event_intervals(events, end)
+    played = [(started, last_seen) for _, started, last_seen in store.sessions(start)]
+
+    state, origin = build_state(start, end, billed, played)
+    return daily_stats(state, origin, runs), recommend_threshold(
+        IdleStretches(empty_stretches(state)), current_threshold, restart_cost, coverage
+    )
+
+
+def restart_cost_from_timeline(path: str | None) -> float:
+    """Median cold start in minutes from a timeline, or the default."""
+    if not path:
+        return DEFAULT_RESTART_COST
+    store = TimelineStore(path)
+    try:
+        for stats in timeline_report([store]):
+            if stats.stage == "cold_start":
+                return stats.p50 / 60
+    finally:
+        store.close()
+    return DEFAULT_RESTART_COST
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Report billed and played minutes per day and recommend an idle threshold."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--db", help="session database (default: SESSIONS_DB)")
+    parser.add_argument("--days", type=float, default=30.0)
+    parser.add_argument(
+        "--idle-threshold",
+        type=int,
+        default=int(os.getenv("IDLE_THRESHOLD", "600")),
+        help="current idle threshold in seconds (default: IDLE_THRESHOLD or 600)",
+    )
+    parser.add_argument(
+        "--restart-cost",
+        type=float,
+        help="billed minutes per server start (default: median cold start "
+        f"from TIMELINE_DB, or {DEFAULT_RESTART_COST:.0f})",
+    )
+    parser.add_argument(
+        "--coverage",
+        type=float,
+        default=0.9,
+        help="share of breaks the recommended threshold waits out (default: 0.9)",
+    )
+    parser.add_argument(
+        "--no-ecs",
+        action="store_true",
+        help="do not add the service events of ECS_CLUSTER and ECS_SERVICE",
+    )
+    args = parser.parse_args(argv)
+
+    setup_logging_from_env()
+    path = args.db or os.getenv("SESSIONS_DB")
+    if not path:
+        parser.error("no database given and SESSIONS_DB is not set")
+    restart_cost = args.restart_cost
+    if restart_cost is None:
+        restart_cost = restart_cost_from_timeline(os.getenv("TIMELINE_DB"))
+
+    events: list[dict[str, Any]] = []
+    cluster, service = os.getenv("ECS_CLUSTER"), os.getenv("ECS_SERVICE")
+    if cluster and service and not args.no_ecs:
+        from minecraft_tools.aws import create_client
+
+        response = create_client("ecs").describe_services(
+            cluster=cluster, services=[service]
+        )
+        for info in response["services"]:
+            events.extend(info.get("events", []))
+
+    store = SessionStore(path)
+    try:
+        days, recommendation = report(
+            store,
+            args.days,
+            round(args.idle_threshold / 60),
+            restart_cost,
+            events,
+            coverage=args.coverage,
+        )
+    finally:
+        store.close()
+    print(format_report(days, recommendation))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
 """Health check utilities."""
 
+import json
 import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import Any
 
 import boto3
@@ -8,28 +14,43 @@ from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
 
+HealthCheck = Callable[[], dict[str, Any]]
+# Serves a JSON document from the health server, e.g. statistics for the bot
+Route = Callable[[], dict[str, Any]]
 
-def check_aws_connectivity() -> dict[str, Any]:
-    """Check AWS connectivity and permissions."""
+
+def client_error_code(error: ClientError) -> str:
+    """AWS error code alone; messages can name the account and role."""
+    return str(error.response.get("Error", {}).get("Code", "ClientError"))
+
+
+def check_aws_connectivity(sts_client: Any = None) -> dict[str, Any]:
+    """Check AWS connectivity and permissions.
+
+    Only the outcome and latency are reported: the routes can be reachable
+    from the network, so the caller identity is left out.
+    """
+    started = time.monotonic()
     try:
-        sts = boto3.client("sts")
-        identity = sts.get_caller_identity()
+        sts = sts_client or boto3.client("sts")
+        sts.get_caller_identity()
         return {
             "status": "healthy",
-            "account": identity.get("Account"),
-            "user_id": identity.get("UserId"),
+            "latency_ms": round((time.monotonic() - started) * 1000, 1),
         }
     except ClientError as e:
         return {
             "status": "unhealthy",
-            "error": str(e),
+            "error": client_error_code(e),
         }
 
 
-def check_ecs_service(cluster: str, service: str) -> dict[str, Any]:
+def check_ecs_service(
+    cluster: str, service: str, ecs_client: Any = None
+) -> dict[str, Any]:
     """Check ECS service health."""
     try:
-        ecs = boto3.client("ecs")
+        ecs = ecs_client or boto3.client("ecs")
         response = ecs.describe_services(cluster=cluster, services=[service])
 
         if not response["services"]:
@@ -48,5 +69,179 @@ def check_ecs_service(cluster: str, service: str) -> dict[str, Any]:
     except ClientError as e:
         return {
             "status": "unhealthy",
-            "error": str(e),
+            "error": client_error_code(e),
         }
+
+
+class HealthChecker:
+    """Runs health checks in parallel and caches the combined result."""
+
+    def __init__(
+        self,
+        checks: dict[str, HealthCheck],
+        cache_ttl: float = 10.0,
+        timeout: float = 3.0,
+    ) -> None:
+        self.checks = checks
+        self.cache_ttl = cache_ttl
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(len(checks), 1), thread_name_prefix="health"
+        )
+        self._lock = threading.Lock()
+        # Each running check with the deadline it was given when submitted
+        self._in_flight: dict[str, tuple[Future[dict[str, Any]], float]] = {}
+        self._refreshing = False
+        self._result: dict[str, Any] | None = None
+        self._expires_at = 0.0
+
+    def _submit(
+        self, name: str, check: HealthCheck
+    ) -> tuple[Future[dict[str, Any]], float]:
+        # A check that timed out earlier may still be running, reuse it
+        entry = self._in_flight.get(name)
+        if entry is None or entry[0].done():
+            entry = (self._executor.submit(check), time.monotonic() + self.timeout)
+            self._in_flight[name] = entry
+        return entry
+
+    def _collect(
+        self, future: Future[dict[str, Any]], deadline: float
+    ) -> dict[str, Any]:
+        try:
+            return future.result(timeout=max(deadline - time.monotonic(), 0))
+        except TimeoutError:
+            return {
+                "status": "unhealthy",
+                "error": f"Timed out after {self.timeout}s",
+            }
+        except Exception as e:
+            return {"status": "unhealthy", "error": str(e)}
+
+    def run(self) -> dict[str, Any]:
+        """Get the combined check result, from cache when fresh.
+
+        While one caller refreshes the result, others get the previous one
+        instead of queueing behind the checks.
+        """
+        with self._lock:
+            if self._result is not None and (
+                self._refreshing or time.monotonic() < self._expires_at
+            ):
+                return self._result
+            self._refreshing = True
+            futures = {
+                name: self._submit(name, check) for name, check in self.checks.items()
+            }
+
+        try:
+            results = {
+                name: self._collect(future, deadline)
+                for name, (future, deadline) in futures.items()
+            }
+            healthy = all(r.get("status") == "healthy" for r in results.values())
+            result = {
+                "status": "healthy" if healthy else "unhealthy",
+                "checks": results,
+            }
+            with self._lock:
+                self._result = result
+                self._expires_at = time.monotonic() + self.cache_ttl
+            return result
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def close(self) -> None:
+        """Stop the check worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class HealthServer:
+    """Embedded HTTP server exposing /livez, /readyz and extra JSON routes."""
+
+    def __init__(
+        self,
+        checker: HealthChecker,
+        port: int,
+        host: str = "",
+        routes: dict[str, Route] | None = None,
+    ) -> None:
+        self.checker = checker
+        self.routes = routes or {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                if self.path == "/livez":
+                    self._respond(200, {"status": "alive"})
+                elif self.path == "/readyz":
+                    result = server.checker.run()
+                    code = 200 if result["status"] == "healthy" else 503
+                    self._respond(code, result)
+                elif self.path in server.routes:
+                    try:
+                        self._respond(200, server.routes[self.path]())
+                    except Exception as e:
+                        logger.error(f"Failed to serve {self.path}: {e}")
+                        self._respond(500, {"error": str(e)})
+                else:
+                    self._respond(404, {"error": "Not found"})
+
+            def _respond(self, code: int, body: dict[str, Any]) -> None:
+                payload = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug(format % args)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name="health-server", daemon=True
+        )
+
+    @property
+    def port(self) -> int:
+        """The port the server is bound to."""
+        return int(self.httpd.server_address[1])
+
+    def start(self) -> "HealthServer":
+        """Serve requests on a background thread."""
+        self._thread.start()
+        logger.info(f"Health server listening on port {self.port}")
+        return self
+
+    def stop(self) -> None:
+        """Shut the server down."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.checker.close()
+
+
+def start_health_server(
+    port: int,
+    checks: dict[str, HealthCheck],
+    cache_ttl: float = 10.0,
+    timeout: float = 3.0,
+    routes: dict[str, Route] | None = None,
+) -> HealthServer:
+    """Start a health server for a long-running tool."""
+    checker = HealthChecker(checks, cache_ttl=cache_ttl, timeout=timeout)
+    return HealthServer(checker, port, routes=routes).start()
+
+
+def aws_service_checks(
+    cluster: str, service: str, ecs_client: Any = None
+) -> dict[str, HealthCheck]:
+    """Standard AWS and ECS readiness checks with shared clients."""
+    sts_client = boto3.client("sts")
+    ecs_client = ecs_client or boto3.client("ecs")
+    return {
+        "aws": lambda: check_aws_connectivity(sts_client),
+        "ecs": lambda: check_ecs_service(cluster, service, ecs_client),
+    }
@@ -0,0 +1,21 @@
+"""Process-wide HTTP session."""
+
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import requests
+
+_session: "requests.Session | None" = None
+_lock = threading.Lock()
+
+
+def get_http_session() -> "requests.Session":
+    """Get the shared session, so tools in one process reuse pooled connections."""
+    global _session
+    with _lock:
+        if _session is None:
+            import requests
+
+            _session = requests.Session()
+        return _session
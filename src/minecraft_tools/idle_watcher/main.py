@@ -1,49 +1,100 @@
 """Idle watcher for Minecraft server - shuts down server when no players are online."""
 
 import logging
+import signal
+import threading
 import time
+from collections.abc import Callable
 from typing import Any
 
 import boto3
-import requests
 from botocore.exceptions import ClientError
-from mcrcon import MCRcon
 
+from minecraft_tools.aws import use_trimmed_models
+from minecraft_tools.backup.main import create_snapshot
 from minecraft_tools.config import IdleWatcherConfig
+from minecraft_tools.health import aws_service_checks, start_health_server
+from minecraft_tools.idle_watcher.players import PlayerTracker, parse_player_list
+from minecraft_tools.idle_watcher.shutdown import ShutdownStep, StepResult, run_steps
+from minecraft_tools.logging_config import SAMPLED, log_context, setup_logging_from_env
+from minecraft_tools.notifications import send_discord_message
+from minecraft_tools.rcon import RconClient
+from minecraft_tools.sessions import configure_sessions_from_env, get_sessions
+from minecraft_tools.timeline import configure_timeline_from_env, get_timeline
+from minecraft_tools.tracing import configure_tracing_from_env, traced
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
 logger = logging.getLogger(__name__)
 
+# Seconds each step may take when the task is stopped, within SHUTDOWN_GRACE
+SAVE_TIMEOUT = 15.0
+BROADCAST_TIMEOUT = 3.0
+NOTICE_TIMEOUT = 5.0
+TIMELINE_TIMEOUT = 2.0
 
-def get_player_count(host: str, port: int, password: str = "") -> int:
-    """Get current player count from Minecraft server."""
+
+@traced("rcon.list")
+def get_online_players(host: str, port: int, password: str = "") -> list[str] | None:
+    """Names of the players online, or None if RCON could not be reached."""
     try:
-        with MCRcon(host, password, port=port) as mcr:
-            response = mcr.command("list")
-            # Parse response like "There are 0 of a max of 20 players online:"
-            if "There are" in response:
-                parts = response.split()
-                if len(parts) >= 3:
-                    return int(parts[2])
-        return 0
+        with RconClient(host, port, password) as rcon:
+            response = rcon.command("list")
+            # Parse response like "There are 1 of a max of 20 players online: Steve"
+            return parse_player_list(response) or []
     except Exception as e:
         logger.warning(f"Failed to get player count: {e}")
-        return -1  # Return -1 to indicate error
+        return None
+
+
+def get_player_count(host: str, port: int, password: str = "") -> int:
+    """Get current player count from Minecraft server."""
+    players = get_online_players(host, port, password)
+    return -1 if players is None else len(players)  # -1 indicates an error
 
 
-def send_discord_message(webhook_url: str, message: str) -> None:
-    """Send message to Discord webhook."""
-    if not webhook_url:
+def follow_players(
+    tracker: PlayerTracker,
+    config: IdleWatcherConfig,
+    stop_event: threading.Event,
+    idle_start_time: float | None,
+) -> float | None:
+    """Follow joins and leaves in the log until the next RCON check is due.
+
+    Returns early once the server has been empty for the idle threshold, and
+    returns the updated idle start time.
+    """
+    deadline = time.monotonic() + config.check_interval
+    while (remaining := deadline - time.monotonic()) > 0:
+        if stop_event.wait(min(config.log_poll_interval, remaining)):
+            break
+        if tracker.poll():
+            get_sessions().observe(tracker.online)
+        if tracker.online:
+            idle_start_time = None
+            continue
+        if idle_start_time is None:
+            idle_start_time = tracker.empty_since
+            logger.info("Last player left, starting idle timer")
+        if time.time() - idle_start_time >= config.idle_threshold:
+            break
+    return idle_start_time
+
+
+def backup_world(config: IdleWatcherConfig) -> None:
+    """Flush the world to disk and back it up while saving is paused."""
+    if config.backup is None:
         return
     try:
-        requests.post(webhook_url, json={"content": message}, timeout=10)
-        logger.info("Discord notification sent")
+        with RconClient(
+            config.rcon_host, config.rcon_port, config.rcon_password, timeout=60
+        ) as rcon:
+            try:
+                rcon.commands(["save-off", "save-all flush"])
+                create_snapshot(config.backup)
+            finally:
+                rcon.command("save-on")
     except Exception as e:
-        logger.warning(f"Failed to send Discord message: {e}")
+        # The world is still on EFS, so never keep the server up for this
+        logger.error(f"World backup failed: {e}")
 
 
 def get_service_status(ecs_client: Any, cluster: str, service: str) -> dict[str, int]:
@@ -86,29 +137,98 @@ def scale_service(
         return False
 
 
-def monitor_server(config: IdleWatcherConfig) -> None:
+def termination_steps(config: IdleWatcherConfig, ecs_client: Any) -> list[ShutdownStep]:
+    """Steps to take when the task is stopped underneath the server."""
+
+    def rcon_command(command: str) -> Callable[[float], None]:
+        def action(timeout: float) -> None:
+            with RconClient(
+                config.rcon_host, config.rcon_port, config.rcon_password, timeout
+            ) as rcon:
+                rcon.command(command)
+
+        return action
+
+    def notify(timeout: float) -> None:
+        status = get_service_status(ecs_client, config.ecs_cluster, config.ecs_service)
+        if status["desired"] == 0:
+            # Scaled down on purpose, which has been announced already
+            return
+        send_discord_message(
+            config.discord_webhook,
+            "⚠️ Minecraft server was interrupted and is stopping",
+            timeout=timeout,
+        )
+
+    return [
+        ShutdownStep("save", rcon_command("save-all flush"), SAVE_TIMEOUT),
+        ShutdownStep(
+            "broadcast",
+            rcon_command("say Server is stopping, see you soon"),
+            BROADCAST_TIMEOUT,
+        ),
+        ShutdownStep("notice", notify, NOTICE_TIMEOUT),
+        ShutdownStep(
+            "timeline",
+            lambda timeout: get_timeline().mark("task_stopping"),
+            TIMELINE_TIMEOUT,
+        ),
+    ]
+
+
+def handle_termination(
+    config: IdleWatcherConfig, ecs_client: Any = None
+) -> list[StepResult]:
+    """Save the world and tell players before the task is killed."""
+    logger.info(f"Task is stopping, running shutdown within {config.shutdown_grace}s")
+    ecs_client = ecs_client or boto3.client("ecs")
+    return run_steps(termination_steps(config, ecs_client), config.shutdown_grace)
+
+
+def monitor_server(
+    config: IdleWatcherConfig,
+    ecs_client: Any = None,
+    stop_event: threading.Event | None = None,
+) -> None:
     """Monitor server and shut down if idle."""
-    ecs_client = boto3.client("ecs")
+    ecs_client = ecs_client or boto3.client("ecs")
+    stop_event = stop_event or threading.Event()
     idle_start_time = None
     server_available = False
+    # With the server log available, RCON is only a periodic consistency check
+    tracker = PlayerTracker(config.player_log) if config.player_log else None
 
-    while True:
+    while not stop_event.is_set():
         try:
+            # Pick up tunables changed in Parameter Store
+            config.refresh()
+
             # Check service status
             status = get_service_status(
                 ecs_client, config.ecs_cluster, config.ecs_service
             )
 
             if status["running"] == 0:
-                logger.info("Service is not running, resetting idle timer")
+                logger.info(
+                    "Service is not running, resetting idle timer", extra=SAMPLED
+                )
                 idle_start_time = None
-                time.sleep(config.check_interval)
+                get_sessions().observe([])
+                stop_event.wait(config.check_interval)
                 continue
 
+            get_sessions().record_uptime()
+
             # Get player count
-            player_count = get_player_count(
+            players = get_online_players(
                 config.rcon_host, config.rcon_port, config.rcon_password
             )
+            player_count = -1 if players is None else len(players)
+            if tracker is not None and players is not None:
+                tracker.poll()
+                tracker.reconcile(players)
+            if players is not None:
+                get_sessions().observe(players)
 
             if player_count == -1:
                 logger.warning("Could not get player count, assuming server is busy")
@@ -118,31 +238,39 @@ def monitor_server(config: IdleWatcherConfig) -> None:
                 # If this is the first successful connection, notify Discord
                 if not server_available:
                     server_available = True
+                    get_timeline().mark("rcon_ready")
                     send_discord_message(
-                        config.discord_webhook, 
-                        f"🟢 Minecraft server is now online and ready for players!\nConnect to: **{config.dns_name}**"
+                        config.discord_webhook,
+                        f"🟢 Minecraft server is now online and ready for players!\nConnect to: **{config.dns_name}**",
                     )
 
                 if player_count == 0:
                     current_time = time.time()
 
                     if idle_start_time is None:
-                        idle_start_time = current_time
+                        idle_start_time = (
+                            tracker.empty_since if tracker is not None else None
+                        ) or current_time
                         logger.info("Server is idle, starting idle timer")
                     else:
                         idle_duration = current_time - idle_start_time
-                        logger.info(f"Server idle for {idle_duration:.0f} seconds")
+                        logger.info(
+                            f"Server idle for {idle_duration:.0f} seconds",
+                            extra=SAMPLED,
+                        )
 
                         if idle_duration >= config.idle_threshold:
                             logger.info("Server has been idle too long, shutting down")
                             send_discord_message(
                                 config.discord_webhook,
-                                "🔴 Minecraft server shutting down due to inactivity"
+                                "🔴 Minecraft server shutting down due to inactivity",
                             )
+                            backup_world(config)
                             if scale_service(
                                 ecs_client, config.ecs_cluster, config.ecs_service, 0
                             ):
                                 logger.info("Server shutdown initiated")
+                                get_sessions().record_idle_shutdown()
                                 server_available = False
                                 return
                             else:
@@ -150,28 +278,52 @@ def monitor_server(config: IdleWatcherConfig) -> None:
                 else:
                     # Players online, reset idle timer
                     if idle_start_time is not None:
-                        logger.info(f"Players online ({player_count}), resetting idle timer")
+                        logger.info(
+                            f"Players online ({player_count}), resetting idle timer"
+                        )
                         idle_start_time = None
 
         except Exception as e:
             logger.error(f"Error in monitoring loop: {e}")
             idle_start_time = None  # Reset on error to be safe
 
-        time.sleep(config.check_interval)
-
-        time.sleep(config.check_interval)
+        if tracker is not None and server_available:
+            idle_start_time = follow_players(
+                tracker, config, stop_event, idle_start_time
+            )
+        else:
+            stop_event.wait(config.check_interval)
 
 
 def main() -> None:
     """Main entry point."""
     try:
+        setup_logging_from_env()
+        use_trimmed_models()
+        configure_tracing_from_env()
+        configure_timeline_from_env("idle-watcher")
+        configure_sessions_from_env()
         config = IdleWatcherConfig.from_env()
         logger.info(
             f"Starting idle watcher for {config.rcon_host}:{config.rcon_port} "
             f"(check every {config.check_interval}s, idle threshold {config.idle_threshold}s)"
         )
 
-        monitor_server(config)
+        if config.health_port:
+            start_health_server(
+                config.health_port,
+                aws_service_checks(config.ecs_cluster, config.ecs_service),
+                cache_ttl=config.health_cache_ttl,
+            )
+
+        ecs_client = boto3.client("ecs")
+        stop_event = threading.Event()
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+
+        with log_context(cluster=config.ecs_cluster, service=config.ecs_service):
+            monitor_server(config, ecs_client, stop_event)
+            if stop_event.is_set():
+                handle_termination(config, ecs_client)
 
     except ValueError as e:
         logger.error(f"Configuration error: {e}")
@@ -0,0 +1,168 @@
+"""Player tracking from the server log.
+
+The server writes a line to ``logs/latest.log`` whenever a player joins or
+leaves. Following that file gives the idle watcher join and leave events as
+they happen, without an RCON round trip per check.
+"""
+
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import BinaryIO
+
+logger = logging.getLogger(__name__)
+
+# "[12:00:00 INFO]: Steve joined the game" (Paper) or
+# "[12:00:00] [Server thread/INFO]: Steve joined the game" (vanilla). Anchored
+# to the whole line so that chat such as "<Steve> ]: Bob left the game" cannot
+# fake an event: chat always puts its sender, e.g. "<Steve>", first. Floodgate
+# gives Bedrock players a prefix, "." by default, e.g. ".Steve".
+PLAYER_EVENT = re.compile(
+    r"^\[\d{2}:\d{2}:\d{2}(?: INFO\]|\] \[Server thread/INFO\]): "
+    r"(?P<player>[.*]?\w{1,16}) (?P<action>joined|left) the game$"
+)
+RCON_PLAYER_LIST = re.compile(r"There are (\d+) of a max of \d+ players online:(.*)")
+
+
+@dataclass
+class PlayerEvent:
+    """A player joining or leaving."""
+
+    player: str
+    joined: bool
+    at: float
+
+
+def parse_log_line(line: str, at: float = 0.0) -> PlayerEvent | None:
+    """Join or leave event from a server log line."""
+    match = PLAYER_EVENT.match(line.rstrip())
+    if match is None:
+        return None
+    return PlayerEvent(match["player"], match["action"] == "joined", at)
+
+
+def parse_player_list(response: str) -> list[str] | None:
+    """Player names from the RCON ``list`` response."""
+    match = RCON_PLAYER_LIST.search(response)
+    if match is None:
+        return None
+    return [name.strip() for name in match[2].split(",") if name.strip()]
+
+
+class LogTailer:
+    """Read lines appended to a file, following it across log rotation."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file: BinaryIO | None = None
+        self._inode: int | None = None
+        self._partial = b""
+
+    def _reopen(self) -> bool:
+        """Open the current file at its start; False if it does not exist."""
+        self.close()
+        try:
+            self._file = open(self.path, "rb")  # noqa: SIM115
+        except FileNotFoundError:
+            return False
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        return True
+
+    def rotated(self) -> bool:
+        """Whether the file was replaced or truncated since the last read."""
+        if self._file is None:
+            return True
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return st.st_ino != self._inode or st.st_size < self._file.tell()
+
+    def read_lines(self) -> tuple[list[str], bool]:
+        """Complete lines appended since the last call.
+
+        Also returns whether reading restarted at the beginning of a new
+        file, in which case the lines describe a new server run.
+        """
+        restarted = False
+        if self.rotated():
+            if self._file is not None:
+                # Finish the old file before switching
+                lines = self._read()
+                if lines:
+                    return lines, False
+            if not self._reopen():
+                return [], False
+            self._partial = b""
+            restarted = True
+        return self._read(), restarted
+
+    def _read(self) -> list[str]:
+        assert self._file is not None
+        data = self._partial + self._file.read()
+        lines = data.split(b"\n")
+        self._partial = lines.pop()
+        return [line.decode("utf-8", errors="replace") for line in lines]
+
+    def close(self) -> None:
+        """Close the followed file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class PlayerTracker:
+    """Players online according to the server log."""
+
+    def __init__(self, path: str) -> None:
+        self.tailer = LogTailer(path)
+        self.online: set[str] = set()
+        # When the server last became empty, or None while players are online
+        self.empty_since: float | None = None
+
+    def poll(self, now: float | None = None) -> list[PlayerEvent]:
+        """Apply the log lines written since the last poll."""
+        now = time.time() if now is None else now
+        lines, restarted = self.tailer.read_lines()
+        if restarted:
+            self.online.clear()
+        events = []
+        for line in lines:
+            event = parse_log_line(line, now)
+            if event is None:
+                continue
+            events.append(event)
+            if event.joined:
+                self.online.add(event.player)
+            else:
+                self.online.discard(event.player)
+        if self.online:
+            self.empty_since = None
+        elif self.empty_since is None:
+            self.empty_since = now
+        for event in events:
+            action = "joined" if event.joined else "left"
+            logger.info(f"{event.player} {action}, {len(self.online)} online")
+        return events
+
+    def reconcile(self, players: list[str], now: float | None = None) -> bool:
+        """Adopt the players RCON reports; True if the log had missed some."""
+        reported = set(players)
+        if reported == self.online:
+            return False
+        logger.warning(
+            f"Log shows {sorted(self.online)} online but RCON reports "
+            f"{sorted(reported)}, using RCON"
+        )
+        self.online = reported
+        if reported:
+            self.empty_since = None
+        elif self.empty_since is None:
+            self.empty_since = time.time() if now is None else now
+        return True
+
+    def close(self) -> None:
+        """Stop following the log."""
+        self.tailer.close()
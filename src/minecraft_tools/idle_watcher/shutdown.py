@@ -0,0 +1,90 @@
+"""Bounded-time shutdown steps for when the task is being stopped.
+
+Fargate Spot interruptions arrive as SIGTERM, and ECS kills the container
+once the stop timeout has passed. Each step gets its own deadline within that
+grace period; a step that overruns is abandoned on its daemon thread so the
+remaining steps still run. The overrun is logged once, when the step is
+abandoned; its thread is kept on the result for callers that want to wait
+for it.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ShutdownStep:
+    """One step of the shutdown, called with the seconds it may take."""
+
+    name: str
+    action: Callable[[float], None]
+    timeout: float
+
+
+@dataclass
+class StepResult:
+    """Outcome and duration of a shutdown step."""
+
+    name: str
+    status: str  # "ok", "failed", "timeout" or "skipped"
+    seconds: float = 0.0
+    error: str | None = None
+    # Still running after a timeout
+    thread: threading.Thread | None = field(default=None, repr=False, compare=False)
+
+
+def run_step(step: ShutdownStep, timeout: float) -> StepResult:
+    """Run one step on a daemon thread and wait for it at most ``timeout``."""
+    errors: list[Exception] = []
+
+    def target() -> None:
+        try:
+            step.action(timeout)
+        except Exception as e:
+            errors.append(e)
+
+    started = time.perf_counter()
+    thread = threading.Thread(target=target, name=f"shutdown-{step.name}", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    seconds = time.perf_counter() - started
+
+    if thread.is_alive():
+        logger.warning(
+            f"Shutdown step {step.name} overran its {timeout:.1f}s deadline, "
+            "abandoning it"
+        )
+        return StepResult(step.name, "timeout", seconds, thread=thread)
+    if errors:
+        logger.warning(f"Shutdown step {step.name} failed: {errors[0]}")
+        return StepResult(step.name, "failed", seconds, str(errors[0]))
+    logger.info(f"Shutdown step {step.name} took {seconds * 1000:.0f}ms")
+    return StepResult(step.name, "ok", seconds)
+
+
+def run_steps(steps: list[ShutdownStep], budget: float) -> list[StepResult]:
+    """Run steps in order, each bounded by its timeout and the overall budget."""
+    started = time.monotonic()
+    deadline = started + budget
+    results = []
+    for step in steps:
+        timeout = min(step.timeout, deadline - time.monotonic())
+        if timeout <= 0:
+            results.append(StepResult(step.name, "skipped"))
+        else:
+            results.append(run_step(step, timeout))
+
+    skipped = [r.name for r in results if r.status == "skipped"]
+    if skipped:
+        logger.warning(f"No time left for shutdown steps: {', '.join(skipped)}")
+
+    logger.info(
+        f"Shutdown finished in {time.monotonic() - started:.1f}s of {budget:.0f}s: "
+        + ", ".join(f"{r.name} {r.status}" for r in results)
+    )
+    return results
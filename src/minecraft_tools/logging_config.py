@@ -1,10 +1,71 @@
 """Structured logging configuration."""
 
+import atexit
 import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Any
 
+# Fields that may be attached to records through log_context() or extra=
+CONTEXT_FIELDS = ("cluster", "service", "component", "command", "latency_ms")
+
+# Pass as extra= on repetitive poll logs to make them eligible for sampling
+SAMPLED = {"sampled": True}
+
+_log_context: ContextVar[dict[str, Any] | None] = ContextVar(
+    "log_context", default=None
+)
+_listener: logging.handlers.QueueListener | None = None
+_encoder = json.JSONEncoder(ensure_ascii=False, default=str)
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """Attach fields to every record logged within the block."""
+    token = _log_context.set({**(_log_context.get() or {}), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copy the active log context onto records."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in (_log_context.get() or {}).items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Let through one in every N sampled records per call site."""
+
+    def __init__(self, every: int) -> None:
+        super().__init__()
+        self.every = every
+        self._counts: dict[tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.every <= 1 or record.levelno >= logging.WARNING:
+            return True
+        if not getattr(record, "sampled", False):
+            return True
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % self.every == 0
+
 
 class StructuredFormatter(logging.Formatter):
     """JSON formatter for structured logging."""
@@ -17,18 +78,49 @@ class StructuredFormatter(logging.Formatter):
             "message": record.getMessage(),
         }
 
+        # Only serialize the context fields a record actually carries
+        for key in CONTEXT_FIELDS:
+            value = record.__dict__.get(key)
+            if value is not None:
+                log_entry[key] = value
+
         if record.exc_info:
             log_entry["exception"] = self.formatException(record.exc_info)
 
-        return json.dumps(log_entry)
+        return _encoder.encode(log_entry)
 
 
-def setup_logging(level: str = "INFO", structured: bool = False) -> None:
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves formatting to the writer thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the arguments now, since they may change after the call
+        # returns, but keep exc_info so the writer can format the traceback
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
+def setup_logging(
+    level: str = "INFO", structured: bool = False, sample_every: int = 1
+) -> None:
     """Setup logging configuration."""
+    global _listener
     log_level = getattr(logging, level.upper())
 
     if structured:
-        formatter = StructuredFormatter()
+        formatter: logging.Formatter = StructuredFormatter()
     else:
         formatter = logging.Formatter(
             "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -37,12 +129,35 @@ def setup_logging(level: str = "INFO", structured: bool = False) -> None:
     handler = logging.StreamHandler(sys.stdout)
     handler.setFormatter(formatter)
 
+    # Records are handed to a background writer so callers never block on I/O
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.addFilter(SamplingFilter(sample_every))
+
+    previous = _listener
+    _listener = logging.handlers.QueueListener(log_queue, handler)
+    _listener.start()
+
     # Configure root logger
     logging.root.setLevel(log_level)
-    logging.root.handlers = [handler]
+    logging.root.handlers = [queue_handler]
+
+    # Drain the writer of an earlier setup_logging() call
+    if previous is not None:
+        previous.stop()
 
     # Suppress noisy loggers
     logging.getLogger("discord.ext.commands.bot").setLevel(logging.ERROR)
     logging.getLogger("discord.client").setLevel(logging.WARNING)
     logging.getLogger("boto3").setLevel(logging.WARNING)
     logging.getLogger("botocore").setLevel(logging.WARNING)
+
+
+def setup_logging_from_env() -> None:
+    """Setup logging from LOG_LEVEL, STRUCTURED_LOGGING and LOG_SAMPLE_EVERY."""
+    setup_logging(
+        level=os.getenv("LOG_LEVEL", "INFO"),
+        structured=os.getenv("STRUCTURED_LOGGING", "false").lower() == "true",
+        sample_every=int(os.getenv("LOG_SAMPLE_EVERY", "1")),
+    )
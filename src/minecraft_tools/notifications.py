@@ -0,0 +1,20 @@
+"""Discord webhook notifications."""
+
+import logging
+
+from minecraft_tools.http_session import get_http_session
+from minecraft_tools.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+
+@traced("discord.webhook")
+def send_discord_message(webhook_url: str, message: str, timeout: float = 10.0) -> None:
+    """Send message to Discord webhook."""
+    if not webhook_url:
+        return
+    try:
+        get_http_session().post(webhook_url, json={"content": message}, timeout=timeout)
+        logger.info("Discord notification sent")
+    except Exception as e:
+        logger.warning(f"Failed to send Discord message: {e}")
@@ -0,0 +1,138 @@
+"""Minimal thread-safe RCON client.
+
+Unlike mcrcon, timeouts are enforced with socket timeouts instead of
+SIGALRM, so the client can be used from any thread.
+"""
+
+import itertools
+import socket
+import struct
+import threading
+from typing import Any
+
+SERVERDATA_AUTH = 3
+SERVERDATA_EXECCOMMAND = 2
+SERVERDATA_RESPONSE_VALUE = 0
+# Minecraft splits command output into packets of at most this many bytes
+MAX_RESPONSE_BODY = 4096
+
+
+class RconError(Exception):
+    """RCON protocol or authentication failure."""
+
+
+class RconClient:
+    """RCON connection to a Minecraft server."""
+
+    def __init__(
+        self, host: str, port: int = 25575, password: str = "", timeout: float = 5.0
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self._sock: socket.socket | None = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "RconClient":
+        self.connect()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def connect(self) -> None:
+        """Open the connection and log in."""
+        self._sock = socket.create_connection(
+            (self.host, self.port), timeout=self.timeout
+        )
+        request_id = next(self._ids)
+        self._send(request_id, SERVERDATA_AUTH, self.password)
+        response_id, _, _ = self._read_packet()
+        if response_id == -1:
+            self.close()
+            raise RconError("RCON login failed")
+
+    def close(self) -> None:
+        """Close the connection."""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def command(self, command: str) -> str:
+        """Run a command and return its output."""
+        return self.commands([command])[0]
+
+    def commands(self, commands: list[str]) -> list[str]:
+        """Run several commands in one round trip and return their outputs.
+
+        Every request is written before any response is read, and responses
+        are matched to their command by request id. The server splits long
+        outputs into full packets, so a shorter packet ends an output. Each
+        command is also followed by a packet of an unknown type, which the
+        server answers once the output is complete; that marker is only
+        needed for outputs that fill their last packet exactly.
+        """
+        if not commands:
+            return []
+        with self._lock:
+            outputs: dict[int, list[bytes]] = {}
+            markers: dict[int, int] = {}
+            request = bytearray()
+            for command in commands:
+                request_id, marker_id = next(self._ids), next(self._ids)
+                outputs[request_id] = []
+                markers[marker_id] = request_id
+                request += self._encode(request_id, SERVERDATA_EXECCOMMAND, command)
+                request += self._encode(marker_id, SERVERDATA_RESPONSE_VALUE, "")
+            self._send_raw(bytes(request))
+
+            pending = set(outputs)
+            while pending:
+                response_id, _, body = self._read_packet()
+                if response_id in outputs:
+                    outputs[response_id].append(body)
+                    if len(body) < MAX_RESPONSE_BODY:
+                        pending.discard(response_id)
+                elif response_id in markers:
+                    pending.discard(markers[response_id])
+                elif response_id == -1:
+                    raise RconError("RCON session is not logged in")
+                # Anything else answers an earlier request, e.g. its marker
+            return [
+                b"".join(parts).decode("utf-8", "replace") for parts in outputs.values()
+            ]
+
+    def _encode(self, request_id: int, packet_type: int, body: str) -> bytes:
+        payload = (
+            struct.pack("<ii", request_id, packet_type) + body.encode() + b"\x00\x00"
+        )
+        return struct.pack("<i", len(payload)) + payload
+
+    def _send(self, request_id: int, packet_type: int, body: str) -> None:
+        self._send_raw(self._encode(request_id, packet_type, body))
+
+    def _send_raw(self, data: bytes) -> None:
+        if self._sock is None:
+            raise RconError("Not connected")
+        self._sock.sendall(data)
+
+    def _read_packet(self) -> tuple[int, int, bytes]:
+        (length,) = struct.unpack("<i", self._recv_exact(4))
+        payload = self._recv_exact(length)
+        request_id, packet_type = struct.unpack("<ii", payload[:8])
+        if payload[-2:] != b"\x00\x00":
+            raise RconError("Malformed RCON packet")
+        return request_id, packet_type, payload[8:-2]
+
+    def _recv_exact(self, length: int) -> bytes:
+        if self._sock is None:
+            raise RconError("Not connected")
+        data = b""
+        while len(data) < length:
+            chunk = self._sock.recv(length - len(data))
+            if not chunk:
+                raise RconError("Connection closed by server")
+            data += chunk
+        return data
@@ -0,0 +1,300 @@
+"""Player sessions and playtime per hour, for server statistics.
+
+The idle watcher reports who is online on every RCON check and whenever the
+server log shows a join or leave. A session row is opened when a player
+appears and closed when they are gone, and the closed session's playtime is
+added to per-hour totals. Statistics are read from those totals, so queries
+cover a few rows per player per hour played however long the history is.
+
+The watcher also records how long the server runs and when it shuts the
+server down for being idle, for the efficiency report.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# A server seen running again after this long without uptime reports was
+# restarted in between
+RUN_GAP = 900.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    player TEXT NOT NULL,
+    started REAL NOT NULL,
+    ended REAL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_started ON sessions (started);
+CREATE INDEX IF NOT EXISTS sessions_open ON sessions (player) WHERE ended IS NULL;
+CREATE TABLE IF NOT EXISTS playtime (
+    hour INTEGER NOT NULL,
+    player TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    PRIMARY KEY (hour, player)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS runs (
+    started REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    idle_shutdown REAL
+);
+CREATE INDEX IF NOT EXISTS runs_last_seen ON runs (last_seen);
+"""
+
+
+def split_hours(start: float, end: float) -> Iterator[tuple[int, float]]:
+    """Seconds between two timestamps falling in each hour since the epoch."""
+    hour = int(start // 3600)
+    while start < end:
+        boundary = (hour + 1) * 3600
+        yield hour, min(end, boundary) - start
+        start = boundary
+        hour += 1
+
+
+def week_start(now: float | None = None) -> float:
+    """Monday 00:00 UTC of the current week."""
+    today = datetime.fromtimestamp(time.time() if now is None else now, UTC).date()
+    monday = today - timedelta(days=today.weekday())
+    return datetime(monday.year, monday.month, monday.day, tzinfo=UTC).timestamp()
+
+
+class SessionStore:
+    """SQLite store of player sessions with hourly playtime totals."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # Sessions left open by an earlier run end when they were last seen
+        self._resumed = False
+        self._run: tuple[int, float] | None = None  # rowid and last seen
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def observe(self, players: Iterable[str], at: float | None = None) -> None:
+        """Open sessions for players who appeared and close the others."""
+        at = time.time() if at is None else at
+        online = set(players)
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT rowid, player, started, last_seen FROM sessions "
+                "WHERE ended IS NULL"
+            ).fetchall()
+            still_open = set()
+            for rowid, player, started, last_seen in rows:
+                if not self._resumed:
+                    self._close(rowid, player, started, last_seen)
+                elif player not in online:
+                    self._close(rowid, player, started, at)
+                else:
+                    still_open.add(player)
+            self._conn.execute(
+                "UPDATE sessions SET last_seen = ? WHERE ended IS NULL", (at,)
+            )
+            self._conn.executemany(
+                "INSERT INTO sessions VALUES (?, ?, NULL, ?)",
+                [(player, at, at) for player in sorted(online - still_open)],
+            )
+            self._resumed = True
+
+    def _close(self, rowid: int, player: str, started: float, ended: float) -> None:
+        self._conn.execute(
+            "UPDATE sessions SET ended = ?, last_seen = ? WHERE rowid = ?",
+            (ended, ended, rowid),
+        )
+        self._conn.executemany(
+            "INSERT INTO playtime VALUES (?, ?, ?) ON CONFLICT (hour, player) "
+            "DO UPDATE SET seconds = seconds + excluded.seconds",
+            [(hour, player, seconds) for hour, seconds in split_hours(started, ended)],
+        )
+
+    def record_uptime(self, at: float | None = None) -> int:
+        """Record that the server is running; returns the id of the run."""
+        at = time.time() if at is None else at
+        with self._lock, self._conn:
+            if self._run is None or at - self._run[1] > RUN_GAP:
+                cursor = self._conn.execute(
+                    "INSERT INTO runs VALUES (?, ?, NULL)", (at, at)
+                )
+                run_id = cursor.lastrowid or 0
+            else:
+                run_id = self._run[0]
+                self._conn.execute(
+                    "UPDATE runs SET last_seen = ? WHERE rowid = ?", (at, run_id)
+                )
+            self._run = (run_id, at)
+        return run_id
+
+    def record_idle_shutdown(self, at: float | None = None) -> None:
+        """Record that the server was shut down for being idle."""
+        at = time.time() if at is None else at
+        run_id = self.record_uptime(at)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE runs SET idle_shutdown = ? WHERE rowid = ?", (at, run_id)
+            )
+            self._run = None
+
+    def runs(self, since: float) -> list[tuple[float, float, float | None]]:
+        """Server runs still going at or after a timestamp, oldest first."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT started, last_seen, idle_shutdown FROM runs "
+                "WHERE last_seen >= ? ORDER BY started",
+                (since,),
+            ).fetchall()
+
+    def sessions(self, since: float) -> list[tuple[str, float, float]]:
+        """Player sessions going at or after a timestamp, until last seen."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT player, started, last_seen FROM sessions WHERE last_seen >= ?",
+                (since,),
+            ).fetchall()
+
+    def _totals(self, since: float, by_player: bool) -> dict[Any, float]:
+        """Seconds played since a timestamp per player or per hour of the day.
+
+        Counted from the hour containing ``since``; open sessions are counted
+        up to when they were last seen.
+        """
+        column = "player" if by_player else "hour % 24"
+        totals: dict[Any, float] = defaultdict(float)
+        with self._lock:
+            totals.update(
+                self._conn.execute(
+                    f"SELECT {column}, SUM(seconds) FROM playtime WHERE hour >= ? "
+                    "GROUP BY 1",
+                    (int(since // 3600),),
+                ).fetchall()
+            )
+            open_sessions = self._conn.execute(
+                "SELECT player, started, last_seen FROM sessions WHERE ended IS NULL"
+            ).fetchall()
+        for player, started, last_seen in open_sessions:
+            for hour, seconds in split_hours(max(started, since), last_seen):
+                totals[player if by_player else hour % 24] += seconds
+        return totals
+
+    def playtime(self, since: float) -> list[tuple[str, float]]:
+        """Seconds played per player since a timestamp, most first."""
+        totals = self._totals(since, by_player=True)
+        return sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+
+    def busiest_hours(self, since: float) -> list[tuple[int, float]]:
+        """Seconds played per hour of the day (UTC) since a timestamp, most first."""
+        totals = self._totals(since, by_player=False)
+        return sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+
+    def close(self) -> None:
+        """Close the database."""
+        self._conn.close()
+
+
+def format_duration(seconds: float) -> str:
+    """Render a duration as hours and minutes."""
+    minutes = round(seconds / 60)
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+def format_playtime(playtime: list[tuple[str, float]], limit: int = 10) -> str:
+    """Render playtime per player as a table."""
+    if not playtime:
+        return "Nobody has played yet"
+    lines = [f"{'player':<16} {'played':>8}"]
+    for player, seconds in playtime[:limit]:
+        lines.append(f"{player:<16} {format_duration(seconds):>8}")
+    return "\n".join(lines)
+
+
+def format_busiest_hours(busiest: list[tuple[int, float]], limit: int = 5) -> str:
+    """Render the hours of the day with the most playtime as a table."""
+    if not busiest:
+        return "Nobody has played yet"
+    lines = [f"{'hour (UTC)':<16} {'played':>8}"]
+    for hour, seconds in busiest[:limit]:
+        span = f"{hour:02d}:00-{(hour + 1) % 24:02d}:00"
+        lines.append(f"{span:<16} {format_duration(seconds):>8}")
+    return "\n".join(lines)
+
+
+def player_stats(
+    store: SessionStore, now: float | None = None, days: float = 30.0
+) -> dict[str, Any]:
+    """Playtime this week and the busiest hours of the last days."""
+    now = time.time() if now is None else now
+    return {
+        "playtime": store.playtime(week_start(now)),
+        "busiest_hours": store.busiest_hours(now - days * 86400),
+    }
+
+
+class Sessions:
+    """Process-wide recorder; does nothing until a store is configured."""
+
+    def __init__(self, store: SessionStore | None = None) -> None:
+        self.store = store
+
+    def observe(self, players: Iterable[str], at: float | None = None) -> None:
+        """Record who is online, never failing the caller."""
+        if self.store is None:
+            return
+        try:
+            self.store.observe(players, at)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to record player sessions: {e}")
+
+    def record_uptime(self) -> None:
+        """Record that the server is running, never failing the caller."""
+        if self.store is None:
+            return
+        try:
+            self.store.record_uptime()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to record server uptime: {e}")
+
+    def record_idle_shutdown(self) -> None:
+        """Record an idle shutdown, never failing the caller."""
+        if self.store is None:
+            return
+        try:
+            self.store.record_idle_shutdown()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to record idle shutdown: {e}")
+
+
+_sessions = Sessions()
+
+
+def get_sessions() -> Sessions:
+    """Get the process-wide session recorder."""
+    return _sessions
+
+
+def configure_sessions(path: str | None) -> Sessions:
+    """Replace the process-wide session recorder."""
+    global _sessions
+    if _sessions.store is not None:
+        _sessions.store.close()
+    _sessions = Sessions(SessionStore(path) if path else None)
+    return _sessions
+
+
+def configure_sessions_from_env() -> None:
+    """Record player sessions to the SQLite file named by SESSIONS_DB, if set."""
+    path = os.getenv("SESSIONS_DB")
+    if path:
+        configure_sessions(path)
+        logger.info(f"Recording player sessions to {path}")
@@ -0,0 +1,72 @@
+"""Import-time profiling for start-up sensitive entry points."""
+
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+
+
+@dataclass
+class ImportCost:
+    """Time spent importing one module, as reported by ``-X importtime``."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportCost]:
+    """Parse the ``-X importtime`` report written to stderr."""
+    costs = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Header line
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        costs.append(
+            ImportCost(
+                module=stripped,
+                self_us=int(fields[0]),
+                cumulative_us=int(fields[1]),
+                # Nested imports are indented two spaces per level
+                depth=(len(name) - len(stripped) - 1) // 2,
+            )
+        )
+    return costs
+
+
+def profile_imports(modules: list[str]) -> list[ImportCost]:
+    """Import modules in a fresh interpreter and report what each one cost."""
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=os.environ.copy(),
+    )
+    return parse_importtime(result.stderr)
+
+
+def total_import_ms(costs: list[ImportCost], modules: list[str]) -> float:
+    """Cumulative import time of the given top-level modules."""
+    wanted = set(modules)
+    return (
+        sum(c.cumulative_us for c in costs if c.depth == 0 and c.module in wanted)
+        / 1000
+    )
+
+
+def format_report(costs: list[ImportCost], limit: int = 25) -> str:
+    """Render the most expensive imports, slowest first."""
+    lines = [f"{'cumulative ms':>14} {'self ms':>9}  module"]
+    for cost in sorted(costs, key=lambda c: c.cumulative_us, reverse=True)[:limit]:
+        lines.append(
+            f"{cost.cumulative_us / 1000:>14.1f} {cost.self_us / 1000:>9.1f}  "
+            f"{'  ' * cost.depth}{cost.module}"
+        )
+    return "\n".join(lines)
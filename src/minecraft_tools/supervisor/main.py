@@ -0,0 +1,294 @@
+"""Supervisor running the server-side tools as tasks in a single process.
+
+The idle watcher and DNS reconciler are blocking loops, so each one runs on
+a worker thread driven by an asyncio task. They share one set of AWS
+clients, the process-wide HTTP session and the Parameter Store cache, and
+a failing component is restarted with backoff without touching the others.
+"""
+
+import asyncio
+import contextlib
+import logging
+import signal
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import boto3
+
+from minecraft_tools.aws import use_trimmed_models
+from minecraft_tools.config import (
+    DNSUpdaterConfig,
+    IdleWatcherConfig,
+    ParameterStoreSource,
+    SupervisorConfig,
+    parameter_source_from_env,
+)
+from minecraft_tools.dns_updater.main import reconcile_dns, update_dns_if_needed
+from minecraft_tools.health import Route, aws_service_checks, start_health_server
+from minecraft_tools.idle_watcher.main import handle_termination, monitor_server
+from minecraft_tools.logging_config import log_context, setup_logging_from_env
+from minecraft_tools.sessions import (
+    configure_sessions_from_env,
+    get_sessions,
+    player_stats,
+)
+from minecraft_tools.timeline import (
+    configure_timeline_from_env,
+    get_timeline,
+    recent_milestones,
+)
+from minecraft_tools.tracing import configure_tracing_from_env
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Component:
+    """A blocking tool loop that runs until its stop event is set."""
+
+    name: str
+    target: Callable[[threading.Event], None]
+    restart: bool = True  # restart after returning on its own
+    stop_event: threading.Event = field(default_factory=threading.Event)
+    running: bool = False
+    finished: bool = False
+    restarts: int = 0
+    last_error: str | None = None
+    restart_requested: bool = False
+    # Run when the process is terminated, unless the component has finished
+    on_terminate: Callable[[], Any] | None = None
+
+
+class Supervisor:
+    """Runs components concurrently and restarts them independently."""
+
+    def __init__(
+        self,
+        components: list[Component],
+        restart_delay: float = 1.0,
+        max_restart_delay: float = 60.0,
+    ) -> None:
+        self.components = {c.name: c for c in components}
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self._stopping = False
+        self._stopped: asyncio.Event | None = None
+
+    async def run(self) -> None:
+        """Run all components until they finish or stop() is called."""
+        self._stopped = asyncio.Event()
+        if self._stopping:
+            self._stopped.set()
+        await asyncio.gather(*(self._supervise(c) for c in self.components.values()))
+
+    def stop(self) -> None:
+        """Ask every component to stop."""
+        logger.info("Stopping all components")
+        self._stopping = True
+        for component in self.components.values():
+            component.stop_event.set()
+        if self._stopped is not None:
+            self._stopped.set()
+
+    async def terminate(self) -> None:
+        """Stop every component and run their termination hooks concurrently."""
+        hooks = [
+            c.on_terminate
+            for c in self.components.values()
+            if c.on_terminate is not None and not c.finished
+        ]
+        self.stop()
+        results = await asyncio.gather(
+            *(asyncio.to_thread(hook) for hook in hooks), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Termination hook failed: {result}")
+
+    def restart(self, name: str) -> None:
+        """Restart one component without affecting the others."""
+        component = self.components[name]
+        logger.info(f"Restart of {name} requested")
+        component.restart_requested = True
+        component.stop_event.set()
+
+    def health_check(self) -> dict[str, Any]:
+        """Report whether every unfinished component is running."""
+        states = {
+            name: {
+                "running": c.running,
+                "finished": c.finished,
+                "restarts": c.restarts,
+                "last_error": c.last_error,
+            }
+            for name, c in self.components.items()
+        }
+        healthy = all(c.running or c.finished for c in self.components.values())
+        return {"status": "healthy" if healthy else "unhealthy", "components": states}
+
+    async def _supervise(self, component: Component) -> None:
+        delay = self.restart_delay
+        with log_context(component=component.name):
+            while not self._stopping:
+                component.stop_event = threading.Event()
+                component.restart_requested = False
+                component.running = True
+                started = time.monotonic()
+                failed = False
+                try:
+                    # to_thread copies the context, so logs keep the component
+                    await asyncio.to_thread(component.target, component.stop_event)
+                except Exception as e:
+                    failed = True
+                    component.last_error = str(e)
+                    logger.error(f"Component {component.name} failed: {e}")
+                finally:
+                    component.running = False
+
+                if self._stopping:
+                    return
+                if component.restart_requested:
+                    component.restarts += 1
+                    continue
+                if not failed and not component.restart:
+                    logger.info(f"Component {component.name} finished")
+                    component.finished = True
+                    return
+
+                # Start over with a short delay once a run stayed up for a while
+                if time.monotonic() - started > self.max_restart_delay:
+                    delay = self.restart_delay
+                logger.info(f"Restarting {component.name} in {delay:.0f}s")
+                await self._sleep(delay)
+                delay = min(delay * 2, self.max_restart_delay)
+                component.restarts += 1
+
+    async def _sleep(self, delay: float) -> None:
+        if self._stopped is None:
+            return
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(self._stopped.wait(), timeout=delay)
+
+
+def build_components(
+    config: SupervisorConfig,
+    ecs_client: Any,
+    ec2_client: Any,
+    source: ParameterStoreSource | None = None,
+) -> list[Component]:
+    """Create the configured components with shared clients."""
+    components = []
+
+    if "idle-watcher" in config.components:
+        idle_config = IdleWatcherConfig.from_env(source)
+        components.append(
+            Component(
+                name="idle-watcher",
+                target=lambda stop: monitor_server(idle_config, ecs_client, stop),
+                # Returning means the server was shut down for inactivity
+                restart=False,
+                on_terminate=lambda: handle_termination(idle_config, ecs_client),
+            )
+        )
+
+    if "dns-updater" in config.components:
+        dns_config = DNSUpdaterConfig.from_env(source)
+        if dns_config.reconcile_interval > 0:
+            components.append(
+                Component(
+                    name="dns-updater",
+                    target=lambda stop: reconcile_dns(
+                        dns_config, stop, ecs_client, ec2_client
+                    ),
+                )
+            )
+        else:
+            components.append(
+                Component(
+                    name="dns-updater",
+                    target=lambda stop: update_dns_if_needed(
+                        dns_config, None, ecs_client, ec2_client
+                    ),
+                    restart=False,
+                )
+            )
+
+    return components
+
+
+async def serve(supervisor: Supervisor) -> None:
+    """Run the supervisor until SIGTERM or SIGINT, then run termination hooks."""
+    loop = asyncio.get_running_loop()
+    terminating: list[asyncio.Task[None]] = []
+
+    def terminate() -> None:
+        if not terminating:
+            terminating.append(loop.create_task(supervisor.terminate()))
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, terminate)
+    await supervisor.run()
+    if terminating:
+        await terminating[0]
+
+
+def tools_routes() -> dict[str, Route]:
+    """Statistics the bot reads from the health server, from the EFS stores."""
+    routes: dict[str, Route] = {}
+    sessions = get_sessions().store
+    if sessions is not None:
+        routes["/stats"] = lambda: player_stats(sessions)
+    timeline = get_timeline().store
+    if timeline is not None:
+        routes["/timeline"] = lambda: recent_milestones(timeline)
+    return routes
+
+
+def main() -> None:
+    """Main entry point."""
+    try:
+        setup_logging_from_env()
+        use_trimmed_models()
+        configure_tracing_from_env()
+        configure_timeline_from_env("mc-tools")
+        configure_sessions_from_env()
+        source = parameter_source_from_env()
+        config = SupervisorConfig.from_env(source)
+
+        ecs_client = boto3.client("ecs")
+        ec2_client = boto3.client("ec2")
+        supervisor = Supervisor(
+            build_components(config, ecs_client, ec2_client, source),
+            restart_delay=config.restart_delay,
+            max_restart_delay=config.max_restart_delay,
+        )
+        logger.info(f"Starting components: {', '.join(supervisor.components)}")
+
+        if config.health_port:
+            checks = aws_service_checks(
+                config.ecs_cluster, config.ecs_service, ecs_client
+            )
+            start_health_server(
+                config.health_port,
+                {**checks, "components": supervisor.health_check},
+                cache_ttl=config.health_cache_ttl,
+                routes=tools_routes(),
+            )
+
+        with log_context(cluster=config.ecs_cluster, service=config.ecs_service):
+            asyncio.run(serve(supervisor))
+        logger.info("All components stopped")
+
+    except ValueError as e:
+        logger.error(f"Configuration error: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"Supervisor failed: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
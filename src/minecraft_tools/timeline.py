@@ -0,0 +1,310 @@
+"""Server lifecycle timeline with cold-start percentiles per stage.
+
+Each tool records the milestones it observes for a task in a small SQLite
+store: the bot the start request, the DNS updater the ECS task timestamps
+and the DNS update, and the idle watcher the first RCON response. Start
+requests are recorded before their task exists and are matched to the
+first task created after them.
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+MILESTONES = (
+    "requested",
+    "prewarmed",
+    "prewarm_used",
+    "task_created",
+    "pull_started",
+    "pull_stopped",
+    "task_started",
+    "rcon_ready",
+    "dns_updated",
+    "task_stopping",
+)
+
+# (stage, from milestone, to milestone)
+STAGES = (
+    ("ecs_scheduling", "requested", "pull_started"),
+    ("image_pull", "pull_started", "pull_stopped"),
+    # Volume mounts, including EFS, happen after the pull
+    ("container_start", "pull_stopped", "task_started"),
+    ("server_boot", "task_started", "rcon_ready"),
+    ("dns_update", "task_started", "dns_updated"),
+    ("cold_start", "requested", "rcon_ready"),
+)
+
+# ECS task timestamps and the milestone each one marks
+TASK_MILESTONES = {
+    "createdAt": "task_created",
+    "pullStartedAt": "pull_started",
+    "pullStoppedAt": "pull_stopped",
+    "startedAt": "task_started",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS milestones (
+    task_arn TEXT,
+    milestone TEXT NOT NULL,
+    at REAL NOT NULL,
+    source TEXT NOT NULL DEFAULT '',
+    UNIQUE (task_arn, milestone)
+);
+CREATE INDEX IF NOT EXISTS milestones_at ON milestones (at);
+"""
+
+
+class TimelineStore:
+    """SQLite store keeping the first time each task reached a milestone."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def record(
+        self,
+        milestone: str,
+        task_arn: str | None = None,
+        at: float | None = None,
+        source: str = "",
+    ) -> None:
+        """Record a milestone; later sightings of a task milestone are ignored.
+
+        Start requests and pre-warms are recorded without a task.
+        """
+        if milestone not in MILESTONES:
+            raise ValueError(f"Unknown milestone: {milestone}")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO milestones VALUES (?, ?, ?, ?)",
+                (task_arn, milestone, time.time() if at is None else at, source),
+            )
+
+    def record_task(self, task: dict[str, Any], source: str = "") -> None:
+        """Record the timestamps of an ECS task from ``describe_tasks``."""
+        for key, milestone in TASK_MILESTONES.items():
+            value = task.get(key)
+            if isinstance(value, datetime):
+                self.record(milestone, task["taskArn"], value.timestamp(), source)
+
+    def milestones(self, since: float = 0.0) -> list[tuple[str | None, str, float]]:
+        """Milestones recorded since a Unix timestamp, oldest first."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT task_arn, milestone, at FROM milestones "
+                "WHERE at >= ? ORDER BY at",
+                (since,),
+            ).fetchall()
+
+    def close(self) -> None:
+        """Close the database."""
+        self._conn.close()
+
+
+@dataclass
+class StageStats:
+    """Percentiles of one stage across lifecycles, in seconds."""
+
+    stage: str
+    count: int
+    p50: float
+    p95: float
+
+
+def lifecycles(
+    rows: list[tuple[str | None, str, float]], request_window: float = 600.0
+) -> dict[str, dict[str, float]]:
+    """Group milestones by task and attach the start request of each task.
+
+    A pre-warm counts as the request of the task it started.
+    """
+    tasks: dict[str, dict[str, float]] = {}
+    requests = []
+    for task_arn, milestone, at in rows:
+        if task_arn is None:
+            if milestone in ("requested", "prewarmed"):
+                requests.append(at)
+        else:
+            tasks.setdefault(task_arn, {}).setdefault(milestone, at)
+
+    requests.sort()
+    for timeline in tasks.values():
+        created = timeline.get("task_created")
+        if created is None:
+            continue
+        # The latest request shortly before the task was created started it
+        matching = [at for at in requests if created - request_window <= at <= created]
+        if matching:
+            timeline["requested"] = matching[-1]
+    return tasks
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def stage_stats(timelines: dict[str, dict[str, float]]) -> list[StageStats]:
+    """p50 and p95 of every stage with at least one measurement."""
+    stats = []
+    for stage, start, end in STAGES:
+        durations = [
+            t[end] - t[start] for t in timelines.values() if start in t and end in t
+        ]
+        if durations:
+            stats.append(
+                StageStats(
+                    stage=stage,
+                    count=len(durations),
+                    p50=percentile(durations, 50),
+                    p95=percentile(durations, 95),
+                )
+            )
+    return stats
+
+
+def format_report(stats: list[StageStats]) -> str:
+    """Render stage percentiles as a table."""
+    if not stats:
+        return "No complete server starts recorded yet"
+    lines = [f"{'stage':<16} {'starts':>6} {'p50 s':>7} {'p95 s':>7}"]
+    for s in stats:
+        lines.append(f"{s.stage:<16} {s.count:>6} {s.p50:>7.1f} {s.p95:>7.1f}")
+    return "\n".join(lines)
+
+
+def report(stores: list[TimelineStore], days: float = 30.0) -> list[StageStats]:
+    """Stage percentiles over the last days of one or more stores."""
+    since = time.time() - days * 86400
+    rows = [row for store in stores for row in store.milestones(since)]
+    return stage_stats(lifecycles(rows))
+
+
+def recent_milestones(store: TimelineStore, days: float = 30.0) -> dict[str, Any]:
+    """Milestones of the last days, for a report merged elsewhere."""
+    return {"milestones": store.milestones(time.time() - days * 86400)}
+
+
+class Timeline:
+    """Process-wide recorder; does nothing until a store is configured."""
+
+    def __init__(self, store: TimelineStore | None = None, source: str = "") -> None:
+        self.store = store
+        self.source = source
+
+    def record(
+        self, milestone: str, task_arn: str | None = None, at: float | None = None
+    ) -> None:
+        """Record a milestone, never failing the caller."""
+        if self.store is None:
+            return
+        try:
+            self.store.record(milestone, task_arn, at, self.source)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to record {milestone}: {e}")
+
+    def record_task(self, task: dict[str, Any]) -> None:
+        """Record the timestamps of an ECS task, never failing the caller."""
+        if self.store is None:
+            return
+        try:
+            self.store.record_task(task, self.source)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to record task timestamps: {e}")
+
+    def mark(self, milestone: str) -> None:
+        """Record a milestone for the ECS task this process runs in."""
+        if self.store is None:
+            return
+        task_arn = current_task_arn()
+        if task_arn:
+            self.record(milestone, task_arn)
+
+
+_timeline = Timeline()
+_task_arn: str | None = None
+
+
+def get_timeline() -> Timeline:
+    """Get the process-wide timeline."""
+    return _timeline
+
+
+def current_task_arn() -> str | None:
+    """ARN of the ECS task this process runs in, from the metadata endpoint."""
+    global _task_arn
+    if _task_arn is None:
+        endpoint = os.getenv("ECS_CONTAINER_METADATA_URI_V4")
+        if not endpoint:
+            return None
+        import urllib.request
+
+        try:
+            with urllib.request.urlopen(f"{endpoint}/task", timeout=2) as response:
+                _task_arn = json.load(response)["TaskARN"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Failed to read ECS task metadata: {e}")
+    return _task_arn
+
+
+def configure_timeline(path: str | None, source: str = "") -> Timeline:
+    """Replace the process-wide timeline."""
+    global _timeline
+    if _timeline.store is not None:
+        _timeline.store.close()
+    _timeline = Timeline(TimelineStore(path) if path else None, source)
+    return _timeline
+
+
+def configure_timeline_from_env(source: str) -> None:
+    """Record milestones to the SQLite file named by TIMELINE_DB, if set."""
+    path = os.getenv("TIMELINE_DB")
+    if path:
+        configure_timeline(path, source)
+        logger.info(f"Recording lifecycle milestones to {path}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Report cold-start stage percentiles."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "--db",
+        action="append",
+        help="timeline database to include, may be repeated (default: TIMELINE_DB)",
+    )
+    parser.add_argument(
+        "--days", type=float, default=30.0, help="only include recent starts"
+    )
+    args = parser.parse_args(argv)
+
+    paths = args.db or [os.getenv("TIMELINE_DB")]
+    if not all(paths):
+        parser.error("no database given and TIMELINE_DB is not set")
+    stores = [TimelineStore(path) for path in paths]
+    try:
+        print(format_report(report(stores, args.days)))
+    finally:
+        for store in stores:
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""Lightweight tracing spans for outbound calls.
+
+Tracing is off unless an exporter is configured. While off, ``span()``
+returns a shared no-op context manager and ``traced`` wrappers call straight
+through, so instrumented code pays a single attribute check.
+"""
+
+import atexit
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections.abc import Callable
+from contextvars import ContextVar, Token
+from dataclasses import asdict, dataclass, field
+from typing import Any, Protocol, TypeVar
+
+from minecraft_tools.http_session import get_http_session
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_time: float
+    end_time: float | None = None
+    status: str = "ok"
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        """Span duration in milliseconds."""
+        return ((self.end_time or time.time()) - self.start_time) * 1000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span."""
+        self.attributes[key] = value
+
+
+class SpanExporter(Protocol):
+    """Destination for finished spans."""
+
+    def export(self, spans: list[Span]) -> None: ...
+
+
+class JsonlExporter:
+    """Append spans as JSON lines to a local file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        lines = "".join(json.dumps(asdict(s), default=str) + "\n" for s in spans)
+        with self._lock, open(self.path, "a") as f:
+            f.write(lines)
+
+
+class OTLPHttpExporter:
+    """Post spans to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str = "minecraft-tools") -> None:
+        self.endpoint = endpoint
+        self.service_name = service_name
+
+    @staticmethod
+    def _attributes(values: dict[str, Any]) -> list[dict[str, Any]]:
+        return [{"key": k, "value": {"stringValue": str(v)}} for k, v in values.items()]
+
+    def payload(self, spans: list[Span]) -> dict[str, Any]:
+        """Build the OTLP request body for a batch of spans."""
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": self._attributes(
+                            {"service.name": self.service_name}
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "minecraft_tools"},
+                            "spans": [
+                                {
+                                    "traceId": s.trace_id,
+                                    "spanId": s.span_id,
+                                    "parentSpanId": s.parent_id or "",
+                                    "name": s.name,
+                                    "kind": 3,  # SPAN_KIND_CLIENT
+                                    "startTimeUnixNano": str(int(s.start_time * 1e9)),
+                                    "endTimeUnixNano": str(
+                                        int((s.end_time or s.start_time) * 1e9)
+                                    ),
+                                    "attributes": self._attributes(s.attributes),
+                                    "status": {"code": 2 if s.status == "error" else 1},
+                                }
+                                for s in spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def export(self, spans: list[Span]) -> None:
+        get_http_session().post(self.endpoint, json=self.payload(spans), timeout=5)
+
+
+class _NoopSpanContext:
+    """Context manager handed out while tracing is off or unsampled."""
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NOOP = _NoopSpanContext()
+# The active span, or False inside a trace that was not sampled
+_current: ContextVar["Span | bool | None"] = ContextVar("current_span", default=None)
+
+
+class _SpanContext:
+    """Context manager that starts and ends one span."""
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self._active: tuple[Span | None, Token[Span | bool | None]] | None = None
+
+    def __enter__(self) -> Span | None:
+        self._active = self.tracer.start_span(self.name, **self.attributes)
+        return self._active[0]
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> None:
+        if self._active is not None:
+            self.tracer.end_span(self._active, exc)
+
+
+class Tracer:
+    """Creates spans and hands finished ones to an exporter in batches.
+
+    Batches are exported on a background thread, so ending a span never
+    waits on a slow collector; batches beyond ``max_pending`` are dropped.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter | None = None,
+        sample_rate: float = 1.0,
+        batch_size: int = 50,
+        max_pending: int = 20,
+    ) -> None:
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.enabled = exporter is not None and sample_rate > 0
+        self._buffer: list[Span] = []
+        self._lock = threading.Lock()
+        self._pending: queue.Queue[list[Span]] = queue.Queue(max_pending)
+        self._worker: threading.Thread | None = None
+
+    def span(self, name: str, **attributes: Any) -> Any:
+        """Context manager timing a block as a child of the active span."""
+        if not self.enabled or _current.get() is False:
+            return _NOOP
+        return _SpanContext(self, name, attributes)
+
+    def start_span(
+        self, name: str, **attributes: Any
+    ) -> tuple[Span | None, Token[Span | bool | None]]:
+        """Start a span and make it the active one."""
+        parent = _current.get()
+        if isinstance(parent, bool):
+            return None, _current.set(False)
+        if parent is None and random.random() >= self.sample_rate:
+            # Unsampled root: mark the context so children are skipped too
+            return None, _current.set(False)
+
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent else None,
+            start_time=time.time(),
+            attributes=attributes,
+        )
+        return span, _current.set(span)
+
+    def end_span(
+        self,
+        active: tuple[Span | None, Token[Span | bool | None]],
+        error: BaseException | None = None,
+    ) -> None:
+        """Finish a span started with start_span()."""
+        span, token = active
+        _current.reset(token)
+        if span is None:
+            return
+        span.end_time = time.time()
+        if error is not None:
+            span.status = "error"
+            span.set_attribute("error", str(error))
+        with self._lock:
+            self._buffer.append(span)
+            if len(self._buffer) < self.batch_size:
+                return
+            spans, self._buffer = self._buffer, []
+        self._submit(spans)
+
+    def flush(self) -> None:
+        """Export buffered spans and wait for queued batches to go out."""
+        with self._lock:
+            spans, self._buffer = self._buffer, []
+        if spans:
+            self._submit(spans)
+        if self._worker is not None:
+            self._pending.join()
+
+    def _submit(self, spans: list[Span]) -> None:
+        if self.exporter is None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._export_loop, name="trace-export", daemon=True
+                )
+                self._worker.start()
+        try:
+            self._pending.put_nowait(spans)
+        except queue.Full:
+            logger.warning(f"Dropped {len(spans)} spans, the exporter is behind")
+
+    def _export_loop(self) -> None:
+        assert self.exporter is not None
+        while True:
+            spans = self._pending.get()
+            try:
+                self.exporter.export(spans)
+            except Exception as e:
+                logger.warning(f"Failed to export {len(spans)} spans: {e}")
+            finally:
+                self._pending.task_done()
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer."""
+    return _tracer
+
+
+def span(name: str, **attributes: Any) -> Any:
+    """Time a block as a span on the process-wide tracer."""
+    return _tracer.span(name, **attributes)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator running a function inside a span."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _tracer.enabled:
+                return func(*args, **kwargs)
+            with _tracer.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def _before_aws_call(model: Any, context: dict[str, Any], **kwargs: Any) -> None:
+    if _tracer.enabled:
+        context["trace_span"] = _tracer.start_span(
+            f"aws.{model.service_model.service_name}.{model.name}"
+        )
+
+
+def _after_aws_call(context: dict[str, Any], **kwargs: Any) -> None:
+    active = context.pop("trace_span", None)
+    if active is not None:
+        _tracer.end_span(active, kwargs.get("exception"))
+
+
+def instrument_boto3(session: Any = None) -> None:
+    """Time every AWS API call made by clients of a boto3 session."""
+    if session is None:
+        import boto3
+
+        if boto3.DEFAULT_SESSION is None:
+            boto3.setup_default_session()
+        session = boto3.DEFAULT_SESSION
+
+    events = session.events
+    events.register("before-call", _before_aws_call, unique_id="trace-before-call")
+    events.register("after-call", _after_aws_call, unique_id="trace-after-call")
+    events.register(
+        "after-call-error", _after_aws_call, unique_id="trace-after-call-error"
+    )
+
+
+def configure_tracing(
+    exporter: SpanExporter | None, sample_rate: float = 1.0
+) -> Tracer:
+    """Replace the process-wide tracer."""
+    global _tracer
+    _tracer.flush()
+    _tracer = Tracer(exporter, sample_rate=sample_rate)
+    return _tracer
+
+
+def configure_tracing_from_env() -> None:
+    """Enable tracing from TRACE_EXPORT and TRACE_SAMPLE_RATE.
+
+    TRACE_EXPORT is either an http(s) URL of an OTLP collector or the path
+    of a JSONL file. Tracing stays off when it is unset.
+    """
+    target = os.getenv("TRACE_EXPORT")
+    if not target:
+        return
+
+    exporter: SpanExporter
+    if target.startswith(("http://", "https://")):
+        exporter = OTLPHttpExporter(target)
+    else:
+        exporter = JsonlExporter(target)
+
+    configure_tracing(exporter, float(os.getenv("TRACE_SAMPLE_RATE", "1.0")))
+    instrument_boto3()
+    logger.info(f"Tracing enabled, exporting to {target}")
+
+
+atexit.register(lambda: _tracer.flush())
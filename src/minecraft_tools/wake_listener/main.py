@@ -0,0 +1,272 @@
+"""Wake-on-connect listener standing in for the server while it is stopped.
+
+It answers the Server List Ping with a message saying the server is asleep
+or starting, and the first login attempt scales the ECS service up, so the
+server boots while the player's launcher is still loading. All connections
+share one cached view of the service, so bursts of pings cost a single ECS
+call.
+"""
+
+import asyncio
+import contextlib
+import logging
+import signal
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from minecraft_tools.aws import create_client, use_trimmed_models
+from minecraft_tools.config import WakeListenerConfig
+from minecraft_tools.logging_config import log_context, setup_logging_from_env
+from minecraft_tools.notifications import send_discord_message
+from minecraft_tools.timeline import configure_timeline_from_env, get_timeline, report
+from minecraft_tools.tracing import configure_tracing_from_env
+from minecraft_tools.wake_listener.protocol import (
+    PACKET_HANDSHAKE,
+    PACKET_LOGIN_START,
+    PACKET_PING,
+    PACKET_STATUS_REQUEST,
+    STATE_LOGIN,
+    STATE_STATUS,
+    STATE_TRANSFER,
+    ProtocolError,
+    login_disconnect,
+    parse_handshake,
+    pong,
+    read_packet,
+    status_response,
+)
+
+logger = logging.getLogger(__name__)
+
+VERSION_NAME = "Sleeping"
+
+
+@dataclass
+class ServiceState:
+    """ECS service counts and when they were fetched."""
+
+    desired: int
+    running: int
+    checked_at: float
+
+
+class WakeListener:
+    """Answers pings for the stopped server and wakes it on login."""
+
+    def __init__(self, config: WakeListenerConfig, ecs_client: Any) -> None:
+        self.config = config
+        self.ecs_client = ecs_client
+        self.start_estimate = config.start_estimate
+        self.starting_since: float | None = None
+        self.pings = 0
+        self.wakes = 0
+        self._state: ServiceState | None = None
+        self._refresh: asyncio.Task[ServiceState] | None = None
+        self._wake_lock = asyncio.Lock()
+        self._notifications: set[asyncio.Task[None]] = set()
+
+    def _describe_service(self) -> ServiceState:
+        response = self.ecs_client.describe_services(
+            cluster=self.config.ecs_cluster, services=[self.config.ecs_service]
+        )
+        if not response["services"]:
+            raise ValueError(f"Service {self.config.ecs_service} not found")
+        service = response["services"][0]
+        return ServiceState(
+            service["desiredCount"], service["runningCount"], time.monotonic()
+        )
+
+    def _set_state(self, state: ServiceState) -> None:
+        self._state = state
+        if state.desired == 0:
+            self.starting_since = None
+        elif state.running == 0 and self.starting_since is None:
+            # Started elsewhere, e.g. from Discord
+            self.starting_since = state.checked_at
+
+    async def service_state(self) -> ServiceState:
+        """Service counts, fetched at most once per cache TTL."""
+        state = self._state
+        if state and time.monotonic() - state.checked_at < self.config.status_cache_ttl:
+            return state
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(
+                asyncio.to_thread(self._describe_service)
+            )
+        # Shielded so a client timing out does not cancel the shared call
+        state = await asyncio.shield(self._refresh)
+        if state is not self._state:
+            self._set_state(state)
+        return state
+
+    def seconds_until_ready(self) -> int:
+        """Estimated seconds until the server accepts players."""
+        elapsed = time.monotonic() - (self.starting_since or time.monotonic())
+        return max(5, round(self.start_estimate - elapsed))
+
+    def motd(self, state: ServiceState | None) -> str:
+        """Message shown in the server list."""
+        if state is None:
+            return "Server status unavailable, try again later"
+        if state.desired == 0:
+            return "Server is asleep, join to wake it up"
+        if state.running > 0 and (
+            self.starting_since is None or self.seconds_until_ready() <= 5
+        ):
+            return "Server is up, refresh your server list"
+        return f"Server starting, retry in ~{self.seconds_until_ready()}s"
+
+    async def wake(self, player: str) -> str:
+        """Scale the service up for a login attempt; returns the kick message."""
+        allowed = self.config.allowed_players
+        if allowed and player not in allowed:
+            logger.info(f"Login attempt by {player} is not allowed to wake the server")
+            return "Server is asleep, ask in Discord to start it"
+
+        async with self._wake_lock:
+            state = await self.service_state()
+            if state.desired == 0:
+                logger.info(f"{player} is waking the server")
+                await asyncio.to_thread(
+                    self.ecs_client.update_service,
+                    cluster=self.config.ecs_cluster,
+                    service=self.config.ecs_service,
+                    desiredCount=1,
+                    forceNewDeployment=True,
+                )
+                self.wakes += 1
+                self._set_state(ServiceState(1, state.running, time.monotonic()))
+                self.starting_since = time.monotonic()
+                get_timeline().record("requested")
+                notification = asyncio.create_task(
+                    asyncio.to_thread(
+                        send_discord_message,
+                        self.config.discord_webhook,
+                        f"🟡 {player} is waking up the Minecraft server",
+                    )
+                )
+                self._notifications.add(notification)
+                notification.add_done_callback(self._notifications.discard)
+        return f"Server is starting, try again in about {self.seconds_until_ready()}s"
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve one client connection."""
+        try:
+            async with asyncio.timeout(self.config.client_timeout):
+                await self._serve(reader, writer)
+        except (
+            ProtocolError,
+            asyncio.IncompleteReadError,
+            TimeoutError,
+            ConnectionError,
+        ) as e:
+            logger.debug(f"Dropped client: {e!r}")
+        except Exception as e:
+            logger.warning(f"Error serving client: {e}")
+        finally:
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        packet_id, packet = await read_packet(reader)
+        if packet_id != PACKET_HANDSHAKE:
+            raise ProtocolError(f"Expected a handshake, got packet {packet_id}")
+        handshake = parse_handshake(packet)
+
+        if handshake.next_state == STATE_STATUS:
+            packet_id, _ = await read_packet(reader)
+            if packet_id != PACKET_STATUS_REQUEST:
+                raise ProtocolError(f"Expected a status request, got {packet_id}")
+            self.pings += 1
+            try:
+                state = await self.service_state()
+            except Exception as e:
+                logger.warning(f"Failed to get service status: {e}")
+                state = None
+            writer.write(
+                status_response(self.motd(state), handshake.protocol, VERSION_NAME)
+            )
+            await writer.drain()
+
+            packet_id, packet = await read_packet(reader)
+            if packet_id == PACKET_PING:
+                writer.write(pong(packet.read_bytes(8)))
+                await writer.drain()
+
+        elif handshake.next_state in (STATE_LOGIN, STATE_TRANSFER):
+            packet_id, packet = await read_packet(reader)
+            if packet_id != PACKET_LOGIN_START:
+                raise ProtocolError(f"Expected login start, got packet {packet_id}")
+            player = packet.read_string(16)
+            try:
+                message = await self.wake(player)
+            except Exception as e:
+                logger.error(f"Failed to wake the server: {e}")
+                message = "Could not start the server, try /server-start in Discord"
+            writer.write(login_disconnect(message))
+            await writer.drain()
+
+        else:
+            raise ProtocolError(f"Unknown next state {handshake.next_state}")
+
+
+def estimate_from_timeline(default: float) -> float:
+    """Median cold start from the timeline, if it has any."""
+    store = get_timeline().store
+    if store is None:
+        return default
+    for stats in report([store]):
+        if stats.stage == "cold_start" and stats.count:
+            return stats.p50
+    return default
+
+
+async def serve(listener: WakeListener) -> None:
+    """Accept connections until SIGTERM or SIGINT."""
+    config = listener.config
+    server = await asyncio.start_server(listener.handle, config.host, config.port)
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopped.set)
+    async with server:
+        logger.info(f"Listening on {config.host}:{config.port}")
+        await stopped.wait()
+    logger.info(f"Stopped after {listener.pings} pings and {listener.wakes} wakes")
+
+
+def main() -> None:
+    """Main entry point."""
+    try:
+        setup_logging_from_env()
+        use_trimmed_models()
+        configure_tracing_from_env()
+        configure_timeline_from_env("wake-listener")
+        config = WakeListenerConfig.from_env()
+
+        listener = WakeListener(config, create_client("ecs"))
+        listener.start_estimate = estimate_from_timeline(config.start_estimate)
+        logger.info(
+            f"Waking {config.ecs_service} on login, "
+            f"expecting starts to take {listener.start_estimate:.0f}s"
+        )
+
+        with log_context(cluster=config.ecs_cluster, service=config.ecs_service):
+            asyncio.run(serve(listener))
+
+    except ValueError as e:
+        logger.error(f"Configuration error: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"Wake listener failed: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
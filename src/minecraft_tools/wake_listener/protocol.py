@@ -0,0 +1,166 @@
+"""Just enough of the Minecraft Java Edition protocol to stand in for a server.
+
+Covers the handshake, the Server List Ping (status request and ping) and
+turning a login attempt away with a disconnect message. Packets are a VarInt
+length followed by a VarInt packet id and the fields.
+"""
+
+import asyncio
+import json
+import struct
+from dataclasses import dataclass
+
+# Handshakes, status and login start packets are all far smaller than this
+MAX_PACKET_SIZE = 4096
+
+STATE_STATUS = 1
+STATE_LOGIN = 2
+STATE_TRANSFER = 3
+
+PACKET_HANDSHAKE = 0x00
+PACKET_STATUS_REQUEST = 0x00
+PACKET_STATUS_RESPONSE = 0x00
+PACKET_PING = 0x01
+PACKET_PONG = 0x01
+PACKET_LOGIN_START = 0x00
+PACKET_LOGIN_DISCONNECT = 0x00
+
+
+class ProtocolError(Exception):
+    """Malformed or unexpected packet."""
+
+
+def encode_varint(value: int) -> bytes:
+    """Encode a 32-bit integer as a VarInt."""
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if not value:
+            out.append(byte)
+            return bytes(out)
+        out.append(byte | 0x80)
+
+
+def encode_string(value: str) -> bytes:
+    """Encode a string as its UTF-8 length and bytes."""
+    data = value.encode()
+    return encode_varint(len(data)) + data
+
+
+def encode_packet(packet_id: int, payload: bytes = b"") -> bytes:
+    """Frame a packet with its length."""
+    body = encode_varint(packet_id) + payload
+    return encode_varint(len(body)) + body
+
+
+class PacketReader:
+    """Fields of a received packet, read in order."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.position = 0
+
+    def read_bytes(self, count: int) -> bytes:
+        """Read raw bytes."""
+        end = self.position + count
+        if end > len(self.data):
+            raise ProtocolError("Packet is truncated")
+        value = self.data[self.position : end]
+        self.position = end
+        return value
+
+    def read_varint(self) -> int:
+        """Read a VarInt."""
+        result = 0
+        for shift in range(0, 35, 7):
+            byte = self.read_bytes(1)[0]
+            result |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return result - (1 << 32) if result & (1 << 31) else result
+        raise ProtocolError("VarInt is too long")
+
+    def read_string(self, max_length: int = 32767) -> str:
+        """Read a string of at most ``max_length`` characters."""
+        length = self.read_varint()
+        if not 0 <= length <= max_length * 4:
+            raise ProtocolError(f"String length {length} is out of range")
+        try:
+            value = self.read_bytes(length).decode()
+        except UnicodeDecodeError as e:
+            raise ProtocolError("String is not valid UTF-8") from e
+        if len(value) > max_length:
+            raise ProtocolError(f"String is longer than {max_length} characters")
+        return value
+
+    def read_ushort(self) -> int:
+        """Read a big-endian unsigned short."""
+        return struct.unpack(">H", self.read_bytes(2))[0]
+
+
+async def read_varint(reader: asyncio.StreamReader) -> int:
+    """Read a VarInt from a stream."""
+    result = 0
+    for shift in range(0, 35, 7):
+        byte = (await reader.readexactly(1))[0]
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result
+    raise ProtocolError("VarInt is too long")
+
+
+async def read_packet(reader: asyncio.StreamReader) -> tuple[int, PacketReader]:
+    """Read one packet and return its id and fields."""
+    length = await read_varint(reader)
+    if not 0 < length <= MAX_PACKET_SIZE:
+        raise ProtocolError(f"Packet length {length} is out of range")
+    packet = PacketReader(await reader.readexactly(length))
+    return packet.read_varint(), packet
+
+
+@dataclass
+class Handshake:
+    """The first packet of every connection."""
+
+    protocol: int
+    address: str
+    port: int
+    next_state: int
+
+
+def parse_handshake(packet: PacketReader) -> Handshake:
+    """Read the fields of a handshake packet."""
+    return Handshake(
+        protocol=packet.read_varint(),
+        # Forge appends its marker to the address, so allow more than a hostname
+        address=packet.read_string(1024),
+        port=packet.read_ushort(),
+        next_state=packet.read_varint(),
+    )
+
+
+def status_response(motd: str, protocol: int, version: str) -> bytes:
+    """Status response showing a message and no players.
+
+    Echoing the client's protocol version keeps the server list from marking
+    the server as incompatible.
+    """
+    status = {
+        "version": {"name": version, "protocol": protocol},
+        "players": {"max": 0, "online": 0},
+        "description": {"text": motd},
+    }
+    return encode_packet(PACKET_STATUS_RESPONSE, encode_string(json.dumps(status)))
+
+
+def pong(payload: bytes) -> bytes:
+    """Answer to a ping, echoing its payload."""
+    return encode_packet(PACKET_PONG, payload)
+
+
+def login_disconnect(message: str) -> bytes:
+    """Disconnect during login with a message shown to the player."""
+    return encode_packet(
+        PACKET_LOGIN_DISCONNECT, encode_string(json.dumps({"text": message}))
+    )
@@ -0,0 +1,190 @@
+"""Reading and compacting Anvil region files without an NBT parser.
+
+A region file holds 32x32 chunks. Its first 4 KiB sector has one location
+entry per chunk (3 byte sector offset, 1 byte sector count), the second one
+the chunk timestamps. Each chunk starts with its length and compression
+type, followed by the compressed NBT.
+"""
+
+import mmap
+import os
+import re
+import struct
+import zlib
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+SECTOR_SIZE = 4096
+CHUNKS_PER_REGION = 1024
+HEADER_SIZE = 2 * SECTOR_SIZE
+
+COMPRESSION_GZIP = 1
+COMPRESSION_ZLIB = 2
+COMPRESSION_NONE = 3
+EXTERNAL_FLAG = 0x80  # payload lives in a separate c.<x>.<z>.mcc file
+
+# TAG_Long named InhabitedTime, followed by its big-endian value
+INHABITED_TIME_TAG = b"\x04\x00\x0dInhabitedTime"
+INHABITED_SCAN_STEP = 16 * 1024
+
+REGION_NAME = re.compile(r"^r\.(-?\d+)\.(-?\d+)\.mca$")
+
+
+@dataclass
+class ChunkEntry:
+    """Location of one chunk in a region file."""
+
+    index: int
+    offset: int  # in sectors
+    sectors: int
+    timestamp: int
+
+    @property
+    def local_x(self) -> int:
+        """Chunk x within the region."""
+        return self.index % 32
+
+    @property
+    def local_z(self) -> int:
+        """Chunk z within the region."""
+        return self.index // 32
+
+
+def region_coords(path: Path) -> tuple[int, int] | None:
+    """Region x and z from an ``r.<x>.<z>.mca`` file name."""
+    match = REGION_NAME.match(path.name)
+    return (int(match[1]), int(match[2])) if match else None
+
+
+@contextmanager
+def map_region(path: Path) -> Iterator[mmap.mmap | None]:
+    """Memory-map a region file, or yield None if it has no header yet."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < HEADER_SIZE:
+            yield None
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def read_chunk_table(data: mmap.mmap | bytes) -> list[ChunkEntry]:
+    """Chunks present in a region file, read from its header only."""
+    locations = struct.unpack_from(">1024I", data, 0)
+    timestamps = struct.unpack_from(">1024I", data, SECTOR_SIZE)
+    return [
+        ChunkEntry(
+            index=i,
+            offset=location >> 8,
+            sectors=location & 0xFF,
+            timestamp=timestamps[i],
+        )
+        for i, location in enumerate(locations)
+        if location
+    ]
+
+
+def chunk_payload(data: mmap.mmap | bytes, entry: ChunkEntry) -> tuple[int, bytes]:
+    """Compression type and compressed payload of a chunk."""
+    start = entry.offset * SECTOR_SIZE
+    if start + 5 > len(data):
+        raise ValueError(f"Chunk {entry.index} points past the end of the file")
+    length, compression = struct.unpack_from(">IB", data, start)
+    return compression, data[start + 5 : start + 4 + length]
+
+
+def inhabited_time(data: mmap.mmap | bytes, entry: ChunkEntry) -> int | None:
+    """Ticks players spent near a chunk, or None if it cannot be read.
+
+    The payload is decompressed incrementally and only until the
+    InhabitedTime tag has been seen, instead of parsing the whole NBT.
+    """
+    compression, payload = chunk_payload(data, entry)
+    if compression == COMPRESSION_NONE:
+        decompress = None
+    elif compression == COMPRESSION_ZLIB:
+        decompress = zlib.decompressobj()
+    elif compression == COMPRESSION_GZIP:
+        decompress = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    else:
+        return None  # LZ4, custom or external payloads
+
+    if decompress is None:
+        return _find_inhabited_time(payload)
+
+    nbt = b""
+    pending = payload
+    while not decompress.eof:
+        try:
+            output = decompress.decompress(pending, INHABITED_SCAN_STEP)
+        except zlib.error:
+            return None
+        nbt += output
+        value = _find_inhabited_time(nbt)
+        if value is not None:
+            return value
+        pending = decompress.unconsumed_tail
+        if not pending and len(output) < INHABITED_SCAN_STEP:
+            break
+    return None
+
+
+def _find_inhabited_time(nbt: bytes) -> int | None:
+    position = nbt.find(INHABITED_TIME_TAG)
+    end = position + len(INHABITED_TIME_TAG) + 8
+    if position < 0 or end > len(nbt):
+        return None
+    return struct.unpack_from(">q", nbt, end - 8)[0]
+
+
+def compact_region(path: Path, drop: set[int]) -> int:
+    """Rewrite a region file without the given chunks.
+
+    Kept chunks are copied sector by sector without recompressing them, and
+    the external payload files of dropped chunks are removed. Returns the
+    number of bytes freed; a region left without chunks is deleted.
+    """
+    size_before = path.stat().st_size
+    coords = region_coords(path)
+    with map_region(path) as data:
+        if data is None:
+            return 0
+        entries = read_chunk_table(data)
+        kept = [e for e in entries if e.index not in drop]
+        if len(kept) == len(entries):
+            return 0
+
+        if coords is not None:
+            for entry in entries:
+                if entry.index in drop:
+                    external = path.with_name(
+                        f"c.{coords[0] * 32 + entry.local_x}."
+                        f"{coords[1] * 32 + entry.local_z}.mcc"
+                    )
+                    external.unlink(missing_ok=True)
+
+        if not kept:
+            path.unlink()
+            return size_before
+
+        locations = [0] * CHUNKS_PER_REGION
+        timestamps = [0] * CHUNKS_PER_REGION
+        body = bytearray()
+        next_sector = HEADER_SIZE // SECTOR_SIZE
+        for entry in sorted(kept, key=lambda e: e.offset):
+            start = entry.offset * SECTOR_SIZE
+            body += data[start : start + entry.sectors * SECTOR_SIZE]
+            # The last chunk of a file is not always padded to a full sector
+            body += bytes(-len(body) % SECTOR_SIZE)
+            locations[entry.index] = next_sector << 8 | entry.sectors
+            timestamps[entry.index] = entry.timestamp
+            next_sector += entry.sectors
+
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(struct.pack(">1024I", *locations))
+        f.write(struct.pack(">1024I", *timestamps))
+        f.write(body)
+    os.replace(tmp, path)
+    return size_before - path.stat().st_size
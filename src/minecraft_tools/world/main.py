@@ -0,0 +1,246 @@
+"""World analysis and pruning of chunks players never stayed in.
+
+Region files are memory-mapped and processed in a pool of worker processes,
+one file per task. Sizes come from the region headers alone; the
+InhabitedTime of each chunk is read by decompressing only as much of the
+chunk as needed to find it.
+"""
+
+import argparse
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from minecraft_tools.logging_config import setup_logging_from_env
+from minecraft_tools.timeline import percentile
+from minecraft_tools.world.anvil import (
+    SECTOR_SIZE,
+    compact_region,
+    inhabited_time,
+    map_region,
+    read_chunk_table,
+)
+
+logger = logging.getLogger(__name__)
+
+TICKS_PER_SECOND = 20
+# Per-dimension folders holding region files with the same chunk layout
+CHUNK_DATA_DIRS = ("entities", "poi")
+INHABITED_BUCKETS = ((0, "never"), (10, "< 10s"), (60, "< 1m"), (600, "< 10m"))
+
+
+@dataclass
+class RegionStats:
+    """Chunk and size statistics of one region file."""
+
+    path: str
+    file_bytes: int = 0
+    used_bytes: int = 0
+    chunks: int = 0
+    inhabited: list[int] = field(default_factory=list)  # ticks, readable chunks
+    unreadable: int = 0
+    prunable_chunks: int = 0
+    prunable_bytes: int = 0
+
+
+@dataclass
+class WorldStats:
+    """Statistics over all region files of a world."""
+
+    regions: int = 0
+    chunks: int = 0
+    file_bytes: int = 0
+    used_bytes: int = 0
+    inhabited: list[int] = field(default_factory=list)
+    unreadable: int = 0
+    prunable_chunks: int = 0
+    prunable_bytes: int = 0
+
+    def add(self, region: RegionStats) -> None:
+        """Include the statistics of one region file."""
+        self.regions += 1
+        self.chunks += region.chunks
+        self.file_bytes += region.file_bytes
+        self.used_bytes += region.used_bytes
+        self.inhabited.extend(region.inhabited)
+        self.unreadable += region.unreadable
+        self.prunable_chunks += region.prunable_chunks
+        self.prunable_bytes += region.prunable_bytes
+
+
+def find_region_files(world_dir: Path) -> list[Path]:
+    """Terrain region files of every dimension below a directory."""
+    return sorted(world_dir.rglob("region/*.mca"))
+
+
+def prunable_chunks(data: Any, threshold_ticks: int) -> tuple[RegionStats, set[int]]:
+    """Analyze mapped region data and pick chunks below the threshold."""
+    stats = RegionStats(path="")
+    drop = set()
+    for entry in read_chunk_table(data):
+        stats.chunks += 1
+        stats.used_bytes += entry.sectors * SECTOR_SIZE
+        try:
+            ticks = inhabited_time(data, entry)
+        except ValueError:
+            ticks = None
+        if ticks is None:
+            # Never prune what could not be read
+            stats.unreadable += 1
+            continue
+        stats.inhabited.append(ticks)
+        if ticks < threshold_ticks:
+            drop.add(entry.index)
+            stats.prunable_chunks += 1
+            stats.prunable_bytes += entry.sectors * SECTOR_SIZE
+    return stats, drop
+
+
+def analyze_region(path: str, threshold_ticks: int = 0) -> RegionStats:
+    """Statistics of one region file."""
+    with map_region(Path(path)) as data:
+        if data is None:
+            stats = RegionStats(path=path)
+        else:
+            stats, _ = prunable_chunks(data, threshold_ticks)
+            stats.path = path
+    stats.file_bytes = os.path.getsize(path)
+    return stats
+
+
+def prune_region(path: str, threshold_ticks: int) -> RegionStats:
+    """Drop chunks below the threshold from a region and its entity data."""
+    region = Path(path)
+    with map_region(region) as data:
+        if data is None:
+            return RegionStats(path=path, file_bytes=region.stat().st_size)
+        stats, drop = prunable_chunks(data, threshold_ticks)
+    stats.path = path
+    stats.file_bytes = region.stat().st_size
+    if drop:
+        compact_region(region, drop)
+        dimension = region.parent.parent
+        for name in CHUNK_DATA_DIRS:
+            sibling = dimension / name / region.name
+            if sibling.exists():
+                compact_region(sibling, drop)
+    return stats
+
+
+def process_world(
+    world_dir: Path,
+    threshold_ticks: int = 0,
+    workers: int | None = None,
+    prune: bool = False,
+) -> WorldStats:
+    """Analyze, and optionally prune, every region file of a world."""
+    paths = [str(path) for path in find_region_files(world_dir)]
+    task = prune_region if prune else analyze_region
+    world = WorldStats()
+    if not paths:
+        return world
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for region in pool.map(
+            partial(task, threshold_ticks=threshold_ticks),
+            paths,
+            chunksize=max(1, len(paths) // ((workers or os.cpu_count() or 1) * 4)),
+        ):
+            world.add(region)
+    return world
+
+
+def format_duration(ticks: float) -> str:
+    """Game ticks as a short human readable duration."""
+    seconds = ticks / TICKS_PER_SECOND
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.1f}h"
+
+
+def format_report(world: WorldStats, threshold_ticks: int = 0) -> str:
+    """Render world statistics."""
+    mib = 2**20
+    lines = [
+        f"regions          {world.regions}",
+        f"chunks           {world.chunks} ({world.unreadable} unreadable)",
+        f"size on disk     {world.file_bytes / mib:.1f} MiB "
+        f"({world.used_bytes / mib:.1f} MiB in use)",
+    ]
+    if world.inhabited:
+        lines.append(
+            f"inhabited time   p50 {format_duration(percentile(world.inhabited, 50))}"
+            f"  p90 {format_duration(percentile(world.inhabited, 90))}"
+            f"  max {format_duration(max(world.inhabited))}"
+        )
+        for limit, label in INHABITED_BUCKETS:
+            ticks = limit * TICKS_PER_SECOND
+            count = sum(1 for t in world.inhabited if (t < ticks if ticks else t == 0))
+            lines.append(f"  {label:<14} {count:>8} chunks")
+    if threshold_ticks:
+        lines.append(
+            f"below {format_duration(threshold_ticks):<10} "
+            f"{world.prunable_chunks} chunks, {world.prunable_bytes / mib:.1f} MiB"
+        )
+    return "\n".join(lines)
+
+
+def server_is_stopped(ecs_client: Any, cluster: str, service: str) -> bool:
+    """Whether the ECS service is scaled to zero with no task left."""
+    response = ecs_client.describe_services(cluster=cluster, services=[service])
+    if not response["services"]:
+        raise ValueError(f"Service {service} not found in cluster {cluster}")
+    service_info = response["services"][0]
+    return service_info["desiredCount"] == 0 and service_info["runningCount"] == 0
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Report region file statistics and prune barely visited chunks."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("world", type=Path, nargs="?", default=Path("/data"))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--prune-below",
+        type=float,
+        metavar="SECONDS",
+        help="remove chunks players spent less than this long in",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only report what would be pruned"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="prune without checking that the ECS service is stopped",
+    )
+    args = parser.parse_args(argv)
+
+    setup_logging_from_env()
+    threshold_ticks = round((args.prune_below or 0) * TICKS_PER_SECOND)
+    prune = bool(args.prune_below) and not args.dry_run
+
+    if prune and not args.force:
+        from minecraft_tools.aws import create_client
+
+        cluster, service = os.getenv("ECS_CLUSTER"), os.getenv("ECS_SERVICE")
+        if not cluster or not service:
+            parser.error("set ECS_CLUSTER and ECS_SERVICE, or pass --force")
+        if not server_is_stopped(create_client("ecs"), cluster, service):
+            parser.error(f"{service} is running; scale it to zero before pruning")
+
+    world = process_world(args.world, threshold_ticks, args.workers, prune)
+    print(format_report(world, threshold_ticks))
+    if prune:
+        logger.info(
+            f"Pruned {world.prunable_chunks} chunks "
+            f"({world.prunable_bytes / 2**20:.1f} MiB)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,8 @@ resource "cloudflare_dns_record" "minecraft_a" {
   proxied = false
 
   lifecycle {
-    ignore_changes = [content]
+    # Content and TTL are managed by mc-dns-updater
+    ignore_changes = [content, ttl]
   }
 }
 
@@ -18,6 +18,8 @@ resource "aws_iam_role_policy_attachment" "ecs_task_execution_policy" {
   policy_arn = "arn:aws:iam::aws:policy/service-role/AmazonECSTaskExecutionRolePolicy"
 }
 
+data "aws_caller_identity" "current" {}
+
 data "aws_iam_policy_document" "ecs_ssm_access" {
   statement {
     effect = "Allow"
@@ -34,6 +36,20 @@ data "aws_iam_policy_document" "ecs_ssm_access" {
     ]
   }
 
+  # Tool configuration loaded with GetParametersByPath
+  statement {
+    effect = "Allow"
+
+    actions = [
+      "ssm:GetParametersByPath"
+    ]
+
+    resources = [
+      "arn:aws:ssm:${var.region}:${data.aws_caller_identity.current.account_id}:parameter${local.config_ssm_path}",
+      "arn:aws:ssm:${var.region}:${data.aws_caller_identity.current.account_id}:parameter${local.config_ssm_path}/*"
+    ]
+  }
+
   statement {
     effect = "Allow"
 
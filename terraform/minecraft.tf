@@ -94,10 +94,11 @@ resource "aws_ecs_task_definition" "minecraft" {
       }
     },
     {
-      name      = "mc-idle-watcher"
-      image     = "ghcr.io/melvyndekort/mc-idle-watcher:latest"
+      name      = "mc-tools"
+      image     = "ghcr.io/melvyndekort/mc-tools:latest"
       essential = true
       environment = [
+        { name = "SUPERVISOR_COMPONENTS", value = "idle-watcher,dns-updater" },
         { name = "RCON_HOST", value = "localhost" },
         { name = "RCON_PORT", value = "25575" },
         { name = "RCON_PASSWORD", value = random_string.random_password.result },
@@ -106,45 +107,49 @@ resource "aws_ecs_task_definition" "minecraft" {
         { name = "AWS_REGION", value = var.region },
         { name = "IDLE_MINUTES", value = "15" },
         { name = "CHECK_INTERVAL", value = "30" },
-        { name = "DNS_NAME", value = local.fqdn }
-      ]
-      secrets = [
-        { name = "DISCORD_WEBHOOK", valueFrom = aws_ssm_parameter.discord_webhook_url.arn }
-      ]
-      logConfiguration = {
-        logDriver = "awslogs"
-        options = {
-          "awslogs-group"         = aws_cloudwatch_log_group.minecraft.name
-          "awslogs-region"        = var.region
-          "awslogs-stream-prefix" = "mc-idle-watcher"
-        }
-      }
-    },
-    {
-      name      = "mc-dns-updater"
-      image     = "ghcr.io/melvyndekort/mc-dns-updater:latest"
-      essential = false
-      environment = [
+        { name = "DNS_NAME", value = local.fqdn },
         { name = "CLOUDFLARE_ZONE_ID", value = data.cloudflare_zone.zone.zone_id },
         { name = "CLOUDFLARE_A_RECORD_ID", value = cloudflare_dns_record.minecraft_a.id },
         { name = "CLOUDFLARE_AAAA_RECORD_ID", value = cloudflare_dns_record.minecraft_aaaa.id },
         { name = "DNS_RECORD_NAME", value = local.fqdn },
-        { name = "ECS_CLUSTER", value = aws_ecs_cluster.minecraft.name },
-        { name = "ECS_SERVICE", value = local.minecraft_service_name },
-        { name = "DNS_NAME", value = local.fqdn }
+        { name = "DNS_VERIFY_PROPAGATION", value = "true" },
+        { name = "DNS_RECONCILE_INTERVAL", value = "60" },
+        { name = "DNS_SLEEP_ADDRESS", value = var.wake_listener_address },
+        { name = "HEALTH_PORT", value = "8080" },
+        { name = "CONFIG_SSM_PATH", value = local.config_ssm_path },
+        { name = "TIMELINE_DB", value = "/data/mc-tools/timeline.db" },
+        { name = "SESSIONS_DB", value = "/data/mc-tools/sessions.db" },
+        { name = "BACKUP_REPOSITORY", value = "/data/mc-tools/backups" },
+        { name = "BACKUP_EXCLUDE", value = "logs,cache,mc-tools" },
+        { name = "PLAYER_LOG", value = "/data/logs/latest.log" }
+      ]
+      mountPoints = [
+        {
+          sourceVolume  = "minecraft-data"
+          containerPath = "/data"
+          readOnly      = false
+        }
       ]
       secrets = [
         {
           name      = "CLOUDFLARE_TOKEN"
           valueFrom = aws_ssm_parameter.cloudflare_api_token.arn
-        }
+        },
+        { name = "DISCORD_WEBHOOK", valueFrom = aws_ssm_parameter.discord_webhook_url.arn }
       ]
+      healthCheck = {
+        command     = ["CMD-SHELL", "wget -q -O /dev/null http://localhost:8080/livez || exit 1"]
+        interval    = 30
+        timeout     = 5
+        retries     = 3
+        startPeriod = 10
+      }
       logConfiguration = {
         logDriver = "awslogs"
         options = {
           "awslogs-group"         = aws_cloudwatch_log_group.minecraft.name
           "awslogs-region"        = var.region
-          "awslogs-stream-prefix" = "mc-dns-updater"
+          "awslogs-stream-prefix" = "mc-tools"
         }
       }
     }
@@ -74,6 +74,17 @@ resource "aws_security_group" "minecraft" {
     ipv6_cidr_blocks = ["::/0"]
   }
 
+  dynamic "ingress" {
+    for_each = length(var.tools_http_cidrs) > 0 ? [1] : []
+    content {
+      description = "Tools health server and statistics"
+      from_port   = 8080
+      to_port     = 8080
+      protocol    = "tcp"
+      cidr_blocks = var.tools_http_cidrs
+    }
+  }
+
   tags = {
     Name = "minecraft-sg"
   }
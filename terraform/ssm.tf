@@ -9,3 +9,29 @@ resource "aws_ssm_parameter" "discord_webhook_url" {
   type  = "SecureString"
   value = local.secrets.discord.webhook_url
 }
+
+# Live tunables, read by the tools through CONFIG_SSM_PATH. Values can be
+# changed in Parameter Store without a redeploy.
+locals {
+  config_ssm_path = "/mc/config"
+}
+
+resource "aws_ssm_parameter" "idle_threshold" {
+  name  = "${local.config_ssm_path}/idle_threshold"
+  type  = "String"
+  value = "900"
+
+  lifecycle {
+    ignore_changes = [value]
+  }
+}
+
+resource "aws_ssm_parameter" "check_interval" {
+  name  = "${local.config_ssm_path}/check_interval"
+  type  = "String"
+  value = "30"
+
+  lifecycle {
+    ignore_changes = [value]
+  }
+}
@@ -45,3 +45,15 @@ variable "paper_version" {
   description = "Minecraft Paper server version"
   type        = string
 }
+
+variable "wake_listener_address" {
+  description = "IP address of the machine running wake-listener, published in DNS while the server is stopped; empty keeps the last task address"
+  type        = string
+  default     = ""
+}
+
+variable "tools_http_cidrs" {
+  description = "CIDR blocks allowed to reach the tools container's health server, e.g. the Discord bot's address for /server-stats and /server-timeline"
+  type        = list(string)
+  default     = []
+}
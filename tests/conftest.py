@@ -0,0 +1,18 @@
+"""Shared test fixtures."""
+
+import logging
+
+import pytest
+
+from minecraft_tools.logging_config import stop_logging
+
+
+@pytest.fixture(autouse=True)
+def restore_logging():
+    """Undo setup_logging() calls made by CLI entry points under test."""
+    handlers = logging.root.handlers[:]
+    level = logging.root.level
+    yield
+    stop_logging()
+    logging.root.handlers = handlers
+    logging.root.setLevel(level)
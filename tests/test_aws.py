@@ -0,0 +1,181 @@
+"""Tests for trimmed AWS service models."""
+
+import json
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from minecraft_tools.aws import (
+    build_models,
+    trim_service_model,
+    trimmed_model_loader,
+    use_trimmed_models,
+)
+
+MODEL = {
+    "version": "2.0",
+    "metadata": {"apiVersion": "2020-01-01", "protocol": "json"},
+    "operations": {
+        "Describe": {
+            "name": "Describe",
+            "input": {"shape": "DescribeRequest"},
+            "output": {"shape": "DescribeResponse"},
+            "errors": [{"shape": "NotFound"}],
+            "documentation": "Describes things.",
+        },
+        "Delete": {"name": "Delete", "input": {"shape": "DeleteRequest"}},
+    },
+    "shapes": {
+        "DescribeRequest": {
+            "type": "structure",
+            "members": {"names": {"shape": "Names"}},
+        },
+        "DescribeResponse": {
+            "type": "structure",
+            "members": {"tags": {"shape": "Tags"}},
+        },
+        "Names": {"type": "list", "member": {"shape": "String"}},
+        "Tags": {
+            "type": "map",
+            "key": {"shape": "String"},
+            "value": {"shape": "String"},
+        },
+        "NotFound": {"type": "structure", "members": {}, "exception": True},
+        "DeleteRequest": {"type": "structure", "members": {"id": {"shape": "Id"}}},
+        "Id": {"type": "string"},
+        "String": {"type": "string", "documentation": "A string."},
+    },
+}
+
+
+@pytest.fixture
+def models_dir(tmp_path):
+    """Trimmed models built from the installed botocore."""
+    build_models(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def default_session():
+    """Restore the default boto3 session after the test."""
+    previous = boto3.DEFAULT_SESSION
+    yield
+    boto3.DEFAULT_SESSION = previous
+
+
+class TestTrimServiceModel:
+    """Test service model trimming."""
+
+    def test_keeps_referenced_shapes_only(self):
+        """Test that unused operations and their shapes are dropped."""
+        trimmed = trim_service_model(MODEL, ["Describe"])
+
+        assert list(trimmed["operations"]) == ["Describe"]
+        assert set(trimmed["shapes"]) == {
+            "DescribeRequest",
+            "DescribeResponse",
+            "Names",
+            "Tags",
+            "NotFound",
+            "String",
+        }
+        assert trimmed["metadata"] == MODEL["metadata"]
+
+    def test_strips_documentation(self):
+        """Test that documentation strings are removed."""
+        trimmed = trim_service_model(MODEL, ["Describe"])
+
+        assert "documentation" not in json.dumps(trimmed)
+
+    def test_unknown_operation(self):
+        """Test that a typo in the operation list is reported."""
+        with pytest.raises(ValueError, match="Unknown operations: Describes"):
+            trim_service_model(MODEL, ["Describes"])
+
+
+class TestTrimmedModelLoader:
+    """Test loading clients from trimmed models."""
+
+    def test_client_uses_trimmed_model(self, models_dir):
+        """Test that a client only knows the trimmed operations."""
+        session = boto3.Session(region_name="eu-west-1")
+        session._session.register_component(
+            "data_loader", trimmed_model_loader(models_dir)
+        )
+
+        ecs = session.client("ecs")
+
+        assert sorted(ecs.meta.service_model.operation_names) == [
+            "DescribeServices",
+            "DescribeTasks",
+            "ListTasks",
+            "UpdateService",
+        ]
+        assert ecs.can_paginate("list_tasks")
+
+    def test_falls_back_to_full_model(self, models_dir):
+        """Test that an outdated trimmed model is ignored."""
+        (current,) = (models_dir / "ecs").iterdir()
+        current.rename(current.with_name("2000-01-01"))
+        session = boto3.Session(region_name="eu-west-1")
+        session._session.register_component(
+            "data_loader", trimmed_model_loader(models_dir)
+        )
+
+        ecs = session.client("ecs")
+
+        assert "CreateCluster" in ecs.meta.service_model.operation_names
+
+    @mock_aws
+    def test_use_trimmed_models(self, models_dir, default_session, monkeypatch):
+        """Test that the default session serves calls from trimmed models."""
+        monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-1")
+        boto3.client("ecs").create_cluster(clusterName="minecraft")
+
+        use_trimmed_models(models_dir)
+        ecs = boto3.client("ecs")
+
+        assert not hasattr(ecs, "create_cluster")
+        assert ecs.list_tasks(cluster="minecraft")["taskArns"] == []
+
+    def test_assume_role_profile(
+        self, models_dir, default_session, tmp_path, monkeypatch
+    ):
+        """Test that credentials resolve from an assume-role profile."""
+        config_file = tmp_path / "config"
+        config_file.write_text(
+            "[profile botrole]\n"
+            "role_arn = arn:aws:iam::123456789012:role/bot\n"
+            "source_profile = default\n"
+            "region = eu-west-1\n"
+        )
+        credentials_file = tmp_path / "credentials"
+        credentials_file.write_text(
+            "[default]\naws_access_key_id = AKIA0\naws_secret_access_key = secret\n"
+        )
+        monkeypatch.setenv("AWS_CONFIG_FILE", str(config_file))
+        monkeypatch.setenv("AWS_SHARED_CREDENTIALS_FILE", str(credentials_file))
+        monkeypatch.setenv("AWS_PROFILE", "botrole")
+        monkeypatch.setenv("AWS_ACCESS_KEY_ID", "unused")
+        monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "unused")
+
+        with mock_aws():
+            # moto exports its own keys, which would win over the profile
+            monkeypatch.delenv("AWS_ACCESS_KEY_ID")
+            monkeypatch.delenv("AWS_SECRET_ACCESS_KEY")
+            use_trimmed_models(models_dir)
+            session = boto3.DEFAULT_SESSION
+            credentials = session.get_credentials().get_frozen_credentials()
+            identity = boto3.client("sts").get_caller_identity()
+
+        assert credentials.access_key not in ("AKIA0", "unused")
+        assert ":assumed-role/bot/" in identity["Arn"]
+
+    def test_missing_models_dir(self, tmp_path, default_session):
+        """Test that the full models are used when none were built."""
+        boto3.DEFAULT_SESSION = None
+
+        use_trimmed_models(tmp_path / "missing")
+
+        assert boto3.DEFAULT_SESSION is None
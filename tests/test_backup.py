@@ -0,0 +1,147 @@
+"""Tests for incremental world backups."""
+
+import os
+
+import pytest
+
+from minecraft_tools.backup.main import (
+    CHUNK_SIZE,
+    create_snapshot,
+    iter_files,
+    restore_snapshot,
+)
+from minecraft_tools.backup.store import BackupRepository
+from minecraft_tools.config import BackupConfig
+
+
+@pytest.fixture
+def world(tmp_path):
+    """Server data directory with a small world."""
+    data = tmp_path / "data"
+    region = data / "world" / "region"
+    region.mkdir(parents=True)
+    (region / "r.0.0.mca").write_bytes(os.urandom(CHUNK_SIZE * 4))
+    (region / "r.0.1.mca").write_bytes(os.urandom(CHUNK_SIZE + 100))
+    (data / "server.properties").write_text("motd=test\n")
+    (data / "empty.json").write_bytes(b"")
+    (data / "logs").mkdir()
+    (data / "logs" / "latest.log").write_text("log line\n")
+    return data
+
+
+@pytest.fixture
+def config(world, tmp_path):
+    """Backup configuration with the repository next to the world."""
+    return BackupConfig(repository=str(tmp_path / "backups"), source_dir=str(world))
+
+
+def rewrite_chunk(path, index):
+    """Overwrite one backup chunk of a file in place."""
+    with open(path, "r+b") as f:
+        f.seek(index * CHUNK_SIZE)
+        f.write(os.urandom(CHUNK_SIZE))
+
+
+class TestCreateSnapshot:
+    """Test creating snapshots."""
+
+    def test_first_snapshot_stores_everything(self, config):
+        """Test that a first snapshot reads and stores every file."""
+        snapshot_id, stats = create_snapshot(config)
+
+        manifest = BackupRepository(config.repository).load_manifest(snapshot_id)
+        assert sorted(manifest["files"]) == [
+            "empty.json",
+            "server.properties",
+            "world/region/r.0.0.mca",
+            "world/region/r.0.1.mca",
+        ]
+        assert manifest["files"]["empty.json"]["chunks"] == []
+        assert stats.changed_files == 4
+        assert stats.new_chunks == 4 + 2 + 1
+
+    def test_unchanged_files_are_not_read(self, config):
+        """Test that a snapshot without changes reads nothing."""
+        create_snapshot(config)
+
+        _, stats = create_snapshot(config)
+
+        assert stats.files == 4
+        assert stats.changed_files == 0
+        assert stats.read_bytes == 0
+        assert stats.new_chunks == 0
+
+    def test_only_changed_chunks_are_stored(self, config, world):
+        """Test that rewriting part of a region file stores just that part."""
+        create_snapshot(config)
+        rewrite_chunk(world / "world" / "region" / "r.0.0.mca", 2)
+
+        _, stats = create_snapshot(config)
+
+        assert stats.changed_files == 1
+        assert stats.read_bytes == CHUNK_SIZE * 4
+        assert stats.new_chunks == 1
+        assert stats.new_bytes == CHUNK_SIZE
+
+    def test_duplicate_content_stored_once(self, config, world):
+        """Test that identical chunks across files share storage."""
+        region = world / "world" / "region"
+        (region / "r.1.0.mca").write_bytes((region / "r.0.0.mca").read_bytes())
+
+        _, stats = create_snapshot(config)
+
+        assert stats.new_chunks == 4 + 2 + 1
+
+    def test_old_snapshots_are_pruned(self, config, world):
+        """Test that expired snapshots and their unique chunks are removed."""
+        config.keep = 1
+        region_file = world / "world" / "region" / "r.0.0.mca"
+        create_snapshot(config)
+        rewrite_chunk(region_file, 0)
+
+        snapshot_id, _ = create_snapshot(config)
+
+        repo = BackupRepository(config.repository)
+        assert repo.snapshot_ids() == [snapshot_id]
+        assert len(repo.chunk_digests()) == 4 + 2 + 1
+
+    def test_restore_round_trip(self, config, world, tmp_path):
+        """Test that a restored snapshot matches the original files."""
+        create_snapshot(config)
+        rewrite_chunk(world / "world" / "region" / "r.0.1.mca", 1)
+        snapshot_id, _ = create_snapshot(config)
+        target = tmp_path / "restored"
+
+        restore_snapshot(BackupRepository(config.repository), snapshot_id, target)
+
+        for rel in ("world/region/r.0.0.mca", "world/region/r.0.1.mca"):
+            assert (target / rel).read_bytes() == (world / rel).read_bytes()
+            assert (target / rel).stat().st_mtime_ns == (world / rel).stat().st_mtime_ns
+        assert (target / "empty.json").read_bytes() == b""
+
+    def test_restore_detects_corruption(self, config, tmp_path):
+        """Test that a damaged chunk fails the restore."""
+        snapshot_id, _ = create_snapshot(config)
+        repo = BackupRepository(config.repository)
+        digest = next(iter(repo.chunk_digests()))
+        repo.chunk_path(digest).write_bytes(b"garbage")
+
+        with pytest.raises(ValueError, match="corrupt"):
+            restore_snapshot(repo, snapshot_id, tmp_path / "restored")
+
+
+class TestIterFiles:
+    """Test selecting files to back up."""
+
+    def test_skips_excluded_paths_and_repository(self, world):
+        """Test that excluded directories and the repository are left out."""
+        repo = world / "mc-tools" / "backups"
+        repo.mkdir(parents=True)
+        (repo / "chunk").write_bytes(b"x")
+        (world / "mc-tools" / "timeline.db").write_bytes(b"x")
+
+        files = [rel for rel, _ in iter_files(world, ["logs"], skip=repo)]
+
+        assert "logs/latest.log" not in files
+        assert "mc-tools/backups/chunk" not in files
+        assert "mc-tools/timeline.db" in files
@@ -0,0 +1,156 @@
+"""Smoke tests for the benchmarks, with tiny workloads."""
+
+import pytest
+from benchmarks.__main__ import run_scenarios
+from benchmarks.bot_load import format_result, run_load
+from benchmarks.clock import VirtualClock
+from benchmarks.harness import (
+    CallCounter,
+    Measurement,
+    compare,
+    load_baselines,
+    measure,
+    save_baselines,
+)
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.simulator import START, Settings, Timings, Visit, World, patched
+
+
+class TestBotLoad:
+    """Test the load test of the bot's command handlers."""
+
+    def test_every_command_is_answered(self):
+        """Test a short run of the default command mix."""
+        result = run_load(rate=40, duration=0.25, aws_latency=0.001, seed=3)
+
+        assert result.errors == []
+        assert sum(c.count for c in result.commands) == result.sent > 0
+        assert "commands answered" in format_result(result)
+
+    def test_blocking_handler_shows_as_stall(self):
+        """Test that AWS calls made on the event loop delay the timer."""
+        result = run_load(
+            mix={"server-status": 1}, rate=10, duration=0.2, aws_latency=0.05
+        )
+
+        # server-status makes four AWS calls without leaving the loop
+        assert result.longest_stall >= 150
+        assert result.max_aws_in_flight == 1
+
+
+class TestVirtualClock:
+    """Test virtual time for the simulated threads."""
+
+    def test_waits_pass_in_virtual_time(self):
+        """Test that a thread waking every 10s runs until its event is set."""
+        clock = VirtualClock(0.0)
+        stop = clock.event()
+        wakeups = []
+
+        def worker():
+            while not stop.wait(10):
+                wakeups.append(clock.time())
+
+        clock.spawn("worker", worker)
+        clock.call_at(35, stop.set)
+        try:
+            clock.run_until(100)
+        finally:
+            clock.close()
+
+        assert wakeups == [10, 20, 30]
+        assert clock.time() == 100
+        assert clock.errors == []
+
+
+class TestSimulator:
+    """Test the lifecycle simulation step by step."""
+
+    @pytest.fixture
+    def world(self, tmp_path):
+        """A stopped service with the tools patched onto a virtual clock."""
+        clock = VirtualClock(START)
+        world = World(Settings(idle_threshold=600), Timings(), clock, str(tmp_path))
+        with world.rcon, patched(world):
+            yield world
+            clock.close()
+        assert clock.errors == []
+
+    def test_wake_and_idle_shutdown(self, world):
+        """Test that a player wakes the server and it stops once idle."""
+        clock = world.clock
+        visit = Visit("Steve", START + 60, [1800.0])
+        clock.call_at(visit.arrive, lambda: world.arrive(visit, clock.now))
+
+        clock.run_until(START + 59)
+        assert world.desired == 0
+        assert world.tasks == []
+
+        # /server-start scales the service up as the player arrives
+        clock.run_until(START + 61)
+        assert world.desired == 1
+        assert [t.status for t in world.tasks] == ["PROVISIONING"]
+
+        # The player joins once the task is up, booted and in DNS
+        clock.run_until(START + 60 + 1200)
+        assert world.online == {"Steve"}
+        [wait] = world.waits
+        left = START + 60 + wait + 1800
+
+        # Nobody online: the idle watcher scales down after the threshold
+        clock.run_until(left + 599)
+        assert world.online == set()
+        assert world.desired == 1
+        clock.run_until(left + 600 + world.settings.check_interval)
+        assert world.desired == 0
+        assert world.shutdown_lags == [pytest.approx(600, abs=30)]
+
+        clock.run_until(left + 700)
+        assert world.tasks == []
+        assert len(world.finished) == 1
+
+
+class TestHarness:
+    """Test the scenario harness with a single timed run each."""
+
+    def test_measure_counts_calls_of_one_run(self):
+        """Test that calls are taken from the extra run, not the timed ones."""
+        counter = CallCounter()
+        m = measure("op", lambda: counter.add("aws", 2), counter, repeat=2, warmup=0)
+        assert m.name == "op"
+        assert m.calls == {"aws": 2}
+        assert m.wall_ms >= 0
+        assert counter.snapshot() == {"aws": 6}
+
+    def test_compare_reports_regressions(self):
+        """Test that extra calls always regress and timings only past tolerance."""
+        baseline = {"wall_ms": 10.0, "alloc_kib": 100.0, "calls": {"aws": 2}}
+        within = Measurement("op", wall_ms=14.0, alloc_kib=120.0, calls={"aws": 2})
+        worse = Measurement("op", wall_ms=16.0, alloc_kib=130.0, calls={"aws": 3})
+
+        assert compare(within, baseline) == []
+        assert compare(worse, None) == []
+        assert compare(worse, baseline) == [
+            "aws calls 2 -> 3",
+            "wall time 10.0ms -> 16.0ms",
+            "allocations 100KiB -> 130KiB",
+        ]
+
+    def test_baselines_round_trip(self, tmp_path):
+        """Test that saved baselines load back keyed by scenario name."""
+        path = tmp_path / "baselines.json"
+        m = Measurement("op", wall_ms=1.5, alloc_kib=2.0, calls={"http": 1})
+        save_baselines([m], path)
+        assert load_baselines(path) == {
+            "op": {"wall_ms": 1.5, "alloc_kib": 2.0, "calls": {"http": 1}}
+        }
+        assert load_baselines(tmp_path / "missing.json") == {}
+
+    def test_scenarios_match_baseline_calls(self):
+        """Test that every scenario runs and makes its baseline's calls."""
+        baselines = load_baselines()
+        measurements = run_scenarios(list(SCENARIOS), repeat=1)
+
+        assert [m.name for m in measurements] == list(SCENARIOS)
+        for m in measurements:
+            assert m.calls == baselines[m.name]["calls"], m.name
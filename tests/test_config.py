@@ -3,9 +3,39 @@
 import os
 from unittest.mock import patch
 
+import boto3
 import pytest
+from moto import mock_aws
 
-from minecraft_tools.config import DiscordBotConfig, DNSUpdaterConfig, IdleWatcherConfig
+from minecraft_tools.config import (
+    BackupConfig,
+    DiscordBotConfig,
+    DNSRecordSpec,
+    DNSUpdaterConfig,
+    IdleWatcherConfig,
+    ParameterStoreSource,
+    SupervisorConfig,
+    WakeListenerConfig,
+)
+
+
+@pytest.fixture
+def ssm():
+    """SSM client backed by moto with a few tunables."""
+    with mock_aws():
+        client = boto3.client("ssm", region_name="eu-west-1")
+        client.put_parameter(
+            Name="/mc/config/idle_threshold", Value="900", Type="String"
+        )
+        client.put_parameter(
+            Name="/mc/config/check_interval", Value="60", Type="String"
+        )
+        client.put_parameter(
+            Name="/mc/config/idle-watcher/rcon_password",
+            Value="secret",
+            Type="SecureString",
+        )
+        yield client
 
 
 class TestDiscordBotConfig:
@@ -47,8 +77,11 @@ class TestDiscordBotConfig:
 
     def test_missing_token_raises_error(self):
         """Test error when token is missing."""
-        with patch.dict(os.environ, {}, clear=True), pytest.raises(
-            ValueError, match="DISCORD_TOKEN environment variable is required"
+        with (
+            patch.dict(os.environ, {}, clear=True),
+            pytest.raises(
+                ValueError, match="DISCORD_TOKEN environment variable is required"
+            ),
         ):
             DiscordBotConfig.from_env()
 
@@ -60,6 +93,24 @@ class TestDiscordBotConfig:
             ):
                 DiscordBotConfig.from_env()
 
+    def test_prewarm(self):
+        """Test pre-warming settings, off by default."""
+        env_vars = {
+            "DISCORD_TOKEN": "test_token",
+            "ECS_CLUSTER": "test_cluster",
+            "ECS_SERVICE": "test_service",
+        }
+        with patch.dict(os.environ, env_vars, clear=True):
+            assert DiscordBotConfig.from_env().prewarm_probability == 0
+
+        env_vars.update(PREWARM_PROBABILITY="0.6", PREWARM_MAX_PER_WEEK="3")
+        with patch.dict(os.environ, env_vars, clear=True):
+            config = DiscordBotConfig.from_env()
+
+        assert config.prewarm_probability == 0.6
+        assert config.prewarm_lead == 600
+        assert config.prewarm_max_per_week == 3
+
 
 class TestDNSUpdaterConfig:
     """Test DNS updater configuration."""
@@ -82,11 +133,40 @@ class TestDNSUpdaterConfig:
         assert config.record_name == "mc.example.com"
         assert config.ecs_cluster == "test_cluster"
         assert config.ecs_service == "test_service"
+        assert config.records == [DNSRecordSpec("mc.example.com", "A")]
+
+    def test_from_env_multiple_records(self):
+        """Test configuration with a list of managed records."""
+        env_vars = {
+            "CLOUDFLARE_TOKEN": "test_token",
+            "CLOUDFLARE_ZONE_ID": "test_zone",
+            "DNS_RECORD_NAME": "mc.example.com",
+            "DNS_RECORDS": "mc.example.com:A, be.example.com,_minecraft._tcp.example.com:srv",
+            "ECS_CLUSTER": "test_cluster",
+            "ECS_SERVICE": "test_service",
+        }
+
+        with patch.dict(os.environ, env_vars):
+            config = DNSUpdaterConfig.from_env()
+
+        assert config.records == [
+            DNSRecordSpec("mc.example.com", "A"),
+            DNSRecordSpec("be.example.com", "A"),
+            DNSRecordSpec("_minecraft._tcp.example.com", "SRV"),
+        ]
+
+    def test_unsupported_record_type_raises_error(self):
+        """Test error for record types the updater cannot manage."""
+        with pytest.raises(ValueError, match="Unsupported DNS record type: MX"):
+            DNSRecordSpec.parse("mc.example.com:MX")
 
     def test_missing_token_raises_error(self):
         """Test error when Cloudflare token is missing."""
-        with patch.dict(os.environ, {}, clear=True), pytest.raises(
-            ValueError, match="CLOUDFLARE_TOKEN environment variable is required"
+        with (
+            patch.dict(os.environ, {}, clear=True),
+            pytest.raises(
+                ValueError, match="CLOUDFLARE_TOKEN environment variable is required"
+            ),
         ):
             DNSUpdaterConfig.from_env()
 
@@ -135,11 +215,148 @@ class TestIdleWatcherConfig:
         assert config.dns_name == ""
         assert config.check_interval == 300
         assert config.idle_threshold == 600
+        assert config.backup is None
+        assert config.player_log == ""
+
+    def test_backup_enabled_by_repository(self):
+        """Test that setting a backup repository enables backups."""
+        env_vars = {
+            "ECS_CLUSTER": "test_cluster",
+            "ECS_SERVICE": "test_service",
+            "RCON_HOST": "mc.example.com",
+            "BACKUP_REPOSITORY": "/data/mc-tools/backups",
+            "BACKUP_EXCLUDE": "logs, /mc-tools/ ",
+        }
+
+        with patch.dict(os.environ, env_vars, clear=True):
+            config = IdleWatcherConfig.from_env()
+
+        assert config.backup == BackupConfig(
+            repository="/data/mc-tools/backups", exclude=["logs", "mc-tools"]
+        )
 
     def test_missing_host_raises_error(self):
         """Test error when RCON host is missing."""
         env_vars = {"ECS_CLUSTER": "test", "ECS_SERVICE": "test"}
-        with patch.dict(os.environ, env_vars, clear=True), pytest.raises(
-            ValueError, match="RCON_HOST environment variable is required"
+        with (
+            patch.dict(os.environ, env_vars, clear=True),
+            pytest.raises(
+                ValueError, match="RCON_HOST environment variable is required"
+            ),
         ):
             IdleWatcherConfig.from_env()
+
+
+class TestSupervisorConfig:
+    """Test supervisor configuration."""
+
+    def test_from_env_defaults_to_all_components(self):
+        """Test that every component runs unless configured otherwise."""
+        env_vars = {"ECS_CLUSTER": "test_cluster", "ECS_SERVICE": "test_service"}
+        with patch.dict(os.environ, env_vars, clear=True):
+            config = SupervisorConfig.from_env()
+
+        assert config.components == ["idle-watcher", "dns-updater"]
+        assert config.health_port == 0
+
+    def test_unknown_component_raises_error(self):
+        """Test error for a component name that does not exist."""
+        env_vars = {
+            "ECS_CLUSTER": "test",
+            "ECS_SERVICE": "test",
+            "SUPERVISOR_COMPONENTS": "idle-watcher,backup",
+        }
+        with (
+            patch.dict(os.environ, env_vars, clear=True),
+            pytest.raises(ValueError, match="Unknown supervisor component: backup"),
+        ):
+            SupervisorConfig.from_env()
+
+
+class TestParameterStoreSource:
+    """Test Parameter Store backed configuration."""
+
+    def count_calls(self, client):
+        calls = []
+        client.meta.events.register(
+            "before-call.ssm.GetParametersByPath", lambda **kw: calls.append(1)
+        )
+        return calls
+
+    def test_loads_all_parameters_in_one_listing(self, ssm):
+        """Test that every tool's parameters come from one cached listing."""
+        calls = self.count_calls(ssm)
+        source = ParameterStoreSource("/mc/config", ttl=300, ssm_client=ssm)
+
+        assert source.get("IDLE_THRESHOLD") == "900"
+        assert source.get("RCON_PASSWORD") == "secret"
+        assert source.get("CHECK_INTERVAL") == "60"
+        assert len(calls) == 1
+
+    def test_environment_is_the_fallback(self, ssm):
+        """Test that values missing from SSM come from the environment."""
+        source = ParameterStoreSource("/mc/config", ssm_client=ssm)
+
+        with patch.dict(os.environ, {"RCON_HOST": "localhost", "IDLE_THRESHOLD": "1"}):
+            assert source.get("RCON_HOST") == "localhost"
+            assert source.get("IDLE_THRESHOLD") == "900"
+        assert source.get("MISSING", "default") == "default"
+
+    def test_config_from_parameter_store(self, ssm):
+        """Test building a tool config from the parameter source."""
+        source = ParameterStoreSource("/mc/config", ssm_client=ssm)
+        env_vars = {"ECS_CLUSTER": "c", "ECS_SERVICE": "s", "RCON_HOST": "localhost"}
+
+        with patch.dict(os.environ, env_vars, clear=True):
+            config = IdleWatcherConfig.from_env(source)
+
+        assert config.idle_threshold == 900
+        assert config.check_interval == 60
+        assert config.rcon_password == "secret"
+
+    def test_refresh_picks_up_changed_tunables(self, ssm):
+        """Test live refresh once the cache expires."""
+        calls = self.count_calls(ssm)
+        source = ParameterStoreSource("/mc/config", ttl=0, ssm_client=ssm)
+        env_vars = {"ECS_CLUSTER": "c", "ECS_SERVICE": "s", "RCON_HOST": "localhost"}
+        with patch.dict(os.environ, env_vars, clear=True):
+            config = IdleWatcherConfig.from_env(source)
+
+        ssm.put_parameter(
+            Name="/mc/config/idle_threshold",
+            Value="1200",
+            Type="String",
+            Overwrite=True,
+        )
+        config.refresh()
+
+        assert config.idle_threshold == 1200
+        assert len(calls) == 2
+
+
+class TestWakeListenerConfig:
+    """Test wake listener configuration."""
+
+    def test_from_env(self):
+        """Test configuration with an allow list of players."""
+        env_vars = {
+            "ECS_CLUSTER": "test_cluster",
+            "ECS_SERVICE": "test_service",
+            "WAKE_PORT": "25566",
+            "WAKE_ALLOWED_PLAYERS": "Steve, Alex,",
+        }
+
+        with patch.dict(os.environ, env_vars, clear=True):
+            config = WakeListenerConfig.from_env()
+
+        assert config.port == 25566
+        assert config.start_estimate == 90.0
+        assert config.allowed_players == ["Steve", "Alex"]
+
+    def test_missing_service_raises_error(self):
+        """Test that the ECS service is required."""
+        with (
+            patch.dict(os.environ, {"ECS_CLUSTER": "test_cluster"}, clear=True),
+            pytest.raises(ValueError, match="ECS_SERVICE"),
+        ):
+            WakeListenerConfig.from_env()
@@ -1,9 +1,13 @@
 """Tests for Discord bot."""
+import threading
+
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
 
 from minecraft_tools.discord_bot.main import create_bot, get_service_status, update_service
 from minecraft_tools.config import DiscordBotConfig
+from minecraft_tools.health import HealthChecker, HealthServer
+from minecraft_tools.sessions import SessionStore, player_stats
 
 
 class TestDiscordBot:
@@ -101,3 +105,109 @@ class TestDiscordBot:
             
             # Should not raise an exception - error is handled gracefully
             await update_service(mock_interaction, mock_ecs, "test-cluster", "test-service", 1)
+
+
+class TestTimelineRecording:
+    """Test that milestones are written off the event loop."""
+
+    @pytest.fixture
+    def timeline(self):
+        """Timeline whose writes remember the thread they ran on."""
+        threads = []
+        timeline = MagicMock()
+        timeline.record.side_effect = lambda *_: threads.append(threading.get_ident())
+        timeline.record_task.side_effect = lambda *_: threads.append(
+            threading.get_ident()
+        )
+        with patch(
+            "minecraft_tools.discord_bot.main.get_timeline", return_value=timeline
+        ):
+            yield timeline, threads
+
+    @pytest.mark.asyncio
+    async def test_task_timestamps_recorded_in_thread(self, timeline):
+        """Test that task timestamps from a status check are written in a thread."""
+        timeline, threads = timeline
+        ecs = MagicMock()
+        ecs.describe_services.return_value = {
+            "services": [{"desiredCount": 1, "runningCount": 1}]
+        }
+        ecs.list_tasks.return_value = {"taskArns": ["task"]}
+        ecs.describe_tasks.return_value = {"tasks": [{"taskArn": "task"}]}
+
+        await get_service_status(ecs, MagicMock(), "cluster", "service")
+
+        timeline.record_task.assert_called_once_with({"taskArn": "task"})
+        assert threads and threading.get_ident() not in threads
+
+    @pytest.mark.asyncio
+    async def test_start_request_recorded_in_thread(self, timeline):
+        """Test that a start request is written in a thread."""
+        timeline, threads = timeline
+        interaction = AsyncMock()
+        interaction.user.name = "testuser"
+        interaction.user.discriminator = "1234"
+
+        with patch(
+            "minecraft_tools.discord_bot.main.get_service_status",
+            return_value={"desired": 0, "running": 0},
+        ), patch("minecraft_tools.discord_bot.main.boto3.client"):
+            await update_service(interaction, MagicMock(), "cluster", "service", 1)
+
+        timeline.record.assert_called_once_with("requested")
+        assert threads and threading.get_ident() not in threads
+
+
+class TestToolsStatistics:
+    """Test commands answered from the tools container's health server."""
+
+    def make_bot(self, tools_url):
+        config = DiscordBotConfig(
+            token="test_token",
+            ecs_cluster="test_cluster",
+            ecs_service="test_service",
+            tools_url=tools_url,
+        )
+        with patch("minecraft_tools.discord_bot.main.boto3.client"):
+            return create_bot(config)
+
+    async def invoke(self, bot, name):
+        interaction = AsyncMock()
+        await bot.tree.get_command(name).callback(interaction)
+        return interaction.response.send_message.call_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_server_stats(self, tmp_path):
+        """Test that /server-stats shows the statistics the tools serve."""
+        store = SessionStore(str(tmp_path / "sessions.db"))
+        store.observe(["Steve"], at=1_000.0)
+        store.observe(["Steve"], at=1_000.0 + 3600)
+        routes = {"/stats": lambda: player_stats(store, now=1_000.0 + 3600)}
+        server = HealthServer(
+            HealthChecker({}), port=0, host="127.0.0.1", routes=routes
+        ).start()
+        try:
+            bot = self.make_bot(f"http://127.0.0.1:{server.port}")
+            message = await self.invoke(bot, "server-stats")
+        finally:
+            server.stop()
+            store.close()
+
+        assert "Steve" in message
+        assert "1h 00m" in message
+
+    @pytest.mark.asyncio
+    async def test_server_stats_while_stopped(self):
+        """Test that an unreachable tools container is reported."""
+        bot = self.make_bot("http://127.0.0.1:9")
+
+        message = await self.invoke(bot, "server-stats")
+
+        assert "available while the server is running" in message
+
+    @pytest.mark.asyncio
+    async def test_server_stats_not_enabled(self):
+        """Test the answer without a tools URL."""
+        message = await self.invoke(self.make_bot(None), "server-stats")
+
+        assert "not enabled" in message
@@ -0,0 +1,37 @@
+"""Tests for candidate address probing."""
+
+import socket
+
+from minecraft_tools.dns_updater.probe import (
+    ProbeResult,
+    probe_candidates,
+    rank_healthy,
+)
+
+
+class TestProbeCandidates:
+    """Test TCP probing of task addresses."""
+
+    def test_probe_listening_and_closed_ports(self):
+        """Test that only a listening address is reported healthy."""
+        with socket.socket() as listener:
+            listener.bind(("127.0.0.1", 0))
+            listener.listen()
+            port = listener.getsockname()[1]
+
+            results = probe_candidates(["127.0.0.1", "127.0.0.2"], port, timeout=0.5)
+
+        assert results[0].healthy is True
+        assert results[0].latency is not None
+        assert results[1].healthy is False
+        assert results[1].error
+
+    def test_rank_healthy_orders_by_latency(self):
+        """Test that the fastest healthy address comes first."""
+        results = [
+            ProbeResult("1.1.1.1", True, 0.050),
+            ProbeResult("2.2.2.2", False, error="refused"),
+            ProbeResult("3.3.3.3", True, 0.010),
+        ]
+
+        assert rank_healthy(results) == ["3.3.3.3", "1.1.1.1"]
@@ -0,0 +1,102 @@
+"""Tests for DNS propagation verification."""
+
+import socket
+import struct
+import threading
+
+import pytest
+
+from minecraft_tools.dns_updater.propagation import (
+    build_query,
+    parse_a_answers,
+    parse_nameserver,
+    query_a_records,
+    wait_for_propagation,
+)
+
+
+class StubDNSServer:
+    """Minimal UDP nameserver answering A queries from a list of IPs."""
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.queries = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.1)
+        self.address = f"127.0.0.1:{self.sock.getsockname()[1]}"
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                data, addr = self.sock.recvfrom(512)
+            except TimeoutError:
+                continue
+            ip = self.answers[min(self.queries, len(self.answers) - 1)]
+            self.queries += 1
+            header = data[:2] + struct.pack(">HHHHH", 0x8400, 1, 1, 0, 0)
+            answer = b"\xc0\x0c" + struct.pack(">HHIH", 1, 1, 60, 4)
+            self.sock.sendto(header + data[12:] + answer + socket.inet_aton(ip), addr)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.sock.close()
+
+
+class TestDNSPackets:
+    """Test DNS packet handling."""
+
+    def test_parse_nameserver(self):
+        """Test host and port parsing."""
+        assert parse_nameserver("ns1.example.com") == ("ns1.example.com", 53)
+        assert parse_nameserver("127.0.0.1:5353") == ("127.0.0.1", 5353)
+
+    def test_parse_rejects_mismatched_id(self):
+        """Test that responses to other queries are rejected."""
+        query = build_query("mc.example.com", 1)
+        response = b"\x00\x02" + query[2:]
+
+        with pytest.raises(ValueError, match="does not match"):
+            parse_a_answers(response, 1)
+
+    def test_query_stub_server(self):
+        """Test querying a local nameserver."""
+        with StubDNSServer(["1.2.3.4"]) as server:
+            assert query_a_records(server.address, "mc.example.com") == ["1.2.3.4"]
+
+
+class TestWaitForPropagation:
+    """Test propagation polling."""
+
+    def test_waits_until_new_answer_is_seen(self):
+        """Test that latency is recorded once the new IP is served."""
+        with StubDNSServer(["1.2.3.4", "1.2.3.4", "5.6.7.8"]) as server:
+            result = wait_for_propagation(
+                "mc.example.com", "5.6.7.8", [server.address], interval=0.01
+            )
+
+        assert result.propagated is True
+        assert server.queries == 3
+        assert result.nameservers[server.address] is not None
+        assert result.latency >= 0
+
+    def test_times_out(self):
+        """Test that an unpropagated record is reported after the timeout."""
+        with StubDNSServer(["1.2.3.4"]) as server:
+            result = wait_for_propagation(
+                "mc.example.com",
+                "5.6.7.8",
+                [server.address],
+                timeout=0.05,
+                interval=0.01,
+            )
+
+        assert result.propagated is False
+        assert result.nameservers[server.address] is None
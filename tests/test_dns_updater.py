@@ -1,10 +1,39 @@
 """Tests for DNS updater."""
 
-from unittest.mock import MagicMock
+import json
+import threading
+from datetime import UTC, datetime
+from unittest.mock import MagicMock, patch
 
 import responses
 
-from minecraft_tools.dns_updater.main import CloudflareAPI, get_service_public_ips
+from minecraft_tools.config import DNSRecordSpec, DNSUpdaterConfig
+from minecraft_tools.dns_updater.main import (
+    CloudflareAPI,
+    build_desired_record,
+    choose_ttl,
+    diff_dns_records,
+    get_service_public_ips,
+    index_dns_records,
+    lower_dns_ttl,
+    reconcile_dns,
+    select_addresses,
+    update_dns_if_needed,
+)
+from minecraft_tools.dns_updater.probe import ProbeResult
+
+ZONE_URL = "https://api.cloudflare.com/client/v4/zones/test-zone/dns_records"
+
+
+def make_config(records=None):
+    return DNSUpdaterConfig(
+        cloudflare_token="test-token",
+        zone_id="test-zone",
+        record_name="mc.example.com",
+        ecs_cluster="test-cluster",
+        ecs_service="test-service",
+        records=records or [],
+    )
 
 
 class TestCloudflareAPI:
@@ -50,6 +79,128 @@ class TestCloudflareAPI:
 
         assert record is None
 
+    @responses.activate
+    def test_list_dns_records_follows_pagination(self):
+        """Test that every page of a large zone is fetched."""
+        for page in (1, 2):
+            responses.add(
+                responses.GET,
+                ZONE_URL,
+                match=[
+                    responses.matchers.query_param_matcher(
+                        {"per_page": "5000", "page": str(page)}
+                    )
+                ],
+                json={
+                    "success": True,
+                    "result": [
+                        {"id": f"r{page}", "name": f"h{page}.example.com", "type": "A"}
+                    ],
+                    "result_info": {"page": page, "total_pages": 2},
+                },
+            )
+
+        client = CloudflareAPI("test-token")
+        records = client.list_dns_records("test-zone")
+
+        assert [r["id"] for r in records] == ["r1", "r2"]
+
+    @responses.activate
+    def test_repeated_lookups_use_index(self):
+        """Test that lookups are answered from one zone listing."""
+        responses.add(
+            responses.GET,
+            ZONE_URL,
+            json={
+                "success": True,
+                "result": [
+                    {
+                        "id": "a",
+                        "name": "mc.example.com",
+                        "type": "A",
+                        "content": "1.2.3.4",
+                    },
+                    {
+                        "id": "b",
+                        "name": "be.example.com",
+                        "type": "A",
+                        "content": "1.2.3.4",
+                    },
+                    {
+                        "id": "c",
+                        "name": "mc.example.com",
+                        "type": "AAAA",
+                        "content": "::1",
+                    },
+                ],
+            },
+        )
+
+        client = CloudflareAPI("test-token")
+
+        assert client.get_dns_record("test-zone", "MC.example.com")["id"] == "a"
+        assert client.get_dns_record("test-zone", "be.example.com")["id"] == "b"
+        assert client.get_dns_record("test-zone", "mc.example.com", "AAAA")["id"] == "c"
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_index_refreshes_when_stale(self):
+        """Test that a stale index is reloaded."""
+        responses.add(responses.GET, ZONE_URL, json={"success": True, "result": []})
+
+        client = CloudflareAPI("test-token", index_ttl=0)
+        client.get_dns_record("test-zone", "mc.example.com")
+        client.get_dns_record("test-zone", "mc.example.com")
+
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_batch_result_updates_index(self):
+        """Test that written records are folded into the index."""
+        responses.add(
+            responses.GET,
+            ZONE_URL,
+            json={
+                "success": True,
+                "result": [
+                    {
+                        "id": "a",
+                        "name": "mc.example.com",
+                        "type": "A",
+                        "content": "1.2.3.4",
+                    }
+                ],
+            },
+        )
+        responses.add(
+            responses.POST,
+            f"{ZONE_URL}/batch",
+            json={
+                "success": True,
+                "result": {
+                    "patches": [
+                        {
+                            "id": "a",
+                            "name": "mc.example.com",
+                            "type": "A",
+                            "content": "5.6.7.8",
+                        }
+                    ]
+                },
+            },
+        )
+
+        client = CloudflareAPI("test-token")
+        client.get_dns_record("test-zone", "mc.example.com")
+        client.batch_dns_records(
+            "test-zone", {"patches": [{"id": "a", "content": "5.6.7.8"}]}
+        )
+
+        assert (
+            client.get_dns_record("test-zone", "mc.example.com")["content"] == "5.6.7.8"
+        )
+        assert len(responses.calls) == 2
+
     @responses.activate
     def test_update_dns_record_success(self):
         """Test successful DNS record update."""
@@ -61,10 +212,11 @@ class TestCloudflareAPI:
 
         client = CloudflareAPI("test-token")
         result = client.update_dns_record(
-            "test-zone", "record-123", "test.example.com", "5.6.7.8"
+            "test-zone", "record-123", "test.example.com", "5.6.7.8", ttl=60
         )
 
         assert result is True
+        assert json.loads(responses.calls[0].request.body)["ttl"] == 60
 
     @responses.activate
     def test_update_dns_record_failure(self):
@@ -77,7 +229,7 @@ class TestCloudflareAPI:
 
         client = CloudflareAPI("test-token")
         result = client.update_dns_record(
-            "test-zone", "record-123", "test.example.com", "5.6.7.8"
+            "test-zone", "record-123", "test.example.com", "5.6.7.8", ttl=60
         )
 
         assert result is False
@@ -165,3 +317,394 @@ class TestGetServicePublicIPs:
 
         ips = get_service_public_ips(mock_ecs, mock_ec2, "test-cluster", "test-service")
         assert ips == []
+
+
+class TestDiffDNSRecords:
+    """Test multi-record diffing."""
+
+    def test_only_changed_records_are_patched(self):
+        """Test that unchanged records are left alone."""
+        config = make_config(
+            [
+                DNSRecordSpec("mc.example.com", "A"),
+                DNSRecordSpec("bedrock.example.com", "A"),
+            ]
+        )
+        desired = [
+            build_desired_record(r, config, "5.6.7.8", 300) for r in config.records
+        ]
+        existing = [
+            {
+                "id": "a",
+                "name": "mc.example.com",
+                "type": "A",
+                "content": "1.2.3.4",
+                "ttl": 300,
+            },
+            {
+                "id": "b",
+                "name": "bedrock.example.com",
+                "type": "A",
+                "content": "5.6.7.8",
+                "ttl": 300,
+            },
+        ]
+
+        changes = diff_dns_records(desired, index_dns_records(existing))
+
+        assert list(changes) == ["patches"]
+        assert changes["patches"][0]["id"] == "a"
+        assert changes["patches"][0]["content"] == "5.6.7.8"
+
+    def test_missing_srv_record_is_created(self):
+        """Test that a missing SRV record is posted pointing at the hostname."""
+        config = make_config([DNSRecordSpec("_minecraft._tcp.example.com", "SRV")])
+        desired = [
+            build_desired_record(r, config, "5.6.7.8", 300) for r in config.records
+        ]
+
+        changes = diff_dns_records(desired, {})
+
+        assert changes["posts"][0]["data"]["target"] == "mc.example.com"
+        assert changes["posts"][0]["data"]["port"] == 25565
+
+    def test_no_changes(self):
+        """Test that an up to date zone produces an empty batch."""
+        config = make_config()
+        desired = [
+            build_desired_record(r, config, "1.2.3.4", 300) for r in config.records
+        ]
+        existing = [
+            {
+                "id": "a",
+                "name": "mc.example.com",
+                "type": "A",
+                "content": "1.2.3.4",
+                "ttl": 300,
+            }
+        ]
+
+        assert diff_dns_records(desired, index_dns_records(existing)) == {}
+
+
+class TestMultiValueRecords:
+    """Test publishing several addresses under one name."""
+
+    def test_surplus_records_are_deleted_and_missing_posted(self):
+        """Test that stale addresses are repointed or removed."""
+        config = make_config()
+        existing = [
+            {
+                "id": "a",
+                "name": "mc.example.com",
+                "type": "A",
+                "content": "1.1.1.1",
+                "ttl": 60,
+            },
+            {
+                "id": "b",
+                "name": "mc.example.com",
+                "type": "A",
+                "content": "2.2.2.2",
+                "ttl": 60,
+            },
+            {
+                "id": "c",
+                "name": "mc.example.com",
+                "type": "A",
+                "content": "9.9.9.9",
+                "ttl": 60,
+            },
+        ]
+        desired = [
+            build_desired_record(config.records[0], config, ip, 60)
+            for ip in ("2.2.2.2", "3.3.3.3")
+        ]
+
+        changes = diff_dns_records(desired, index_dns_records(existing))
+
+        assert changes["patches"] == [{"id": "a", **desired[1]}]
+        assert changes["deletes"] == [{"id": "c"}]
+        assert "posts" not in changes
+
+    @patch("minecraft_tools.dns_updater.main.probe_candidates")
+    def test_select_addresses_prefers_fastest_healthy(self, mock_probe):
+        """Test that dead tasks are skipped and the fastest one wins."""
+        mock_probe.return_value = [
+            ProbeResult("1.1.1.1", False, error="refused"),
+            ProbeResult("2.2.2.2", True, 0.030),
+            ProbeResult("3.3.3.3", True, 0.010),
+        ]
+        config = make_config()
+
+        assert select_addresses(config, ["1.1.1.1", "2.2.2.2", "3.3.3.3"]) == [
+            "3.3.3.3"
+        ]
+        config.max_addresses = 3
+        assert select_addresses(config, ["1.1.1.1", "2.2.2.2", "3.3.3.3"]) == [
+            "3.3.3.3",
+            "2.2.2.2",
+        ]
+
+    @patch("minecraft_tools.dns_updater.main.probe_candidates")
+    def test_select_addresses_falls_back_when_none_answer(self, mock_probe):
+        """Test that booting tasks are still published when none answer."""
+        mock_probe.return_value = [
+            ProbeResult("1.1.1.1", False, error="refused"),
+            ProbeResult("2.2.2.2", False, error="refused"),
+        ]
+
+        assert select_addresses(make_config(), ["1.1.1.1", "2.2.2.2"]) == ["1.1.1.1"]
+
+    @patch("minecraft_tools.dns_updater.main.probe_candidates")
+    def test_single_candidate_is_not_probed(self, mock_probe):
+        """Test that a single task is published without probing."""
+        assert select_addresses(make_config(), ["1.1.1.1"]) == ["1.1.1.1"]
+        mock_probe.assert_not_called()
+
+
+class TestChooseTTL:
+    """Test lifecycle-based TTL selection."""
+
+    NOW = 1_700_000_000.0
+
+    def record(self, content="1.2.3.4", ttl=60, age=0):
+        modified = datetime.fromtimestamp(self.NOW - age, tz=UTC)
+        return {"content": content, "ttl": ttl, "modified_on": modified.isoformat()}
+
+    def test_new_ip_gets_low_ttl(self):
+        """Test that a changed IP is published with the low TTL."""
+        config = make_config()
+        current = self.record(content="1.2.3.4", ttl=300, age=86400)
+
+        assert choose_ttl(config, current, "5.6.7.8", self.NOW) == config.ttl_low
+        assert choose_ttl(config, None, "5.6.7.8", self.NOW) == config.ttl_low
+
+    def test_recent_ip_keeps_low_ttl(self):
+        """Test that an unstable IP keeps the low TTL."""
+        config = make_config()
+        current = self.record(age=config.ttl_stable_after - 1)
+
+        assert choose_ttl(config, current, "1.2.3.4", self.NOW) == config.ttl_low
+
+    def test_stable_ip_gets_high_ttl(self):
+        """Test that the TTL is raised once the IP has been stable."""
+        config = make_config()
+        current = self.record(age=config.ttl_stable_after)
+
+        assert choose_ttl(config, current, "1.2.3.4", self.NOW) == config.ttl_high
+
+    def test_high_ttl_is_kept(self):
+        """Test that raising the TTL does not restart the stability window."""
+        config = make_config()
+        current = self.record(ttl=config.ttl_high, age=0)
+
+        assert choose_ttl(config, current, "1.2.3.4", self.NOW) == config.ttl_high
+
+    @responses.activate
+    def test_lower_dns_ttl_on_stop(self):
+        """Test that A records drop to the low TTL when the server stops."""
+        responses.add(
+            responses.GET,
+            ZONE_URL,
+            json={
+                "success": True,
+                "result": [
+                    {
+                        "id": "a",
+                        "name": "mc.example.com",
+                        "type": "A",
+                        "content": "1.2.3.4",
+                        "ttl": 300,
+                    }
+                ],
+            },
+        )
+        responses.add(responses.POST, f"{ZONE_URL}/batch", json={"success": True})
+
+        config = make_config()
+        lower_dns_ttl(config, CloudflareAPI("test-token"))
+
+        body = json.loads(responses.calls[1].request.body)
+        assert body["patches"][0]["id"] == "a"
+        assert body["patches"][0]["content"] == "1.2.3.4"
+        assert body["patches"][0]["ttl"] == config.ttl_low
+
+    @responses.activate
+    def test_lower_dns_ttl_keeps_every_address(self):
+        """Test that lowering the TTL patches each record and deletes none."""
+        records = [
+            {
+                "id": record_id,
+                "name": "mc.example.com",
+                "type": "A",
+                "content": content,
+                "ttl": 300,
+            }
+            for record_id, content in [("a", "1.2.3.4"), ("b", "5.6.7.8")]
+        ]
+        responses.add(
+            responses.GET, ZONE_URL, json={"success": True, "result": records}
+        )
+        responses.add(responses.POST, f"{ZONE_URL}/batch", json={"success": True})
+
+        config = make_config()
+        lower_dns_ttl(config, CloudflareAPI("test-token"))
+
+        body = json.loads(responses.calls[1].request.body)
+        assert "deletes" not in body
+        assert [(p["id"], p["content"], p["ttl"]) for p in body["patches"]] == [
+            ("a", "1.2.3.4", config.ttl_low),
+            ("b", "5.6.7.8", config.ttl_low),
+        ]
+
+    @responses.activate
+    def test_lower_dns_ttl_already_low(self):
+        """Test that records already at the low TTL are left alone."""
+        config = make_config()
+        responses.add(
+            responses.GET,
+            ZONE_URL,
+            json={
+                "success": True,
+                "result": [
+                    {
+                        "id": "a",
+                        "name": "mc.example.com",
+                        "type": "A",
+                        "content": "1.2.3.4",
+                        "ttl": config.ttl_low,
+                    }
+                ],
+            },
+        )
+
+        lower_dns_ttl(config, CloudflareAPI("test-token"))
+
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    @patch("minecraft_tools.dns_updater.main.CloudflareAPI")
+    def test_stopped_service_points_at_sleep_address(self, mock_cloudflare):
+        """Test that stopping repoints A records at the wake listener."""
+        records = [
+            {
+                "id": record_id,
+                "name": "mc.example.com",
+                "type": "A",
+                "content": content,
+                "ttl": 300,
+            }
+            for record_id, content in [("a", "1.2.3.4"), ("b", "5.6.7.8")]
+        ]
+        responses.add(
+            responses.GET, ZONE_URL, json={"success": True, "result": records}
+        )
+        responses.add(responses.POST, f"{ZONE_URL}/batch", json={"success": True})
+        mock_cloudflare.return_value = CloudflareAPI("test-token")
+
+        config = make_config(
+            [
+                DNSRecordSpec("mc.example.com", "A"),
+                DNSRecordSpec("_minecraft._tcp.example.com", "SRV"),
+            ]
+        )
+        config.sleep_address = "9.9.9.9"
+        stopped = threading.Event()
+        stopped.set()
+        ecs = MagicMock()
+        reconcile_dns(config, stopped, ecs, MagicMock())
+
+        ecs.list_tasks.assert_not_called()
+        body = json.loads(responses.calls[1].request.body)
+        assert body["patches"] == [
+            {
+                "id": "a",
+                "type": "A",
+                "name": "mc.example.com",
+                "content": "9.9.9.9",
+                "ttl": config.ttl_low,
+            }
+        ]
+        assert body["deletes"] == [{"id": "b"}]
+        assert "posts" not in body
+
+
+class TestUpdateDNSIfNeeded:
+    """Test the DNS update flow."""
+
+    @responses.activate
+    @patch("minecraft_tools.dns_updater.main.get_service_public_ips")
+    @patch("minecraft_tools.dns_updater.main.create_client")
+    def test_batches_changes_in_single_request(self, mock_create_client, mock_get_ips):
+        """Test that several records cost one listing and one batch call."""
+        mock_get_ips.return_value = ["5.6.7.8"]
+        responses.add(
+            responses.GET,
+            ZONE_URL,
+            json={
+                "success": True,
+                "result": [
+                    {
+                        "id": "a",
+                        "name": "mc.example.com",
+                        "type": "A",
+                        "content": "1.2.3.4",
+                    },
+                    {
+                        "id": "b",
+                        "name": "be.example.com",
+                        "type": "A",
+                        "content": "1.2.3.4",
+                    },
+                ],
+            },
+        )
+        responses.add(responses.POST, f"{ZONE_URL}/batch", json={"success": True})
+
+        config = make_config(
+            [
+                DNSRecordSpec("mc.example.com", "A"),
+                DNSRecordSpec("be.example.com", "A"),
+                DNSRecordSpec("_minecraft._tcp.example.com", "SRV"),
+            ]
+        )
+        update_dns_if_needed(config)
+
+        assert len(responses.calls) == 2
+        body = json.loads(responses.calls[1].request.body)
+        assert {p["id"] for p in body["patches"]} == {"a", "b"}
+        assert len(body["posts"]) == 1
+
+    @responses.activate
+    @patch("minecraft_tools.dns_updater.main.send_discord_message")
+    @patch("minecraft_tools.dns_updater.main.wait_for_propagation")
+    @patch("minecraft_tools.dns_updater.main.get_service_public_ips")
+    @patch("minecraft_tools.dns_updater.main.create_client")
+    def test_verifies_propagation_after_update(
+        self, mock_create_client, mock_get_ips, mock_wait, mock_discord
+    ):
+        """Test that updated A records are verified against zone nameservers."""
+        mock_get_ips.return_value = ["5.6.7.8"]
+        mock_wait.return_value = MagicMock(
+            propagated=True, latency=4.2, nameservers={"ns1.example.com": 4.2}
+        )
+        responses.add(responses.GET, ZONE_URL, json={"success": True, "result": []})
+        responses.add(responses.POST, f"{ZONE_URL}/batch", json={"success": True})
+        responses.add(
+            responses.GET,
+            "https://api.cloudflare.com/client/v4/zones/test-zone",
+            json={"success": True, "result": {"name_servers": ["ns1.example.com"]}},
+        )
+
+        config = make_config()
+        config.verify_propagation = True
+        config.discord_webhook = "https://discord.example/webhook"
+        update_dns_if_needed(config)
+
+        assert mock_wait.call_args.args[:3] == (
+            "mc.example.com",
+            "5.6.7.8",
+            ["ns1.example.com"],
+        )
+        assert "4.2s" in mock_discord.call_args.args[1]
@@ -0,0 +1,170 @@
+"""Tests for the uptime-vs-playtime report."""
+
+from datetime import UTC, date, datetime
+
+import pytest
+
+from minecraft_tools.efficiency import (
+    IdleStretches,
+    build_state,
+    daily_stats,
+    empty_stretches,
+    main,
+    recommend_threshold,
+    report,
+    service_event_intervals,
+)
+from minecraft_tools.sessions import SessionStore
+
+DAY = datetime(2026, 10, 12, tzinfo=UTC).timestamp()
+HOUR = 3600
+MINUTE = 60
+
+
+def at(hours):
+    """Timestamp some hours into the first day."""
+    return DAY + hours * HOUR
+
+
+def event(hours, message):
+    """ECS service event."""
+    return {
+        "createdAt": datetime.fromtimestamp(at(hours), UTC),
+        "message": f"(service minecraft) {message}",
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Session store with an evening of play and an idle shutdown."""
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    for minute in range(0, 181, 5):
+        store.record_uptime(at(18) + minute * MINUTE)
+    store.observe(["Steve"], at=at(18.5))
+    store.observe([], at=at(19))
+    store.observe(["Steve"], at=at(20))
+    store.observe([], at=at(20.75))
+    store.record_idle_shutdown(at(21))
+    yield store
+    store.close()
+
+
+class TestServiceEvents:
+    """Test reading task runs from ECS service events."""
+
+    def test_started_and_stopped(self):
+        """Test pairing starts and stops, newest event first as ECS lists them."""
+        events = [
+            event(12, "has reached a steady state."),
+            event(11, "has stopped 1 running tasks: (task def)."),
+            event(9, "has started 1 tasks: (task def)."),
+            event(8, "has stopped 1 running tasks: (task abc)."),
+        ]
+
+        assert service_event_intervals(events, now=at(13)) == [(at(9), at(11))]
+
+    def test_task_still_running(self):
+        """Test that a task without a stop event runs until now."""
+        events = [event(9, "has started 1 tasks: (task abc).")]
+
+        assert service_event_intervals(events, now=at(13)) == [(at(9), at(13))]
+
+
+class TestStateMap:
+    """Test the per-minute aggregation."""
+
+    def test_daily_stats_split_at_midnight(self):
+        """Test billed and played minutes of a run past midnight."""
+        state, origin = build_state(
+            DAY, DAY + 2 * 86400, [(at(23), at(25))], [(at(23.5), at(24.5))]
+        )
+
+        days = daily_stats(state, origin, [(at(23), at(25), at(25))])
+
+        assert [(d.day, d.billed, d.played) for d in days] == [
+            (date(2026, 10, 12), 60, 30),
+            (date(2026, 10, 13), 60, 30),
+        ]
+        assert (days[0].starts, days[1].idle_shutdowns) == (1, 1)
+        assert days[0].efficiency == 0.5
+
+    def test_partial_minutes_count(self):
+        """Test that minutes are rounded out to include partial ones."""
+        state, _ = build_state(DAY, DAY + HOUR, [(DAY + 30, DAY + 90)], [])
+
+        assert state.count(1) == 2
+
+    def test_empty_stretches(self):
+        """Test finding empty stretches and whether somebody came back."""
+        state, _ = build_state(DAY, at(4), [(at(0), at(3))], [(at(1), at(2))])
+
+        assert empty_stretches(state) == [(60, True), (60, False)]
+
+
+class TestRecommendation:
+    """Test recommending an idle threshold."""
+
+    def test_cost(self):
+        """Test idle minutes and restarts for a threshold."""
+        stretches = IdleStretches([(5, True), (40, True), (20, False), (3, False)])
+
+        assert stretches.cost(10, restart_cost=3) == (5 + 13 + 10 + 3, 1)
+        assert stretches.cost(60, restart_cost=3) == (5 + 40 + 20 + 3, 0)
+
+    def test_players_returning_after_short_breaks(self):
+        """Test that a threshold just above the usual break is recommended."""
+        stretches = IdleStretches([(8, True)] * 10 + [(45, False)] * 5)
+
+        recommendation = recommend_threshold(stretches, current=15, restart_cost=3)
+
+        assert recommendation.threshold == 8
+        assert recommendation.restarts == 0
+        assert recommendation.idle_minutes < recommendation.current_idle_minutes
+
+    def test_rare_long_break_not_waited_out(self):
+        """Test that the odd long break does not stretch the threshold."""
+        stretches = IdleStretches([(2, True)] * 9 + [(50, True)])
+
+        recommendation = recommend_threshold(stretches, 15, restart_cost=3)
+
+        assert (recommendation.threshold, recommendation.restarts) == (2, 1)
+
+    def test_no_breaks_keeps_current(self):
+        """Test that without returning players the threshold is kept."""
+        stretches = IdleStretches([(15, False)])
+
+        assert recommend_threshold(stretches, 15, restart_cost=3).threshold == 15
+
+
+class TestReport:
+    """Test the report over a session store."""
+
+    def test_report(self, store):
+        """Test combining runs, sessions and ECS events."""
+        events = [
+            event(21, "has stopped 1 running tasks: (task abc)."),
+            event(17.9, "has started 1 tasks: (task abc)."),
+        ]
+
+        [day], recommendation = report(
+            store,
+            days=1,
+            current_threshold=15,
+            restart_cost=3,
+            events=events,
+            now=at(24),
+        )
+
+        assert (day.billed, day.played) == (186, 75)
+        assert (day.starts, day.idle_shutdowns) == (1, 1)
+        assert recommendation.current_threshold == 15
+
+    def test_cli(self, store, capsys, monkeypatch):
+        """Test the command line report."""
+        monkeypatch.delenv("TIMELINE_DB", raising=False)
+
+        main(["--db", store.path, "--days", "36500", "--no-ecs"])
+
+        out = capsys.readouterr().out
+        assert "2026-10-12" in out
+        assert "(recommended)" in out
@@ -1,10 +1,20 @@
 """Tests for health check module."""
 
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
 from unittest.mock import MagicMock, patch
 
 from botocore.exceptions import ClientError
 
-from minecraft_tools.health import check_aws_connectivity, check_ecs_service
+from minecraft_tools.health import (
+    HealthChecker,
+    HealthServer,
+    check_aws_connectivity,
+    check_ecs_service,
+)
 
 
 class TestCheckAWSConnectivity:
@@ -23,23 +33,30 @@ class TestCheckAWSConnectivity:
         result = check_aws_connectivity()
 
         assert result["status"] == "healthy"
-        assert result["account"] == "123456789012"
-        assert result["user_id"] == "AIDACKCEVSQ6C2EXAMPLE"
+        assert result["latency_ms"] >= 0
+        # Served over the network, so the caller identity stays out
+        assert "123456789012" not in json.dumps(result)
+        assert "AIDACKCEVSQ6C2EXAMPLE" not in json.dumps(result)
 
     @patch("boto3.client")
     def test_check_aws_connectivity_failure(self, mock_boto_client):
         """Test AWS connectivity check failure."""
         mock_sts = MagicMock()
         mock_sts.get_caller_identity.side_effect = ClientError(
-            {"Error": {"Code": "AccessDenied", "Message": "Access denied"}},
+            {
+                "Error": {
+                    "Code": "AccessDenied",
+                    "Message": "User: arn:aws:sts::123456789012:assumed-role/x "
+                    "is not authorized",
+                }
+            },
             "GetCallerIdentity",
         )
         mock_boto_client.return_value = mock_sts
 
         result = check_aws_connectivity()
 
-        assert result["status"] == "unhealthy"
-        assert "error" in result
+        assert result == {"status": "unhealthy", "error": "AccessDenied"}
 
 
 class TestCheckECSService:
@@ -90,5 +107,151 @@ class TestCheckECSService:
 
         result = check_ecs_service("test-cluster", "test-service")
 
+        assert result == {"status": "unhealthy", "error": "ClusterNotFoundException"}
+
+
+class TestHealthChecker:
+    """Test parallel, cached health checks."""
+
+    def test_results_are_cached(self):
+        """Test that checks are not rerun within the cache window."""
+        check = MagicMock(return_value={"status": "healthy"})
+        checker = HealthChecker({"aws": check}, cache_ttl=60)
+
+        assert checker.run()["status"] == "healthy"
+        assert checker.run()["status"] == "healthy"
+        assert check.call_count == 1
+
+    def test_checks_run_in_parallel(self):
+        """Test that slow checks do not add up."""
+
+        def slow():
+            time.sleep(0.2)
+            return {"status": "healthy"}
+
+        checker = HealthChecker({"a": slow, "b": slow, "c": slow}, cache_ttl=0)
+
+        started = time.monotonic()
+        result = checker.run()
+
+        assert result["status"] == "healthy"
+        assert time.monotonic() - started < 0.5
+
+    def test_timeout_and_errors_mark_unhealthy(self):
+        """Test that hanging and failing checks are reported unhealthy."""
+        release = threading.Event()
+
+        def hang():
+            release.wait()
+            return {"status": "healthy"}
+
+        def fail():
+            raise RuntimeError("boom")
+
+        checker = HealthChecker({"hang": hang, "fail": fail}, timeout=0.05)
+        result = checker.run()
+        release.set()
+
         assert result["status"] == "unhealthy"
-        assert "error" in result
+        assert "Timed out" in result["checks"]["hang"]["error"]
+        assert result["checks"]["fail"]["error"] == "boom"
+
+    def test_each_check_gets_its_own_timeout(self):
+        """Test that a check still running from an earlier run is not waited on again."""
+        release = threading.Event()
+
+        def hang():
+            release.wait()
+            return {"status": "healthy"}
+
+        checker = HealthChecker({"hang": hang}, cache_ttl=0, timeout=0.2)
+        try:
+            checker.run()
+            time.sleep(0.2)
+            started = time.monotonic()
+            result = checker.run()
+            elapsed = time.monotonic() - started
+        finally:
+            release.set()
+
+        assert "Timed out" in result["checks"]["hang"]["error"]
+        assert elapsed < 0.1
+
+    def test_stale_result_served_during_refresh(self):
+        """Test that callers are not blocked while another refreshes."""
+        started = threading.Event()
+        release = threading.Event()
+        status = {"status": "healthy"}
+
+        def check():
+            started.set()
+            release.wait()
+            return status
+
+        checker = HealthChecker({"ecs": check}, cache_ttl=0, timeout=5)
+        release.set()
+        first = checker.run()
+
+        started.clear()
+        release.clear()
+        status = {"status": "unhealthy"}
+        refresh = threading.Thread(target=checker.run)
+        refresh.start()
+        try:
+            assert started.wait(1)
+            begun = time.monotonic()
+            assert checker.run() is first
+            assert time.monotonic() - begun < 0.1
+        finally:
+            release.set()
+            refresh.join()
+
+        assert checker.run()["status"] == "unhealthy"
+
+
+class TestHealthServer:
+    """Test the embedded health endpoints."""
+
+    def get(self, server, path):
+        url = f"http://127.0.0.1:{server.port}{path}"
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def test_livez_and_readyz(self):
+        """Test liveness and readiness responses."""
+        status = {"status": "healthy"}
+        checker = HealthChecker({"ecs": lambda: status}, cache_ttl=0)
+        server = HealthServer(checker, port=0, host="127.0.0.1").start()
+        try:
+            assert self.get(server, "/livez") == (200, {"status": "alive"})
+            assert self.get(server, "/readyz")[0] == 200
+
+            status = {"status": "unhealthy", "error": "down"}
+            code, body = self.get(server, "/readyz")
+            assert code == 503
+            assert body["checks"]["ecs"]["error"] == "down"
+        finally:
+            server.stop()
+
+    def test_extra_routes(self):
+        """Test that extra routes serve their JSON documents."""
+
+        def fail():
+            raise RuntimeError("database is locked")
+
+        checker = HealthChecker({}, cache_ttl=0)
+        routes = {"/stats": lambda: {"players": 2}, "/broken": fail}
+        server = HealthServer(checker, port=0, host="127.0.0.1", routes=routes)
+        server.start()
+        try:
+            assert self.get(server, "/stats") == (200, {"players": 2})
+            assert self.get(server, "/broken") == (
+                500,
+                {"error": "database is locked"},
+            )
+            assert self.get(server, "/missing")[0] == 404
+        finally:
+            server.stop()
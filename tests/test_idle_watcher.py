@@ -1,53 +1,70 @@
 """Tests for idle watcher."""
 
+import os
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
+import pytest
+
+from minecraft_tools.config import BackupConfig, IdleWatcherConfig
 from minecraft_tools.idle_watcher.main import (
+    backup_world,
+    follow_players,
     get_player_count,
     get_service_status,
+    handle_termination,
     scale_service,
 )
+from minecraft_tools.idle_watcher.players import (
+    LogTailer,
+    PlayerTracker,
+    parse_log_line,
+    parse_player_list,
+)
+from minecraft_tools.idle_watcher.shutdown import ShutdownStep, run_steps
+from minecraft_tools.sessions import configure_sessions
 
 
 class TestIdleWatcher:
     """Test idle watcher functionality."""
 
-    @patch("minecraft_tools.idle_watcher.main.MCRcon")
-    def test_get_player_count_success(self, mock_mcrcon):
+    @patch("minecraft_tools.idle_watcher.main.RconClient")
+    def test_get_player_count_success(self, mock_rcon):
         """Test successful player count retrieval."""
-        mock_mcr = MagicMock()
-        mock_mcr.command.return_value = (
+        mock_conn = MagicMock()
+        mock_conn.command.return_value = (
             "There are 2 of a max of 20 players online: Player1, Player2"
         )
-        mock_mcrcon.return_value.__enter__.return_value = mock_mcr
+        mock_rcon.return_value.__enter__.return_value = mock_conn
 
         count = get_player_count("localhost", 25575, "password")
         assert count == 2
 
-    @patch("minecraft_tools.idle_watcher.main.MCRcon")
-    def test_get_player_count_no_players(self, mock_mcrcon):
+    @patch("minecraft_tools.idle_watcher.main.RconClient")
+    def test_get_player_count_no_players(self, mock_rcon):
         """Test player count when no players online."""
-        mock_mcr = MagicMock()
-        mock_mcr.command.return_value = "There are 0 of a max of 20 players online:"
-        mock_mcrcon.return_value.__enter__.return_value = mock_mcr
+        mock_conn = MagicMock()
+        mock_conn.command.return_value = "There are 0 of a max of 20 players online:"
+        mock_rcon.return_value.__enter__.return_value = mock_conn
 
         count = get_player_count("localhost", 25575, "password")
         assert count == 0
 
-    @patch("minecraft_tools.idle_watcher.main.MCRcon")
-    def test_get_player_count_connection_error(self, mock_mcrcon):
+    @patch("minecraft_tools.idle_watcher.main.RconClient")
+    def test_get_player_count_connection_error(self, mock_rcon):
         """Test player count when connection fails."""
-        mock_mcrcon.side_effect = Exception("Connection refused")
+        mock_rcon.side_effect = Exception("Connection refused")
 
         count = get_player_count("localhost", 25575, "password")
         assert count == -1
 
-    @patch("minecraft_tools.idle_watcher.main.MCRcon")
-    def test_get_player_count_invalid_response(self, mock_mcrcon):
+    @patch("minecraft_tools.idle_watcher.main.RconClient")
+    def test_get_player_count_invalid_response(self, mock_rcon):
         """Test player count with invalid response format."""
-        mock_mcr = MagicMock()
-        mock_mcr.command.return_value = "Invalid response format"
-        mock_mcrcon.return_value.__enter__.return_value = mock_mcr
+        mock_conn = MagicMock()
+        mock_conn.command.return_value = "Invalid response format"
+        mock_rcon.return_value.__enter__.return_value = mock_conn
 
         count = get_player_count("localhost", 25575, "password")
         assert count == 0  # Returns 0 for invalid format, not -1
@@ -83,3 +100,324 @@ class TestIdleWatcher:
         result = scale_service(mock_ecs, "test-cluster", "test-service", 0)
 
         assert result is False
+
+
+class TestBackupWorld:
+    """Test the backup taken before an idle shutdown."""
+
+    def make_config(self, tmp_path):
+        return IdleWatcherConfig(
+            ecs_cluster="cluster",
+            ecs_service="service",
+            rcon_host="localhost",
+            backup=BackupConfig(repository=str(tmp_path)),
+        )
+
+    @patch("minecraft_tools.idle_watcher.main.create_snapshot")
+    @patch("minecraft_tools.idle_watcher.main.RconClient")
+    def test_saving_paused_during_backup(self, mock_rcon, mock_snapshot, tmp_path):
+        """Test that the world is flushed and saving resumed around the backup."""
+        conn = mock_rcon.return_value.__enter__.return_value
+        conn.commands.side_effect = lambda commands: calls.extend(commands)
+        conn.command.side_effect = lambda command: calls.append(command)
+        mock_snapshot.side_effect = lambda config: calls.append("snapshot")
+        calls = []
+
+        backup_world(self.make_config(tmp_path))
+
+        assert calls == ["save-off", "save-all flush", "snapshot", "save-on"]
+
+    @patch("minecraft_tools.idle_watcher.main.create_snapshot")
+    @patch("minecraft_tools.idle_watcher.main.RconClient")
+    def test_failure_does_not_block_shutdown(self, mock_rcon, mock_snapshot, tmp_path):
+        """Test that a failed backup is logged instead of raised."""
+        conn = mock_rcon.return_value.__enter__.return_value
+        mock_snapshot.side_effect = OSError("No space left on device")
+
+        backup_world(self.make_config(tmp_path))
+
+        conn.command.assert_called_with("save-on")
+
+    @patch("minecraft_tools.idle_watcher.main.RconClient")
+    def test_disabled_without_repository(self, mock_rcon):
+        """Test that nothing happens when backups are not configured."""
+        backup_world(IdleWatcherConfig(ecs_cluster="c", ecs_service="s", rcon_host="h"))
+
+        mock_rcon.assert_not_called()
+
+
+class TestPlayerLog:
+    """Test following players in the server log."""
+
+    def test_parse_log_line(self):
+        """Test parsing Paper and vanilla join and leave lines."""
+        joined = parse_log_line("[12:00:00 INFO]: Steve joined the game\n", 5.0)
+        left = parse_log_line("[12:00:00] [Server thread/INFO]: Alex_2 left the game")
+
+        assert (joined.player, joined.joined, joined.at) == ("Steve", True, 5.0)
+        assert (left.player, left.joined) == ("Alex_2", False)
+        assert parse_log_line("[12:00:00 INFO]: <Steve> Bob joined the game") is None
+        assert parse_log_line("[12:00:00 INFO]: Done (3.2s)!") is None
+
+    def test_parse_bedrock_player(self):
+        """Test that Floodgate's prefixed Bedrock names are followed too."""
+        joined = parse_log_line("[12:00:00 INFO]: .Steve joined the game")
+        left = parse_log_line("[12:00:00] [Server thread/INFO]: *Alex_2 left the game")
+
+        assert (joined.player, joined.joined) == (".Steve", True)
+        assert (left.player, left.joined) == ("*Alex_2", False)
+        assert parse_log_line("[12:00:00 INFO]: <.Steve> ]: .Bob left the game") is None
+
+    def test_chat_cannot_spoof_events(self):
+        """Test that chat messages quoting a join or leave line are ignored."""
+        spoofs = [
+            "[12:00:00 INFO]: <Steve> ]: Bob left the game",
+            "[12:00:00] [Async Chat Thread - #0/INFO]: <Steve> ]: Bob joined the game",
+            "[12:00:00] [Server thread/INFO]: <Steve> ]: Bob left the game",
+            "[12:00:00] [Server thread/INFO]: [Steve] ]: Bob left the game",
+            "[12:00:00] [Server thread/INFO]: * Steve ]: Bob left the game",
+        ]
+
+        assert [parse_log_line(line) for line in spoofs] == [None] * len(spoofs)
+
+    def test_parse_player_list(self):
+        """Test reading names from the RCON list response."""
+        response = "There are 2 of a max of 20 players online: Steve, Alex"
+
+        assert parse_player_list(response) == ["Steve", "Alex"]
+        assert parse_player_list("There are 0 of a max of 20 players online:") == []
+        assert parse_player_list("Unknown command") is None
+
+    def test_tailer_reads_only_new_complete_lines(self, tmp_path):
+        """Test that each line is returned once, and only when complete."""
+        log = tmp_path / "latest.log"
+        tailer = LogTailer(str(log))
+        assert tailer.read_lines() == ([], False)
+
+        log.write_text("first\nsec")
+        assert tailer.read_lines() == (["first"], True)
+        with open(log, "a") as f:
+            f.write("ond\n")
+        assert tailer.read_lines() == (["second"], False)
+        assert tailer.read_lines() == ([], False)
+
+    def test_tailer_follows_rotation(self, tmp_path):
+        """Test that a new latest.log is read from its start."""
+        log = tmp_path / "latest.log"
+        log.write_text("old\n")
+        tailer = LogTailer(str(log))
+        tailer.read_lines()
+
+        with open(log, "a") as f:
+            f.write("last old line\n")
+        os.rename(log, tmp_path / "2026-01-01-1.log")
+        log.write_text("new\n")
+
+        assert tailer.read_lines() == (["last old line"], False)
+        assert tailer.read_lines() == (["new"], True)
+
+    def test_tracker_follows_joins_and_leaves(self, tmp_path):
+        """Test the online players and when the server became empty."""
+        log = tmp_path / "latest.log"
+        log.write_text("[10:00:00 INFO]: Steve joined the game\n")
+        tracker = PlayerTracker(str(log))
+
+        tracker.poll(now=100.0)
+        assert tracker.online == {"Steve"}
+        assert tracker.empty_since is None
+
+        with open(log, "a") as f:
+            f.write("[10:05:00 INFO]: Steve left the game\n")
+        tracker.poll(now=200.0)
+        tracker.poll(now=300.0)
+        assert tracker.online == set()
+        assert tracker.empty_since == 200.0
+
+    def test_tracker_restarted_server_starts_empty(self, tmp_path):
+        """Test that players of a previous server run are forgotten."""
+        log = tmp_path / "latest.log"
+        log.write_text("[10:00:00 INFO]: Steve joined the game\n")
+        tracker = PlayerTracker(str(log))
+        tracker.poll(now=100.0)
+
+        os.remove(log)
+        log.write_text("[11:00:00 INFO]: Starting minecraft server\n")
+        tracker.poll(now=200.0)
+
+        assert tracker.online == set()
+        assert tracker.empty_since == 200.0
+
+    def test_reconcile_adopts_rcon(self, tmp_path):
+        """Test that RCON corrects players the log missed."""
+        tracker = PlayerTracker(str(tmp_path / "latest.log"))
+        tracker.poll(now=100.0)
+
+        assert tracker.reconcile(["Steve"]) is True
+        assert tracker.empty_since is None
+        assert tracker.reconcile(["Steve"]) is False
+        assert tracker.reconcile([], now=300.0) is True
+        assert tracker.empty_since == 300.0
+
+
+class TestFollowPlayers:
+    """Test the idle timer driven by the server log."""
+
+    def make_config(self, tmp_path, **kwargs):
+        return IdleWatcherConfig(
+            ecs_cluster="cluster",
+            ecs_service="service",
+            rcon_host="localhost",
+            player_log=str(tmp_path / "latest.log"),
+            log_poll_interval=0.01,
+            **kwargs,
+        )
+
+    def test_returns_when_idle_threshold_reached(self, tmp_path):
+        """Test that the idle threshold is not rounded up to the next check."""
+        config = self.make_config(tmp_path, check_interval=60, idle_threshold=0)
+        (tmp_path / "latest.log").write_text("[10:00:00 INFO]: Steve left the game\n")
+        tracker = PlayerTracker(config.player_log)
+
+        idle_start_time = follow_players(tracker, config, threading.Event(), None)
+
+        assert idle_start_time == tracker.empty_since
+
+    def test_join_resets_idle_timer(self, tmp_path):
+        """Test that a player joining between checks stops the idle timer."""
+        config = self.make_config(tmp_path, check_interval=0.05)
+        (tmp_path / "latest.log").write_text("[10:00:00 INFO]: Steve joined the game\n")
+        tracker = PlayerTracker(config.player_log)
+
+        assert follow_players(tracker, config, threading.Event(), 100.0) is None
+        assert tracker.online == {"Steve"}
+
+    def test_joins_recorded_as_sessions(self, tmp_path):
+        """Test that players seen in the log are recorded right away."""
+        config = self.make_config(tmp_path, check_interval=0.05)
+        (tmp_path / "latest.log").write_text("[10:00:00 INFO]: Steve joined the game\n")
+        sessions = configure_sessions(str(tmp_path / "sessions.db"))
+        try:
+            follow_players(
+                PlayerTracker(config.player_log), config, threading.Event(), None
+            )
+            sessions.observe(["Steve"], at=time.time() + 60)
+            [(player, seconds)] = sessions.store.playtime(0)
+        finally:
+            configure_sessions(None)
+
+        assert player == "Steve"
+        assert seconds >= 60
+
+    def test_stops_with_stop_event(self, tmp_path):
+        """Test that a stop request ends following right away."""
+        config = self.make_config(tmp_path, check_interval=60)
+        stop_event = threading.Event()
+        stop_event.set()
+
+        assert (
+            follow_players(PlayerTracker(config.player_log), config, stop_event, 100.0)
+            == 100.0
+        )
+
+
+class TestShutdown:
+    """Test the bounded shutdown when the task is stopped."""
+
+    @pytest.fixture
+    def release(self):
+        """Event that hanging steps wait on, set once the test is done."""
+        release = threading.Event()
+        yield release
+        release.set()
+
+    def join_abandoned(self, release, results):
+        release.set()
+        for result in results:
+            if result.thread is not None:
+                result.thread.join(5)
+                assert not result.thread.is_alive()
+
+    def test_steps_run_in_order_with_deadlines(self, release):
+        """Test that a hanging or failing step does not stop the next ones."""
+        calls = []
+
+        def fail(timeout):
+            raise ConnectionRefusedError("RCON is gone")
+
+        results = run_steps(
+            [
+                ShutdownStep("hang", lambda timeout: release.wait(5), 0.05),
+                ShutdownStep("fail", fail, 1.0),
+                ShutdownStep("ok", calls.append, 2.0),
+            ],
+            budget=1.0,
+        )
+        self.join_abandoned(release, results)
+
+        assert [(r.name, r.status) for r in results] == [
+            ("hang", "timeout"),
+            ("fail", "failed"),
+            ("ok", "ok"),
+        ]
+        assert results[0].seconds < 0.5
+        assert results[1].error == "RCON is gone"
+        # Each step is given what is left of the budget at most
+        assert 0 < calls[0] <= 1.0
+
+    def test_steps_past_budget_are_skipped(self, release, caplog):
+        """Test that steps are skipped once the budget is used up."""
+        results = run_steps(
+            [
+                ShutdownStep("slow", lambda timeout: release.wait(5), 1.0),
+                ShutdownStep("late", lambda timeout: None, 1.0),
+                ShutdownStep("later", lambda timeout: None, 1.0),
+            ],
+            budget=0.05,
+        )
+        self.join_abandoned(release, results)
+
+        assert [r.status for r in results] == ["timeout", "skipped", "skipped"]
+        warnings = [r.getMessage() for r in caplog.records if r.levelname == "WARNING"]
+        assert len(warnings) == 2
+        assert warnings[0].startswith("Shutdown step slow overran its")
+        assert warnings[1] == "No time left for shutdown steps: late, later"
+
+    @patch("minecraft_tools.idle_watcher.main.send_discord_message")
+    @patch("minecraft_tools.idle_watcher.main.RconClient")
+    def test_interruption_saves_and_notifies(self, mock_rcon, mock_discord):
+        """Test the shutdown steps when the task is interrupted."""
+        conn = mock_rcon.return_value.__enter__.return_value
+        ecs = MagicMock()
+        ecs.describe_services.return_value = {
+            "services": [{"desiredCount": 1, "runningCount": 1}]
+        }
+        config = IdleWatcherConfig(
+            ecs_cluster="cluster",
+            ecs_service="service",
+            rcon_host="localhost",
+            discord_webhook="https://discord.example/webhook",
+        )
+
+        results = handle_termination(config, ecs)
+
+        assert [r.status for r in results] == ["ok"] * 4
+        assert conn.command.call_args_list[0].args == ("save-all flush",)
+        assert conn.command.call_args_list[1].args[0].startswith("say ")
+        mock_discord.assert_called_once()
+        assert "interrupted" in mock_discord.call_args.args[1]
+
+    @patch("minecraft_tools.idle_watcher.main.send_discord_message")
+    @patch("minecraft_tools.idle_watcher.main.RconClient")
+    def test_no_notice_when_scaled_down(self, mock_rcon, mock_discord):
+        """Test that an intended shutdown is not reported as an interruption."""
+        ecs = MagicMock()
+        ecs.describe_services.return_value = {
+            "services": [{"desiredCount": 0, "runningCount": 1}]
+        }
+        config = IdleWatcherConfig(
+            ecs_cluster="cluster", ecs_service="service", rcon_host="localhost"
+        )
+
+        handle_termination(config, ecs)
+
+        mock_discord.assert_not_called()
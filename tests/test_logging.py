@@ -2,9 +2,34 @@
 
 import json
 import logging
+import threading
 from unittest.mock import patch
 
-from minecraft_tools.logging_config import StructuredFormatter, setup_logging
+from minecraft_tools import logging_config
+from minecraft_tools.logging_config import (
+    SAMPLED,
+    ContextFilter,
+    DeferredQueueHandler,
+    SamplingFilter,
+    StructuredFormatter,
+    log_context,
+    setup_logging,
+    stop_logging,
+)
+
+
+def make_record(msg="Test message", level=logging.INFO, **extra):
+    record = logging.LogRecord(
+        name="test_logger",
+        level=level,
+        pathname="test.py",
+        lineno=1,
+        msg=msg,
+        args=(),
+        exc_info=None,
+    )
+    record.__dict__.update(extra)
+    return record
 
 
 class TestStructuredFormatter:
@@ -59,10 +84,103 @@ class TestStructuredFormatter:
         assert "exception" in data
         assert "ValueError: Test error" in data["exception"]
 
+    def test_format_only_present_context_fields(self):
+        """Test that context fields are included only when set."""
+        formatter = StructuredFormatter()
+
+        data = json.loads(formatter.format(make_record(command="server-start")))
+
+        assert data["command"] == "server-start"
+        assert "latency_ms" not in data
+        assert "cluster" not in data
+
+
+class TestContextAndSampling:
+    """Test contextual fields and sampling of poll logs."""
+
+    def test_log_context_is_attached_and_restored(self):
+        """Test that context applies only inside the block."""
+        context_filter = ContextFilter()
+
+        with log_context(cluster="c", service="s"):
+            with log_context(command="server-status"):
+                inner = make_record()
+                context_filter.filter(inner)
+            outer = make_record()
+            context_filter.filter(outer)
+        after = make_record()
+        context_filter.filter(after)
+
+        assert (inner.cluster, inner.command) == ("c", "server-status")
+        assert outer.cluster == "c" and not hasattr(outer, "command")
+        assert not hasattr(after, "cluster")
+
+    def test_sampling_only_applies_to_marked_records(self):
+        """Test that one in N marked records passes and others all pass."""
+        sampling = SamplingFilter(every=3)
+
+        sampled = [sampling.filter(make_record(**SAMPLED)) for _ in range(6)]
+        unmarked = [sampling.filter(make_record()) for _ in range(3)]
+        warnings = [
+            sampling.filter(make_record(level=logging.WARNING, **SAMPLED))
+            for _ in range(3)
+        ]
+
+        assert sampled == [True, False, False, True, False, False]
+        assert all(unmarked)
+        assert all(warnings)
+
+    def test_sampling_counts_across_threads(self):
+        """Test that concurrent callers share one count per call site."""
+        sampling = SamplingFilter(every=4)
+        passed = []
+
+        def log_many():
+            passed.extend(sampling.filter(make_record(**SAMPLED)) for _ in range(1000))
+
+        threads = [threading.Thread(target=log_many) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(passed) == 8000 // 4
+
+    def test_records_reach_writer_thread(self):
+        """Test end to end delivery through the queue."""
+        records = []
+
+        class Collect(logging.Handler):
+            def emit(self, record):
+                records.append(record)
+
+        root_handlers = logging.root.handlers[:]
+        try:
+            setup_logging()
+            logging_config._listener.handlers = (Collect(),)
+            with log_context(service="svc"):
+                logging.getLogger("test").warning("hello %s", "world")
+        finally:
+            stop_logging()
+            logging.root.handlers = root_handlers
+
+        assert records[0].getMessage() == "hello world"
+        assert records[0].service == "svc"
+
 
 class TestSetupLogging:
     """Test logging setup function."""
 
+    def test_setup_logging_stops_previous_writer(self):
+        """Test that calling setup_logging again stops the earlier writer."""
+        with patch("logging.root"):
+            setup_logging()
+            first = logging_config._listener
+            setup_logging()
+
+        assert logging_config._listener is not first
+        assert first._thread is None
+
     def test_setup_logging_default(self):
         """Test default logging setup."""
         with patch("logging.root") as mock_root:
@@ -82,9 +200,10 @@ class TestSetupLogging:
         with patch("logging.root") as mock_root:
             setup_logging(structured=True)
 
-        # Verify handler was added
+        # Records go through a queue to a writer thread that formats them
         assert len(mock_root.handlers) == 1
-        handler = mock_root.handlers[0]
+        assert isinstance(mock_root.handlers[0], DeferredQueueHandler)
+        handler = logging_config._listener.handlers[0]
         assert isinstance(handler.formatter, StructuredFormatter)
 
     def test_logger_suppression(self):
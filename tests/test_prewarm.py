@@ -0,0 +1,257 @@
+"""Tests for pre-warming the server ahead of expected players."""
+
+from datetime import UTC, datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from minecraft_tools.config import DiscordBotConfig
+from minecraft_tools.discord_bot.prewarm import (
+    COOLDOWN,
+    WEEK_SECONDS,
+    PrewarmScheduler,
+    WeeklyProfile,
+    arrivals,
+)
+from minecraft_tools.sessions import SessionStore
+from minecraft_tools.timeline import TimelineStore
+
+# Monday 2026-10-12 00:00 UTC
+MONDAY = datetime(2026, 10, 12, tzinfo=UTC).timestamp()
+HOUR = 3600
+TUESDAY_EVENING = MONDAY + 24 * HOUR + 19 * HOUR
+
+
+def weeks_ago(weeks, at=TUESDAY_EVENING):
+    """The same time some weeks earlier."""
+    return at - weeks * WEEK_SECONDS
+
+
+def make_ecs(desired=0):
+    ecs = MagicMock()
+    ecs.describe_services.return_value = {
+        "services": [{"desiredCount": desired, "runningCount": desired}]
+    }
+    return ecs
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Session store with four Tuesday evenings of play."""
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    for week in range(1, 5):
+        store.observe(["Steve"], at=weeks_ago(week))
+        store.observe(["Steve", "Alex"], at=weeks_ago(week) + 600)
+        store.observe([], at=weeks_ago(week) + 2 * HOUR)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def timeline(tmp_path):
+    """Timeline store of a bot asked to start the server on Tuesday evenings."""
+    timeline = TimelineStore(str(tmp_path / "timeline.db"))
+    for week in range(1, 5):
+        timeline.record("requested", at=weeks_ago(week))
+    yield timeline
+    timeline.close()
+
+
+@pytest.fixture
+def config():
+    """Bot configuration with pre-warming enabled."""
+    return DiscordBotConfig(
+        token="token",
+        ecs_cluster="cluster",
+        ecs_service="service",
+        prewarm_probability=0.5,
+        prewarm_lead=600,
+    )
+
+
+class TestWeeklyProfile:
+    """Test learning when players arrive."""
+
+    def test_arrivals(self):
+        """Test that only joins on an empty server are arrivals."""
+        sessions = [
+            ("Steve", 100.0, 500.0),
+            ("Alex", 200.0, 400.0),
+            ("Alex", 900.0, 950.0),
+        ]
+
+        assert arrivals(sessions, requests=[50.0]) == [50.0, 100.0, 900.0]
+
+    def test_regular_arrival(self):
+        """Test the chance around an arrival seen every week."""
+        times = [weeks_ago(week) for week in range(4, 0, -1)]
+
+        profile = WeeklyProfile.fit(times, now=TUESDAY_EVENING)
+
+        assert profile.weeks == 4
+        # Counted for the slots less than the window before it
+        assert profile.probability(TUESDAY_EVENING) == 1.0
+        assert profile.probability(TUESDAY_EVENING - 300) == 1.0
+        assert profile.probability(TUESDAY_EVENING - 600) == 0.0
+        assert profile.probability(TUESDAY_EVENING + 300) == 0.0
+
+    def test_window(self):
+        """Test that a longer window counts an arrival for more slots."""
+        times = [weeks_ago(week) for week in range(4, 0, -1)]
+
+        profile = WeeklyProfile.fit(times, now=TUESDAY_EVENING, window=1800)
+
+        assert profile.probability(TUESDAY_EVENING - 1500) == 1.0
+        assert profile.probability(TUESDAY_EVENING - 1800) == 0.0
+
+    def test_recent_weeks_weigh_more(self):
+        """Test that a habit that stopped fades out."""
+        old_habit = [weeks_ago(week) for week in range(4, 2, -1)]
+        new_habit = [weeks_ago(week, TUESDAY_EVENING + HOUR) for week in (2, 1)]
+
+        profile = WeeklyProfile.fit(old_habit + new_habit, now=TUESDAY_EVENING)
+
+        assert profile.probability(TUESDAY_EVENING + HOUR) > 0.5
+        assert profile.probability(TUESDAY_EVENING) < 0.5
+
+    def test_no_history(self):
+        """Test that nothing is expected without history."""
+        profile = WeeklyProfile.fit([], now=TUESDAY_EVENING)
+
+        assert profile.probability(TUESDAY_EVENING) == 0.0
+
+
+class TestPrewarmScheduler:
+    """Test scaling the service up ahead of players."""
+
+    def test_prewarm_before_expected_arrival(self, config, store):
+        """Test starting the server one lead time ahead of the usual join."""
+        ecs = make_ecs()
+        scheduler = PrewarmScheduler(config, ecs, store)
+
+        assert not scheduler.tick(TUESDAY_EVENING - 1800)
+        assert scheduler.tick(TUESDAY_EVENING - 900)
+
+        ecs.update_service.assert_called_once_with(
+            cluster="cluster",
+            service="service",
+            desiredCount=1,
+            forceNewDeployment=True,
+        )
+
+    def test_waits_for_most_likely_slot(self, config, tmp_path):
+        """Test that a low bar does not start the server too early to be used."""
+        config.prewarm_probability = 0.1
+        store = SessionStore(str(tmp_path / "sessions.db"))
+        for week, at in [(4, TUESDAY_EVENING - 600), (3, TUESDAY_EVENING)]:
+            store.observe(["Steve"], at=weeks_ago(week, at))
+            store.observe([], at=weeks_ago(week, at) + HOUR)
+        for week in (2, 1):
+            store.observe(["Steve"], at=weeks_ago(week))
+            store.observe([], at=weeks_ago(week) + HOUR)
+        scheduler = PrewarmScheduler(config, make_ecs(), store)
+
+        assert not scheduler.tick(TUESDAY_EVENING - 1500)
+        assert not scheduler.tick(TUESDAY_EVENING - 1200)
+        assert scheduler.tick(TUESDAY_EVENING - 900)
+        store.close()
+
+    def test_once_per_session(self, config, store):
+        """Test that a pre-warm nobody used is not repeated right away."""
+        scheduler = PrewarmScheduler(config, make_ecs(), store)
+
+        assert scheduler.tick(TUESDAY_EVENING - 900)
+        assert not scheduler.tick(TUESDAY_EVENING - 900 + COOLDOWN - 60)
+
+    def test_weekly_cap(self, config, store):
+        """Test that pre-warms stop once the weekly allowance is used."""
+        config.prewarm_max_per_week = 1
+        scheduler = PrewarmScheduler(config, make_ecs(), store)
+        scheduler.prewarms = [TUESDAY_EVENING - 2 * 86400]
+
+        assert not scheduler.tick(TUESDAY_EVENING - 900)
+
+    def test_already_running(self, config, store):
+        """Test that a running service is left alone."""
+        ecs = make_ecs(desired=1)
+
+        assert not PrewarmScheduler(config, ecs, store).tick(TUESDAY_EVENING - 900)
+        ecs.update_service.assert_not_called()
+
+    def test_learns_from_start_requests_alone(self, config, timeline):
+        """Test the bot's own timeline is enough without the session store."""
+        scheduler = PrewarmScheduler(config, make_ecs(), None, timeline)
+
+        assert not scheduler.tick(TUESDAY_EVENING - 1800)
+        assert scheduler.tick(TUESDAY_EVENING - 900)
+
+    def test_prewarm_is_not_a_request(self, config, timeline):
+        """Test that a pre-warm is remembered apart from the start requests."""
+        scheduler = PrewarmScheduler(config, make_ecs(), None, timeline)
+
+        assert scheduler.tick(TUESDAY_EVENING - 900)
+        assert timeline.milestones(TUESDAY_EVENING - 900) == [
+            (None, "prewarmed", TUESDAY_EVENING - 900)
+        ]
+
+    def test_weekly_cap_survives_restart(self, config, timeline):
+        """Test that the weekly cap counts pre-warms made before a restart."""
+        config.prewarm_max_per_week = 1
+        # Recorded by the bot process before the restart
+        timeline.record("prewarmed", at=TUESDAY_EVENING - 2 * 86400)
+        ecs = make_ecs()
+
+        assert not PrewarmScheduler(config, ecs, None, timeline).tick(
+            TUESDAY_EVENING - 900
+        )
+        ecs.update_service.assert_not_called()
+
+    def test_records_prewarm_players_used(self, config, timeline):
+        """Test that a pre-warm still up after the idle threshold was used."""
+        ecs = make_ecs()
+        scheduler = PrewarmScheduler(config, ecs, None, timeline)
+        prewarmed = TUESDAY_EVENING - 900
+        assert scheduler.tick(prewarmed)
+
+        # A player joined, so the idle watcher left the service up
+        ecs.describe_services.return_value["services"][0]["desiredCount"] = 1
+        assert not scheduler.check_used(scheduler.used_check_at(prewarmed) - 60)
+        assert scheduler.check_used(scheduler.used_check_at(prewarmed))
+        assert (None, "prewarm_used", prewarmed) in timeline.milestones(prewarmed)
+        # Checked once only
+        assert not scheduler.check_used(scheduler.used_check_at(prewarmed) + 60)
+
+    def test_unused_prewarm_is_not_recorded(self, config, timeline):
+        """Test that a pre-warm scaled down for lack of players is not used."""
+        scheduler = PrewarmScheduler(config, make_ecs(), None, timeline)
+        prewarmed = TUESDAY_EVENING - 900
+        assert scheduler.tick(prewarmed)
+
+        assert not scheduler.tick(scheduler.used_check_at(prewarmed))
+        assert [m for _, m, _ in timeline.milestones(prewarmed)] == ["prewarmed"]
+
+    def test_used_prewarm_stays_in_profile(self, config, tmp_path):
+        """Test that a pre-warm players used keeps its slot after a refit."""
+        config.prewarm_probability = 0.7
+        timeline = TimelineStore(str(tmp_path / "timeline.db"))
+        for week in range(4, 1, -1):
+            timeline.record("requested", at=weeks_ago(week))
+        # Last week nobody had to ask, the pre-warm was used instead
+        timeline.record("prewarmed", at=weeks_ago(1, TUESDAY_EVENING - 900))
+        timeline.record("prewarm_used", at=weeks_ago(1, TUESDAY_EVENING - 900))
+        scheduler = PrewarmScheduler(config, make_ecs(), None, timeline)
+
+        assert scheduler.tick(TUESDAY_EVENING - 900)
+        timeline.close()
+
+    def test_unused_prewarm_leaves_profile(self, config, tmp_path):
+        """Test that a week with an unused pre-warm counts as no arrival."""
+        config.prewarm_probability = 0.7
+        timeline = TimelineStore(str(tmp_path / "timeline.db"))
+        for week in range(4, 1, -1):
+            timeline.record("requested", at=weeks_ago(week))
+        timeline.record("prewarmed", at=weeks_ago(1, TUESDAY_EVENING - 900))
+        scheduler = PrewarmScheduler(config, make_ecs(), None, timeline)
+
+        assert not scheduler.tick(TUESDAY_EVENING - 900)
+        timeline.close()
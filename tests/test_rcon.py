@@ -0,0 +1,153 @@
+"""Tests for the RCON client."""
+
+import socket
+import struct
+import threading
+
+import pytest
+
+from minecraft_tools.rcon import RconClient, RconError
+
+
+def raw_packet(request_id, packet_type, body):
+    payload = struct.pack("<ii", request_id, packet_type) + body + b"\x00\x00"
+    return struct.pack("<i", len(payload)) + payload
+
+
+def packet(request_id, packet_type, body):
+    return raw_packet(request_id, packet_type, body.encode())
+
+
+class StubRconServer:
+    """Single-connection RCON server replying with canned packets.
+
+    With ``reverse_batches`` set, it waits for that many commands and
+    answers them in reverse order, each followed by the packets sent after it.
+    """
+
+    def __init__(self, password="secret", replies=None, reverse_batches=0):
+        self.password = password
+        self.replies = replies or {}
+        self.reverse_batches = reverse_batches
+        self.requests = []
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def _recv(self, conn, length):
+        data = b""
+        while len(data) < length:
+            chunk = conn.recv(length - len(data))
+            if not chunk:
+                raise ConnectionError
+            data += chunk
+        return data
+
+    def _serve(self):
+        conn, _ = self.sock.accept()
+        with conn:
+            try:
+                while True:
+                    (length,) = struct.unpack("<i", self._recv(conn, 4))
+                    payload = self._recv(conn, length)
+                    request_id, packet_type = struct.unpack("<ii", payload[:8])
+                    body = payload[8:-2].decode()
+                    if packet_type == 3:
+                        ok = body == self.password
+                        conn.sendall(packet(request_id if ok else -1, 2, ""))
+                        continue
+                    if packet_type == 2:
+                        # Split on bytes like Minecraft, even inside a character
+                        data = "".join(self.replies.get(body, [body])).encode()
+                        chunks = [data[i : i + 4096] for i in range(0, len(data), 4096)]
+                        self.requests.append(
+                            b"".join(
+                                raw_packet(request_id, 0, c) for c in chunks or [b""]
+                            )
+                        )
+                    else:
+                        # What Minecraft answers to request types it does not know
+                        self.requests[-1] += packet(
+                            request_id, 0, f"Unknown request {packet_type}"
+                        )
+                    if len(self.requests) >= self.reverse_batches and packet_type != 2:
+                        conn.sendall(b"".join(reversed(self.requests)))
+                        self.requests.clear()
+            except ConnectionError:
+                pass
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.sock.close()
+        self._thread.join(timeout=1)
+
+
+class TestRconClient:
+    """Test the RCON client."""
+
+    def test_command(self):
+        """Test logging in and running a command."""
+        server = StubRconServer(replies={"list": ["There are 2 of a max of 20"]})
+        with server, RconClient("127.0.0.1", server.port, "secret") as rcon:
+            assert rcon.command("list") == "There are 2 of a max of 20"
+
+    def test_multi_packet_response(self):
+        """Test that split responses are joined."""
+        server = StubRconServer(replies={"help": ["a" * 4096, "b" * 4096, "c"]})
+        with server, RconClient("127.0.0.1", server.port, "secret") as rcon:
+            assert rcon.command("help") == "a" * 4096 + "b" * 4096 + "c"
+
+    def test_response_filling_last_packet(self):
+        """Test that an output ending on a full packet waits for the marker."""
+        server = StubRconServer(replies={"help": ["a" * 4096, "b" * 4096]})
+        with server, RconClient("127.0.0.1", server.port, "secret") as rcon:
+            assert rcon.command("help") == "a" * 4096 + "b" * 4096
+            assert rcon.command("list") == "list"
+
+    def test_multibyte_character_split_across_packets(self):
+        """Test that output is decoded after joining its packets."""
+        text = "a" * 4095 + "é"
+        server = StubRconServer(replies={"help": [text]})
+        with server, RconClient("127.0.0.1", server.port, "secret") as rcon:
+            assert rcon.command("help") == text
+
+    def test_batch(self):
+        """Test that a batch returns each command's output in order."""
+        server = StubRconServer(replies={"list": ["a" * 4096, "b"]})
+        with server, RconClient("127.0.0.1", server.port, "secret") as rcon:
+            assert rcon.commands(["list", "tps", "seed"]) == [
+                "a" * 4096 + "b",
+                "tps",
+                "seed",
+            ]
+            assert rcon.commands([]) == []
+
+    def test_batch_is_pipelined(self):
+        """Test that all requests are sent before any response is awaited."""
+        # Nothing is answered until every command and marker has arrived
+        server = StubRconServer(reverse_batches=3)
+        with server, RconClient("127.0.0.1", server.port, "secret") as rcon:
+            assert rcon.commands(["list", "tps", "seed"]) == ["list", "tps", "seed"]
+
+    def test_login_failure(self):
+        """Test that a wrong password raises."""
+        with StubRconServer() as server, pytest.raises(RconError, match="login failed"):
+            RconClient("127.0.0.1", server.port, "wrong").connect()
+
+    def test_usable_from_worker_thread(self):
+        """Test that the client works off the main thread."""
+        results = []
+        with StubRconServer() as server:
+
+            def run():
+                with RconClient("127.0.0.1", server.port, "secret") as rcon:
+                    results.append(rcon.command("list"))
+
+            thread = threading.Thread(target=run)
+            thread.start()
+            thread.join(timeout=5)
+
+        assert results == ["list"]
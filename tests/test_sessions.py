@@ -0,0 +1,142 @@
+"""Tests for player session statistics."""
+
+from datetime import UTC, datetime
+
+import pytest
+
+from minecraft_tools.sessions import (
+    RUN_GAP,
+    Sessions,
+    SessionStore,
+    format_busiest_hours,
+    format_duration,
+    format_playtime,
+    player_stats,
+    split_hours,
+    week_start,
+)
+
+# Monday 2026-10-12 00:00 UTC
+MONDAY = datetime(2026, 10, 12, tzinfo=UTC).timestamp()
+HOUR = 3600
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Session store in a temporary directory."""
+    store = SessionStore(str(tmp_path / "sessions" / "sessions.db"))
+    yield store
+    store.close()
+
+
+class TestSessionStore:
+    """Test recording sessions."""
+
+    def test_session_counted_when_closed(self, store):
+        """Test that a finished session adds up its playtime."""
+        store.observe(["Steve"], at=MONDAY + 20 * HOUR)
+        store.observe(["Steve", "Alex"], at=MONDAY + 20.5 * HOUR)
+        store.observe(["Alex"], at=MONDAY + 21.5 * HOUR)
+        store.observe([], at=MONDAY + 22 * HOUR)
+
+        assert store.playtime(MONDAY) == [("Alex", 1.5 * HOUR), ("Steve", 1.5 * HOUR)]
+
+    def test_open_session_counted_until_last_seen(self, store):
+        """Test that players still online are included in the statistics."""
+        store.observe(["Steve"], at=MONDAY + 10 * HOUR)
+        store.observe(["Steve"], at=MONDAY + 10 * HOUR + 300)
+
+        assert store.playtime(MONDAY) == [("Steve", 300.0)]
+
+    def test_restart_ends_session_when_last_seen(self, store):
+        """Test that a session left open by a restart is not stretched."""
+        store.observe(["Steve"], at=MONDAY)
+        store.observe(["Steve"], at=MONDAY + 60)
+        restarted = SessionStore(store.path)
+        restarted.observe(["Steve"], at=MONDAY + HOUR)
+        restarted.observe(["Steve"], at=MONDAY + HOUR + 30)
+        restarted.close()
+
+        assert store.playtime(MONDAY) == [("Steve", 90.0)]
+
+    def test_playtime_since(self, store):
+        """Test that earlier weeks are left out."""
+        store.observe(["Steve"], at=MONDAY - 2 * HOUR)
+        store.observe([], at=MONDAY - HOUR)
+        store.observe(["Alex"], at=MONDAY + HOUR)
+        store.observe([], at=MONDAY + 2 * HOUR)
+
+        assert store.playtime(MONDAY) == [("Alex", float(HOUR))]
+
+    def test_busiest_hours(self, store):
+        """Test playtime per hour of the day across days."""
+        for day in range(3):
+            evening = MONDAY + day * 24 * HOUR + 19.5 * HOUR
+            store.observe(["Steve", "Alex"], at=evening)
+            store.observe([], at=evening + HOUR)
+
+        assert store.busiest_hours(MONDAY) == [(19, 3 * HOUR), (20, 3 * HOUR)]
+
+    def test_runs(self, store):
+        """Test recording server runs and idle shutdowns."""
+        store.record_uptime(MONDAY)
+        store.record_uptime(MONDAY + 30)
+        store.record_idle_shutdown(MONDAY + 60)
+        store.record_uptime(MONDAY + HOUR)
+        store.record_uptime(MONDAY + HOUR + RUN_GAP + 1)
+
+        assert store.runs(MONDAY) == [
+            (MONDAY, MONDAY + 60, MONDAY + 60),
+            (MONDAY + HOUR, MONDAY + HOUR, None),
+            (MONDAY + HOUR + RUN_GAP + 1, MONDAY + HOUR + RUN_GAP + 1, None),
+        ]
+
+    def test_split_hours(self):
+        """Test splitting a span at hour boundaries."""
+        assert list(split_hours(1.5 * HOUR, 3.25 * HOUR)) == [
+            (1, 1800.0),
+            (2, 3600.0),
+            (3, 900.0),
+        ]
+
+    def test_week_start(self):
+        """Test the start of the week for a Sunday evening."""
+        assert week_start(MONDAY + 6 * 24 * HOUR + 23 * HOUR) == MONDAY
+
+
+class TestFormat:
+    """Test rendering statistics."""
+
+    def test_format_playtime(self):
+        """Test the playtime table."""
+        table = format_playtime([("Steve", 2 * HOUR + 65)])
+
+        assert table.splitlines()[1].split() == ["Steve", "2h", "01m"]
+
+    def test_format_busiest_hours(self):
+        """Test the busiest hours table, wrapping around midnight."""
+        table = format_busiest_hours([(23, 90.0)])
+
+        assert table.splitlines()[1].split() == ["23:00-00:00", "0h", "02m"]
+
+    def test_format_empty(self):
+        """Test the tables without any playtime."""
+        assert format_playtime([]) == format_busiest_hours([])
+        assert format_duration(0) == "0h 00m"
+
+
+class TestSessions:
+    """Test the process-wide recorder."""
+
+    def test_disabled_by_default(self):
+        """Test that an unconfigured recorder ignores players."""
+        Sessions().observe(["Steve"])
+
+    def test_player_stats(self, store):
+        """Test the statistics the tools container serves to the bot."""
+        store.observe(["Steve"], at=MONDAY + 20 * HOUR)
+        store.observe([], at=MONDAY + 20 * HOUR + 60)
+
+        stats = player_stats(store, now=MONDAY + 2 * 86400)
+
+        assert stats == {"playtime": [("Steve", 60.0)], "busiest_hours": [(20, 60.0)]}
@@ -0,0 +1,77 @@
+"""Tests for start-up profiling and lazy imports."""
+
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+from minecraft_tools.dns_updater.main import main
+from minecraft_tools.startup import ImportCost, parse_importtime, total_import_ms
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     botocore.compat
+import time:       300 |        420 |   boto3.session
+import time:       250 |        670 | boto3
+"""
+
+
+class TestImportProfile:
+    """Test import-time report parsing."""
+
+    def test_parse_importtime(self):
+        """Test that module names, timings and nesting are parsed."""
+        costs = parse_importtime(IMPORTTIME_OUTPUT)
+
+        assert costs == [
+            ImportCost("botocore.compat", 120, 120, 2),
+            ImportCost("boto3.session", 300, 420, 1),
+            ImportCost("boto3", 250, 670, 0),
+        ]
+        assert total_import_ms(costs, ["boto3"]) == 0.67
+
+    def test_profile_startup_flag(self, capsys):
+        """Test that --profile-startup prints a report instead of running."""
+        costs = parse_importtime(IMPORTTIME_OUTPUT)
+        with patch("minecraft_tools.startup.profile_imports", return_value=costs):
+            main(["--profile-startup"])
+
+        output = capsys.readouterr().out
+        assert "Deferred until first use" in output
+        assert "boto3.session" in output
+
+
+class TestLazyImports:
+    """Test that heavy dependencies stay out of the start-up path."""
+
+    def heavy_modules_after(self, code):
+        """Heavy dependencies loaded after running code in a fresh interpreter."""
+        code += (
+            "; import sys; "
+            "print(sorted(m for m in ('boto3', 'botocore', 'requests') "
+            "if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+        return result.stdout.strip()
+
+    def test_dns_updater_defers_boto3_and_requests(self):
+        """Test importing the DNS updater loads neither boto3 nor requests."""
+        code = "import minecraft_tools.dns_updater.main"
+
+        assert self.heavy_modules_after(code) == "[]"
+
+    def test_no_trimmed_models_defers_boto3(self, tmp_path):
+        """Test that boto3 is not loaded when there are no trimmed models."""
+        code = (
+            "from pathlib import Path; "
+            "from minecraft_tools.aws import use_trimmed_models; "
+            f"use_trimmed_models(Path({str(tmp_path / 'missing')!r}))"
+        )
+
+        assert self.heavy_modules_after(code) == "[]"
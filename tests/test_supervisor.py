@@ -0,0 +1,168 @@
+"""Tests for the single-process supervisor."""
+
+import asyncio
+import threading
+
+import pytest
+
+from minecraft_tools.config import SupervisorConfig
+from minecraft_tools.sessions import configure_sessions
+from minecraft_tools.supervisor.main import (
+    Component,
+    Supervisor,
+    build_components,
+    tools_routes,
+)
+from minecraft_tools.timeline import configure_timeline
+
+
+class Recorder:
+    """Component target counting its runs and blocking until stopped."""
+
+    def __init__(self, fail_times=0, finish=False):
+        self.fail_times = fail_times
+        self.finish = finish
+        self.runs = 0
+
+    def __call__(self, stop_event: threading.Event) -> None:
+        self.runs += 1
+        if self.runs <= self.fail_times:
+            raise RuntimeError("boom")
+        if self.finish:
+            return
+        stop_event.wait()
+
+
+async def wait_until(predicate, timeout=2.0):
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+
+class TestSupervisor:
+    """Test component supervision."""
+
+    @pytest.mark.asyncio
+    async def test_failed_component_is_restarted(self):
+        """Test that a crash restarts only the failing component."""
+        flaky, steady = Recorder(fail_times=2), Recorder()
+        supervisor = Supervisor(
+            [Component("flaky", flaky), Component("steady", steady)],
+            restart_delay=0.01,
+        )
+        task = asyncio.create_task(supervisor.run())
+
+        await wait_until(
+            lambda: flaky.runs == 3 and supervisor.components["flaky"].running
+        )
+        supervisor.stop()
+        await task
+
+        assert steady.runs == 1
+        assert supervisor.components["flaky"].restarts == 2
+        assert supervisor.components["flaky"].last_error == "boom"
+
+    @pytest.mark.asyncio
+    async def test_finished_component_is_not_restarted(self):
+        """Test that a one-shot component is left alone once done."""
+        once = Recorder(finish=True)
+        supervisor = Supervisor([Component("once", once, restart=False)])
+
+        await asyncio.wait_for(supervisor.run(), timeout=2)
+
+        assert once.runs == 1
+        assert supervisor.components["once"].finished is True
+        assert supervisor.health_check()["status"] == "healthy"
+
+    @pytest.mark.asyncio
+    async def test_restart_on_request(self):
+        """Test restarting one component while the other keeps running."""
+        first, second = Recorder(), Recorder()
+        supervisor = Supervisor(
+            [Component("first", first), Component("second", second)]
+        )
+        task = asyncio.create_task(supervisor.run())
+
+        await wait_until(lambda: first.runs == 1)
+        supervisor.restart("first")
+        await wait_until(lambda: first.runs == 2)
+        supervisor.stop()
+        await task
+
+        assert second.runs == 1
+        assert supervisor.components["first"].restarts == 1
+
+    @pytest.mark.asyncio
+    async def test_terminate_runs_hooks_of_unfinished_components(self):
+        """Test that termination stops components and runs their hooks."""
+        hooks = []
+        supervisor = Supervisor(
+            [
+                Component(
+                    "watcher", Recorder(), on_terminate=lambda: hooks.append("watcher")
+                ),
+                Component(
+                    "once",
+                    Recorder(finish=True),
+                    restart=False,
+                    on_terminate=lambda: hooks.append("once"),
+                ),
+            ]
+        )
+        task = asyncio.create_task(supervisor.run())
+
+        await wait_until(lambda: supervisor.components["once"].finished)
+        await supervisor.terminate()
+        await asyncio.wait_for(task, timeout=2)
+
+        assert hooks == ["watcher"]
+
+    def test_health_check_reports_stopped_component(self):
+        """Test that a component that is not running is unhealthy."""
+        supervisor = Supervisor([Component("idle-watcher", Recorder())])
+
+        result = supervisor.health_check()
+
+        assert result["status"] == "unhealthy"
+        assert result["components"]["idle-watcher"]["running"] is False
+
+
+class TestBuildComponents:
+    """Test component construction."""
+
+    def test_one_shot_dns_update_without_reconcile_interval(self, monkeypatch):
+        """Test that DNS runs once when no reconcile interval is set."""
+        for key, value in {
+            "ECS_CLUSTER": "cluster",
+            "ECS_SERVICE": "service",
+            "CLOUDFLARE_TOKEN": "token",
+            "CLOUDFLARE_ZONE_ID": "zone",
+            "DNS_RECORD_NAME": "mc.example.com",
+        }.items():
+            monkeypatch.setenv(key, value)
+        config = SupervisorConfig(
+            ecs_cluster="cluster", ecs_service="service", components=["dns-updater"]
+        )
+
+        components = build_components(config, object(), object())
+
+        assert [c.name for c in components] == ["dns-updater"]
+        assert components[0].restart is False
+
+
+class TestToolsRoutes:
+    """Test the statistics served to the bot."""
+
+    def test_routes_follow_configured_stores(self, tmp_path):
+        """Test that statistics are only served from configured stores."""
+        assert tools_routes() == {}
+
+        configure_sessions(str(tmp_path / "sessions.db"))
+        configure_timeline(str(tmp_path / "timeline.db"))
+        try:
+            routes = tools_routes()
+            assert routes["/stats"]() == {"playtime": [], "busiest_hours": []}
+            assert routes["/timeline"]() == {"milestones": []}
+        finally:
+            configure_sessions(None)
+            configure_timeline(None)
@@ -0,0 +1,234 @@
+"""Tests for the server lifecycle timeline."""
+
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from minecraft_tools.config import DiscordBotConfig
+from minecraft_tools.discord_bot.main import create_bot, update_service
+from minecraft_tools.health import HealthChecker, HealthServer
+from minecraft_tools.timeline import (
+    Timeline,
+    TimelineStore,
+    configure_timeline,
+    format_report,
+    lifecycles,
+    main,
+    percentile,
+    recent_milestones,
+    report,
+    stage_stats,
+)
+
+TASK = "arn:aws:ecs:eu-west-1:123456789012:task/minecraft/abc"
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Timeline store in a temporary directory."""
+    store = TimelineStore(str(tmp_path / "timeline" / "timeline.db"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def timeline(tmp_path):
+    """Process-wide timeline recording to a temporary store."""
+    yield configure_timeline(str(tmp_path / "timeline.db"), source="test")
+    configure_timeline(None)
+
+
+def record_start(store, task, requested, offsets):
+    """Record one server start at the given offsets from its request."""
+    store.record("requested", at=requested)
+    for milestone, offset in offsets.items():
+        store.record(milestone, task, requested + offset)
+
+
+class TestTimelineStore:
+    """Test recording milestones."""
+
+    def test_first_sighting_wins(self, store):
+        """Test that a task milestone keeps its earliest recorded time."""
+        store.record("rcon_ready", TASK, at=100.0)
+        store.record("rcon_ready", TASK, at=130.0)
+
+        assert store.milestones() == [(TASK, "rcon_ready", 100.0)]
+
+    def test_record_task(self, store):
+        """Test recording the timestamps of an ECS task."""
+        store.record_task(
+            {
+                "taskArn": TASK,
+                "createdAt": datetime(2026, 1, 1, 12, 0, 0, tzinfo=UTC),
+                "pullStartedAt": datetime(2026, 1, 1, 12, 0, 20, tzinfo=UTC),
+                "lastStatus": "PROVISIONING",
+            }
+        )
+
+        milestones = [m for _, m, _ in store.milestones()]
+        assert milestones == ["task_created", "pull_started"]
+
+    def test_unknown_milestone(self, store):
+        """Test that a misspelled milestone is rejected."""
+        with pytest.raises(ValueError, match="Unknown milestone"):
+            store.record("rcon-ready", TASK)
+
+
+class TestReport:
+    """Test stage percentiles."""
+
+    def test_request_matched_to_next_task(self):
+        """Test that a start request belongs to the task created after it."""
+        rows = [
+            (None, "requested", 0.0),
+            (None, "requested", 1000.0),
+            (TASK, "task_created", 1010.0),
+        ]
+
+        assert lifecycles(rows)[TASK]["requested"] == 1000.0
+
+    def test_stale_request_ignored(self):
+        """Test that a request long before the task is not attached."""
+        rows = [(None, "requested", 0.0), (TASK, "task_created", 5000.0)]
+
+        assert "requested" not in lifecycles(rows)[TASK]
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = [float(v) for v in range(1, 21)]
+
+        assert percentile(values, 50) == 10.0
+        assert percentile(values, 95) == 19.0
+        assert percentile([7.0], 95) == 7.0
+
+    def test_stage_stats(self, store):
+        """Test percentiles across several starts."""
+        for i, boot in enumerate([60, 70, 90]):
+            record_start(
+                store,
+                f"task-{i}",
+                requested=1000.0 * (i + 1),
+                offsets={
+                    "task_created": 5,
+                    "pull_started": 15,
+                    "pull_stopped": 45,
+                    "task_started": 50,
+                    "rcon_ready": 50 + boot,
+                },
+            )
+
+        stats = {s.stage: s for s in stage_stats(lifecycles(store.milestones()))}
+
+        assert stats["image_pull"].p50 == 30.0
+        assert stats["server_boot"].count == 3
+        assert stats["server_boot"].p50 == 70.0
+        assert stats["server_boot"].p95 == 90.0
+        assert stats["cold_start"].p95 == 140.0
+        assert "dns_update" not in stats
+
+    def test_report_merges_stores(self, tmp_path):
+        """Test combining the bot and task side of the same start."""
+        bot = TimelineStore(str(tmp_path / "bot.db"))
+        tools = TimelineStore(str(tmp_path / "tools.db"))
+        bot.record("requested", at=1000.0)
+        tools.record("task_created", TASK, at=1010.0)
+        tools.record("rcon_ready", TASK, at=1100.0)
+
+        stats = report([bot, tools], days=365 * 100)
+
+        assert [(s.stage, s.p50) for s in stats] == [("cold_start", 100.0)]
+
+    def test_format_empty_report(self):
+        """Test the report without any complete start."""
+        assert format_report([]) == "No complete server starts recorded yet"
+
+    def test_cli(self, store, capsys):
+        """Test printing a report for a database."""
+        record_start(store, TASK, 0.0, {"pull_started": 10, "pull_stopped": 40})
+
+        main(["--db", store.path, "--days", "100000"])
+
+        output = capsys.readouterr().out
+        assert "image_pull" in output
+        assert "30.0" in output
+
+
+class TestTimeline:
+    """Test the process-wide recorder."""
+
+    def test_disabled_by_default(self):
+        """Test that an unconfigured timeline ignores milestones."""
+        Timeline().record("requested")
+
+    def test_mark_current_task(self, timeline):
+        """Test marking a milestone for the task this process runs in."""
+        with patch("minecraft_tools.timeline.current_task_arn", return_value=TASK):
+            timeline.mark("dns_updated")
+
+        [(task_arn, milestone, _)] = timeline.store.milestones()
+        assert (task_arn, milestone) == (TASK, "dns_updated")
+
+    def test_mark_outside_ecs(self, timeline, monkeypatch):
+        """Test that marks are skipped without ECS task metadata."""
+        monkeypatch.delenv("ECS_CONTAINER_METADATA_URI_V4", raising=False)
+
+        timeline.mark("rcon_ready")
+
+        assert timeline.store.milestones() == []
+
+    @pytest.mark.asyncio
+    async def test_server_start_records_request(self, timeline):
+        """Test that the bot records a start request."""
+        interaction = AsyncMock()
+        with (
+            patch("minecraft_tools.discord_bot.main.get_service_status") as status,
+            patch("minecraft_tools.discord_bot.main.boto3.client"),
+        ):
+            status.return_value = {"desired": 0, "running": 0}
+            await update_service(interaction, MagicMock(), "cluster", "service", 1)
+
+        [(task_arn, milestone, _)] = timeline.store.milestones()
+        assert (task_arn, milestone) == (None, "requested")
+
+    async def server_timeline(self, tools_url):
+        config = DiscordBotConfig(
+            token="token",
+            ecs_cluster="cluster",
+            ecs_service="service",
+            tools_url=tools_url,
+        )
+        with patch("minecraft_tools.discord_bot.main.boto3.client"):
+            bot = create_bot(config)
+        interaction = AsyncMock()
+        await bot.tree.get_command("server-timeline").callback(interaction)
+        return interaction.response.send_message.call_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_server_timeline_merges_tools_milestones(self, timeline, store):
+        """Test that the bot's requests are combined with the tools' milestones."""
+        requested = datetime.now(UTC).timestamp() - 3600
+        timeline.record("requested", at=requested)
+        store.record("task_created", TASK, requested + 10)
+        store.record("rcon_ready", TASK, requested + 100)
+        routes = {"/timeline": lambda: recent_milestones(store)}
+        server = HealthServer(
+            HealthChecker({}), port=0, host="127.0.0.1", routes=routes
+        ).start()
+        try:
+            message = await self.server_timeline(f"http://127.0.0.1:{server.port}")
+        finally:
+            server.stop()
+
+        assert "cold_start" in message
+        assert "100.0" in message
+        assert "while the server is running" not in message
+
+    @pytest.mark.asyncio
+    async def test_server_timeline_while_stopped(self, timeline):
+        """Test that the bot's own milestones are shown without the tools."""
+        message = await self.server_timeline("http://127.0.0.1:9")
+
+        assert "No complete server starts recorded yet" in message
+        assert "available while the server is running" in message
@@ -0,0 +1,194 @@
+"""Tests for tracing spans."""
+
+import json
+import threading
+import time
+
+import boto3
+import pytest
+import responses
+from moto import mock_aws
+
+from minecraft_tools import tracing
+from minecraft_tools.tracing import (
+    JsonlExporter,
+    OTLPHttpExporter,
+    configure_tracing,
+    instrument_boto3,
+    span,
+    traced,
+)
+
+
+class ListExporter:
+    """Exporter collecting spans in memory."""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+@pytest.fixture
+def exporter():
+    """Enable tracing with an in-memory exporter for one test."""
+    exporter = ListExporter()
+    tracer = configure_tracing(exporter)
+    yield exporter
+    tracer.flush()
+    configure_tracing(None)
+
+
+class TestTracer:
+    """Test span creation and export."""
+
+    def test_disabled_tracer_is_noop(self):
+        """Test that spans cost nothing while tracing is off."""
+        assert span("anything") is tracing._NOOP
+        with span("anything") as active:
+            assert active is None
+
+    def test_child_spans_share_trace(self, exporter):
+        """Test parent and child span linkage."""
+        with span("parent") as parent, span("child", key="value") as child:
+            pass
+        tracing.get_tracer().flush()
+
+        assert [s.name for s in exporter.spans] == ["child", "parent"]
+        assert child.trace_id == parent.trace_id
+        assert child.parent_id == parent.span_id
+        assert parent.parent_id is None
+        assert child.attributes == {"key": "value"}
+        assert child.end_time >= child.start_time
+
+    def test_error_status(self, exporter):
+        """Test that exceptions mark the span as failed."""
+
+        @traced("failing")
+        def fail():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            fail()
+        tracing.get_tracer().flush()
+
+        assert exporter.spans[0].status == "error"
+        assert exporter.spans[0].attributes["error"] == "boom"
+
+    def test_unsampled_trace_skips_children(self):
+        """Test that a trace dropped by sampling drops its children too."""
+        exporter = ListExporter()
+        configure_tracing(exporter, sample_rate=0.0)
+        try:
+            with span("root"), span("child"):
+                pass
+            tracing.get_tracer().flush()
+        finally:
+            configure_tracing(None)
+
+        assert exporter.spans == []
+
+    def test_batches_exports(self):
+        """Test that spans are exported once a batch fills up."""
+        exporter = ListExporter()
+        tracer = tracing.Tracer(exporter, batch_size=2)
+
+        with tracer.span("one"):
+            pass
+        assert exporter.spans == []
+        with tracer.span("two"):
+            pass
+        tracer._pending.join()
+        assert len(exporter.spans) == 2
+
+    def test_export_does_not_block_span(self):
+        """Test that a slow exporter does not hold up the traced code."""
+        release = threading.Event()
+
+        class SlowExporter(ListExporter):
+            def export(self, spans):
+                release.wait(5)
+                super().export(spans)
+
+        exporter = SlowExporter()
+        tracer = tracing.Tracer(exporter, batch_size=1)
+        started = time.monotonic()
+        with tracer.span("one"):
+            pass
+        elapsed = time.monotonic() - started
+        release.set()
+        tracer.flush()
+
+        assert elapsed < 1
+        assert [s.name for s in exporter.spans] == ["one"]
+
+    def test_drops_batches_when_exporter_is_behind(self):
+        """Test that queued batches are bounded."""
+        release = threading.Event()
+
+        class StuckExporter(ListExporter):
+            def export(self, spans):
+                release.wait(5)
+                super().export(spans)
+
+        exporter = StuckExporter()
+        tracer = tracing.Tracer(exporter, batch_size=1, max_pending=1)
+        for name in ("one", "two", "three"):
+            with tracer.span(name):
+                pass
+            time.sleep(0.05)
+        release.set()
+        tracer.flush()
+
+        assert [s.name for s in exporter.spans] == ["one", "two"]
+
+
+class TestExporters:
+    """Test span exporters."""
+
+    def test_jsonl_exporter(self, tmp_path):
+        """Test writing spans as JSON lines."""
+        path = tmp_path / "spans.jsonl"
+        tracer = tracing.Tracer(JsonlExporter(str(path)))
+        with tracer.span("cloudflare.list_dns_records"):
+            pass
+        tracer.flush()
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["name"] == "cloudflare.list_dns_records"
+
+    @responses.activate
+    def test_otlp_exporter(self):
+        """Test posting spans to an OTLP collector."""
+        responses.add(responses.POST, "http://collector:4318/v1/traces", json={})
+        tracer = tracing.Tracer(OTLPHttpExporter("http://collector:4318/v1/traces"))
+        with tracer.span("discord.webhook", status_code=204):
+            pass
+        tracer.flush()
+
+        body = json.loads(responses.calls[0].request.body)
+        spans = body["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert spans[0]["name"] == "discord.webhook"
+        assert spans[0]["attributes"] == [
+            {"key": "status_code", "value": {"stringValue": "204"}}
+        ]
+
+
+class TestBoto3Instrumentation:
+    """Test AWS call spans."""
+
+    @mock_aws
+    def test_aws_calls_are_traced(self, exporter):
+        """Test that boto3 calls become child spans."""
+        session = boto3.Session(region_name="us-east-1")
+        instrument_boto3(session)
+
+        with span("dns.update") as parent:
+            session.client("sts").get_caller_identity()
+        tracing.get_tracer().flush()
+
+        aws_span = exporter.spans[0]
+        assert aws_span.name == "aws.sts.GetCallerIdentity"
+        assert aws_span.parent_id == parent.span_id
@@ -0,0 +1,196 @@
+"""Tests for the wake-on-connect listener."""
+
+import asyncio
+import contextlib
+import json
+import os
+import struct
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from minecraft_tools.config import WakeListenerConfig
+from minecraft_tools.wake_listener.main import WakeListener
+from minecraft_tools.wake_listener.protocol import (
+    PacketReader,
+    ProtocolError,
+    encode_packet,
+    encode_string,
+    encode_varint,
+    read_packet,
+)
+
+
+def handshake(next_state, protocol=767):
+    """Handshake packet as sent by a client."""
+    return encode_packet(
+        0x00,
+        encode_varint(protocol)
+        + encode_string("mc.example.com")
+        + struct.pack(">H", 25565)
+        + encode_varint(next_state),
+    )
+
+
+def make_ecs(desired=0, running=0):
+    ecs = MagicMock()
+    ecs.describe_services.return_value = {
+        "services": [{"desiredCount": desired, "runningCount": running}]
+    }
+    return ecs
+
+
+@pytest.fixture
+def config():
+    """Listener configuration."""
+    return WakeListenerConfig(
+        ecs_cluster="cluster", ecs_service="service", client_timeout=1.0
+    )
+
+
+@contextlib.asynccontextmanager
+async def listening(listener):
+    """Serve a listener on a free port and yield the port."""
+    server = await asyncio.start_server(listener.handle, "127.0.0.1", 0)
+    async with server:
+        yield server.sockets[0].getsockname()[1]
+
+
+async def ping(port, protocol=767):
+    """Run a Server List Ping and return the status and pong payload."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    payload = os.urandom(8)
+    writer.write(handshake(1, protocol) + encode_packet(0x00))
+    packet_id, packet = await read_packet(reader)
+    status = json.loads(packet.read_string())
+    writer.write(encode_packet(0x01, payload))
+    pong_id, pong = await read_packet(reader)
+    writer.close()
+    assert (packet_id, pong_id) == (0x00, 0x01)
+    assert pong.read_bytes(8) == payload
+    return status
+
+
+async def login(port, player="Steve"):
+    """Attempt to log in and return the disconnect message."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        handshake(2) + encode_packet(0x00, encode_string(player) + os.urandom(16))
+    )
+    packet_id, packet = await read_packet(reader)
+    writer.close()
+    assert packet_id == 0x00
+    return json.loads(packet.read_string())["text"]
+
+
+class TestProtocol:
+    """Test packet encoding."""
+
+    @pytest.mark.parametrize("value", [0, 1, 127, 128, 25565, 2**31 - 1, -1])
+    def test_varint_round_trip(self, value):
+        """Test VarInts including negative values."""
+        assert PacketReader(encode_varint(value)).read_varint() == value
+
+    def test_rejects_overlong_string(self):
+        """Test that a string longer than allowed is a protocol error."""
+        with pytest.raises(ProtocolError):
+            PacketReader(encode_string("x" * 17)).read_string(16)
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_packet(self):
+        """Test that a huge length prefix is refused before reading it."""
+        reader = asyncio.StreamReader()
+        reader.feed_data(encode_varint(1 << 20))
+
+        with pytest.raises(ProtocolError):
+            await read_packet(reader)
+
+
+class TestWakeListener:
+    """Test answering pings and waking the server."""
+
+    @pytest.mark.asyncio
+    async def test_ping_while_asleep(self, config):
+        """Test the status shown while the service is scaled to zero."""
+        async with listening(WakeListener(config, make_ecs())) as port:
+            status = await ping(port, protocol=765)
+
+        assert status["description"]["text"] == "Server is asleep, join to wake it up"
+        assert status["version"]["protocol"] == 765
+        assert status["players"]["online"] == 0
+
+    @pytest.mark.asyncio
+    async def test_pings_share_one_service_lookup(self, config):
+        """Test that a burst of pings makes a single ECS call."""
+        ecs = make_ecs()
+        listener = WakeListener(config, ecs)
+
+        async with listening(listener) as port:
+            await asyncio.gather(*(ping(port) for _ in range(50)))
+
+        assert listener.pings == 50
+        assert ecs.describe_services.call_count == 1
+
+    @pytest.mark.asyncio
+    @patch("minecraft_tools.wake_listener.main.send_discord_message")
+    async def test_login_wakes_server_once(self, mock_discord, config):
+        """Test that the first login scales up and later ones do not."""
+        ecs = make_ecs()
+
+        async with listening(WakeListener(config, ecs)) as port:
+            messages = await asyncio.gather(login(port), login(port, "Alex"))
+            status = await ping(port)
+            await asyncio.sleep(0.05)
+
+        ecs.update_service.assert_called_once_with(
+            cluster="cluster",
+            service="service",
+            desiredCount=1,
+            forceNewDeployment=True,
+        )
+        assert all("try again in about" in message for message in messages)
+        assert status["description"]["text"].startswith("Server starting, retry in ~")
+        mock_discord.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_only_allowed_players_wake_server(self, config):
+        """Test that strangers cannot start the server."""
+        config.allowed_players = ["Steve"]
+        ecs = make_ecs()
+
+        async with listening(WakeListener(config, ecs)) as port:
+            message = await login(port, "Stranger")
+
+        assert "ask in Discord" in message
+        ecs.update_service.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_status_unavailable_on_aws_error(self, config):
+        """Test that an ECS failure still answers the ping."""
+        ecs = MagicMock()
+        ecs.describe_services.side_effect = RuntimeError("throttled")
+
+        async with listening(WakeListener(config, ecs)) as port:
+            status = await ping(port)
+
+        assert "unavailable" in status["description"]["text"]
+
+    @pytest.mark.asyncio
+    async def test_garbage_is_dropped(self, config):
+        """Test that a client sending garbage is disconnected."""
+        config.client_timeout = 0.2
+        async with listening(WakeListener(config, make_ecs())) as port:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"\xfe\x01\xfa" + b"\xff" * 10)
+            data = await asyncio.wait_for(reader.read(), timeout=2)
+            writer.close()
+
+        assert data == b""
+
+    def test_motd_once_running(self, config):
+        """Test the status shown when the server was already up."""
+        listener = WakeListener(config, make_ecs(desired=1, running=1))
+        state = listener._describe_service()
+        listener._set_state(state)
+
+        assert listener.motd(state) == "Server is up, refresh your server list"
@@ -0,0 +1,204 @@
+"""Tests for region file analysis and pruning."""
+
+import gzip
+import os
+import struct
+import zlib
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from minecraft_tools.world.anvil import (
+    SECTOR_SIZE,
+    chunk_payload,
+    compact_region,
+    inhabited_time,
+    map_region,
+    read_chunk_table,
+)
+from minecraft_tools.world.main import main, process_world
+
+
+def chunk_nbt(ticks, padding=0):
+    """Minimal chunk NBT with an InhabitedTime tag after optional padding."""
+    return (
+        b"\x0a\x00\x00"
+        + b"\x07\x00\x07Padding"
+        + struct.pack(">i", padding)
+        + os.urandom(padding)
+        + b"\x04\x00\x0dInhabitedTime"
+        + struct.pack(">q", ticks)
+        + b"\x00"
+    )
+
+
+def write_region(path, chunks, compression=2):
+    """Write a region file with {index: payload NBT} chunks."""
+    locations = [0] * 1024
+    timestamps = [0] * 1024
+    body = b""
+    sector = 2
+    for index, nbt in chunks.items():
+        if compression == 2:
+            payload = zlib.compress(nbt)
+        elif compression == 1:
+            payload = gzip.compress(nbt)
+        else:
+            payload = nbt
+        data = struct.pack(">IB", len(payload) + 1, compression) + payload
+        data += bytes(-len(data) % SECTOR_SIZE)
+        sectors = len(data) // SECTOR_SIZE
+        locations[index] = sector << 8 | sectors
+        timestamps[index] = 1_700_000_000 + index
+        body += data
+        sector += sectors
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(
+        struct.pack(">1024I", *locations) + struct.pack(">1024I", *timestamps) + body
+    )
+
+
+def read_inhabited(path):
+    with map_region(path) as data:
+        return {e.index: inhabited_time(data, e) for e in read_chunk_table(data)}
+
+
+class TestAnvil:
+    """Test reading region files."""
+
+    def test_chunk_table(self, tmp_path):
+        """Test reading chunk locations from the header."""
+        path = tmp_path / "r.0.0.mca"
+        write_region(path, {0: chunk_nbt(1), 33: chunk_nbt(2)})
+
+        with map_region(path) as data:
+            entries = read_chunk_table(data)
+
+        assert [(e.index, e.local_x, e.local_z) for e in entries] == [
+            (0, 0, 0),
+            (33, 1, 1),
+        ]
+        assert entries[1].offset == 3
+        assert entries[1].timestamp == 1_700_000_033
+
+    @pytest.mark.parametrize("compression", [1, 2, 3])
+    def test_inhabited_time(self, tmp_path, compression):
+        """Test reading InhabitedTime for each supported compression."""
+        path = tmp_path / "r.0.0.mca"
+        write_region(path, {5: chunk_nbt(12345)}, compression)
+
+        assert read_inhabited(path) == {5: 12345}
+
+    def test_inhabited_time_deep_in_chunk(self, tmp_path):
+        """Test finding a tag beyond the first decompression step."""
+        path = tmp_path / "r.0.0.mca"
+        write_region(path, {0: chunk_nbt(99, padding=100_000)})
+
+        assert read_inhabited(path) == {0: 99}
+
+    def test_unsupported_compression(self, tmp_path):
+        """Test that LZ4 chunks are reported as unreadable."""
+        path = tmp_path / "r.0.0.mca"
+        write_region(path, {0: chunk_nbt(1)}, compression=4)
+
+        assert read_inhabited(path) == {0: None}
+
+    def test_compact_region(self, tmp_path):
+        """Test that compaction keeps the remaining chunks intact."""
+        path = tmp_path / "r.0.0.mca"
+        write_region(
+            path, {0: chunk_nbt(1, 9000), 1: chunk_nbt(2), 2: chunk_nbt(3, 5000)}
+        )
+        with map_region(path) as data:
+            before = chunk_payload(data, read_chunk_table(data)[2])
+        size = path.stat().st_size
+
+        freed = compact_region(path, {0})
+
+        assert freed == size - path.stat().st_size > 0
+        assert read_inhabited(path) == {1: 2, 2: 3}
+        with map_region(path) as data:
+            assert chunk_payload(data, read_chunk_table(data)[1]) == before
+
+    def test_compact_region_removes_empty_file(self, tmp_path):
+        """Test that a region without chunks is deleted."""
+        path = tmp_path / "r.0.0.mca"
+        write_region(path, {0: chunk_nbt(1)})
+        (tmp_path / "c.0.0.mcc").write_bytes(b"external")
+
+        compact_region(path, {0})
+
+        assert not path.exists()
+        assert not (tmp_path / "c.0.0.mcc").exists()
+
+
+class TestWorld:
+    """Test analyzing and pruning a world."""
+
+    @pytest.fixture
+    def world(self, tmp_path):
+        """World with two dimensions and entity data."""
+        write_region(
+            tmp_path / "world" / "region" / "r.0.0.mca",
+            {0: chunk_nbt(0), 1: chunk_nbt(20 * 3600), 2: chunk_nbt(100)},
+        )
+        write_region(
+            tmp_path / "world" / "entities" / "r.0.0.mca",
+            {0: b"entities", 1: b"entities"},
+        )
+        write_region(
+            tmp_path / "world_nether" / "DIM-1" / "region" / "r.-1.0.mca",
+            {10: chunk_nbt(0)},
+        )
+        write_region(
+            tmp_path / "world_nether" / "DIM-1" / "region" / "r.-1.1.mca",
+            {0: chunk_nbt(0)},
+            compression=4,
+        )
+        return tmp_path
+
+    def test_analyze(self, world):
+        """Test statistics across all dimensions."""
+        stats = process_world(world, threshold_ticks=20 * 60, workers=2)
+
+        assert stats.regions == 3
+        assert stats.chunks == 5
+        assert stats.unreadable == 1
+        assert sorted(stats.inhabited) == [0, 0, 100, 20 * 3600]
+        assert stats.prunable_chunks == 3
+
+    def test_prune(self, world):
+        """Test removing chunks below the threshold with their entities."""
+        process_world(world, threshold_ticks=20 * 60, workers=2, prune=True)
+
+        assert read_inhabited(world / "world" / "region" / "r.0.0.mca") == {1: 72000}
+        with map_region(world / "world" / "entities" / "r.0.0.mca") as data:
+            assert [e.index for e in read_chunk_table(data)] == [1]
+        assert not (world / "world_nether" / "DIM-1" / "region" / "r.-1.0.mca").exists()
+        # Unreadable chunks are kept
+        assert (world / "world_nether" / "DIM-1" / "region" / "r.-1.1.mca").exists()
+
+    @patch("minecraft_tools.aws.create_client")
+    def test_prune_refused_while_running(self, mock_create_client, world, monkeypatch):
+        """Test that pruning needs the service to be scaled to zero."""
+        monkeypatch.setenv("ECS_CLUSTER", "cluster")
+        monkeypatch.setenv("ECS_SERVICE", "service")
+        ecs = MagicMock()
+        ecs.describe_services.return_value = {
+            "services": [{"desiredCount": 1, "runningCount": 1}]
+        }
+        mock_create_client.return_value = ecs
+
+        with pytest.raises(SystemExit):
+            main([str(world), "--prune-below", "60"])
+
+        assert (world / "world_nether" / "DIM-1" / "region" / "r.-1.0.mca").exists()
+
+    def test_dry_run_report(self, world, capsys):
+        """Test that a dry run only reports what would be pruned."""
+        main([str(world), "--prune-below", "60", "--dry-run", "--workers", "2"])
+
+        output = capsys.readouterr().out
+        assert "below 1m" in output
+        assert "3 chunks" in output
+        assert (world / "world_nether" / "DIM-1" / "region" / "r.-1.0.mca").exists()